@@ -51,7 +51,7 @@ SYNCHRONIZATION_DEF
   # time (cached in ~/.cache/zig/), but consumers need them at a fixed, known location.
   #
   # Two types of source files exist in lib-common/:
-  #   .def     -- ready to use directly with dlltool (e.g. shlwapi.def)
+  #   .def     -- ready to use directly (e.g. shlwapi.def)
   #   .def.in  -- C preprocessor templates that conditionally include exports by
   #              architecture using macros from def-include/func.def.in
   #              (e.g. kernel32.def.in, ws2_32.def.in, ole32.def.in)
@@ -137,20 +137,7 @@ SYNCHRONIZATION_DEF
     _def_include="${_mingw_common}/../def-include"
     _mingw_libsrc="${_mingw_common}/../libsrc"
 
-    _dlltool=""
-    for _cand in \
-        "${BUILD_PREFIX}/bin/llvm-dlltool" \
-        "${BUILD_PREFIX}/bin/llvm-dlltool.exe" \
-        "${BUILD_PREFIX}/Library/bin/llvm-dlltool.exe" \
-        "${BUILD_PREFIX}/Library/bin/llvm-dlltool" \
-        "$(command -v llvm-dlltool 2>/dev/null || true)"; do
-      if [[ -x "${_cand}" ]]; then
-        _dlltool="${_cand}"
-        break
-      fi
-    done
-
-    # llvm-ar, discovered the same way as llvm-dlltool above. Required because
+    # llvm-ar, searched in BUILD_PREFIX first, then on PATH. Required because
     # zig 0.16.0's own `ar` frontend deterministically fails to create archives
     # on the osx-64 lane, where the freshly built x86_64 zig runs under Rosetta
     # on an arm64 host: `ar: error: unable to open '<path>': No such file or
@@ -179,9 +166,9 @@ SYNCHRONIZATION_DEF
       _ar_cmd=("${_zig_bin}" ar)
     fi
 
-    dbg echo "=== MinGW import lib generation: zig=${_zig_bin} dlltool=${_dlltool:-not found} ==="
-    if [[ -n "${_dlltool}" ]] && [[ -x "${_zig_bin}" ]]; then
-      dbg echo "=== Generating MinGW import libs (dlltool=${_dlltool}) ==="
+    dbg echo "=== MinGW import lib generation: zig=${_zig_bin} ==="
+    if [[ -x "${_zig_bin}" ]]; then
+      dbg echo "=== Generating MinGW import libs ==="
       _gen_count=0
       _gen_ok=0
       _gen_fail=0
@@ -203,93 +190,68 @@ SYNCHRONIZATION_DEF
       _gen_pre=$(ls -1 "${_mingw_common}"/*.a 2>/dev/null | wc -l || true)
       _gen_pre=$(( _gen_pre + 0 ))
 
-      # Helper: generate .a from a processed .def file.
-      # Captures dlltool's real exit status (was previously discarded via
-      # `2>/dev/null || true`, so a failed dlltool run left no trace beyond
-      # the attempt counter). set -e safe: a single failure must not abort
-      # the ~800-iteration loop, so the failure branch is handled explicitly
-      # rather than left to propagate.
-      function _gen_implib() {
-        local stem="$1" def="$2" outdir="$3" machine="$4"
-        local lib="${outdir}/lib${stem}.a"
-        if [[ -f "${lib}" ]]; then
-          _gen_skipped=$(( _gen_skipped + 1 ))
-          return 0
-        fi
-        local dll
-        dll="$(awk '/^LIBRARY/{gsub(/"/, "", $2); print $2; exit}' "${def}")"
-        [[ -z "${dll}" ]] && dll="${stem}.dll"
-        if "${_dlltool}" -m "${machine}" -D "${dll}" -d "${def}" -l "${lib}" 2>/dev/null; then
-          _gen_ok=$(( _gen_ok + 1 ))
-        else
-          _gen_fail=$(( _gen_fail + 1 ))
-          echo "WARNING: dlltool failed to generate lib${stem}.a from ${def} (machine=${machine})" >&2
-        fi
-        _gen_count=$(( _gen_count + 1 ))
-      }
-
-      # Silence xtrace across the import-lib loops below. Each .def costs ~14
-      # trace lines (for / [[ -f ]] / basename / the locals inside _gen_implib /
-      # awk / dlltool / counter) and there are ~800 .def and .def.in files, so
-      # this region alone emits several thousand CI log lines with no diagnostic
-      # value: dlltool failures now emit a WARNING each (see _gen_implib above)
-      # and the post-loop summaries report the counts. Restored immediately
-      # after the loops so Step 5 onward (CRT compile, stub archives -- where
-      # the real failures have occurred) stays fully traced.
-      _mingw_xt=0
-      if [[ "${DEBUG_ZIG_BUILD:-0}" != "1" ]]; then
-        case $- in *x*) _mingw_xt=1 ;; esac
-        { set +x; } 2>/dev/null
-      fi
-
-      # Steps 1/2/4 iterate all three Windows arches: implib generation is
-      # independent of this lane's target arch (see _mingw_arch_specs above).
+      # Steps 1/2/4 run through building/mingw_implibs.py: one call per
+      # source dir covers all three Windows arches (see _mingw_arch_specs),
+      # fanned out over CPU_COUNT workers. The old per-.def loop cost an awk
+      # fork, a `zig cc -E` and a dlltool run serially for ~800 sources x 3
+      # arches. With $ZIG_MINGW_IMPLIB_CACHE set, results are cached there
+      # keyed by (source content hash, dlltool machine, zig version, archive
+      # writer), so a rebuild only regenerates libs whose inputs changed;
+      # unset (the default), nothing outlives the build. The driver prints
+      #   attempts=N ok=N failed=N skipped=N cached=N
+      # which _run_implib_driver folds into the _gen_* counters below, so the
+      # census lines read as they did with the bash loop (cache hits count
+      # as ok). The archives themselves are written in-process by
+      # building/coff_implib.py (byte-identical to llvm-dlltool's output),
+      # so no dlltool is forked per lib. A .def it rejects still emits one
+      # WARNING on stderr and counts as failed.
+      _implib_cache="${ZIG_MINGW_IMPLIB_CACHE:-}"
+      _gen_cached=0
+      _implib_arch_args=()
       for _spec in "${_mingw_arch_specs[@]}"; do
-        _spec_arch="${_spec%%|*}"
-        _spec_rest="${_spec#*|}"
-        _spec_machine="${_spec_rest%%|*}"
-        _spec_triple="${_spec_rest#*|}"
-        case "${_spec_arch}" in
-          aarch64) _spec_outdir="${_mingw_libarm64}" ;;
-          x86)     _spec_outdir="${_mingw_lib32}" ;;
-          *)       _spec_outdir="${_mingw_common}" ;;
+        case "${_spec%%|*}" in
+          aarch64) _implib_arch_args+=(--arch "${_spec}|${_mingw_libarm64}") ;;
+          x86)     _implib_arch_args+=(--arch "${_spec}|${_mingw_lib32}") ;;
+          *)       _implib_arch_args+=(--arch "${_spec}|${_mingw_common}") ;;
         esac
+      done
 
-        # Step 1: plain .def files (shlwapi.def, version.def, synchronization.def, etc.)
-        # Source .def files are arch-independent (no preprocessing) and shared
-        # from lib-common; only the generated .a goes to the per-arch outdir.
-        for _def in "${_mingw_common}"/*.def; do
-          [[ -f "${_def}" ]] || continue
-          _stem="$(basename "${_def%.def}")"
-          _gen_implib "${_stem}" "${_def}" "${_spec_outdir}" "${_spec_machine}"
-        done
-
-        # Step 2: .def.in template files (ws2_32, kernel32, ole32, advapi32, user32, ...)
-        # Process through zig's C preprocessor with per-arch defines so
-        # architecture macros (F_X64, F_I386, F64, F32, etc.) expand correctly.
-        # The preprocessed .def is arch-dependent, so unlike the plain .def
-        # files above it is written into the per-arch outdir too, not cached
-        # back to lib-common.
-        for _def_in in "${_mingw_common}"/*.def.in; do
-          [[ -f "${_def_in}" ]] || continue
-          _stem="$(basename "${_def_in%.def.in}")"
-          # Skip include-only fragments (no LIBRARY/EXPORTS; macros defined externally)
-          case "${_stem}" in
-            ucrtbase-common|vcruntime140-common) continue ;;
+      # Args: driver args (--defs, -I, --skip) appended to the common set.
+      # A driver crash (no census line) counts as one failure, so it feeds
+      # the FATAL check below instead of passing as "nothing to do".
+      function _run_implib_driver() {
+        local census kv
+        if ! census="$(python "${RECIPE_DIR}/building/mingw_implibs.py" \
+              --zig "${_zig_bin}" \
+              --jobs "${CPU_COUNT:-1}" --cache-dir "${_implib_cache}" \
+              "${_implib_arch_args[@]}" "$@")" || [[ "${census}" != attempts=* ]]; then
+          echo "WARNING: mingw_implibs.py failed for $*" >&2
+          _gen_fail=$(( _gen_fail + 1 ))
+          return 0
+        fi
+        for kv in ${census}; do
+          case "${kv}" in
+            attempts=*) _gen_count=$(( _gen_count + ${kv#*=} )) ;;
+            ok=*)       _gen_ok=$(( _gen_ok + ${kv#*=} )) ;;
+            failed=*)   _gen_fail=$(( _gen_fail + ${kv#*=} )) ;;
+            skipped=*)  _gen_skipped=$(( _gen_skipped + ${kv#*=} )) ;;
+            cached=*)   _gen_cached=$(( _gen_cached + ${kv#*=} )) ;;
           esac
-          _lib="${_spec_outdir}/lib${_stem}.a"
-          [[ -f "${_lib}" ]] && continue
-          _def="${_spec_outdir}/${_stem}.def"
-          if [[ ! -f "${_def}" ]]; then
-            "${_zig_bin}" cc -E -P \
-              -target "${_spec_triple}" \
-              -x assembler-with-cpp \
-              -I"${_def_include}" \
-              "${_def_in}" 2>/dev/null > "${_def}" || { rm -f "${_def}"; continue; }
-          fi
-          _gen_implib "${_stem}" "${_def}" "${_spec_outdir}" "${_spec_machine}"
         done
-      done
+      }
+
+      # Step 1: plain .def files (shlwapi.def, version.def, synchronization.def, etc.)
+      # Source .def files are arch-independent (no preprocessing) and shared
+      # from lib-common; only the generated .a goes to the per-arch outdir.
+      # Step 2: .def.in template files (ws2_32, kernel32, ole32, advapi32, user32, ...)
+      # Processed through zig's C preprocessor with per-arch defines so
+      # architecture macros (F_X64, F_I386, F64, F32, etc.) expand correctly.
+      # The preprocessed .def is arch-dependent, so unlike the plain .def
+      # files above it is written into the per-arch outdir too, not cached
+      # back to lib-common. Include-only fragments (no LIBRARY/EXPORTS;
+      # macros defined externally) are skipped.
+      _run_implib_driver --defs "${_mingw_common}" -I "${_def_include}" \
+        --skip ucrtbase-common --skip vcruntime140-common
 
       # Step 3: uuid -- compiled from C source (no DLL, no import lib needed).
       # Per-arch: the object is COFF, so an x86_64 libuuid.a cannot link into
@@ -324,7 +286,7 @@ SYNCHRONIZATION_DEF
       _gen_common_a=$(ls -1 "${_mingw_common}"/*.a 2>/dev/null | wc -l || true); _gen_common_a=$(( _gen_common_a + 0 ))
       _gen_arm64_a=$(ls -1 "${_mingw_libarm64}"/*.a 2>/dev/null | wc -l || true); _gen_arm64_a=$(( _gen_arm64_a + 0 ))
       _gen_x86_a=$(ls -1 "${_mingw_lib32}"/*.a 2>/dev/null | wc -l || true); _gen_x86_a=$(( _gen_x86_a + 0 ))
-      dbg echo "=== Generated ${_gen_count} import lib attempts (${_gen_pre} pre-existing, ${_gen_ok} ok, ${_gen_fail} failed, ${_gen_skipped} skipped-present); per-arch .a counts: x86_64=${_gen_common_a} aarch64=${_gen_arm64_a} x86=${_gen_x86_a} ==="
+      dbg echo "=== Generated ${_gen_count} import lib attempts (${_gen_pre} pre-existing, ${_gen_ok} ok, ${_gen_fail} failed, ${_gen_skipped} skipped-present, ${_gen_cached} from cache); per-arch .a counts: x86_64=${_gen_common_a} aarch64=${_gen_arm64_a} x86=${_gen_x86_a} ==="
 
       # Step 4: Supplemental import libs from mingw-w64 .def.in templates.
       # Zig doesn't ship msvcrt.def -- we provide a complete mingw-w64 version
@@ -337,56 +299,17 @@ SYNCHRONIZATION_DEF
       _supp_defs="${RECIPE_DIR}/building/mingw-defs"
       if [[ -d "${_supp_defs}" ]]; then
         dbg echo "=== Processing supplemental mingw-w64 .def.in templates ==="
-        for _spec in "${_mingw_arch_specs[@]}"; do
-          _spec_arch="${_spec%%|*}"
-          _spec_rest="${_spec#*|}"
-          _spec_machine="${_spec_rest%%|*}"
-          _spec_triple="${_spec_rest#*|}"
-          case "${_spec_arch}" in
-            aarch64) _spec_outdir="${_mingw_libarm64}" ;;
-            x86)     _spec_outdir="${_mingw_lib32}" ;;
-            *)       _spec_outdir="${_mingw_common}" ;;
-          esac
-
-          for _supp_in in "${_supp_defs}"/*.def.in; do
-            [[ -f "${_supp_in}" ]] || continue
-            _supp_stem="$(basename "${_supp_in%.def.in}")"
-            # Skip pure include helpers (not standalone DLL definitions)
-            case "${_supp_stem}" in
-              func|ucrtbase-common|crt-aliases) continue ;;
-            esac
-            _supp_lib="${_spec_outdir}/lib${_supp_stem}.a"
-            [[ -f "${_supp_lib}" ]] && continue
-            _supp_def="${_spec_outdir}/${_supp_stem}.def"
-            if [[ ! -f "${_supp_def}" ]]; then
-              "${_zig_bin}" cc -E -P \
-                -target "${_spec_triple}" \
-                -x assembler-with-cpp \
-                -I"${_supp_defs}" \
-                -I"${_def_include}" \
-                -I"${_mingw_common}" \
-                "${_supp_in}" 2>/dev/null > "${_supp_def}" || { rm -f "${_supp_def}"; continue; }
-            fi
-            _gen_implib "${_supp_stem}" "${_supp_def}" "${_spec_outdir}" "${_spec_machine}"
-          done
-          # Also process plain .def files (no preprocessing needed, shared source)
-          for _supp_def in "${_supp_defs}"/*.def; do
-            [[ -f "${_supp_def}" ]] || continue
-            _supp_stem="$(basename "${_supp_def%.def}")"
-            _supp_lib="${_spec_outdir}/lib${_supp_stem}.a"
-            [[ -f "${_supp_lib}" ]] && continue
-            _gen_implib "${_supp_stem}" "${_supp_def}" "${_spec_outdir}" "${_spec_machine}"
-          done
-        done
+        # Pure include helpers (not standalone DLL definitions) are skipped.
+        _run_implib_driver --defs "${_supp_defs}" \
+          -I "${_supp_defs}" -I "${_def_include}" -I "${_mingw_common}" \
+          --skip func --skip ucrtbase-common --skip crt-aliases
         _gen_common_a=$(ls -1 "${_mingw_common}"/*.a 2>/dev/null | wc -l || true); _gen_common_a=$(( _gen_common_a + 0 ))
         _gen_arm64_a=$(ls -1 "${_mingw_libarm64}"/*.a 2>/dev/null | wc -l || true); _gen_arm64_a=$(( _gen_arm64_a + 0 ))
         _gen_x86_a=$(ls -1 "${_mingw_lib32}"/*.a 2>/dev/null | wc -l || true); _gen_x86_a=$(( _gen_x86_a + 0 ))
-        dbg echo "=== Supplemental import libs done (${_gen_pre} pre-existing, total ${_gen_count} attempts, ${_gen_ok} ok, ${_gen_fail} failed, ${_gen_skipped} skipped-present); per-arch .a counts: x86_64=${_gen_common_a} aarch64=${_gen_arm64_a} x86=${_gen_x86_a} ==="
+        dbg echo "=== Supplemental import libs done (${_gen_pre} pre-existing, total ${_gen_count} attempts, ${_gen_ok} ok, ${_gen_fail} failed, ${_gen_skipped} skipped-present, ${_gen_cached} from cache); per-arch .a counts: x86_64=${_gen_common_a} aarch64=${_gen_arm64_a} x86=${_gen_x86_a} ==="
       fi
 
-      if [[ "${_mingw_xt}" == "1" ]]; then { set -x; } 2>/dev/null; fi
-
-      # Post-loop check: a successful dlltool/ar exit does not guarantee a
+      # Post-loop check: a successful implib/ar step does not guarantee a
       # usable archive, and per-arch generation must not silently produce
       # nothing for one of the three arches. Sweep every outdir, accumulate
       # failures, then FATAL once -- same accumulate-then-FATAL style as
@@ -464,7 +387,7 @@ SYNCHRONIZATION_DEF
       done
       if [[ "${_gen_fail}" -gt 0 ]]; then
         _gen_failed_count=$(( _gen_failed_count + 1 ))
-        _gen_failed_list="${_gen_failed_list}  - dlltool reported ${_gen_fail} failure(s) across all arches
+        _gen_failed_list="${_gen_failed_list}  - import-lib generation reported ${_gen_fail} failure(s) across all arches
 "
       fi
       if [[ "${_gen_failed_count}" -gt 0 ]]; then
@@ -715,7 +638,7 @@ WARM_EOF
       dbg echo "=== Stub archive generation done ==="
 
     else
-      dbg echo "=== llvm-dlltool or zig not found; skipping import lib pre-generation ==="
+      dbg echo "=== zig not found; skipping import lib pre-generation ==="
     fi
   fi
 }
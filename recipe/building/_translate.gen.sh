@@ -2,8 +2,10 @@
 # Source of truth: recipe/building/flag_rules.py
 # Regenerate:       python recipe/building/gen_translators.py
 # CI drift guard:   python recipe/building/gen_translators.py --check
+# Inputs digest:    825c494d6f3919aace29bc5e211a32b42babe4883b0159b5bd7a048545d4ec69
+# Output digest:    64a96db2a91aef097fcc1e47a51313e8c5cfbba3c33b0ea660e233924f9051a7
 #
-# _zig_translate_flags -- shared flag-translation rules R1-R13 (unix
+# _zig_translate_flags -- shared flag-translation rules R1-R14 (unix
 # profile only -- this fragment is only ever sourced by the bash wrapper,
 # which always runs on the unix profile).
 #
@@ -15,6 +17,9 @@
 #     _tr_is_win_target : 0|1    - whether the baked-in zig target is a
 #                         windows/mingw target (drives R1's -Map rewrite)
 #     _tr_mode_is_cxx   : 0|1    - 1 for c++ mode, 0 for cc mode
+#     _tr_probe_out, _tr_probe_err : arrays, optional - R14's install-time
+#                         answers (stdout / stderr text per probe, in
+#                         flag_rules order); unset or empty = not baked
 #   Outputs (globals, set by this function):
 #     _tr_out_args : array  - translated args. Already includes any
 #                    injected "-mcpu=baseline" (R6, prepended first) and
@@ -29,19 +34,29 @@
 #                    itself) before deciding whether to prepend
 #                    "-fuse-ld=lld".
 #     _tr_mode_out : string - possibly downgraded to "cc" by R4.
+#     _tr_cls      : string - scratch, last _zig_tr_classify result.
 #
-# May print R2/R3/R10-R13 output directly and `exit 0` -- this function is meant
+# May print R2/R3/R10-R14 output directly and `exit 0` -- this function is meant
 # to be `source`d (not run in a subshell), so `exit` here really does
 # exit the whole wrapper process, matching the pre-refactor fragment's
 # behavior.
+#
+# Every arg is classified once per pass by _zig_tr_classify (the `case`
+# jump table below, generated from the same rows as the C trie in
+# _translate.inc); the passes then dispatch on the class.
 _zig_translate_flags() {
     local _a _i _n _dir _name _prog
     local _argc=${#_tr_in_args[@]}
 
-    # R2/R3/R10-R13: intercept rules -- single arg scan, one case dispatch.
-    for _a in "${_tr_in_args[@]}"; do
-        case "$_a" in
-        -print-search-dirs)
+    # Pass 1: intercepts (R2/R3/R10-R14), use_lld triggers (R8,
+    # R9-trigger-subset) and -mcpu= presence (R6).
+    _tr_use_lld=0
+    local _has_mcpu=0
+    for _i in "${!_tr_in_args[@]}"; do
+        _a="${_tr_in_args[$_i]}"
+        _zig_tr_classify "$_a"
+        case "$_tr_cls" in
+        R2_PRINT_SEARCH_DIRS)
             local _zig_lib="${_tr_conda_prefix}/lib/zig"
             local _arch_leaf="lib-x86_64"
             [[ "${_tr_target_arch}" == "aarch64" ]] && _arch_leaf="libarm64"
@@ -51,7 +66,7 @@ _zig_translate_flags() {
             echo "libraries: =${_zig_lib}/libc/mingw/lib-common:${_zig_lib}/libc/mingw/${_arch_leaf}:${_zig_lib}"
             exit 0
             ;;
-        -print-file-name=*)
+        R3_PRINT_FILE_NAME)
             _name="${_a#-print-file-name=}"
             for _dir in "${_tr_conda_prefix}/lib/zig-llvm/lib" "${_tr_conda_prefix}/lib"; do
                 if [[ -e "${_dir}/${_name}" ]]; then
@@ -62,11 +77,11 @@ _zig_translate_flags() {
             echo "${_name}"
             exit 0
             ;;
-        -print-multi-os-directory)
+        R10_PRINT_MULTI_OS_DIRECTORY)
             echo "."
             exit 0
             ;;
-        -print-prog-name=*)
+        R11_PRINT_PROG_NAME)
             _name="${_a#-print-prog-name=}"
             _prog="${_tr_conda_prefix}/bin/${_name}"
             if [[ -e "${_prog}" ]]; then
@@ -76,11 +91,11 @@ _zig_translate_flags() {
             fi
             exit 0
             ;;
-        -print-sysroot)
+        R12_PRINT_SYSROOT)
             echo "${_sr:-}"
             exit 0
             ;;
-        -print-multiarch)
+        R13_PRINT_MULTIARCH)
             if (( _tr_is_win_target )); then
                 _zig_tr_translate_target "${_tr_target_arch}-w64-mingw32"
             else
@@ -88,108 +103,128 @@ _zig_translate_flags() {
             fi
             exit 0
             ;;
+        R14_BAKED_PROBES_0)
+            if (( _argc == 1 )) && [[ -n "${_tr_probe_out[0]:-}${_tr_probe_err[0]:-}" ]]; then
+                _name="${_tr_probe_out[0]:-}"
+                printf '%s' "${_name//"{conda_prefix}"/${_tr_conda_prefix}}"
+                _name="${_tr_probe_err[0]:-}"
+                printf '%s' "${_name//"{conda_prefix}"/${_tr_conda_prefix}}" >&2
+                exit 0
+            fi
+            ;;
+        R14_BAKED_PROBES_1)
+            if (( _argc == 1 )) && [[ -n "${_tr_probe_out[1]:-}${_tr_probe_err[1]:-}" ]]; then
+                _name="${_tr_probe_out[1]:-}"
+                printf '%s' "${_name//"{conda_prefix}"/${_tr_conda_prefix}}"
+                _name="${_tr_probe_err[1]:-}"
+                printf '%s' "${_name//"{conda_prefix}"/${_tr_conda_prefix}}" >&2
+                exit 0
+            fi
+            ;;
+        R14_BAKED_PROBES_2)
+            if (( _argc == 1 )) && [[ -n "${_tr_probe_out[2]:-}${_tr_probe_err[2]:-}" ]]; then
+                _name="${_tr_probe_out[2]:-}"
+                printf '%s' "${_name//"{conda_prefix}"/${_tr_conda_prefix}}"
+                _name="${_tr_probe_err[2]:-}"
+                printf '%s' "${_name//"{conda_prefix}"/${_tr_conda_prefix}}" >&2
+                exit 0
+            fi
+            ;;
+        R14_BAKED_PROBES_3)
+            if (( _argc == 1 )) && [[ -n "${_tr_probe_out[3]:-}${_tr_probe_err[3]:-}" ]]; then
+                _name="${_tr_probe_out[3]:-}"
+                printf '%s' "${_name//"{conda_prefix}"/${_tr_conda_prefix}}"
+                _name="${_tr_probe_err[3]:-}"
+                printf '%s' "${_name//"{conda_prefix}"/${_tr_conda_prefix}}" >&2
+                exit 0
+            fi
+            ;;
+        R8_TRIGGER | R8_XLINKER_VALUE | R9_TRIGGER)
+            _tr_use_lld=1
+            ;;
+        R8_XLINKER)
+            _zig_tr_classify "${_tr_in_args[$((_i + 1))]:-}"
+            if [[ "$_tr_cls" == R8_XLINKER_VALUE ]]; then
+                _tr_use_lld=1
+            fi
+            ;;
+        R6_MCPU)
+            _has_mcpu=1
+            ;;
         esac
     done
 
-    # Pre-scan: use_lld triggers (R8, R9-trigger-subset) + -mcpu= presence (R6).
-    _tr_use_lld=0
-    local _has_mcpu=0
-    for _i in "${!_tr_in_args[@]}"; do
-        _a="${_tr_in_args[$_i]}"
-        case "$_a" in
-            -Wl,-Bsymbolic-functions|-Wl,-Bsymbolic|-Bsymbolic-functions|-Bsymbolic) _tr_use_lld=1 ;;
-            -Wl,-z,defs|-Wl,-z,nodelete) _tr_use_lld=1 ;;
-            -Wl,-O[0-9]*) _tr_use_lld=1 ;;
-            -mcpu=*) _has_mcpu=1 ;;
-        esac
-        if [[ "$_a" == "-Xlinker" ]]; then
-            _n="${_tr_in_args[$((_i + 1))]:-}"
-            case "$_n" in
-                -Bsymbolic-functions|-Bsymbolic) _tr_use_lld=1 ;;
-            esac
-        fi
-    done
-
     _tr_out_args=()
     (( _has_mcpu )) || _tr_out_args+=("-mcpu=baseline")
 
+    # Pass 2: rewrite / drop / keep. R9 (both subsets) and every
+    # unclassified arg fall through to the default keep below.
     local _saw_nostdlibxx=0
     _i=0
     while [[ $_i -lt $_argc ]]; do
         _a="${_tr_in_args[$_i]}"
-
-        # R1: -Map rewrite (mingw targets only)
-        if (( _tr_is_win_target )); then
-            case "$_a" in
-                -Map)
-                    _n="${_tr_in_args[$((_i + 1))]:-}"
-                    if [[ -n "$_n" ]]; then
-                        _tr_out_args+=("-Wl,-Map,${_n}")
-                        _i=$((_i + 2))
+        _zig_tr_classify "$_a"
+        case "$_tr_cls" in
+        R1_MAP)
+            # R1: -Map rewrite (mingw targets only)
+            if (( _tr_is_win_target )); then
+                case "$_a" in
+                    -Map)
+                        _n="${_tr_in_args[$((_i + 1))]:-}"
+                        if [[ -n "$_n" ]]; then
+                            _tr_out_args+=("-Wl,-Map,${_n}")
+                            _i=$((_i + 2))
+                            continue
+                        fi
+                        ;;
+                    -Map=*)
+                        _tr_out_args+=("-Wl,-Map,${_a#-Map=}")
+                        _i=$((_i + 1))
                         continue
-                    fi
-                    ;;
-                -Map=*)
-                    _tr_out_args+=("-Wl,-Map,${_a#-Map=}")
-                    _i=$((_i + 1))
-                    continue
-                    ;;
-                -Map?*)
-                    _tr_out_args+=("-Wl,-Map,${_a#-Map}")
-                    _i=$((_i + 1))
-                    continue
-                    ;;
-            esac
-        fi
-
-        # R4: -nostdlib++ strip + mode downgrade
-        if [[ "$_a" == "-nostdlib++" ]]; then
+                        ;;
+                    -Map?*)
+                        _tr_out_args+=("-Wl,-Map,${_a#-Map}")
+                        _i=$((_i + 1))
+                        continue
+                        ;;
+                esac
+            fi
+            ;;
+        R4_STRIP)
+            # R4: -nostdlib++ strip + mode downgrade
             _saw_nostdlibxx=1
             _i=$((_i + 1))
             continue
-        fi
-
-        # R8: -Xlinker Bsymbolic(-functions) pair -- keep verbatim (already
-        # counted toward use_lld in the pre-scan above).
-        if [[ "$_a" == "-Xlinker" ]]; then
+            ;;
+        R8_XLINKER)
+            # R8: -Xlinker Bsymbolic(-functions) pair -- keep verbatim
+            # (already counted toward use_lld in pass 1).
             _n="${_tr_in_args[$((_i + 1))]:-}"
-            case "$_n" in
-                -Bsymbolic-functions|-Bsymbolic)
-                    _tr_out_args+=("$_a" "$_n")
-                    _i=$((_i + 2))
-                    continue
-                    ;;
-            esac
-        fi
-
-        # R7: hybrid-gated -Wl,* drop -- gate=always members first.
-        case "$_a" in
-            -Wl,--color-diagnostics | -Wl,-rpath-link* | -Wl,--disable-new-dtags)
-                _i=$((_i + 1))
+            _zig_tr_classify "$_n"
+            if [[ "$_tr_cls" == R8_XLINKER_VALUE ]]; then
+                _tr_out_args+=("$_a" "$_n")
+                _i=$((_i + 2))
                 continue
-                ;;
-        esac
-        # R7: gate=when_not_lld members -- only while use_lld is inactive.
-        # (block is empty when R7 has no when_not_lld members, e.g. after
-        # the 2026-07-15 narrowing to the 3 always-drop flags.)
-
-        # R9: -Wl,-z,* / -Wl,-O* -- always kept, never dropped (falls
-        # through to the default keep below; the trigger subset was
-        # already counted toward use_lld in the pre-scan above).
-
-        # R5: -target / --target= translation
-        if [[ "$_a" == "-target" ]]; then
+            fi
+            ;;
+        R7_DROP_ALWAYS)
+            # R7: hybrid-gated -Wl,* drop, gate=always members.
+            _i=$((_i + 1))
+            continue
+            ;;
+        R5_TARGET)
+            # R5: -target translation
             _n="${_tr_in_args[$((_i + 1))]:-}"
             _tr_out_args+=("$_a" "$(_zig_tr_translate_target "$_n")")
             _i=$((_i + 2))
             continue
-        fi
-        case "$_a" in
-            --target=*)
-                _tr_out_args+=("--target=$(_zig_tr_translate_target "${_a#--target=}")")
-                _i=$((_i + 1))
-                continue
-                ;;
+            ;;
+        R5_TARGET_EQ)
+            # R5: --target= translation
+            _tr_out_args+=("--target=$(_zig_tr_translate_target "${_a#--target=}")")
+            _i=$((_i + 1))
+            continue
+            ;;
         esac
 
         _tr_out_args+=("$_a")
@@ -201,6 +236,38 @@ _zig_translate_flags() {
     (( _saw_nostdlibxx )) && _tr_mode_out="cc"
 }
 
+# Token classifier: exact arms first, then prefix arms longest-first, so
+# the first matching arm is the longest match (same rows as the C trie).
+_zig_tr_classify() {
+    case "$1" in
+        "-print-search-dirs") _tr_cls=R2_PRINT_SEARCH_DIRS ;;
+        "-print-multi-os-directory") _tr_cls=R10_PRINT_MULTI_OS_DIRECTORY ;;
+        "-print-sysroot") _tr_cls=R12_PRINT_SYSROOT ;;
+        "-print-multiarch") _tr_cls=R13_PRINT_MULTIARCH ;;
+        "-dumpversion") _tr_cls=R14_BAKED_PROBES_0 ;;
+        "-dumpmachine") _tr_cls=R14_BAKED_PROBES_1 ;;
+        "--version") _tr_cls=R14_BAKED_PROBES_2 ;;
+        "-v") _tr_cls=R14_BAKED_PROBES_3 ;;
+        "-nostdlib++") _tr_cls=R4_STRIP ;;
+        "-target") _tr_cls=R5_TARGET ;;
+        "-Wl,--color-diagnostics" | "-Wl,--disable-new-dtags") _tr_cls=R7_DROP_ALWAYS ;;
+        "-Xlinker") _tr_cls=R8_XLINKER ;;
+        "-Wl,-Bsymbolic-functions" | "-Wl,-Bsymbolic") _tr_cls=R8_TRIGGER ;;
+        "-Bsymbolic-functions" | "-Bsymbolic") _tr_cls=R8_XLINKER_VALUE ;;
+        "-Wl,-z,defs" | "-Wl,-z,nodelete") _tr_cls=R9_TRIGGER ;;
+        "-print-file-name="*) _tr_cls=R3_PRINT_FILE_NAME ;;
+        "-print-prog-name="*) _tr_cls=R11_PRINT_PROG_NAME ;;
+        "-Wl,-rpath-link"*) _tr_cls=R7_DROP_ALWAYS ;;
+        "--target="*) _tr_cls=R5_TARGET_EQ ;;
+        "-Wl,-z,"*) _tr_cls=R9_KEEP ;;
+        "-Wl,-O0"* | "-Wl,-O1"* | "-Wl,-O2"* | "-Wl,-O3"* | "-Wl,-O4"* | "-Wl,-O5"* | "-Wl,-O6"* | "-Wl,-O7"* | "-Wl,-O8"* | "-Wl,-O9"*) _tr_cls=R9_TRIGGER ;;
+        "-mcpu="*) _tr_cls=R6_MCPU ;;
+        "-Wl,-O"*) _tr_cls=R9_KEEP ;;
+        "-Map"*) _tr_cls=R1_MAP ;;
+        *) _tr_cls=NONE ;;
+    esac
+}
+
 # R5 helper: conda triplet -> zig triplet (unix profile: includes darwin).
 _zig_tr_translate_target() {
     case "$1" in
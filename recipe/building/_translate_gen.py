@@ -0,0 +1,285 @@
+# GENERATED FILE -- DO NOT EDIT BY HAND.
+# Source of truth: recipe/building/flag_rules.py
+# Regenerate:       python recipe/building/gen_translators.py
+# CI drift guard:   python recipe/building/gen_translators.py --check
+# Inputs digest:    825c494d6f3919aace29bc5e211a32b42babe4883b0159b5bd7a048545d4ec69
+# Output digest:    74e4df7970ca0b48ce95a177280b9c7f68765a655e8d185ccb936f62fdd3bdd2
+#
+# zig_translate_flags -- pure-Python twin of _translate.inc's
+# zig_translate_flags(): rules R1-R14, both profiles, classified against
+# the same token table as the C trie and the bash jump table, with the
+# C's behaviour wherever the C and bash differ (R12 bails out on the win
+# profile; a trailing bare -target is kept as-is). Intercept output is
+# returned, not printed. Nothing in the wrappers imports this; it exists
+# so tests can run thousands of argv cases per second in-process and
+# diff them against the C and bash legs.
+
+from __future__ import annotations
+
+import os
+from typing import NamedTuple
+
+
+class Profile(NamedTuple):
+    """zig_translate_profile, field for field."""
+
+    is_win: bool
+    is_win_target: bool
+    conda_prefix: str
+    zig_target_arch: str = "x86_64"
+    sysroot: str | None = ""
+    probes: tuple[tuple[str, str], ...] | None = None
+
+
+class Result(NamedTuple):
+    """rc is zig_translate_flags()'s return: 0 translated, 2 intercepted
+    (stdout/stderr hold what the C would have printed; argv is empty)."""
+
+    rc: int
+    argv: list[str]
+    use_lld: int
+    mode_is_cxx: int
+    stdout: str
+    stderr: str = ""
+
+
+_EXACT = {
+    '-print-search-dirs': 'R2_PRINT_SEARCH_DIRS',
+    '-print-multi-os-directory': 'R10_PRINT_MULTI_OS_DIRECTORY',
+    '-print-sysroot': 'R12_PRINT_SYSROOT',
+    '-print-multiarch': 'R13_PRINT_MULTIARCH',
+    '-dumpversion': 'R14_BAKED_PROBES_0',
+    '-dumpmachine': 'R14_BAKED_PROBES_1',
+    '--version': 'R14_BAKED_PROBES_2',
+    '-v': 'R14_BAKED_PROBES_3',
+    '-nostdlib++': 'R4_STRIP',
+    '-target': 'R5_TARGET',
+    '-Wl,--color-diagnostics': 'R7_DROP_ALWAYS',
+    '-Wl,--disable-new-dtags': 'R7_DROP_ALWAYS',
+    '-Xlinker': 'R8_XLINKER',
+    '-Wl,-Bsymbolic-functions': 'R8_TRIGGER',
+    '-Wl,-Bsymbolic': 'R8_TRIGGER',
+    '-Bsymbolic-functions': 'R8_XLINKER_VALUE',
+    '-Bsymbolic': 'R8_XLINKER_VALUE',
+    '-Wl,-z,defs': 'R9_TRIGGER',
+    '-Wl,-z,nodelete': 'R9_TRIGGER',
+}
+
+_PREFIX = {
+    '-print-file-name=': 'R3_PRINT_FILE_NAME',
+    '-print-prog-name=': 'R11_PRINT_PROG_NAME',
+    '-Map': 'R1_MAP',
+    '--target=': 'R5_TARGET_EQ',
+    '-mcpu=': 'R6_MCPU',
+    '-Wl,-rpath-link': 'R7_DROP_ALWAYS',
+    '-Wl,-z,': 'R9_KEEP',
+    '-Wl,-O': 'R9_KEEP',
+    '-Wl,-O0': 'R9_TRIGGER',
+    '-Wl,-O1': 'R9_TRIGGER',
+    '-Wl,-O2': 'R9_TRIGGER',
+    '-Wl,-O3': 'R9_TRIGGER',
+    '-Wl,-O4': 'R9_TRIGGER',
+    '-Wl,-O5': 'R9_TRIGGER',
+    '-Wl,-O6': 'R9_TRIGGER',
+    '-Wl,-O7': 'R9_TRIGGER',
+    '-Wl,-O8': 'R9_TRIGGER',
+    '-Wl,-O9': 'R9_TRIGGER',
+}
+
+_PREFIX_LENGTHS = (17, 15, 9, 7, 6, 4)
+
+# class -> (op, prefix whose remainder is the op's argument, fires on win,
+# only when the token is the whole argv)
+_INTERCEPTS = {
+    'R2_PRINT_SEARCH_DIRS': ('intercept_print_search_dirs', '', True, False),
+    'R3_PRINT_FILE_NAME': ('intercept_print_file_name', '-print-file-name=', True, False),
+    'R10_PRINT_MULTI_OS_DIRECTORY': ('intercept_print_multi_os_directory', '', True, False),
+    'R11_PRINT_PROG_NAME': ('intercept_print_prog_name', '-print-prog-name=', True, False),
+    'R12_PRINT_SYSROOT': ('intercept_print_sysroot', '', False, False),
+    'R13_PRINT_MULTIARCH': ('intercept_print_multiarch', '', True, False),
+    'R14_BAKED_PROBES_0': ('intercept_print_baked_probe', '', True, True),
+    'R14_BAKED_PROBES_1': ('intercept_print_baked_probe', '', True, True),
+    'R14_BAKED_PROBES_2': ('intercept_print_baked_probe', '', True, True),
+    'R14_BAKED_PROBES_3': ('intercept_print_baked_probe', '', True, True),
+}
+
+# R14: Profile.probes is indexed in this order
+_PROBES = ('-dumpversion', '-dumpmachine', '--version', '-v')
+
+# (form, pattern, replacement, unix profile only), in R5 manifest order
+_TARGET_FAMILIES = (
+    ('prefix', 'x86_64-w64-mingw32', 'x86_64-windows-gnu', False),
+    ('prefix', 'aarch64-w64-mingw32', 'aarch64-windows-gnu', False),
+    ('infix', '-conda-linux-gnu', '-linux-gnu', False),
+    ('prefix', 'x86_64-apple-darwin', 'x86_64-macos-none', True),
+    ('prefix', 'arm64-apple-darwin', 'aarch64-macos-none', True),
+)
+
+_PROFILE_DATA = {
+    'unix': {
+        'dir_sep': '/',
+        'path_sep': ':',
+        'zig_lib': '{conda_prefix}/lib/zig',
+        'programs_dir': '{conda_prefix}/bin/',
+        'mingw_common': '{zig_lib}/libc/mingw/lib-common',
+        'arch_dirs': {'aarch64': '{zig_lib}/libc/mingw/libarm64', 'x86': '{zig_lib}/libc/mingw/lib32', 'i386': '{zig_lib}/libc/mingw/lib32', 'i686': '{zig_lib}/libc/mingw/lib32', '*': '{zig_lib}/libc/mingw/lib-x86_64'},
+        'print_file_name_probe_dirs': ['{conda_prefix}/lib/zig-llvm/lib', '{conda_prefix}/lib'],
+    },
+    'win': {
+        'dir_sep': '\\',
+        'path_sep': ';',
+        'zig_lib': '{conda_prefix}\\Library\\lib\\zig',
+        'programs_dir': '{conda_prefix}\\Library\\bin\\',
+        'mingw_common': '{zig_lib}\\libc\\mingw\\lib-common',
+        'arch_dirs': {'aarch64': '{zig_lib}\\libc\\mingw\\libarm64', 'x86': '{zig_lib}\\libc\\mingw\\lib32', 'i386': '{zig_lib}\\libc\\mingw\\lib32', 'i686': '{zig_lib}\\libc\\mingw\\lib32', '*': '{zig_lib}\\libc\\mingw\\lib-x86_64'},
+        'print_file_name_probe_dirs': ['{conda_prefix}\\Library\\lib\\zig-llvm\\lib', '{conda_prefix}\\Library\\lib'],
+    },
+}
+
+
+def classify(a: str) -> str:
+    """Token class, longest match first (zig_tr_classify)."""
+    cls = _EXACT.get(a)
+    if cls is not None:
+        return cls
+    for n in _PREFIX_LENGTHS:
+        cls = _PREFIX.get(a[:n])
+        if cls is not None:
+            return cls
+    return "NONE"
+
+
+def translate_target(val: str, profile: Profile) -> str:
+    """R5: conda triplet -> zig triplet (zig_tr_translate_target)."""
+    for form, pattern, replacement, unix_only in _TARGET_FAMILIES:
+        if unix_only and profile.is_win:
+            continue
+        if form == "prefix":
+            if val.startswith(pattern):
+                return replacement
+        else:
+            p = val.find(pattern)
+            if p >= 0:
+                # The C formats into a 256-byte buffer, prefix capped at 224.
+                return (val[:min(p, 224)] + replacement)[:255]
+    return val
+
+
+def _probe(path: str) -> bool:
+    return os.path.exists(path)
+
+
+def _intercept(op: str, value: str, profile: Profile) -> str:
+    data = _PROFILE_DATA["win" if profile.is_win else "unix"]
+    prefix = profile.conda_prefix
+    if op == "intercept_print_search_dirs":
+        zig_lib = data["zig_lib"].format(conda_prefix=prefix)
+        arch_dirs = data["arch_dirs"]
+        arch = arch_dirs.get(profile.zig_target_arch, arch_dirs["*"]).format(zig_lib=zig_lib)
+        common = data["mingw_common"].format(zig_lib=zig_lib)
+        sep = data["path_sep"]
+        return (f"install: {zig_lib}{data['dir_sep']}\n"
+                f"programs: ={data['programs_dir'].format(conda_prefix=prefix)}\n"
+                f"libraries: ={common}{sep}{arch}{sep}{zig_lib}\n")
+    if op == "intercept_print_file_name":
+        for d in data["print_file_name_probe_dirs"]:
+            probe = d.format(conda_prefix=prefix) + data["dir_sep"] + value
+            if _probe(probe):
+                return probe + "\n"
+        return value + "\n"
+    if op == "intercept_print_multi_os_directory":
+        return ".\n"
+    if op == "intercept_print_prog_name":
+        probe = data["programs_dir"].format(conda_prefix=prefix) + value
+        return (probe if _probe(probe) else value) + "\n"
+    if op == "intercept_print_sysroot":
+        return (profile.sysroot or "") + "\n"
+    if op == "intercept_print_multiarch":
+        synth = profile.zig_target_arch + ("-w64-mingw32" if profile.is_win else "-conda-linux-gnu")
+        return translate_target(synth[:63], profile) + "\n"
+    raise ValueError(op)
+
+
+def _baked_probe(token: str, profile: Profile) -> tuple[str, str] | None:
+    """R14 (zig_tr_print_baked_probe): the (stdout, stderr) replay, or
+    None when this probe was not baked."""
+    if not profile.probes:
+        return None
+    out, err = profile.probes[_PROBES.index(token)]
+    if not out and not err:
+        return None
+    return (out.replace("{conda_prefix}", profile.conda_prefix),
+            err.replace("{conda_prefix}", profile.conda_prefix))
+
+
+def _rewrite_map(a: str, nxt: str | None, profile: Profile) -> tuple[str | None, bool]:
+    """R1 (zig_tr_rewrite_map): (replacement or None, consumed next)."""
+    if not profile.is_win_target:
+        return None, False
+    if a == "-Map":
+        return (None, False) if nxt is None else ("-Wl,-Map," + nxt, True)
+    if a.startswith("-Map=") and len(a) > 5:
+        return "-Wl,-Map," + a[5:], False
+    if a.startswith("-Map") and len(a) > 4 and a[4] != "=":
+        return "-Wl,-Map," + a[4:], False
+    return None, False
+
+
+def zig_translate_flags(argv: list[str], profile: Profile, mode_is_cxx: bool = False) -> Result:
+    """Translate argv (program name excluded) as the C zig_translate_flags()
+    does for profile; mode_is_cxx is the caller's initial *out_mode_is_cxx."""
+    argc = len(argv)
+    classes = [classify(a) for a in argv]
+    use_lld = 0
+    has_mcpu = False
+    for i, cls in enumerate(classes):
+        hit = _INTERCEPTS.get(cls)
+        if hit is not None:
+            op, prefix, on_win, sole = hit
+            if (on_win or not profile.is_win) and (not sole or argc == 1):
+                if op != "intercept_print_baked_probe":
+                    return Result(2, [], 0, int(mode_is_cxx), _intercept(op, argv[i][len(prefix):], profile))
+                baked = _baked_probe(argv[i], profile)
+                if baked is not None:
+                    return Result(2, [], 0, int(mode_is_cxx), *baked)
+        elif cls in ("R8_TRIGGER", "R8_XLINKER_VALUE", "R9_TRIGGER"):
+            use_lld = 1
+        elif cls == "R8_XLINKER":
+            if i + 1 < argc and classes[i + 1] == "R8_XLINKER_VALUE":
+                use_lld = 1
+        elif cls == "R6_MCPU":
+            has_mcpu = True
+
+    out = [] if has_mcpu else ["-mcpu=baseline"]
+    saw_nostdlibxx = False
+    i = 0
+    while i < argc:
+        a, cls = argv[i], classes[i]
+        i += 1
+        if cls == "R1_MAP":
+            rewritten, consumed = _rewrite_map(a, argv[i] if i < argc else None, profile)
+            if rewritten is not None:
+                out.append(rewritten)
+                i += consumed
+                continue
+        elif cls == "R4_STRIP":
+            saw_nostdlibxx = True
+            continue
+        elif cls == "R8_XLINKER":
+            if i < argc and classes[i] == "R8_XLINKER_VALUE":
+                out += [a, argv[i]]
+                i += 1
+                continue
+        elif cls == "R7_DROP_ALWAYS":
+            continue
+        elif cls == "R5_TARGET":
+            if i < argc:
+                out += [a, translate_target(argv[i], profile)]
+                i += 1
+                continue
+        elif cls == "R5_TARGET_EQ":
+            out.append("--target=" + translate_target(a[len("--target="):], profile))
+            continue
+        out.append(a)
+
+    return Result(0, out, use_lld, int(bool(mode_is_cxx) and not saw_nostdlibxx), "")
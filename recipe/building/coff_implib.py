@@ -0,0 +1,538 @@
+#!/usr/bin/env python3
+"""Write MinGW-style COFF import libraries (lib<stem>.a) from .def files.
+
+In-process replacement for `llvm-dlltool -m MACHINE -D DLL -d DEF -l LIB`,
+so mingw_implibs.py can generate ~800 libs x 3 arches without forking one
+dlltool per lib (process creation dominates that step on Windows runners).
+
+Usage: python3 coff_implib.py -m MACHINE [-D DLL] -d DEF -l LIB
+
+MACHINE takes dlltool's spellings: i386:x86-64 / arm64 / i386 (also
+x86_64 / aarch64 / x86). Exits 1 with a message on stderr for a .def that
+dlltool would reject, and writes nothing in that case.
+
+Output is byte-for-byte what llvm-dlltool writes (GNU archive, symbol
+table first, deterministic headers): the import descriptor, null import
+descriptor and null thunk objects for the DLL, then one short-form
+import member per export -- or, for a `NAME == TARGET` alias, a pair of
+weak-external objects (NAME -> TARGET, __imp_NAME -> __imp_TARGET). The
+.def grammar follows llvm's COFFModuleDefinition parser in MinGW mode:
+LIBRARY/NAME, EXPORTS with `=` renames, `@ordinal`, NONAME, DATA,
+CONSTANT, PRIVATE and `==` aliases; HEAPSIZE/STACKSIZE/VERSION are
+accepted and ignored. On i386, undecorated names get the cdecl leading
+underscore.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import struct
+import sys
+from dataclasses import dataclass, field
+
+IMAGE_FILE_MACHINE_I386 = 0x014C
+IMAGE_FILE_MACHINE_AMD64 = 0x8664
+IMAGE_FILE_MACHINE_ARMNT = 0x01C4
+IMAGE_FILE_MACHINE_ARM64 = 0xAA64
+
+MACHINES = {
+    "i386:x86-64": IMAGE_FILE_MACHINE_AMD64,
+    "x86_64": IMAGE_FILE_MACHINE_AMD64,
+    "arm64": IMAGE_FILE_MACHINE_ARM64,
+    "aarch64": IMAGE_FILE_MACHINE_ARM64,
+    "arm": IMAGE_FILE_MACHINE_ARMNT,
+    "i386": IMAGE_FILE_MACHINE_I386,
+    "x86": IMAGE_FILE_MACHINE_I386,
+}
+
+# IMAGE_REL_*_ADDR32NB for the import descriptor's three RVA fields.
+_ADDR32NB = {
+    IMAGE_FILE_MACHINE_AMD64: 3,
+    IMAGE_FILE_MACHINE_ARMNT: 2,
+    IMAGE_FILE_MACHINE_ARM64: 2,
+    IMAGE_FILE_MACHINE_I386: 7,
+}
+
+IMPORT_CODE, IMPORT_DATA, IMPORT_CONST = 0, 1, 2
+IMPORT_ORDINAL, IMPORT_NAME, IMPORT_NAME_NOPREFIX = 0, 1, 2
+
+_IMAGE_FILE_32BIT_MACHINE = 0x0100
+_SCN_CNT_INITIALIZED_DATA = 0x00000040
+_SCN_LNK_INFO = 0x00000200
+_SCN_LNK_REMOVE = 0x00000800
+_SCN_ALIGN_2BYTES = 0x00200000
+_SCN_ALIGN_4BYTES = 0x00300000
+_SCN_ALIGN_8BYTES = 0x00400000
+_SCN_MEM_READ = 0x40000000
+_SCN_MEM_WRITE = 0x80000000
+_IDATA = _SCN_CNT_INITIALIZED_DATA | _SCN_MEM_READ | _SCN_MEM_WRITE
+
+_SYM_CLASS_NULL = 0
+_SYM_CLASS_EXTERNAL = 2
+_SYM_CLASS_STATIC = 3
+_SYM_CLASS_SECTION = 104
+_SYM_CLASS_WEAK_EXTERNAL = 105
+_WEAK_EXTERN_SEARCH_ALIAS = 3
+
+_FILE_HEADER = struct.Struct("<HHIIIHH")
+_SECTION = struct.Struct("<8sIIIIIIHHI")
+_RELOC = struct.Struct("<IIH")
+_SYMBOL = struct.Struct("<8sIhHBB")
+_IMPORT_HEADER = struct.Struct("<HHHHIIHH")
+_DIRECTORY_ENTRY_SIZE = 20
+
+
+class DefError(ValueError):
+    """A .def file llvm-dlltool would reject."""
+
+
+@dataclass
+class Export:
+    name: str
+    ext_name: str = ""
+    alias_target: str = ""
+    ordinal: int = 0
+    noname: bool = False
+    data: bool = False
+    constant: bool = False
+    private: bool = False
+
+
+@dataclass
+class ModuleDefinition:
+    output_file: str = ""
+    exports: list = field(default_factory=list)
+
+
+# ---------------------------------------------------------------------------
+# .def parsing
+# ---------------------------------------------------------------------------
+
+_KEYWORDS = {"BASE", "CONSTANT", "DATA", "EXPORTS", "HEAPSIZE", "LIBRARY", "NAME",
+             "NONAME", "PRIVATE", "STACKSIZE", "VERSION"}
+_WHITESPACE = " \t\n\v\f\r"
+_WORD_END = "=,;\r\n \t\v"
+
+
+def _tokens(text: str):
+    """Yield (kind, value) tokens; kind is a keyword, "ID", "=", "==", "," or
+    "EOF" (repeated forever once reached)."""
+    # llvm trims the remaining buffer on both ends before every token, so
+    # trailing whitespace never reaches a token (e.g. an unterminated quote).
+    pos, n = 0, len(text.rstrip(_WHITESPACE))
+    while True:
+        while pos < n and text[pos] in _WHITESPACE:
+            pos += 1
+        if pos >= n or text[pos] == "\0":
+            yield "EOF", ""
+            continue
+        c = text[pos]
+        if c == ";":
+            nl = text.find("\n", pos)
+            pos = n if nl < 0 else nl
+        elif c == "=":
+            if text.startswith("==", pos):
+                pos += 2
+                yield "==", "=="
+            else:
+                pos += 1
+                yield "=", "="
+        elif c == ",":
+            pos += 1
+            yield ",", ","
+        elif c == '"':
+            end = text.find('"', pos + 1, n)
+            value = text[pos + 1:n] if end < 0 else text[pos + 1:end]
+            pos = n if end < 0 else end + 1
+            yield "ID", value
+        else:
+            end = pos
+            while end < n and text[end] not in _WORD_END:
+                end += 1
+            word = text[pos:end]
+            pos = end
+            yield (word if word in _KEYWORDS else "ID"), word
+
+
+def _is_decorated(sym: str) -> bool:
+    # MinGW .def files list stdcall symbols as "Func@8" (no leading
+    # underscore), which still counts as undecorated here.
+    return sym.startswith("@") or "@@" in sym or sym.startswith("?")
+
+
+def _as_uint(s: str, bits: int):
+    """Decimal unsigned integer that fits in bits, or None --
+    StringRef::getAsInteger(10, ...) into an unsigned type."""
+    if not s or not all("0" <= ch <= "9" for ch in s):
+        return None
+    value = int(s)
+    return value if value < (1 << bits) else None
+
+
+class _Parser:
+    def __init__(self, text: str, machine: int):
+        self._lex = _tokens(text)
+        self._stack: list = []
+        self._machine = machine
+        self.tok = ("EOF", "")
+        self.info = ModuleDefinition()
+
+    def _read(self):
+        self.tok = self._stack.pop() if self._stack else next(self._lex)
+
+    def _unget(self):
+        self._stack.append(self.tok)
+
+    def _decorate(self, sym: str) -> str:
+        if self._machine == IMAGE_FILE_MACHINE_I386 and not _is_decorated(sym):
+            return "_" + sym
+        return sym
+
+    def parse(self) -> ModuleDefinition:
+        while True:
+            self._parse_one()
+            if self.tok[0] == "EOF":
+                return self.info
+
+    def _parse_one(self):
+        self._read()
+        kind, value = self.tok
+        if kind == "EOF":
+            return
+        if kind == "EXPORTS":
+            while True:
+                self._read()
+                if self.tok[0] != "ID":
+                    self._unget()
+                    return
+                self._parse_export()
+        elif kind in ("HEAPSIZE", "STACKSIZE"):
+            self._parse_numbers()
+        elif kind in ("LIBRARY", "NAME"):
+            name = self._parse_name()
+            if not self.info.output_file:
+                self.info.output_file = name
+                if not _has_extension(name):
+                    self.info.output_file += ".dll" if kind == "LIBRARY" else ".exe"
+        elif kind == "VERSION":
+            self._read()
+            major, _, minor = self.tok[1].partition(".")
+            if self.tok[0] != "ID" or _as_uint(major, 32) is None or (minor and _as_uint(minor, 32) is None):
+                raise DefError(f"integer expected: {self.tok[1]}")
+        else:
+            raise DefError(f"unknown directive: {value}")
+
+    def _read_int(self):
+        self._read()
+        if self.tok[0] != "ID" or _as_uint(self.tok[1], 64) is None:
+            raise DefError(f"integer expected: {self.tok[1]}")
+
+    def _parse_numbers(self):
+        self._read_int()
+        self._read()
+        if self.tok[0] != ",":
+            self._unget()
+            return
+        self._read_int()
+
+    def _parse_name(self) -> str:
+        self._read()
+        if self.tok[0] != "ID":
+            self._unget()
+            return ""
+        name = self.tok[1]
+        self._read()
+        if self.tok[0] == "BASE":
+            self._read()
+            if self.tok[0] != "=":
+                raise DefError("'=' expected")
+            self._read_int()
+        else:
+            self._unget()
+        return name
+
+    def _parse_export(self):
+        e = Export(name=self.tok[1])
+        self._read()
+        if self.tok[0] == "=":
+            self._read()
+            if self.tok[0] != "ID":
+                raise DefError(f"identifier expected, but got {self.tok[1]}")
+            e.ext_name, e.name = e.name, self.tok[1]
+        else:
+            self._unget()
+        e.name = self._decorate(e.name)
+        if e.ext_name:
+            e.ext_name = self._decorate(e.ext_name)
+
+        while True:
+            self._read()
+            kind, value = self.tok
+            if kind == "ID" and value.startswith("@"):
+                if value == "@":
+                    # "foo @ 10"
+                    self._read()
+                    ordinal = _as_uint(self.tok[1], 16)
+                    if ordinal is not None:
+                        e.ordinal = ordinal
+                else:
+                    ordinal = _as_uint(value[1:], 16)
+                    if ordinal is None:
+                        # "foo \n @bar": not an ordinal but the next
+                        # (fastcall-decorated) export.
+                        self._unget()
+                        self.info.exports.append(e)
+                        return
+                    e.ordinal = ordinal
+                self._read()
+                if self.tok[0] == "NONAME":
+                    e.noname = True
+                else:
+                    self._unget()
+            elif kind == "DATA":
+                e.data = True
+            elif kind == "CONSTANT":
+                e.constant = True
+            elif kind == "PRIVATE":
+                e.private = True
+            elif kind == "==":
+                self._read()
+                e.alias_target = self._decorate(self.tok[1])
+            else:
+                self._unget()
+                self.info.exports.append(e)
+                return
+
+
+def _has_extension(path: str) -> bool:
+    name = path.replace("\\", "/").rsplit("/", 1)[-1]
+    return name not in (".", "..") and "." in name
+
+
+def parse_def(text: str, machine: int) -> ModuleDefinition:
+    """Parse .def text the way llvm-dlltool does (MinGW mode).
+
+    Raises DefError where dlltool would print a parse error.
+    """
+    info = _Parser(text, machine).parse()
+    # dlltool: when only writing an import library the internal name of a
+    # "ExtName = Name" export is irrelevant; the public name is what counts.
+    for e in info.exports:
+        if e.ext_name:
+            e.name, e.ext_name = e.ext_name, ""
+    return info
+
+
+# ---------------------------------------------------------------------------
+# COFF objects
+# ---------------------------------------------------------------------------
+
+def _string_table(strings) -> bytes:
+    body = b"".join(s.encode("latin-1") + b"\0" for s in strings)
+    return struct.pack("<I", len(body) + 4) + body
+
+
+def _long_name(offset: int) -> bytes:
+    return b"\0\0\0\0" + struct.pack("<I", offset)
+
+
+class _ObjectFactory:
+    """The four member kinds llvm's COFFImportFile writer emits."""
+
+    def __init__(self, import_name: str, machine: int):
+        self.machine = machine
+        self.import_name = import_name
+        self.is32 = machine in (IMAGE_FILE_MACHINE_I386, IMAGE_FILE_MACHINE_ARMNT)
+        library = import_name.rsplit(".", 1)[0] if _has_extension(import_name) else import_name
+        self.descriptor_sym = "__IMPORT_DESCRIPTOR_" + library
+        self.null_descriptor_sym = "__NULL_IMPORT_DESCRIPTOR"
+        self.null_thunk_sym = "\x7f" + library + "_NULL_THUNK_DATA"
+        self._name = import_name.encode("latin-1")
+        self._flags = _IMAGE_FILE_32BIT_MACHINE if self.is32 else 0
+
+    def import_descriptor(self) -> bytes:
+        nsec, nrel = 2, 3
+        hdr_end = _FILE_HEADER.size + nsec * _SECTION.size
+        name_size = len(self._name) + 1
+        symtab = hdr_end + _DIRECTORY_ENTRY_SIZE + nrel * _RELOC.size + name_size
+        reloc = _ADDR32NB[self.machine]
+        out = [
+            _FILE_HEADER.pack(self.machine, nsec, 0, symtab, 7, 0, self._flags),
+            _SECTION.pack(b".idata$2", 0, 0, _DIRECTORY_ENTRY_SIZE, hdr_end,
+                          hdr_end + _DIRECTORY_ENTRY_SIZE, 0, nrel, 0, _SCN_ALIGN_4BYTES | _IDATA),
+            _SECTION.pack(b".idata$6", 0, 0, name_size,
+                          hdr_end + _DIRECTORY_ENTRY_SIZE + nrel * _RELOC.size, 0, 0, 0, 0,
+                          _SCN_ALIGN_2BYTES | _IDATA),
+            bytes(_DIRECTORY_ENTRY_SIZE),
+            # NameRVA -> .idata$6, ImportLookupTableRVA -> .idata$4,
+            # ImportAddressTableRVA -> .idata$5
+            _RELOC.pack(12, 2, reloc),
+            _RELOC.pack(0, 3, reloc),
+            _RELOC.pack(16, 4, reloc),
+            self._name + b"\0",
+            _SYMBOL.pack(_long_name(4), 0, 1, 0, _SYM_CLASS_EXTERNAL, 0),
+            _SYMBOL.pack(b".idata$2", 0, 1, 0, _SYM_CLASS_SECTION, 0),
+            _SYMBOL.pack(b".idata$6", 0, 2, 0, _SYM_CLASS_STATIC, 0),
+            _SYMBOL.pack(b".idata$4", 0, 0, 0, _SYM_CLASS_SECTION, 0),
+            _SYMBOL.pack(b".idata$5", 0, 0, 0, _SYM_CLASS_SECTION, 0),
+            _SYMBOL.pack(_long_name(4 + len(self.descriptor_sym) + 1), 0, 0, 0, _SYM_CLASS_EXTERNAL, 0),
+            _SYMBOL.pack(_long_name(4 + len(self.descriptor_sym) + 1 + len(self.null_descriptor_sym) + 1),
+                         0, 0, 0, _SYM_CLASS_EXTERNAL, 0),
+            _string_table([self.descriptor_sym, self.null_descriptor_sym, self.null_thunk_sym]),
+        ]
+        return b"".join(out)
+
+    def null_import_descriptor(self) -> bytes:
+        hdr_end = _FILE_HEADER.size + _SECTION.size
+        return b"".join([
+            _FILE_HEADER.pack(self.machine, 1, 0, hdr_end + _DIRECTORY_ENTRY_SIZE, 1, 0, self._flags),
+            _SECTION.pack(b".idata$3", 0, 0, _DIRECTORY_ENTRY_SIZE, hdr_end, 0, 0, 0, 0,
+                          _SCN_ALIGN_4BYTES | _IDATA),
+            bytes(_DIRECTORY_ENTRY_SIZE),
+            _SYMBOL.pack(_long_name(4), 0, 1, 0, _SYM_CLASS_EXTERNAL, 0),
+            _string_table([self.null_descriptor_sym]),
+        ])
+
+    def null_thunk(self) -> bytes:
+        va = 4 if self.is32 else 8
+        hdr_end = _FILE_HEADER.size + 2 * _SECTION.size
+        align = _SCN_ALIGN_4BYTES if self.is32 else _SCN_ALIGN_8BYTES
+        return b"".join([
+            _FILE_HEADER.pack(self.machine, 2, 0, hdr_end + 2 * va, 1, 0, self._flags),
+            _SECTION.pack(b".idata$5", 0, 0, va, hdr_end, 0, 0, 0, 0, align | _IDATA),
+            _SECTION.pack(b".idata$4", 0, 0, va, hdr_end + va, 0, 0, 0, 0, align | _IDATA),
+            bytes(2 * va),
+            _SYMBOL.pack(_long_name(4), 0, 1, 0, _SYM_CLASS_EXTERNAL, 0),
+            _string_table([self.null_thunk_sym]),
+        ])
+
+    def short_import(self, sym: str, ordinal: int, import_type: int, name_type: int) -> bytes:
+        payload = sym.encode("latin-1") + b"\0" + self._name + b"\0"
+        return _IMPORT_HEADER.pack(0, 0xFFFF, 0, self.machine, 0, len(payload), ordinal,
+                                   (name_type << 2) | import_type) + payload
+
+    def weak_external(self, target: str, weak: str, imp: bool) -> bytes:
+        prefix = "__imp_" if imp else ""
+        return b"".join([
+            _FILE_HEADER.pack(self.machine, 1, 0, _FILE_HEADER.size + _SECTION.size, 5, 0, 0),
+            _SECTION.pack(b".drectve", 0, 0, 0, 0, 0, 0, 0, 0, _SCN_LNK_INFO | _SCN_LNK_REMOVE),
+            _SYMBOL.pack(b"@comp.id", 0, -1, 0, _SYM_CLASS_STATIC, 0),
+            _SYMBOL.pack(b"@feat.00", 0, -1, 0, _SYM_CLASS_STATIC, 0),
+            _SYMBOL.pack(_long_name(4), 0, 0, 0, _SYM_CLASS_EXTERNAL, 0),
+            _SYMBOL.pack(_long_name(4 + len(prefix) + len(target) + 1), 0, 0, 0, _SYM_CLASS_WEAK_EXTERNAL, 1),
+            _SYMBOL.pack(bytes([2, 0, 0, 0, _WEAK_EXTERN_SEARCH_ALIAS, 0, 0, 0]), 0, 0, 0, _SYM_CLASS_NULL, 0),
+            _string_table([prefix + target, prefix + weak]),
+        ])
+
+
+# ---------------------------------------------------------------------------
+# GNU archive
+# ---------------------------------------------------------------------------
+
+def _member_header(name: str, size: int, perms: str = "644") -> bytes:
+    return (f"{name:<16}{0:<12}{0:<6}{0:<6}{perms:<8}{size:<10}`\n").encode("latin-1")
+
+
+def _write_archive(member_name: str, members: list) -> bytes:
+    """members: [(data, [symbol names])], all sharing member_name."""
+    long_names = b""
+    if len(member_name) >= 16 or "/" in member_name:
+        long_names = (member_name + "/\n").encode("latin-1")
+        header_name = "/0"
+    else:
+        header_name = member_name + "/"
+
+    strtab = b"".join(s.encode("latin-1") + b"\0" for _, syms in members for s in syms)
+    nsyms = sum(len(syms) for _, syms in members)
+    symtab_size = 4 + 4 * nsyms + len(strtab)
+    symtab_pad = symtab_size % 2
+    symtab_size += symtab_pad
+
+    pos = 8 + 60 + symtab_size
+    if long_names:
+        pos += 60 + len(long_names) + len(long_names) % 2
+    offsets = []
+    for data, _ in members:
+        offsets.append(pos)
+        pos += 60 + len(data) + len(data) % 2
+
+    out = [b"!<arch>\n", _member_header("/", symtab_size, perms="0"), struct.pack(">I", nsyms)]
+    for off, (_, syms) in zip(offsets, members):
+        out.extend(struct.pack(">I", off) for _ in syms)
+    out += [strtab, b"\0" * symtab_pad]
+    if long_names:
+        padded = len(long_names) + len(long_names) % 2
+        out += [f"{'//':<48}{padded:<10}`\n".encode("latin-1"), long_names, b"\n" * (len(long_names) % 2)]
+    for data, _ in members:
+        out += [_member_header(header_name, len(data)), data, b"\n" * (len(data) % 2)]
+    return b"".join(out)
+
+
+def write_import_library(import_name: str, exports: list, machine: int) -> bytes:
+    """Archive bytes for import_name's exports, as llvm-dlltool writes them."""
+    of = _ObjectFactory(import_name.replace("\\", "/").rsplit("/", 1)[-1], machine)
+    members = [
+        (of.import_descriptor(), [of.descriptor_sym]),
+        (of.null_import_descriptor(), [of.null_descriptor_sym]),
+        (of.null_thunk(), [of.null_thunk_sym]),
+    ]
+    for e in exports:
+        if e.private:
+            continue
+        import_type = IMPORT_CONST if e.constant else IMPORT_DATA if e.data else IMPORT_CODE
+        name = e.name
+        if e.alias_target and name != e.alias_target:
+            members.append((of.weak_external(e.alias_target, name, False), [name]))
+            members.append((of.weak_external(e.alias_target, name, True), ["__imp_" + name]))
+            continue
+        if e.noname:
+            name_type = IMPORT_ORDINAL
+        elif machine == IMAGE_FILE_MACHINE_I386 and name.startswith("_"):
+            name_type = IMPORT_NAME_NOPREFIX
+        else:
+            name_type = IMPORT_NAME
+        syms = ["__imp_" + name] if import_type == IMPORT_DATA else ["__imp_" + name, name]
+        members.append((of.short_import(name, e.ordinal, import_type, name_type), syms))
+    return _write_archive(of.import_name, members)
+
+
+def build_import_library(def_text: str, machine_name: str, dll_name: str = "") -> bytes:
+    """Parse def_text and return the import archive; dll_name overrides LIBRARY."""
+    machine = MACHINES.get(machine_name)
+    if machine is None:
+        raise DefError(f"unknown target: {machine_name}")
+    info = parse_def(def_text, machine)
+    output_file = dll_name or info.output_file
+    if not output_file:
+        raise DefError("no DLL name specified")
+    return write_import_library(output_file, info.exports, machine)
+
+
+def write_file(path: str, data: bytes) -> None:
+    """Write data to path via a sibling temp file, so readers never see a partial lib."""
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp, path)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-m", dest="machine", required=True, help="target machine (dlltool spelling)")
+    parser.add_argument("-D", dest="dll", default="", help="DLL name (overrides LIBRARY)")
+    parser.add_argument("-d", dest="def_file", required=True, help="input .def file")
+    parser.add_argument("-l", dest="lib", required=True, help="output import library")
+    args = parser.parse_args(argv)
+    try:
+        with open(args.def_file, encoding="latin-1") as fh:
+            data = build_import_library(fh.read(), args.machine, args.dll)
+        write_file(args.lib, data)
+    except (DefError, OSError) as exc:
+        print(f"coff_implib: {args.def_file}: {exc}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
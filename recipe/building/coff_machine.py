@@ -1,16 +1,35 @@
 #!/usr/bin/env python3
 """Print the COFF machine type of one or more archive (.a/.lib) files.
 
-Usage: python3 coff_machine.py FILE [FILE ...]
+Usage: python3 coff_machine.py [--json] [--jobs N] FILE|DIR [FILE|DIR ...]
 
 For each file, prints one line: "<path> <NAME>" where NAME is one of
 x86_64 / arm64 / i386 / UNKNOWN. Never raises and always exits 0 --
 any parsing problem (missing file, truncated archive, unrecognized
 machine value, etc.) resolves to UNKNOWN rather than an error, since
 this is used as a soft, best-effort sanity check in CI.
+
+NAME is the machine of the archive's first real member. The scanner
+maps each file once and reads the machine of EVERY member: when the
+archive has a `/` symbol table it visits exactly the members that table
+indexes (the ones a linker can pull in), otherwise it walks the member
+headers. A DIR argument expands to the *.a and *.lib files directly in
+it; many files are scanned in parallel (--jobs, default CPU_COUNT).
+
+--json prints one JSON array instead, one object per file:
+    {"path", "machine", "machines": {NAME: member count}, "mixed",
+     "members", "symbols", "indexed", "error"}
+where "mixed" is true when members carry more than one known machine
+(a stray x86_64 object inside libarm64/, say), "indexed" whether the
+`/` symbol table was used, and "error" null or a short reason.
 """
 
+import json
+import mmap
+import os
+import struct
 import sys
+from concurrent.futures import ProcessPoolExecutor
 
 ARCHIVE_MAGIC = b"!<arch>\n"
 MEMBER_HEADER_SIZE = 60
@@ -20,11 +39,15 @@ MACHINE_MAP = {
     0x014C: "i386",
 }
 
+# Below this many files the process pool costs more than it saves.
+_PARALLEL_MIN_FILES = 64
+
 
-def _machine_name(data: bytes) -> str:
+def _machine_name(data) -> str:
     """Determine the machine type from a single archive member's raw bytes."""
     if len(data) >= 6 and data[0:4] == b"\x00\x00\xff\xff":
-        # Short-form import library: machine is a little-endian uint16 at offset 6.
+        # Short-form import library (or /bigobj object): machine is a
+        # little-endian uint16 at offset 6.
         if len(data) < 8:
             return "UNKNOWN"
         machine = int.from_bytes(data[6:8], "little")
@@ -36,55 +59,162 @@ def _machine_name(data: bytes) -> str:
     return MACHINE_MAP.get(machine, "UNKNOWN")
 
 
-def detect_machine(path: str) -> str:
-    """Return the COFF machine name for the first real member of an archive at path."""
+def _header(buf, pos: int):
+    """(name, size) of the member header at pos, or None if malformed."""
+    if pos + MEMBER_HEADER_SIZE > len(buf):
+        return None
+    header = buf[pos:pos + MEMBER_HEADER_SIZE]
+    if header[58:60] != b"`\n":
+        return None
+    try:
+        size = int(header[48:58].decode("ascii").strip())
+    except ValueError:
+        return None
+    if pos + MEMBER_HEADER_SIZE + size > len(buf):
+        return None
+    return header[0:16].decode("ascii", errors="replace").strip(), size
+
+
+def _symbol_index(buf, size: int):
+    """{member offset: symbol count} from a GNU `/` symbol table body at
+    buf[0:size] (big-endian count, then one offset per symbol)."""
+    if size < 4:
+        return None
+    (count,) = struct.unpack_from(">I", buf, 0)
+    if 4 + 4 * count > size:
+        return None
+    index = {}
+    for (offset,) in struct.iter_unpack(">I", buf[4:4 + 4 * count]):
+        index[offset] = index.get(offset, 0) + 1
+    return index
+
+
+def _scan_buffer(buf, info: dict) -> None:
+    pos = len(ARCHIVE_MAGIC)
+    first = _header(buf, pos)
+    index = None
+    if first is not None and first[0] == "/":
+        body = pos + MEMBER_HEADER_SIZE
+        index = _symbol_index(buf[body:body + first[1]], first[1])
+
+    if index:
+        info["indexed"] = True
+        offsets = sorted(index)
+    else:
+        offsets = []
+        while True:
+            hdr = _header(buf, pos)
+            if hdr is None:
+                if pos < len(buf) - 1:
+                    info["error"] = f"malformed member header at offset {pos}"
+                break
+            if not hdr[0].startswith("/") or hdr[0][1:2].isdigit():
+                offsets.append(pos)
+            pos += MEMBER_HEADER_SIZE + hdr[1] + (hdr[1] & 1)
+
+    machines = info["machines"]
+    end = len(buf)
+    for offset in offsets:
+        # One slice per member: the 60-byte header plus the first 8 bytes
+        # of the body, which is all _machine_name() looks at.
+        chunk = buf[offset:offset + MEMBER_HEADER_SIZE + 8]
+        try:
+            size = int(chunk[48:58])
+        except ValueError:
+            size = -1
+        if chunk[58:60] != b"`\n" or size < 0 or offset + MEMBER_HEADER_SIZE + size > end:
+            info["error"] = f"bad member header at offset {offset}"
+            break
+        name = _machine_name(chunk[MEMBER_HEADER_SIZE:MEMBER_HEADER_SIZE + min(size, 8)])
+        if info["members"] == 0:
+            info["machine"] = name
+        machines[name] = machines.get(name, 0) + 1
+        info["members"] += 1
+        info["symbols"] += index.get(offset, 0) if index else 0
+    info["mixed"] = len([m for m in machines if m != "UNKNOWN"]) > 1
+
+
+def scan_archive(path: str) -> dict:
+    """Per-member machine census of the archive at path (see module doc)."""
+    info = {"path": path, "machine": "UNKNOWN", "machines": {}, "mixed": False,
+            "members": 0, "symbols": 0, "indexed": False, "error": None}
     try:
         with open(path, "rb") as fh:
-            magic = fh.read(8)
-            if magic != ARCHIVE_MAGIC:
-                return "UNKNOWN"
-
-            while True:
-                header = fh.read(MEMBER_HEADER_SIZE)
-                if len(header) < MEMBER_HEADER_SIZE:
-                    return "UNKNOWN"
-
-                name = header[0:16].decode("ascii", errors="replace").strip()
-                size_field = header[48:58].decode("ascii", errors="replace").strip()
-                end_magic = header[58:60]
+            if os.fstat(fh.fileno()).st_size <= len(ARCHIVE_MAGIC):
+                info["error"] = "not an archive"
+                return info
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if mm[:len(ARCHIVE_MAGIC)] != ARCHIVE_MAGIC:
+                    info["error"] = "not an archive"
+                    return info
+                # Slicing the map copies only what is sliced: 60-byte
+                # headers, 8 bytes per member and the symbol table.
+                _scan_buffer(mm, info)
+    except (OSError, ValueError) as exc:
+        info["error"] = str(exc) or type(exc).__name__
+    return info
+
+
+def _scan_safe(path: str) -> dict:
+    try:
+        return scan_archive(path)
+    except Exception as exc:  # noqa: BLE001 - this tool must never raise
+        return {"path": path, "machine": "UNKNOWN", "machines": {}, "mixed": False,
+                "members": 0, "symbols": 0, "indexed": False, "error": repr(exc)}
 
-                if end_magic != b"`\n":
-                    return "UNKNOWN"
 
-                try:
-                    size = int(size_field)
-                except ValueError:
-                    return "UNKNOWN"
+def detect_machine(path: str) -> str:
+    """Return the COFF machine name for the first real member of an archive at path."""
+    return _scan_safe(path)["machine"]
 
-                data = fh.read(size)
-                if len(data) < size:
-                    return "UNKNOWN"
 
-                # Archive members are padded to an even length.
-                if size % 2 == 1:
-                    fh.read(1)
+def scan_many(paths, jobs: int = 0) -> list:
+    """scan_archive() over paths, in order, across up to jobs worker processes."""
+    paths = list(paths)
+    jobs = jobs or int(os.environ.get("CPU_COUNT") or os.cpu_count() or 1)
+    if jobs <= 1 or len(paths) < _PARALLEL_MIN_FILES:
+        return [_scan_safe(p) for p in paths]
+    try:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            return list(pool.map(_scan_safe, paths, chunksize=max(1, len(paths) // (jobs * 4))))
+    except (OSError, RuntimeError):
+        # No usable process pool (sandboxed runner, etc.): stay serial.
+        return [_scan_safe(p) for p in paths]
 
-                if name.startswith("/") or name.startswith("//"):
-                    # Symbol table or long-name table -- skip to the next member.
-                    continue
 
-                return _machine_name(data)
-    except (OSError, ValueError):
-        return "UNKNOWN"
+def _expand(args) -> list:
+    paths = []
+    for arg in args:
+        if os.path.isdir(arg):
+            paths += sorted(os.path.join(arg, n) for n in os.listdir(arg)
+                            if n.endswith((".a", ".lib")) and os.path.isfile(os.path.join(arg, n)))
+        else:
+            paths.append(arg)
+    return paths
 
 
 def main() -> int:
-    for path in sys.argv[1:]:
-        try:
-            name = detect_machine(path)
-        except Exception:  # noqa: BLE001 - this tool must never raise
-            name = "UNKNOWN"
-        print(f"{path} {name}")
+    args = sys.argv[1:]
+    as_json = "--json" in args
+    jobs = 0
+    rest = []
+    i = 0
+    while i < len(args):
+        if args[i] == "--json":
+            pass
+        elif args[i] == "--jobs" and i + 1 < len(args):
+            i += 1
+            jobs = int(args[i]) if args[i].isdigit() else 0
+        else:
+            rest.append(args[i])
+        i += 1
+
+    results = scan_many(_expand(rest), jobs)
+    if as_json:
+        print(json.dumps(results, indent=1))
+    else:
+        for info in results:
+            print(f"{info['path']} {info['machine']}")
     return 0
 
 
@@ -7,25 +7,33 @@
  *   build-exe/etc  -> -target ZIG_TRIPLET (full triplet)
  *   other          -> passthrough
  *
- * Placeholders replaced at install time:
+ * Defined at install time with -D (_compile_c_shim in install_zig_activation.py;
+ * the "@NAME@" fallbacks below only keep the bare file compilable):
  *   NATIVE_ZIG_EXE  - filename of the native zig binary (e.g. x86_64-w64-mingw32-zig.exe)
  *   CC_TRIPLET      - target for cc/c++ (e.g. aarch64-windows-msvc)
  *   ZIG_TRIPLET     - target for zig commands (e.g. aarch64-windows-msvc)
  *
- * Compiled during package build:
+ * Compiled during package build (with recipe/building on the include path,
+ * for nonunix_common.h):
  *   cl /Fe:target-zig.exe cross-zig-shim.c
  */
 
+#include "nonunix_common.h"
 #include <stdio.h>
 #include <stdlib.h>
 #include <string.h>
-#include <process.h>
 #include <windows.h>
 
-/* These are replaced by the install script */
+/* These are set by the install script (-D, see _compile_c_shim) */
+#ifndef NATIVE_ZIG_EXE
 #define NATIVE_ZIG_EXE "@NATIVE_ZIG_EXE@"
+#endif
+#ifndef CC_TRIPLET
 #define CC_TRIPLET "@CC_TRIPLET@"
+#endif
+#ifndef ZIG_TRIPLET
 #define ZIG_TRIPLET "@ZIG_TRIPLET@"
+#endif
 
 static int str_eq(const char *a, const char *b) {
     return strcmp(a, b) == 0;
@@ -100,14 +108,14 @@ int main(int argc, char *argv[]) {
     }
     new_argv[ni] = NULL;
 
-    /* _spawnv replaces this process, returns exit code */
-    int ret = (int)_spawnv(_P_WAIT, zig_path, new_argv);
-    free(new_argv);
-
+    /* Run zig and propagate its exit code (see zig_spawn_wait) */
+    int ret = zig_spawn_wait(zig_path, new_argv);
     if (ret == -1) {
-        fprintf(stderr, "ERROR: cross-zig-shim: failed to exec %s: %s\n",
-                zig_path, strerror(errno));
+        fprintf(stderr, "ERROR: cross-zig-shim: failed to exec %s: error %lu\n",
+                zig_path, (unsigned long)GetLastError());
+        free(new_argv);
         return 1;
     }
+    free(new_argv);
     return ret;
 }
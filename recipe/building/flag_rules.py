@@ -12,7 +12,7 @@ gen_translators.py, which turns it into:
   - recipe/building/_translate.gen.sh   (bash translation function, sourced
                                           by _zig-cc-common.sh)
 
-SCOPE: rules R1-R13 below are de-duplicated here. Everything else in
+SCOPE: rules R1-R14 below are de-duplicated here. Everything else in
 _zig-cc-common.sh / zig-cc-nonunix.c that is NOT one of these rules
 (sysroot *detection* itself -- R12 only prints the already-computed _sr
 value, -Xlinker general trigger/drop besides Bsymbolic, -march/-mtune/
@@ -62,7 +62,7 @@ Each entry in RULES is a dict with this common envelope:
 RULE_KINDS (top-level "kind")
 ---------------------------------------------------------------------------
   "rewrite"           R1 -- token rewritten to a fixed-template replacement
-  "intercept"         R2, R3, R10-R13 -- print profile-specific text then
+  "intercept"         R2, R3, R10-R14 -- print profile-specific text then
                       exit 0
   "mode_override"     R4 -- strip flag, force translation mode
   "target_translate"  R5 -- rewrite -target/--target= value via "families"
@@ -76,6 +76,8 @@ RULE_KINDS (top-level "kind")
 MATCH KINDS (match["form"]) -- used by single-pattern rules (R1-R4, R6)
 ---------------------------------------------------------------------------
   "exact"         match["values"]: list[str] of exact tokens
+                  (intercepts only: match["sole"]=True restricts the rule
+                  to an argv that is that ONE token -- R14)
   "prefix"        match["values"]: list[str] of prefixes (starts_with)
   "concat_split"  match["token"]: bare token (e.g. "-Map") that can appear
                   as: bare + separate next-arg, "TOKEN=value", or
@@ -125,6 +127,12 @@ ACTION KINDS (action["op"])
                                  target_translate function/logic to
                                  produce the Debian-style value, then
                                  exit 0
+  "intercept_print_baked_probe" (R14) replay the answer install time
+                                 captured from zig for this probe (its
+                                 stdout and stderr, the install prefix
+                                 spelled {conda_prefix}); when none was
+                                 captured the flag is NOT intercepted and
+                                 reaches zig as usual
   "mode_override"               (R4) action["strip"]=True drops the flag
                                  from output; action["force_mode"] is the
                                  mode value to force (only ever downgrades,
@@ -181,7 +189,7 @@ PROFILES: tuple[str, ...] = ("unix", "win")
 
 # ---------------------------------------------------------------------------
 # Per-profile literal data for the intercept rules that need per-profile
-# path templates (R2, R3, R11 -- R10/R12/R13 need no PROFILE_DATA entries).
+# path templates (R2, R3, R11 -- R10/R12-R14 need no PROFILE_DATA entries).
 # ---------------------------------------------------------------------------
 PROFILE_DATA: dict[str, dict] = {
     "unix": dict(
@@ -476,6 +484,28 @@ R13_PRINT_MULTIARCH = dict(
     action=dict(op="intercept_print_multiarch"),
 )
 
+# ---------------------------------------------------------------------------
+# R14 -- compiler-identity probes answered without starting zig. configure
+# scripts and Meson ask `cc --version`, `cc -v`, `cc -dumpversion` and
+# `cc -dumpmachine` (each alone) before anything else, and every one is a
+# full zig startup for an answer fixed at install time.
+# install_zig_activation.py runs the installed zig once per probe, with the
+# wrapper's own -target, and bakes the output into the C wrappers
+# (zig_translate_profile.probes). "sole": `cc -v -c x.c` is a verbose
+# compile, not a probe, so only a one-token argv is intercepted. Builds
+# whose zig cannot run at install time (cross, emulated) bake nothing and
+# the probes keep going to zig. The values' order is the probes array's.
+# ---------------------------------------------------------------------------
+R14_BAKED_PROBES = dict(
+    id="R14_baked_probes",
+    kind="intercept",
+    profiles=PROFILES,
+    gate="n/a",
+    lld_trigger=False,
+    match=dict(form="exact", values=["-dumpversion", "-dumpmachine", "--version", "-v"], sole=True),
+    action=dict(op="intercept_print_baked_probe"),
+)
+
 RULES: list[dict] = [
     R1_MAP_REWRITE,
     R2_PRINT_SEARCH_DIRS,
@@ -490,6 +520,7 @@ RULES: list[dict] = [
     R11_PRINT_PROG_NAME,
     R12_PRINT_SYSROOT,
     R13_PRINT_MULTIARCH,
+    R14_BAKED_PROBES,
 ]
 
 
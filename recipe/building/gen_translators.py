@@ -3,7 +3,7 @@
 recipe/building/gen_translators.py
 
 Generator: turns the pure-data manifest in flag_rules.py (RULES, PROFILES,
-PROFILE_DATA) into two generated artifacts, rule-for-rule:
+PROFILE_DATA) into three generated artifacts, rule-for-rule:
 
   - recipe/building/_translate.inc      Portable C (no windows.h; only
                                          string.h/stdlib.h/stdio.h/ctype.h)
@@ -26,6 +26,15 @@ PROFILE_DATA) into two generated artifacts, rule-for-rule:
                                          runs under). Sourced by
                                          _zig-cc-common.sh.
 
+  - recipe/building/_translate_gen.py   Pure Python implementing
+                                         zig_translate_flags(argv,
+                                         profile), both profiles, with
+                                         the C artifact's semantics.
+                                         Shipped by nothing: it lets the
+                                         parity tests check argv cases
+                                         in-process instead of spawning
+                                         bash or a compiled harness.
+
 OUT OF SCOPE (left hand-written in the real wrappers, NOT emitted here):
   sysroot detection, the general -Xlinker trigger/drop set besides
   Bsymbolic (--dynamic-list, --version-script, --gc-sections, --build-id,
@@ -38,41 +47,70 @@ OUT OF SCOPE (left hand-written in the real wrappers, NOT emitted here):
   out-of-scope LLD triggers before deciding whether to prepend
   -fuse-ld=lld).
 
+Dispatch: every artifact classifies each argv token ONCE against a single
+(form, pattern, class) table flattened from RULES (_token_table) -- a
+radix trie of nested switch/strncmp in C, one `case` jump table in bash,
+exact + per-length prefix dicts in Python -- and then dispatches on the
+class, so per-token cost does not grow with
+the number of rules (recipe/testing/bench_translate_dispatch.py).
+
 Determinism: RULES is a fixed Python list (stable iteration order); no
 timestamps, no random data, no environment-dependent values are emitted.
 Running this generator twice against an unchanged flag_rules.py MUST
 produce byte-identical output -- this is required for the `--check` CI
 drift guard to be meaningful.
 
+Stamping: all three artifacts share one banner (_GEN_BANNER), which
+carries two sha256 digests -- "Inputs digest" over flag_rules.py + this
+file (line endings normalized, so a CRLF checkout stamps the same), the
+same value in _translate.inc, _translate.gen.sh and _translate_gen.py,
+and "Output digest" over that artifact's own text with both digests
+blanked back to their @...@ placeholders. A plain run skips rendering and rewriting any artifact
+whose stamps still verify; --check first verifies the stamps (two file
+hashes, no codegen) and only renders + diffs when one fails, which also
+catches hand edits to a generated file.
+
 Usage:
-    python gen_translators.py            # regenerate + write both files
-    python gen_translators.py --check    # regenerate to temp dir, diff
+    python gen_translators.py            # (re)write stale artifacts only
+    python gen_translators.py --force    # re-render + rewrite every file
+    python gen_translators.py --check    # verify stamps; on mismatch,
+                                          # regenerate to a temp dir and diff
                                           # against the committed files;
                                           # exit 1 on drift, 0 if identical
+    python gen_translators.py --check --full  # always render + diff
 """
 
 from __future__ import annotations
 
 import argparse
 import difflib
-import filecmp
+import hashlib
+import re
 import sys
 import tempfile
 from pathlib import Path
 
-from flag_rules import PROFILE_DATA, RULES, rules_for_profile
+from flag_rules import PROFILE_DATA, PROFILES, RULES, rules_for_profile
 
 _THIS_DIR = Path(__file__).resolve().parent
 _C_OUT = _THIS_DIR / "_translate.inc"
 _SH_OUT = _THIS_DIR / "_translate.gen.sh"
+_PY_OUT = _THIS_DIR / "_translate_gen.py"
 
 _GEN_BANNER = (
     "GENERATED FILE -- DO NOT EDIT BY HAND.\n"
     "Source of truth: recipe/building/flag_rules.py\n"
     "Regenerate:       python recipe/building/gen_translators.py\n"
     "CI drift guard:   python recipe/building/gen_translators.py --check\n"
+    "Inputs digest:    @INPUTS_DIGEST@\n"
+    "Output digest:    @OUTPUT_DIGEST@\n"
 )
 
+# The two stamp lines above, as written into a generated file (the comment
+# leader in front varies: " * " in C, "# " in bash).
+_STAMP_RE = re.compile(r"^(.{0,4})(Inputs|Output) digest:    ([0-9a-f]{64}|@(?:INPUTS|OUTPUT)_DIGEST@)$", re.M)
+_STAMP_SCAN_BYTES = 4096
+
 
 def _rule(rule_id: str) -> dict:
     for r in RULES:
@@ -81,53 +119,241 @@ def _rule(rule_id: str) -> dict:
     raise KeyError(rule_id)
 
 
+# ---------------------------------------------------------------------------
+# Token classification table (shared by the C trie and the bash jump table)
+# ---------------------------------------------------------------------------
+# Every per-token test the translators make is an exact or prefix match of
+# the token against a literal from RULES. Instead of emitting one strcmp /
+# strncmp chain per rule (per-token cost linear in the number of rules),
+# the generator flattens RULES into (form, pattern, class) rows once, and
+# both back ends classify each token ONCE against that table:
+#   - C:    a compile-time radix trie, emitted as nested switch/strncmp
+#           (zig_tr_classify) -- per-token cost bounded by the token
+#           length, independent of the number of rules;
+#   - bash: one `case` jump table (_zig_tr_classify), exact arms first,
+#           then prefix arms longest-first.
+# Both resolve overlaps by LONGEST MATCH (e.g. "-Wl,-z,defs" beats
+# "-Wl,-z,"); the dispatchers in zig_translate_flags/_zig_translate_flags
+# then switch on the class instead of re-testing the token per rule.
+# recipe/testing/bench_translate_dispatch.py measures the C side.
+
+# Non-intercept token classes, in enum order. Intercept rules get one class
+# each (derived from the rule id, see _intercept_class), emitted before
+# these. _token_classes() keeps only the classes _token_table() has rows
+# for, so a class with no members (R7_DROP_WHEN_NOT_LLD since the
+# 2026-07-15 narrowing) emits no enum value and no dispatcher arm.
+_FIXED_CLASSES: tuple[str, ...] = (
+    "R1_MAP",
+    "R4_STRIP",
+    "R5_TARGET",
+    "R5_TARGET_EQ",
+    "R6_MCPU",
+    "R7_DROP_ALWAYS",
+    "R7_DROP_WHEN_NOT_LLD",
+    "R8_XLINKER",
+    "R8_TRIGGER",
+    "R8_XLINKER_VALUE",
+    "R9_TRIGGER",
+    "R9_KEEP",
+)
+
+
+def _intercept_class(rule: dict, index: int) -> str:
+    cls = rule["id"].upper()
+    if len(rule["match"]["values"]) > 1:
+        cls += f"_{index}"
+    return cls
+
+
+def _intercept_classes(rules: list[dict]) -> list[tuple[str, dict, str, str]]:
+    """(class, rule, form, value) for every intercept match value, in
+    manifest order."""
+    out = []
+    for rule in rules:
+        if rule["kind"] != "intercept":
+            continue
+        form = rule["match"]["form"]
+        if form not in ("exact", "prefix"):
+            raise ValueError(f"unsupported intercept match form: {form!r}")
+        for idx, value in enumerate(rule["match"]["values"]):
+            out.append((_intercept_class(rule, idx), rule, form, value))
+    return out
+
+
+def _token_table(rules: list[dict]) -> list[tuple[str, str, str]]:
+    """Flatten RULES into (form, pattern, class) rows, form being "exact"
+    or "prefix". Raises ValueError on a pattern claimed by two classes
+    (longest-match cannot disambiguate those)."""
+    rows: list[tuple[str, str, str]] = []
+    for cls, _rule_, form, value in _intercept_classes(rules):
+        rows.append((form, value, cls))
+    for rule in rules:
+        kind = rule["kind"]
+        if kind == "rewrite":
+            # R1 concat_split: bare/=/concatenated forms all start with the
+            # token; zig_tr_rewrite_map() sorts out which one it is.
+            rows.append(("prefix", rule["match"]["token"], "R1_MAP"))
+        elif kind == "mode_override":
+            rows.extend(("exact", v, "R4_STRIP") for v in rule["match"]["values"])
+        elif kind == "target_translate":
+            rows.append(("exact", "-target", "R5_TARGET"))
+            rows.append(("prefix", "--target=", "R5_TARGET_EQ"))
+        elif kind == "option_preserve":
+            rows.extend((rule["match"]["form"], v, "R6_MCPU") for v in rule["match"]["values"])
+        elif kind == "wl_drop_gated":
+            for m in rule["members"]:
+                cls = "R7_DROP_ALWAYS" if m["gate"] == "always" else "R7_DROP_WHEN_NOT_LLD"
+                rows.append((m["form"], m["value"], cls))
+        elif kind == "keep_trigger":
+            members = rule["match"]["members"]
+            xl_values = {m["value"] for m in members if m["form"] == "xlinker_pair"}
+            exact_values = {m["value"] for m in members if m["form"] == "exact"}
+            # NOTE (flagged in report): an xlinker_pair value is assumed to
+            # also be a standalone exact trigger (true for both R8 values
+            # today) so a single R8_XLINKER_VALUE class can serve both roles.
+            if not xl_values <= exact_values:
+                raise ValueError(f"xlinker_pair values not also exact members: {sorted(xl_values - exact_values)}")
+            if xl_values:
+                rows.append(("exact", "-Xlinker", "R8_XLINKER"))
+            for m in members:
+                if m["form"] == "exact":
+                    cls = "R8_XLINKER_VALUE" if m["value"] in xl_values else "R8_TRIGGER"
+                    rows.append(("exact", m["value"], cls))
+        elif kind == "z_o_split":
+            for m in rule["members"]:
+                rows.append(("prefix", m["prefix"], "R9_KEEP"))
+                for v in m.get("trigger_values", ()):
+                    rows.append(("exact", m["prefix"] + v, "R9_TRIGGER"))
+                if m.get("trigger_numeric_suffix"):
+                    rows.extend(("prefix", m["prefix"] + d, "R9_TRIGGER") for d in "0123456789")
+
+    seen: dict[str, str] = {}
+    for form, pattern, cls in rows:
+        prev = seen.setdefault(pattern, cls)
+        if prev != cls:
+            raise ValueError(f"pattern {pattern!r} claimed by both {prev} and {cls}")
+    return rows
+
+
+def _token_classes(rules: list[dict]) -> list[str]:
+    live = {cls for _f, _p, cls in _token_table(rules)}
+    return (["NONE"] + [c for c, _r, _f, _v in _intercept_classes(rules)]
+            + [c for c in _FIXED_CLASSES if c in live])
+
+
+# Dispatcher arms for R7 gate=when_not_lld members, per language. Spliced
+# in only while that class has rows (see _token_classes).
+_R7_WHEN_NOT_LLD_ARM = {
+    "c": """        case ZIG_TR_TOK_R7_DROP_WHEN_NOT_LLD:
+            if (!use_lld) continue;
+            break;
+""",
+    "sh": """        R7_DROP_WHEN_NOT_LLD)
+            # R7: gate=when_not_lld members -- only while use_lld is
+            # inactive.
+            if (( ! _tr_use_lld )); then
+                _i=$((_i + 1))
+                continue
+            fi
+            ;;
+""",
+    "py": """        elif cls == "R7_DROP_WHEN_NOT_LLD":
+            if not use_lld:
+                continue
+""",
+}
+
+
+def _r7_when_not_lld_arm(lang: str, rules: list[dict]) -> str:
+    if "R7_DROP_WHEN_NOT_LLD" not in _token_classes(rules):
+        return ""
+    return _R7_WHEN_NOT_LLD_ARM[lang]
+
+
 # ---------------------------------------------------------------------------
 # C code generation
 # ---------------------------------------------------------------------------
-def _c_member_check(form: str, value: str, ret: str) -> str:
-    if form == "prefix":
-        return f'    if (zig_tr_starts_with(arg, "{value}")) return {ret};'
-    if form == "exact":
-        return f'    if (zig_tr_streq(arg, "{value}")) return {ret};'
-    raise ValueError(f"unsupported member form for C: {form!r}")
+def _c_char(ch: str) -> str:
+    return "'\\''" if ch == "'" else "'\\\\'" if ch == "\\" else f"'{ch}'"
 
 
-def _c_wl_drop_gate_fn() -> str:
-    r7 = _rule("R7_wl_drop_hybrid")
-    lines = [
-        "/* R7: per-member gated -Wl,* drop.",
-        " * Returns: 0 = no match, 1 = gate=always, 2 = gate=when_not_lld. */",
-        "static int zig_tr_wl_drop_gate(const char *arg) {",
-    ]
-    for m in r7["members"]:
-        ret = "1" if m["gate"] == "always" else "2"
-        lines.append(_c_member_check(m["form"], m["value"], ret))
-    lines.append("    return 0;")
-    lines.append("}")
+def _c_str(s: str) -> str:
+    return s.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def _c_token_enum(classes: list[str]) -> str:
+    lines = ["/* Token classes produced by zig_tr_classify(). */", "enum {"]
+    lines.extend(f"    ZIG_TR_TOK_{cls}," for cls in classes)
+    lines.append("};")
     return "\n".join(lines)
 
 
-def _c_z_o_check_fn() -> str:
+def _trie(rows: list[tuple[str, str, str]]) -> dict:
+    root: dict = {"kids": {}, "exact": None, "prefix": None}
+    for form, pattern, cls in rows:
+        node = root
+        for ch in pattern:
+            node = node["kids"].setdefault(ch, {"kids": {}, "exact": None, "prefix": None})
+        node[form] = cls
+    return root
+
+
+def _c_trie_lines(node: dict, depth: int, indent: str) -> list[str]:
+    """Emit one radix-trie node: record a prefix hit in `best`, return an
+    exact hit at end-of-token, then descend -- a strncmp over a run of
+    single-child nodes, or a switch where the trie branches. Every path
+    ends in a return, so no per-rule loop survives into the output."""
+    lines = []
+    if not node["kids"] and node["prefix"]:
+        lines.append(f"{indent}return ZIG_TR_TOK_{node['prefix']};")
+        return lines
+    if node["prefix"]:
+        lines.append(f"{indent}best = ZIG_TR_TOK_{node['prefix']};")
+    if node["exact"]:
+        lines.append(f"{indent}if (a[{depth}] == '\\0') return ZIG_TR_TOK_{node['exact']};")
+    if not node["kids"]:
+        lines.append(f"{indent}return best;")
+        return lines
+    if len(node["kids"]) == 1:
+        label = ""
+        child = node
+        while len(child["kids"]) == 1:
+            ch, child = next(iter(child["kids"].items()))
+            label += ch
+            if child["exact"] or child["prefix"]:
+                break
+        if len(label) == 1:
+            lines.append(f"{indent}if (a[{depth}] != {_c_char(label)}) return best;")
+        else:
+            lines.append(f'{indent}if (strncmp(a + {depth}, "{_c_str(label)}", {len(label)}) != 0) return best;')
+        lines.extend(_c_trie_lines(child, depth + len(label), indent))
+        return lines
+    # Sibling subtrees with identical bodies (e.g. R9's -Wl,-O0..9) share
+    # one arm under stacked case labels.
+    arms: dict[tuple[str, ...], list[str]] = {}
+    for ch in sorted(node["kids"]):
+        body = tuple(_c_trie_lines(node["kids"][ch], depth + 1, indent + "    "))
+        arms.setdefault(body, []).append(ch)
+    lines.append(f"{indent}switch (a[{depth}]) {{")
+    for body, chars in arms.items():
+        lines.extend(f"{indent}case {_c_char(ch)}:" for ch in chars)
+        lines.extend(body)
+    lines.append(f"{indent}default:")
+    lines.append(f"{indent}    return best;")
+    lines.append(f"{indent}}}")
+    return lines
+
+
+def _c_classify_fn(rows: list[tuple[str, str, str]]) -> str:
     lines = [
-        "/* R9: -Wl,-z,* / -Wl,-O* family split.",
-        " * Returns: 0 = no match, 1 = keep (passthrough only),",
-        " *          2 = keep AND trigger use_lld. */",
-        "static int zig_tr_z_o_check(const char *arg) {",
-        '    if (zig_tr_starts_with(arg, "-Wl,-z,")) {',
-        '        const char *suffix = arg + 7; /* strlen("-Wl,-z,") */',
+        "/* Single-pass token classifier: a radix trie over every exact/prefix/",
+        " * concat_split literal in RULES (see gen_translators._token_table),",
+        " * longest match wins. Cost is bounded by the token length, not by the",
+        " * number of rules. */",
+        "static int zig_tr_classify(const char *a) {",
+        "    int best = ZIG_TR_TOK_NONE;",
     ]
-    r9 = _rule("R9_z_o_passthrough")
-    z_member = next(m for m in r9["members"] if m["prefix"] == "-Wl,-z,")
-    conds = " || ".join(f'zig_tr_streq(suffix, "{v}")' for v in z_member["trigger_values"])
-    lines.append(f"        if ({conds}) return 2;")
-    lines.append("        return 1;")
-    lines.append("    }")
-    lines.append('    if (zig_tr_starts_with(arg, "-Wl,-O")) {')
-    lines.append('        const char *suffix = arg + 6; /* strlen("-Wl,-O") */')
-    lines.append("        if (suffix[0] != '\\0' && isdigit((unsigned char)suffix[0])) return 2;")
-    lines.append("        return 1;")
-    lines.append("    }")
-    lines.append("    return 0;")
+    lines.extend(_c_trie_lines(_trie(rows), 0, "    "))
     lines.append("}")
     return "\n".join(lines)
 
@@ -218,17 +444,27 @@ static void zig_tr_print_search_dirs(const zig_translate_profile *profile) {
 }"""
 
 
+def _c_exists_fn() -> str:
+    # _translate.inc must not include windows.h, so GetFileAttributesA (what
+    # the hand-written win shims use) is out; stat() is the portable
+    # metadata-only equivalent and is in both the POSIX and the mingw/UCRT
+    # headers.
+    return """/* R3/R11 probe: does path exist (any type, like bash's [[ -e ]] and
+ * the Python twin's os.path.exists)? One metadata call -- no handle is
+ * opened, so no FILE buffer, no close, and no on-open AV scan on Windows;
+ * autotools/libtool ask -print-file-name= dozens of times a configure. */
+static int zig_tr_exists(const char *path) {
+    struct stat st;
+    return stat(path, &st) == 0;
+}"""
+
+
 def _c_print_file_name_fn() -> str:
-    # NOTE: the real Windows shim uses GetFileAttributesA (Windows-only) to
-    # probe existence. This portable version uses fopen() instead, since
-    # _translate.inc must not include windows.h. This is a deliberate,
-    # flagged simplification -- see the returned report.
     # NOTE (flagged in report): dirs_unix/dirs_win below are typed to MATCH
     # PROFILE_DATA["unix"/"win"]["print_file_name_probe_dirs"], not
     # mechanically derived from them -- same gap as _c_print_search_dirs_fn.
-    return """/* R3: -print-file-name=<name> intercept.
- * Uses fopen() existence probing (portable) instead of the real Windows
- * shim's GetFileAttributesA -- flagged simplification, see report. */
+    return """/* R3: -print-file-name=<name> intercept. The first probe dir holding
+ * <name> wins; otherwise the bare name, as GCC prints it. */
 static void zig_tr_print_file_name(const char *name, const zig_translate_profile *profile) {
     static const char *dirs_unix[2] = {"lib/zig-llvm/lib", "lib"};
     static const char *dirs_win[2] = {"Library\\\\lib\\\\zig-llvm\\\\lib", "Library\\\\lib"};
@@ -239,9 +475,7 @@ static void zig_tr_print_file_name(const char *name, const zig_translate_profile
             snprintf(probe, sizeof(probe), "%s\\\\%s\\\\%s", profile->conda_prefix, dirs_win[d], name);
         else
             snprintf(probe, sizeof(probe), "%s/%s/%s", profile->conda_prefix, dirs_unix[d], name);
-        FILE *f = fopen(probe, "rb");
-        if (f) {
-            fclose(f);
+        if (zig_tr_exists(probe)) {
             printf("%s\\n", probe);
             return;
         }
@@ -268,9 +502,7 @@ static void zig_tr_print_prog_name(const char *name, const zig_translate_profile
         snprintf(probe, sizeof(probe), "%s\\\\Library\\\\bin\\\\%s", profile->conda_prefix, name);
     else
         snprintf(probe, sizeof(probe), "%s/bin/%s", profile->conda_prefix, name);
-    FILE *f = fopen(probe, "rb");
-    if (f) {
-        fclose(f);
+    if (zig_tr_exists(probe)) {
         printf("%s\\n", probe);
         return;
     }
@@ -307,12 +539,49 @@ static void zig_tr_print_multiarch(const zig_translate_profile *profile) {
 }"""
 
 
+def _c_print_baked_probe_fn() -> str:
+    return """/* Write baked text with each {conda_prefix} spelled as conda_prefix. */
+static void zig_tr_put_baked(FILE *f, const char *text, const char *conda_prefix) {
+    static const char marker[] = "{conda_prefix}";
+    const char *p;
+    while ((p = strstr(text, marker)) != NULL) {
+        fwrite(text, 1, (size_t)(p - text), f);
+        fputs(conda_prefix ? conda_prefix : "", f);
+        text = p + sizeof marker - 1;
+    }
+    fputs(text, f);
+}
+
+/* R14: replay an install-time answer to a compiler-identity probe.
+ * Returns 0, printing nothing, when this probe was not baked -- the
+ * caller then lets the flag through to zig. */
+static int zig_tr_print_baked_probe(int index, const zig_translate_profile *profile) {
+    const char *out, *err;
+    if (!profile->probes) return 0;
+    out = profile->probes[2 * index];
+    err = profile->probes[2 * index + 1];
+    if (!(out && *out) && !(err && *err)) return 0;
+    if (out) zig_tr_put_baked(stdout, out, profile->conda_prefix);
+    if (err) zig_tr_put_baked(stderr, err, profile->conda_prefix);
+    return 1;
+}"""
+
+
+def _c_probe_decls() -> str:
+    values = _rule("R14_baked_probes")["match"]["values"]
+    return "\n".join([
+        "/* R14: probes baked at install time, indexed in this order: "
+        + ", ".join(values) + ". */",
+        f"#define ZIG_TR_N_PROBES {len(values)}",
+    ])
+
+
 # Maps action["op"] (intercept rules only) -> the C call expression used by
-# _c_intercept_dispatch_fn(). Every intercept rule's op is listed here (R1-13
-# has no other intercept ops); R12 is unix-only and is emitted by
-# _c_intercept_dispatch_fn() under a runtime `!profile->is_win` guard rather
-# than being filtered out (rules_for_profile("win") still excludes it from
-# the unconditional/win-applicable loop).
+# _c_intercept_case_lines(). Every intercept rule's op is listed here (R1-13
+# has no other intercept ops); R12 is unix-only and its case arm is emitted
+# under a runtime `profile->is_win` bail-out rather than being filtered out
+# of the token table (the same compiled zig_translate_flags() serves both
+# profiles).
 _C_INTERCEPT_CALL: dict[str, str] = {
     "intercept_print_search_dirs": "zig_tr_print_search_dirs(profile)",
     "intercept_print_file_name": "zig_tr_print_file_name(value, profile)",
@@ -320,55 +589,43 @@ _C_INTERCEPT_CALL: dict[str, str] = {
     "intercept_print_prog_name": "zig_tr_print_prog_name(value, profile)",
     "intercept_print_sysroot": "zig_tr_print_sysroot(profile)",
     "intercept_print_multiarch": "zig_tr_print_multiarch(profile)",
+    "intercept_print_baked_probe": "zig_tr_print_baked_probe({index}, profile)",
 }
 
+# Intercept ops whose C call returns 0 to decline (nothing printed, the
+# token is not intercepted after all) -- R14 without a baked answer.
+_C_INTERCEPT_MAY_DECLINE = frozenset({"intercept_print_baked_probe"})
 
-def _c_intercept_arm_lines(rules: list[dict], indent: str) -> list[str]:
-    """Render one `if (...) { call; return 2; }` line per intercept-rule
-    match value, table-driven from RULES. Shared by the win-applicable loop
-    and the unix-only guarded block in _c_intercept_dispatch_fn()."""
-    lines = []
-    for rule in rules:
-        if rule["kind"] != "intercept":
-            continue
-        form = rule["match"]["form"]
-        call_template = _C_INTERCEPT_CALL[rule["action"]["op"]]
-        for value in rule["match"]["values"]:
-            if form == "exact":
-                lines.append(f'{indent}if (zig_tr_streq(a, "{value}")) {{ {call_template}; return 2; }}')
-            elif form == "prefix":
-                value_expr = f'a + strlen("{value}")'
-                call = call_template.replace("value", value_expr)
-                lines.append(f'{indent}if (zig_tr_starts_with(a, "{value}")) {{ {call}; return 2; }}')
-            else:
-                raise ValueError(f"unsupported intercept match form for C: {form!r}")
-    return lines
-
-
-def _c_intercept_dispatch_fn() -> str:
-    """Single-pass dispatch over ALL intercept rules applicable to the win
-    profile (R2, R3, R10, R11, R13), followed by the unix-only intercept
-    rules (R12) emitted under a runtime `!profile->is_win` guard -- the win
-    shim (zig-cc-nonunix.c) has no sysroot concept, so R12 must not fire
-    there even though it is compiled into the same zig_translate_flags().
-    Replaces the old one-dedicated-for-loop-per-rule shape with a single
-    loop, one arg scan, table-driven from RULES.
-    """
-    lines = [
-        "    for (i = 0; i < argc; i++) {",
-        "        const char *a = argv[i];",
-    ]
-    lines.extend(_c_intercept_arm_lines(rules_for_profile("win"), "        "))
 
+def _c_intercept_case_lines(indent: str) -> list[str]:
+    """Render one `case` arm per intercept class for zig_translate_flags'
+    first pass, table-driven from RULES. Rules not applicable to the win
+    profile (R12) bail out with `break` when profile->is_win -- the win shim
+    (zig-cc-nonunix.c) has no sysroot concept, so R12 must not fire there
+    even though it is compiled into the same zig_translate_flags(). A
+    "sole" rule (R14) only fires when the token is the whole argv, and an
+    op that may decline breaks out when its call returns 0."""
     win_ids = {r["id"] for r in rules_for_profile("win")}
-    unix_only_rules = [r for r in rules_for_profile("unix") if r["id"] not in win_ids]
-    if unix_only_rules:
-        lines.append("        if (!profile->is_win) {")
-        lines.extend(_c_intercept_arm_lines(unix_only_rules, "            "))
-        lines.append("        }")
-
-    lines.append("    }")
-    return "\n".join(lines)
+    lines = []
+    for cls, rule, form, value in _intercept_classes(RULES):
+        op = rule["action"]["op"]
+        call = _C_INTERCEPT_CALL[op].format(index=rule["match"]["values"].index(value))
+        if form == "prefix":
+            call = call.replace("value", f'a + strlen("{_c_str(value)}")')
+        bail = []
+        if rule["id"] not in win_ids:
+            bail.append("profile->is_win")
+        if rule["match"].get("sole"):
+            bail.append("argc != 1")
+        if op in _C_INTERCEPT_MAY_DECLINE:
+            bail.append(f"!{call}")
+        lines.append(f"{indent}case ZIG_TR_TOK_{cls}:")
+        if bail:
+            lines.append(f"{indent}    if ({' || '.join(bail)}) break;")
+        if op not in _C_INTERCEPT_MAY_DECLINE:
+            lines.append(f"{indent}    {call};")
+        lines.append(f"{indent}    return 2;")
+    return lines
 
 
 def generate_c() -> str:
@@ -376,10 +633,12 @@ def generate_c() -> str:
         "/*",
         f" * {_GEN_BANNER}".rstrip().replace("\n", "\n * "),
         " *",
-        " * Encodes rules R1-R13 from flag_rules.py. R12 (-print-sysroot) is",
+        " * Encodes rules R1-R14 from flag_rules.py. R12 (-print-sysroot) is",
         " * unix-only and is gated at runtime on !profile->is_win -- see",
-        " * _c_intercept_dispatch_fn / flag_rules.rules_for_profile. Pure",
-        " * portable C: no windows.h, no spawn/exec, no platform calls beyond",
+        " * _c_intercept_case_lines / flag_rules.rules_for_profile. Pure",
+        " * portable C: no windows.h, no spawn/exec. The only platform call is",
+        " * the stat() existence probe in zig_tr_exists (R3/R11 -print-file-name=",
+        " * / -print-prog-name= under $CONDA_PREFIX); everything else comes from",
         " * the fields already resolved into zig_translate_profile by the caller.",
         " */",
         "",
@@ -390,6 +649,9 @@ def generate_c() -> str:
         "#include <stdlib.h>",
         "#include <stdio.h>",
         "#include <ctype.h>",
+        "#include <sys/stat.h>",
+        "",
+        _c_probe_decls(),
         "",
         "typedef struct {",
         "    int is_win;          /* 1 on the win profile, 0 on unix */",
@@ -402,32 +664,25 @@ def generate_c() -> str:
         "                                 * May be NULL or \"\" -- printed verbatim",
         "                                 * even when not a directory, mirroring",
         "                                 * bash's unconditional echo \"${_sr:-}\". */",
+        "    const char *const *probes;  /* R14: 2 * ZIG_TR_N_PROBES install-time",
+        "                                 * answers -- stdout then stderr per probe,",
+        "                                 * NULL or \"\" = nothing -- or NULL when",
+        "                                 * none were baked. */",
         "} zig_translate_profile;",
         "",
         "static int zig_tr_streq(const char *a, const char *b) { return strcmp(a, b) == 0; }",
         "static int zig_tr_starts_with(const char *s, const char *p) { return strncmp(s, p, strlen(p)) == 0; }",
         "",
-        "/* R8: bare/-Wl,-prefixed Bsymbolic(-functions) forms. */",
-        "static int zig_tr_is_bsymbolic_flag(const char *arg) {",
-        '    return zig_tr_streq(arg, "-Wl,-Bsymbolic-functions") ||',
-        '           zig_tr_streq(arg, "-Wl,-Bsymbolic") ||',
-        '           zig_tr_streq(arg, "-Bsymbolic-functions") ||',
-        '           zig_tr_streq(arg, "-Bsymbolic");',
-        "}",
-        "",
-        "/* R8: value that appears right after a literal -Xlinker token. */",
-        "static int zig_tr_is_xlinker_bsymbolic(const char *arg) {",
-        '    return zig_tr_streq(arg, "-Bsymbolic-functions") || zig_tr_streq(arg, "-Bsymbolic");',
-        "}",
+        _c_token_enum(_token_classes(RULES)),
         "",
-        _c_wl_drop_gate_fn(),
-        "",
-        _c_z_o_check_fn(),
+        _c_classify_fn(_token_table(RULES)),
         "",
         _c_translate_target_fn(),
         "",
         _c_print_search_dirs_fn(),
         "",
+        _c_exists_fn(),
+        "",
         _c_print_file_name_fn(),
         "",
         _c_print_multi_os_directory_fn(),
@@ -438,6 +693,8 @@ def generate_c() -> str:
         "",
         _c_print_multiarch_fn(),
         "",
+        _c_print_baked_probe_fn(),
+        "",
         """/* R1: -Map / -Map=FILE / -MapFILE -> -Wl,-Map,FILE (mingw targets only).
  * Returns 1 if handled: *out is a malloc'd replacement (ownership
  * transferred to the caller's out_argv, do not free here); *consumed_next
@@ -506,139 +763,173 @@ static int zig_tr_rewrite_map(const char *arg, const char *next_arg, int has_nex
  *
  * Return value: 0 on success (*out_argv populated). 2 if any intercept
  * rule matched (R2, R3, R10, R11, R13 unconditionally; R12 on the unix
- * profile only -- see zig_tr_streq/starts_with dispatch below): output
+ * profile only; R14 alone on the line and only with a baked answer --
+ * see the pass-1 classify dispatch below): output
  * was already printed to stdout and the caller must exit(0) immediately
  * WITHOUT touching *out_argv (left unset). 1 on allocation failure.
  *
- * No spawn, no platform calls beyond the fields already resolved into
- * profile by the caller.
+ * No spawn; the only platform call is R3/R11's stat() in zig_tr_exists,
+ * everything else comes from the fields already resolved into profile
+ * by the caller.
  */
 int zig_translate_flags(int argc, char *const argv[], const zig_translate_profile *profile,
                          char ***out_argv, int *out_argc, int *out_use_lld, int *out_mode_is_cxx) {
     int i;
-
-""" + _c_intercept_dispatch_fn() + """
-
-    {
-        int use_lld = 0;
-        int has_mcpu = 0;
-        char **out;
-        int oi = 0;
-        int saw_nostdlibxx = 0;
-
-        for (i = 0; i < argc; i++) {
-            const char *a = argv[i];
-            if (zig_tr_is_bsymbolic_flag(a)) use_lld = 1;
-            if (zig_tr_streq(a, "-Xlinker") && i + 1 < argc && zig_tr_is_xlinker_bsymbolic(argv[i + 1]))
+    int use_lld = 0;
+    int has_mcpu = 0;
+    char **out;
+    int oi = 0;
+    int saw_nostdlibxx = 0;
+
+    /* Pass 1: intercepts (R2/R3/R10-R14), use_lld triggers (R8,
+     * R9-trigger-subset) and -mcpu= presence (R6) -- one classify per
+     * token. An intercept returns before anything is allocated. */
+    for (i = 0; i < argc; i++) {
+        const char *a = argv[i];
+        switch (zig_tr_classify(a)) {
+""" + "\n".join(_c_intercept_case_lines("        ")) + """
+        case ZIG_TR_TOK_R8_TRIGGER:
+        case ZIG_TR_TOK_R8_XLINKER_VALUE:
+        case ZIG_TR_TOK_R9_TRIGGER:
+            use_lld = 1;
+            break;
+        case ZIG_TR_TOK_R8_XLINKER:
+            if (i + 1 < argc && zig_tr_classify(argv[i + 1]) == ZIG_TR_TOK_R8_XLINKER_VALUE)
                 use_lld = 1;
-            if (zig_tr_starts_with(a, "-mcpu=")) has_mcpu = 1;
-            if (zig_tr_z_o_check(a) == 2) use_lld = 1;
+            break;
+        case ZIG_TR_TOK_R6_MCPU:
+            has_mcpu = 1;
+            break;
+        default:
+            break;
         }
+    }
 
-        out = (char **)malloc(sizeof(char *) * (size_t)(argc + 2));
-        if (!out) return 1;
-
-        if (!has_mcpu)
-            out[oi++] = (char *)"-mcpu=baseline";
-
-        for (i = 0; i < argc; i++) {
-            const char *a = argv[i];
-
-            {
-                int consumed_next = 0;
-                char *rewritten = NULL;
-                int has_next = (i + 1 < argc);
-                const char *next = has_next ? argv[i + 1] : NULL;
-                if (zig_tr_rewrite_map(a, next, has_next, profile, &rewritten, &consumed_next)) {
-                    out[oi++] = rewritten;
-                    if (consumed_next) i++;
-                    continue;
-                }
-            }
-
-            if (zig_tr_streq(a, "-nostdlib++")) {
-                saw_nostdlibxx = 1;
+    out = (char **)malloc(sizeof(char *) * (size_t)(argc + 2));
+    if (!out) return 1;
+
+    if (!has_mcpu)
+        out[oi++] = (char *)"-mcpu=baseline";
+
+    /* Pass 2: rewrite / drop / keep, dispatched on the same classes. R9
+     * (both subsets) and every unclassified token fall through to the
+     * default keep at the bottom of the loop. */
+    for (i = 0; i < argc; i++) {
+        const char *a = argv[i];
+        switch (zig_tr_classify(a)) {
+        case ZIG_TR_TOK_R1_MAP: {
+            int consumed_next = 0;
+            char *rewritten = NULL;
+            int has_next = (i + 1 < argc);
+            const char *next = has_next ? argv[i + 1] : NULL;
+            if (zig_tr_rewrite_map(a, next, has_next, profile, &rewritten, &consumed_next)) {
+                out[oi++] = rewritten;
+                if (consumed_next) i++;
                 continue;
             }
-
-            if (zig_tr_streq(a, "-Xlinker") && i + 1 < argc && zig_tr_is_xlinker_bsymbolic(argv[i + 1])) {
+            break;
+        }
+        case ZIG_TR_TOK_R4_STRIP:
+            saw_nostdlibxx = 1;
+            continue;
+        case ZIG_TR_TOK_R8_XLINKER:
+            if (i + 1 < argc && zig_tr_classify(argv[i + 1]) == ZIG_TR_TOK_R8_XLINKER_VALUE) {
                 out[oi++] = (char *)a;
                 out[oi++] = (char *)argv[i + 1];
                 i++;
                 continue;
             }
-
-            {
-                int gate = zig_tr_wl_drop_gate(a);
-                if (gate == 1) continue;
-                if (gate == 2 && !use_lld) continue;
-            }
-
-            /* R9 passthrough: no drop action -- falls through to the
-             * default keep below (zig_tr_z_o_check is only consulted in
-             * the pre-scan above, to decide use_lld). */
-
-            if (zig_tr_streq(a, "-target") && i + 1 < argc) {
+            break;
+        case ZIG_TR_TOK_R7_DROP_ALWAYS:
+            continue;
+""" + _r7_when_not_lld_arm("c", RULES) + """        case ZIG_TR_TOK_R5_TARGET:
+            if (i + 1 < argc) {
+                /* The -conda-linux-gnu family returns a static buffer:
+                 * copy it, or a second -target on the line overwrites
+                 * this one. */
+                const char *translated = zig_tr_translate_target(argv[i + 1], profile);
+                if (translated != argv[i + 1]) {
+                    size_t len = strlen(translated) + 1;
+                    char *buf = (char *)malloc(len);
+                    if (!buf) { free(out); return 1; }
+                    memcpy(buf, translated, len);
+                    translated = buf;
+                }
                 out[oi++] = (char *)a;
-                out[oi++] = (char *)zig_tr_translate_target(argv[i + 1], profile);
+                out[oi++] = (char *)translated;
                 i++;
                 continue;
             }
-            if (zig_tr_starts_with(a, "--target=")) {
-                const char *val = a + strlen("--target=");
-                const char *translated = zig_tr_translate_target(val, profile);
-                if (translated != val) {
-                    size_t len = strlen("--target=") + strlen(translated) + 1;
-                    char *buf = (char *)malloc(len);
-                    if (buf) {
-                        snprintf(buf, len, "--target=%s", translated);
-                        out[oi++] = buf;
-                        continue;
-                    }
+            break;
+        case ZIG_TR_TOK_R5_TARGET_EQ: {
+            const char *val = a + strlen("--target=");
+            const char *translated = zig_tr_translate_target(val, profile);
+            if (translated != val) {
+                size_t len = strlen("--target=") + strlen(translated) + 1;
+                char *buf = (char *)malloc(len);
+                if (buf) {
+                    snprintf(buf, len, "--target=%s", translated);
+                    out[oi++] = buf;
+                    continue;
                 }
-                out[oi++] = (char *)a;
-                continue;
             }
-
-            out[oi++] = (char *)a;
+            break;
+        }
+        default:
+            break;
         }
+        out[oi++] = (char *)a;
+    }
 
-        if (saw_nostdlibxx && *out_mode_is_cxx)
-            *out_mode_is_cxx = 0;
+    if (saw_nostdlibxx && *out_mode_is_cxx)
+        *out_mode_is_cxx = 0;
 
-        out[oi] = NULL;
-        *out_argv = out;
-        *out_argc = oi;
-        *out_use_lld = use_lld;
-    }
+    out[oi] = NULL;
+    *out_argv = out;
+    *out_argc = oi;
+    *out_use_lld = use_lld;
     return 0;
 }""",
         "",
         "#endif /* ZIG_TRANSLATE_INC */",
         "",
     ]
-    return "\n".join(parts)
+    return _stamp("\n".join(parts))
 
 
 # ---------------------------------------------------------------------------
 # Bash code generation (unix profile only)
 # ---------------------------------------------------------------------------
-def _sh_pattern(form: str, value: str) -> str:
-    if form == "prefix":
-        return f"{value}*"
-    if form == "exact":
-        return value
-    raise ValueError(f"unsupported member form for bash: {form!r}")
-
-
-def _sh_wl_drop_always_patterns() -> list[str]:
-    r7 = _rule("R7_wl_drop_hybrid")
-    return [_sh_pattern(m["form"], m["value"]) for m in r7["members"] if m["gate"] == "always"]
-
-
-def _sh_wl_drop_when_not_lld_patterns() -> list[str]:
-    r7 = _rule("R7_wl_drop_hybrid")
-    return [_sh_pattern(m["form"], m["value"]) for m in r7["members"] if m["gate"] == "when_not_lld"]
+def _sh_quote(value: str) -> str:
+    """Double-quote a literal for a `case` pattern so glob metacharacters
+    in a flag (none today) can never turn it into a pattern."""
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"').replace("$", "\\$").replace("`", "\\`") + '"'
+
+
+def _sh_classify_fn(rows: list[tuple[str, str, str]]) -> str:
+    """Bash twin of _c_classify_fn: one `case` jump table over the same
+    rows. `case` takes the FIRST matching arm, so exact arms go first and
+    prefix arms longest-first -- that ordering is what makes first-match
+    equal the C trie's longest-match. Sets the global _tr_cls (a function
+    call, not a $(...) subshell, so classification stays fork-free)."""
+    # Exact arms are mutually disjoint, so they group by class freely;
+    # prefix arms may only merge with their longest-first NEIGHBOURS.
+    exact_arms: dict[str, list[str]] = {}
+    for form, pattern, cls in rows:
+        if form == "exact":
+            exact_arms.setdefault(cls, []).append(_sh_quote(pattern))
+    prefix_arms: list[tuple[str, list[str]]] = []
+    for form, pattern, cls in sorted((r for r in rows if r[0] == "prefix"), key=lambda r: -len(r[1])):
+        if not prefix_arms or prefix_arms[-1][0] != cls:
+            prefix_arms.append((cls, []))
+        prefix_arms[-1][1].append(_sh_quote(pattern) + "*")
+    arms = list(exact_arms.items()) + prefix_arms
+    lines = ["_zig_tr_classify() {", '    case "$1" in']
+    lines.extend(f"        {' | '.join(pats)}) _tr_cls={cls} ;;" for cls, pats in arms)
+    lines.append("        *) _tr_cls=NONE ;;")
+    lines.append("    esac")
+    lines.append("}")
+    return "\n".join(lines)
 
 
 def _sh_translate_target_fn() -> str:
@@ -657,11 +948,13 @@ def _sh_translate_target_fn() -> str:
     return "\n".join(lines)
 
 
-def _sh_intercept_body(rule: dict, unix: dict) -> str:
+def _sh_intercept_body(rule: dict, value: str, unix: dict) -> str:
     """Return the bash body (indented for a `case` arm) for one intercept
-    rule's print-action. Each arm ends with `exit 0` -- this function is
-    meant to be `source`d, so `exit` here really does exit the wrapper
-    process (see _sh_intercept_dispatch_fn's docstring)."""
+    rule's print-action on match value `value`. Each arm ends with
+    `exit 0` -- this function is meant to be `source`d, so `exit` here
+    really does exit the wrapper process (see the generated
+    _zig_translate_flags header). R14's arm exits only when it has a
+    baked answer and otherwise falls out of the `case`."""
     op = rule["action"]["op"]
     if op == "intercept_print_search_dirs":
         zig_lib = unix["zig_lib"].format(conda_prefix="${_tr_conda_prefix}")
@@ -710,52 +1003,30 @@ def _sh_intercept_body(rule: dict, unix: dict) -> str:
                 _zig_tr_translate_target "${_tr_target_arch}-conda-linux-gnu"
             fi
             exit 0"""
+    if op == "intercept_print_baked_probe":
+        return """            if (( _argc == 1 )) && [[ -n "${_tr_probe_out[@IDX@]:-}${_tr_probe_err[@IDX@]:-}" ]]; then
+                _name="${_tr_probe_out[@IDX@]:-}"
+                printf '%s' "${_name//"{conda_prefix}"/${_tr_conda_prefix}}"
+                _name="${_tr_probe_err[@IDX@]:-}"
+                printf '%s' "${_name//"{conda_prefix}"/${_tr_conda_prefix}}" >&2
+                exit 0
+            fi""".replace("@IDX@", str(rule["match"]["values"].index(value)))
     raise ValueError(f"unsupported intercept op for bash: {op!r}")
 
 
-def _sh_intercept_dispatch_fn() -> str:
-    """Single-pass dispatch over ALL intercept rules applicable to the
-    unix profile (R2, R3, R10, R11, R12, R13 -- all six, since the bash
-    wrapper only ever runs on the unix profile). Replaces the old
-    one-dedicated-for-loop-per-rule shape with one loop, one `case`, one
-    arg scan, table-driven from RULES.
-    """
+def _sh_intercept_case_arms() -> str:
+    """One `case "$_tr_cls"` arm per intercept class applicable to the
+    unix profile (R2, R3, R10-R14 -- all of them, since the bash wrapper
+    only ever runs on the unix profile), table-driven from RULES."""
     unix = PROFILE_DATA["unix"]
     arms = []
-    for rule in rules_for_profile("unix"):
-        if rule["kind"] != "intercept":
-            continue
-        pattern = " | ".join(_sh_pattern(rule["match"]["form"], v) for v in rule["match"]["values"])
-        arms.append(f"        {pattern})\n{_sh_intercept_body(rule, unix)}\n            ;;")
-    arms_text = "\n".join(arms)
-    return f"""    # R2/R3/R10-R13: intercept rules -- single arg scan, one case dispatch.
-    for _a in "${{_tr_in_args[@]}}"; do
-        case "$_a" in
-{arms_text}
-        esac
-    done"""
+    for cls, rule, _form, value in _intercept_classes(rules_for_profile("unix")):
+        arms.append(f"        {cls})\n{_sh_intercept_body(rule, value, unix)}\n            ;;")
+    return "\n".join(arms)
 
 
 def generate_bash() -> str:
-    always_patterns = " | ".join(_sh_wl_drop_always_patterns())
-    when_not_lld_patterns = _sh_wl_drop_when_not_lld_patterns()
-    # R7 may have zero gate=when_not_lld members (e.g. after the 2026-07-15
-    # narrowing to the 3 always-drop flags); an empty pattern list would
-    # otherwise emit a syntactically invalid bash `case "$_a" in )` block.
-    if when_not_lld_patterns:
-        when_not_lld_block = f"""        if (( ! _tr_use_lld )); then
-            case "$_a" in
-                {" | \\\n                ".join(when_not_lld_patterns)})
-                    _i=$((_i + 1))
-                    continue
-                    ;;
-            esac
-        fi
-"""
-    else:
-        when_not_lld_block = ""
-
-    intercept_dispatch = _sh_intercept_dispatch_fn()
+    intercept_arms = _sh_intercept_case_arms()
 
     header = (
         f"# {_GEN_BANNER}".rstrip().replace("\n", "\n# ")
@@ -763,7 +1034,7 @@ def generate_bash() -> str:
 
     body = f"""{header}
 #
-# _zig_translate_flags -- shared flag-translation rules R1-R13 (unix
+# _zig_translate_flags -- shared flag-translation rules R1-R14 (unix
 # profile only -- this fragment is only ever sourced by the bash wrapper,
 # which always runs on the unix profile).
 #
@@ -775,6 +1046,9 @@ def generate_bash() -> str:
 #     _tr_is_win_target : 0|1    - whether the baked-in zig target is a
 #                         windows/mingw target (drives R1's -Map rewrite)
 #     _tr_mode_is_cxx   : 0|1    - 1 for c++ mode, 0 for cc mode
+#     _tr_probe_out, _tr_probe_err : arrays, optional - R14's install-time
+#                         answers (stdout / stderr text per probe, in
+#                         flag_rules order); unset or empty = not baked
 #   Outputs (globals, set by this function):
 #     _tr_out_args : array  - translated args. Already includes any
 #                    injected "-mcpu=baseline" (R6, prepended first) and
@@ -789,116 +1063,115 @@ def generate_bash() -> str:
 #                    itself) before deciding whether to prepend
 #                    "-fuse-ld=lld".
 #     _tr_mode_out : string - possibly downgraded to "cc" by R4.
+#     _tr_cls      : string - scratch, last _zig_tr_classify result.
 #
-# May print R2/R3/R10-R13 output directly and `exit 0` -- this function is meant
+# May print R2/R3/R10-R14 output directly and `exit 0` -- this function is meant
 # to be `source`d (not run in a subshell), so `exit` here really does
 # exit the whole wrapper process, matching the pre-refactor fragment's
 # behavior.
+#
+# Every arg is classified once per pass by _zig_tr_classify (the `case`
+# jump table below, generated from the same rows as the C trie in
+# _translate.inc); the passes then dispatch on the class.
 _zig_translate_flags() {{
     local _a _i _n _dir _name _prog
     local _argc=${{#_tr_in_args[@]}}
 
-{intercept_dispatch}
-
-    # Pre-scan: use_lld triggers (R8, R9-trigger-subset) + -mcpu= presence (R6).
+    # Pass 1: intercepts (R2/R3/R10-R14), use_lld triggers (R8,
+    # R9-trigger-subset) and -mcpu= presence (R6).
     _tr_use_lld=0
     local _has_mcpu=0
     for _i in "${{!_tr_in_args[@]}}"; do
         _a="${{_tr_in_args[$_i]}}"
-        case "$_a" in
-            -Wl,-Bsymbolic-functions|-Wl,-Bsymbolic|-Bsymbolic-functions|-Bsymbolic) _tr_use_lld=1 ;;
-            -Wl,-z,defs|-Wl,-z,nodelete) _tr_use_lld=1 ;;
-            -Wl,-O[0-9]*) _tr_use_lld=1 ;;
-            -mcpu=*) _has_mcpu=1 ;;
+        _zig_tr_classify "$_a"
+        case "$_tr_cls" in
+{intercept_arms}
+        R8_TRIGGER | R8_XLINKER_VALUE | R9_TRIGGER)
+            _tr_use_lld=1
+            ;;
+        R8_XLINKER)
+            _zig_tr_classify "${{_tr_in_args[$((_i + 1))]:-}}"
+            if [[ "$_tr_cls" == R8_XLINKER_VALUE ]]; then
+                _tr_use_lld=1
+            fi
+            ;;
+        R6_MCPU)
+            _has_mcpu=1
+            ;;
         esac
-        if [[ "$_a" == "-Xlinker" ]]; then
-            _n="${{_tr_in_args[$((_i + 1))]:-}}"
-            case "$_n" in
-                -Bsymbolic-functions|-Bsymbolic) _tr_use_lld=1 ;;
-            esac
-        fi
     done
 
     _tr_out_args=()
     (( _has_mcpu )) || _tr_out_args+=("-mcpu=baseline")
 
+    # Pass 2: rewrite / drop / keep. R9 (both subsets) and every
+    # unclassified arg fall through to the default keep below.
     local _saw_nostdlibxx=0
     _i=0
     while [[ $_i -lt $_argc ]]; do
         _a="${{_tr_in_args[$_i]}}"
-
-        # R1: -Map rewrite (mingw targets only)
-        if (( _tr_is_win_target )); then
-            case "$_a" in
-                -Map)
-                    _n="${{_tr_in_args[$((_i + 1))]:-}}"
-                    if [[ -n "$_n" ]]; then
-                        _tr_out_args+=("-Wl,-Map,${{_n}}")
-                        _i=$((_i + 2))
+        _zig_tr_classify "$_a"
+        case "$_tr_cls" in
+        R1_MAP)
+            # R1: -Map rewrite (mingw targets only)
+            if (( _tr_is_win_target )); then
+                case "$_a" in
+                    -Map)
+                        _n="${{_tr_in_args[$((_i + 1))]:-}}"
+                        if [[ -n "$_n" ]]; then
+                            _tr_out_args+=("-Wl,-Map,${{_n}}")
+                            _i=$((_i + 2))
+                            continue
+                        fi
+                        ;;
+                    -Map=*)
+                        _tr_out_args+=("-Wl,-Map,${{_a#-Map=}}")
+                        _i=$((_i + 1))
+                        continue
+                        ;;
+                    -Map?*)
+                        _tr_out_args+=("-Wl,-Map,${{_a#-Map}}")
+                        _i=$((_i + 1))
                         continue
-                    fi
-                    ;;
-                -Map=*)
-                    _tr_out_args+=("-Wl,-Map,${{_a#-Map=}}")
-                    _i=$((_i + 1))
-                    continue
-                    ;;
-                -Map?*)
-                    _tr_out_args+=("-Wl,-Map,${{_a#-Map}}")
-                    _i=$((_i + 1))
-                    continue
-                    ;;
-            esac
-        fi
-
-        # R4: -nostdlib++ strip + mode downgrade
-        if [[ "$_a" == "-nostdlib++" ]]; then
+                        ;;
+                esac
+            fi
+            ;;
+        R4_STRIP)
+            # R4: -nostdlib++ strip + mode downgrade
             _saw_nostdlibxx=1
             _i=$((_i + 1))
             continue
-        fi
-
-        # R8: -Xlinker Bsymbolic(-functions) pair -- keep verbatim (already
-        # counted toward use_lld in the pre-scan above).
-        if [[ "$_a" == "-Xlinker" ]]; then
+            ;;
+        R8_XLINKER)
+            # R8: -Xlinker Bsymbolic(-functions) pair -- keep verbatim
+            # (already counted toward use_lld in pass 1).
             _n="${{_tr_in_args[$((_i + 1))]:-}}"
-            case "$_n" in
-                -Bsymbolic-functions|-Bsymbolic)
-                    _tr_out_args+=("$_a" "$_n")
-                    _i=$((_i + 2))
-                    continue
-                    ;;
-            esac
-        fi
-
-        # R7: hybrid-gated -Wl,* drop -- gate=always members first.
-        case "$_a" in
-            {always_patterns})
-                _i=$((_i + 1))
+            _zig_tr_classify "$_n"
+            if [[ "$_tr_cls" == R8_XLINKER_VALUE ]]; then
+                _tr_out_args+=("$_a" "$_n")
+                _i=$((_i + 2))
                 continue
-                ;;
-        esac
-        # R7: gate=when_not_lld members -- only while use_lld is inactive.
-        # (block is empty when R7 has no when_not_lld members, e.g. after
-        # the 2026-07-15 narrowing to the 3 always-drop flags.)
-{when_not_lld_block}
-        # R9: -Wl,-z,* / -Wl,-O* -- always kept, never dropped (falls
-        # through to the default keep below; the trigger subset was
-        # already counted toward use_lld in the pre-scan above).
-
-        # R5: -target / --target= translation
-        if [[ "$_a" == "-target" ]]; then
+            fi
+            ;;
+        R7_DROP_ALWAYS)
+            # R7: hybrid-gated -Wl,* drop, gate=always members.
+            _i=$((_i + 1))
+            continue
+            ;;
+{_r7_when_not_lld_arm("sh", rules_for_profile("unix"))}        R5_TARGET)
+            # R5: -target translation
             _n="${{_tr_in_args[$((_i + 1))]:-}}"
             _tr_out_args+=("$_a" "$(_zig_tr_translate_target "$_n")")
             _i=$((_i + 2))
             continue
-        fi
-        case "$_a" in
-            --target=*)
-                _tr_out_args+=("--target=$(_zig_tr_translate_target "${{_a#--target=}}")")
-                _i=$((_i + 1))
-                continue
-                ;;
+            ;;
+        R5_TARGET_EQ)
+            # R5: --target= translation
+            _tr_out_args+=("--target=$(_zig_tr_translate_target "${{_a#--target=}}")")
+            _i=$((_i + 1))
+            continue
+            ;;
         esac
 
         _tr_out_args+=("$_a")
@@ -910,46 +1183,366 @@ _zig_translate_flags() {{
     (( _saw_nostdlibxx )) && _tr_mode_out="cc"
 }}
 
+# Token classifier: exact arms first, then prefix arms longest-first, so
+# the first matching arm is the longest match (same rows as the C trie).
+{_sh_classify_fn(_token_table(rules_for_profile("unix")))}
+
 # R5 helper: conda triplet -> zig triplet (unix profile: includes darwin).
 {_sh_translate_target_fn()}
 """
-    return body
+    return _stamp(body)
+
+
+# ---------------------------------------------------------------------------
+# Python code generation (both profiles, in-process twin of the C)
+# ---------------------------------------------------------------------------
+# The ops _py_intercept() in the emitted module knows; anything else in an
+# intercept rule is a generator error, as for _C_INTERCEPT_CALL.
+_PY_INTERCEPT_OPS = frozenset(_C_INTERCEPT_CALL)
+
+
+def _py_dict(name: str, items: list[tuple[str, object]]) -> str:
+    lines = [f"{name} = {{"]
+    lines.extend(f"    {k!r}: {v!r}," for k, v in items)
+    lines.append("}")
+    return "\n".join(lines)
+
+
+def _py_tables(rows: list[tuple[str, str, str]]) -> str:
+    exact = [(pattern, cls) for form, pattern, cls in rows if form == "exact"]
+    prefix = [(pattern, cls) for form, pattern, cls in rows if form == "prefix"]
+    lengths = tuple(sorted({len(p) for p, _ in prefix}, reverse=True))
+    return "\n\n".join([
+        _py_dict("_EXACT", exact),
+        _py_dict("_PREFIX", prefix),
+        f"_PREFIX_LENGTHS = {lengths!r}",
+    ])
+
+
+def _py_intercepts() -> str:
+    win_ids = {r["id"] for r in rules_for_profile("win")}
+    items = []
+    for cls, rule, form, value in _intercept_classes(RULES):
+        op = rule["action"]["op"]
+        if op not in _PY_INTERCEPT_OPS:
+            raise ValueError(f"unsupported intercept op for python: {op!r}")
+        items.append((cls, (op, value if form == "prefix" else "", rule["id"] in win_ids,
+                            bool(rule["match"].get("sole")))))
+    return _py_dict("_INTERCEPTS", items)
+
+
+def _py_target_families() -> str:
+    rows = []
+    for fam in _rule("R5_triplet_translate")["action"]["families"]:
+        unix_only = fam["profiles"] == ("unix",)
+        if "prefix" in fam:
+            rows.append(("prefix", fam["prefix"], fam["replace"], unix_only))
+        else:
+            rows.append(("infix", fam["infix"], fam["replace_suffix"], unix_only))
+    return "_TARGET_FAMILIES = (\n" + "".join(f"    {r!r},\n" for r in rows) + ")"
+
+
+def _py_profile_data() -> str:
+    keys = ("dir_sep", "path_sep", "zig_lib", "programs_dir", "mingw_common",
+            "arch_dirs", "print_file_name_probe_dirs")
+    lines = ["_PROFILE_DATA = {"]
+    for profile in PROFILES:
+        lines.append(f"    {profile!r}: {{")
+        lines.extend(f"        {k!r}: {PROFILE_DATA[profile][k]!r}," for k in keys)
+        lines.append("    },")
+    lines.append("}")
+    return "\n".join(lines)
+
+
+def generate_python() -> str:
+    header = f"# {_GEN_BANNER}".rstrip().replace("\n", "\n# ")
+    body = f"""{header}
+#
+# zig_translate_flags -- pure-Python twin of _translate.inc's
+# zig_translate_flags(): rules R1-R14, both profiles, classified against
+# the same token table as the C trie and the bash jump table, with the
+# C's behaviour wherever the C and bash differ (R12 bails out on the win
+# profile; a trailing bare -target is kept as-is). Intercept output is
+# returned, not printed. Nothing in the wrappers imports this; it exists
+# so tests can run thousands of argv cases per second in-process and
+# diff them against the C and bash legs.
+
+from __future__ import annotations
+
+import os
+from typing import NamedTuple
+
+
+class Profile(NamedTuple):
+    \"\"\"zig_translate_profile, field for field.\"\"\"
+
+    is_win: bool
+    is_win_target: bool
+    conda_prefix: str
+    zig_target_arch: str = "x86_64"
+    sysroot: str | None = ""
+    probes: tuple[tuple[str, str], ...] | None = None
+
+
+class Result(NamedTuple):
+    \"\"\"rc is zig_translate_flags()'s return: 0 translated, 2 intercepted
+    (stdout/stderr hold what the C would have printed; argv is empty).\"\"\"
+
+    rc: int
+    argv: list[str]
+    use_lld: int
+    mode_is_cxx: int
+    stdout: str
+    stderr: str = ""
+
+
+{_py_tables(_token_table(RULES))}
+
+# class -> (op, prefix whose remainder is the op's argument, fires on win,
+# only when the token is the whole argv)
+{_py_intercepts()}
+
+# R14: Profile.probes is indexed in this order
+_PROBES = {tuple(_rule("R14_baked_probes")["match"]["values"])!r}
+
+# (form, pattern, replacement, unix profile only), in R5 manifest order
+{_py_target_families()}
+
+{_py_profile_data()}
+
+
+def classify(a: str) -> str:
+    \"\"\"Token class, longest match first (zig_tr_classify).\"\"\"
+    cls = _EXACT.get(a)
+    if cls is not None:
+        return cls
+    for n in _PREFIX_LENGTHS:
+        cls = _PREFIX.get(a[:n])
+        if cls is not None:
+            return cls
+    return "NONE"
+
+
+def translate_target(val: str, profile: Profile) -> str:
+    \"\"\"R5: conda triplet -> zig triplet (zig_tr_translate_target).\"\"\"
+    for form, pattern, replacement, unix_only in _TARGET_FAMILIES:
+        if unix_only and profile.is_win:
+            continue
+        if form == "prefix":
+            if val.startswith(pattern):
+                return replacement
+        else:
+            p = val.find(pattern)
+            if p >= 0:
+                # The C formats into a 256-byte buffer, prefix capped at 224.
+                return (val[:min(p, 224)] + replacement)[:255]
+    return val
+
+
+def _probe(path: str) -> bool:
+    return os.path.exists(path)
+
+
+def _intercept(op: str, value: str, profile: Profile) -> str:
+    data = _PROFILE_DATA["win" if profile.is_win else "unix"]
+    prefix = profile.conda_prefix
+    if op == "intercept_print_search_dirs":
+        zig_lib = data["zig_lib"].format(conda_prefix=prefix)
+        arch_dirs = data["arch_dirs"]
+        arch = arch_dirs.get(profile.zig_target_arch, arch_dirs["*"]).format(zig_lib=zig_lib)
+        common = data["mingw_common"].format(zig_lib=zig_lib)
+        sep = data["path_sep"]
+        return (f"install: {{zig_lib}}{{data['dir_sep']}}\\n"
+                f"programs: ={{data['programs_dir'].format(conda_prefix=prefix)}}\\n"
+                f"libraries: ={{common}}{{sep}}{{arch}}{{sep}}{{zig_lib}}\\n")
+    if op == "intercept_print_file_name":
+        for d in data["print_file_name_probe_dirs"]:
+            probe = d.format(conda_prefix=prefix) + data["dir_sep"] + value
+            if _probe(probe):
+                return probe + "\\n"
+        return value + "\\n"
+    if op == "intercept_print_multi_os_directory":
+        return ".\\n"
+    if op == "intercept_print_prog_name":
+        probe = data["programs_dir"].format(conda_prefix=prefix) + value
+        return (probe if _probe(probe) else value) + "\\n"
+    if op == "intercept_print_sysroot":
+        return (profile.sysroot or "") + "\\n"
+    if op == "intercept_print_multiarch":
+        synth = profile.zig_target_arch + ("-w64-mingw32" if profile.is_win else "-conda-linux-gnu")
+        return translate_target(synth[:63], profile) + "\\n"
+    raise ValueError(op)
+
+
+def _baked_probe(token: str, profile: Profile) -> tuple[str, str] | None:
+    \"\"\"R14 (zig_tr_print_baked_probe): the (stdout, stderr) replay, or
+    None when this probe was not baked.\"\"\"
+    if not profile.probes:
+        return None
+    out, err = profile.probes[_PROBES.index(token)]
+    if not out and not err:
+        return None
+    return (out.replace("{{conda_prefix}}", profile.conda_prefix),
+            err.replace("{{conda_prefix}}", profile.conda_prefix))
+
+
+def _rewrite_map(a: str, nxt: str | None, profile: Profile) -> tuple[str | None, bool]:
+    \"\"\"R1 (zig_tr_rewrite_map): (replacement or None, consumed next).\"\"\"
+    if not profile.is_win_target:
+        return None, False
+    if a == "-Map":
+        return (None, False) if nxt is None else ("-Wl,-Map," + nxt, True)
+    if a.startswith("-Map=") and len(a) > 5:
+        return "-Wl,-Map," + a[5:], False
+    if a.startswith("-Map") and len(a) > 4 and a[4] != "=":
+        return "-Wl,-Map," + a[4:], False
+    return None, False
+
+
+def zig_translate_flags(argv: list[str], profile: Profile, mode_is_cxx: bool = False) -> Result:
+    \"\"\"Translate argv (program name excluded) as the C zig_translate_flags()
+    does for profile; mode_is_cxx is the caller's initial *out_mode_is_cxx.\"\"\"
+    argc = len(argv)
+    classes = [classify(a) for a in argv]
+    use_lld = 0
+    has_mcpu = False
+    for i, cls in enumerate(classes):
+        hit = _INTERCEPTS.get(cls)
+        if hit is not None:
+            op, prefix, on_win, sole = hit
+            if (on_win or not profile.is_win) and (not sole or argc == 1):
+                if op != "intercept_print_baked_probe":
+                    return Result(2, [], 0, int(mode_is_cxx), _intercept(op, argv[i][len(prefix):], profile))
+                baked = _baked_probe(argv[i], profile)
+                if baked is not None:
+                    return Result(2, [], 0, int(mode_is_cxx), *baked)
+        elif cls in ("R8_TRIGGER", "R8_XLINKER_VALUE", "R9_TRIGGER"):
+            use_lld = 1
+        elif cls == "R8_XLINKER":
+            if i + 1 < argc and classes[i + 1] == "R8_XLINKER_VALUE":
+                use_lld = 1
+        elif cls == "R6_MCPU":
+            has_mcpu = True
+
+    out = [] if has_mcpu else ["-mcpu=baseline"]
+    saw_nostdlibxx = False
+    i = 0
+    while i < argc:
+        a, cls = argv[i], classes[i]
+        i += 1
+        if cls == "R1_MAP":
+            rewritten, consumed = _rewrite_map(a, argv[i] if i < argc else None, profile)
+            if rewritten is not None:
+                out.append(rewritten)
+                i += consumed
+                continue
+        elif cls == "R4_STRIP":
+            saw_nostdlibxx = True
+            continue
+        elif cls == "R8_XLINKER":
+            if i < argc and classes[i] == "R8_XLINKER_VALUE":
+                out += [a, argv[i]]
+                i += 1
+                continue
+        elif cls == "R7_DROP_ALWAYS":
+            continue
+{_r7_when_not_lld_arm("py", RULES)}        elif cls == "R5_TARGET":
+            if i < argc:
+                out += [a, translate_target(argv[i], profile)]
+                i += 1
+                continue
+        elif cls == "R5_TARGET_EQ":
+            out.append("--target=" + translate_target(a[len("--target="):], profile))
+            continue
+        out.append(a)
+
+    return Result(0, out, use_lld, int(bool(mode_is_cxx) and not saw_nostdlibxx), "")
+"""
+    return _stamp(body)
+
+
+# ---------------------------------------------------------------------------
+# Stamps
+# ---------------------------------------------------------------------------
+def _inputs_digest() -> str:
+    """sha256 over everything the artifacts are a function of."""
+    h = hashlib.sha256()
+    for path in (_THIS_DIR / "flag_rules.py", Path(__file__).resolve()):
+        h.update(path.name.encode() + b"\0")
+        h.update(path.read_bytes().replace(b"\r\n", b"\n"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _blank_stamps(text: str) -> str:
+    return _STAMP_RE.sub(lambda m: f"{m[1]}{m[2]} digest:    @{m[2].upper()}_DIGEST@", text)
+
+
+def _output_digest(text: str) -> str:
+    return hashlib.sha256(_blank_stamps(text).encode()).hexdigest()
+
+
+def _stamp(text: str) -> str:
+    """Fill in the banner placeholders of a freshly rendered artifact."""
+    output = _output_digest(text)
+    return text.replace("@INPUTS_DIGEST@", _inputs_digest(), 1).replace("@OUTPUT_DIGEST@", output, 1)
+
+
+def _stamp_ok(path: Path, inputs: str) -> bool:
+    """True when path's banner was stamped from these inputs and its body
+    still hashes to the stamped output digest (i.e. nobody edited it)."""
+    try:
+        text = path.read_text()
+    except OSError:
+        return False
+    stamps = {m[2]: m[3] for m in _STAMP_RE.finditer(text[:_STAMP_SCAN_BYTES])}
+    return stamps.get("Inputs") == inputs and stamps.get("Output") == _output_digest(text)
 
 
 # ---------------------------------------------------------------------------
 # Main / --check
 # ---------------------------------------------------------------------------
+_GENERATORS = ((_C_OUT, generate_c), (_SH_OUT, generate_bash), (_PY_OUT, generate_python))
+
+
 def _write(path: Path, content: str) -> None:
     path.write_text(content)
 
 
-def _regenerate_into(dest_dir: Path) -> tuple[Path, Path]:
-    c_path = dest_dir / "_translate.inc"
-    sh_path = dest_dir / "_translate.gen.sh"
-    _write(c_path, generate_c())
-    _write(sh_path, generate_bash())
-    return c_path, sh_path
+def _regenerate_into(dest_dir: Path) -> list[Path]:
+    paths = []
+    for committed, generate in _GENERATORS:
+        path = dest_dir / committed.name
+        _write(path, generate())
+        paths.append(path)
+    return paths
 
 
-def _check() -> int:
+def _check(full: bool = False) -> int:
+    names = ", ".join(committed.name for committed, _ in _GENERATORS)
+    if not full:
+        inputs = _inputs_digest()
+        if all(_stamp_ok(committed, inputs) for committed, _ in _GENERATORS):
+            print(f"OK: {names} match the manifest (stamps verified).")
+            return 0
     with tempfile.TemporaryDirectory() as td:
-        tmp_c, tmp_sh = _regenerate_into(Path(td))
+        fresh_paths = _regenerate_into(Path(td))
         drift = False
-        for committed, fresh in ((_C_OUT, tmp_c), (_SH_OUT, tmp_sh)):
+        for (committed, _), fresh in zip(_GENERATORS, fresh_paths):
             if not committed.exists():
                 print(f"DRIFT: {committed} does not exist yet (run without --check first)")
                 drift = True
                 continue
-            if not filecmp.cmp(committed, fresh, shallow=False):
+            a = committed.read_text().splitlines(keepends=True)
+            b = fresh.read_text().splitlines(keepends=True)
+            if a != b:
                 print(f"DRIFT: {committed} differs from regenerated output")
-                a = committed.read_text().splitlines(keepends=True)
-                b = fresh.read_text().splitlines(keepends=True)
                 diff = difflib.unified_diff(a, b, fromfile=str(committed), tofile="regenerated")
                 sys.stdout.writelines(diff)
                 drift = True
         if drift:
             return 1
-        print("OK: _translate.inc and _translate.gen.sh match the manifest.")
+        print(f"OK: {names} match the manifest.")
         return 0
 
 
@@ -958,16 +1551,34 @@ def main() -> int:
     parser.add_argument(
         "--check",
         action="store_true",
-        help="regenerate to a temp dir and diff against the committed files; exit 1 on drift",
+        help="verify the committed files' stamps, falling back to a full regenerate + diff; exit 1 on drift",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="with --check: skip the stamp fast path and always regenerate + diff",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="re-render and rewrite every artifact even when its stamps are current",
     )
     args = parser.parse_args()
 
     if args.check:
-        return _check()
+        return _check(full=args.full)
 
-    _regenerate_into(_THIS_DIR)
-    print(f"wrote {_C_OUT}")
-    print(f"wrote {_SH_OUT}")
+    inputs = _inputs_digest()
+    for path, generate in _GENERATORS:
+        if not args.force and _stamp_ok(path, inputs):
+            print(f"up to date {path}")
+            continue
+        content = generate()
+        if path.exists() and path.read_text() == content:
+            print(f"unchanged {path}")
+            continue
+        _write(path, content)
+        print(f"wrote {path}")
     return 0
 
 
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""Generate MinGW import libraries (lib<stem>.a) from .def/.def.in files.
+
+Driver for Steps 1/2/4 of generate_mingw_import_libs() (_mingw.sh). The
+bash loop it replaces ran ~800 sources x 3 Windows arches strictly
+serially (awk + `zig cc -E` + llvm-dlltool per pair); this fans the same
+work out over --jobs workers and keeps a content-addressed cache so a
+rebuild only regenerates libs whose inputs changed. The archives are
+written by coff_implib.py (byte-identical to llvm-dlltool's), which is
+pure Python and holds the GIL, so those workers are processes, each
+taking batches of jobs; --dlltool switches back to forking llvm-dlltool
+per lib, where the workers only wait on children and are threads.
+
+Usage:
+    python mingw_implibs.py --zig ZIG --defs DIR [--dlltool DLLTOOL]
+        --arch 'x86_64|i386:x86-64|x86_64-windows-gnu|OUTDIR' [--arch ...]
+        [-I DIR ...] [--skip STEM ...] [--jobs N] [--cache-dir DIR]
+
+--arch takes a _mingw_arch_specs entry with the output dir appended
+('|'-delimited: the x86_64 dlltool machine "i386:x86-64" contains a
+colon). For each arch and each source in --defs:
+
+  <stem>.def     used as-is (arch-independent source).
+  <stem>.def.in  preprocessed with `zig cc -E -P -x assembler-with-cpp
+                 -target <triple> -I...` into OUTDIR/<stem>.def first.
+                 Takes precedence over a same-stem .def: for x86_64,
+                 OUTDIR is lib-common itself, so a .def next to its
+                 .def.in is our own earlier preprocessing output.
+
+A lib already present in OUTDIR is left alone and counted as skipped. A
+preprocessing failure drops the source silently, as before; a .def the
+writer rejects prints a WARNING to stderr and is counted as failed.
+
+Cache (--cache-dir; off when omitted or empty): one entry per (source
+content hash, dlltool machine, zig version, archive writer). The writer is
+coff_implib.py's own content hash, or --dlltool's path and `--version`,
+so a writer fix never serves an archive the old one wrote. For .def.in
+the content hash also covers the target triple and every *.def.in under
+the -I dirs, so an edited func.def.in invalidates all templates. A hit copies the cached .a (and preprocessed .def) without
+running zig or dlltool. The cache is best-effort: any I/O problem with
+it falls back to regenerating.
+
+Prints one census line on stdout for _mingw.sh to fold into its own
+counters:
+    attempts=N ok=N failed=N skipped=N cached=N
+Exits 0 whenever the census was produced (failures are reported there),
+2 on bad arguments.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+import coff_implib
+
+CACHE_VERSION = "1"
+
+
+class _Job:
+    """One (source, arch) pair to turn into OUTDIR/lib<stem>.a."""
+
+    def __init__(self, stem: str, src: Path, template: bool, machine: str, triple: str, outdir: Path):
+        self.stem = stem
+        self.src = src
+        self.template = template
+        self.machine = machine
+        self.triple = triple
+        self.outdir = outdir
+        self.lib = outdir / f"lib{stem}.a"
+
+
+def _parse_arch(spec: str) -> tuple[str, str, str, Path]:
+    parts = spec.split("|")
+    if len(parts) != 4 or not all(parts):
+        raise argparse.ArgumentTypeError(f"expected 'winarch|machine|triple|outdir', got {spec!r}")
+    return parts[0], parts[1], parts[2], Path(parts[3])
+
+
+def _zig_version(zig: str) -> str:
+    try:
+        proc = subprocess.run([zig, "version"], capture_output=True, text=True, timeout=120)
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+    return proc.stdout.strip() if proc.returncode == 0 and proc.stdout.strip() else "unknown"
+
+
+def _writer_id(dlltool: str | None) -> str:
+    """Identity of whatever writes the archives, for the cache key."""
+    if not dlltool:
+        return "builtin:" + hashlib.sha256(Path(coff_implib.__file__).read_bytes()).hexdigest()
+    try:
+        proc = subprocess.run([dlltool, "--version"], capture_output=True, text=True, timeout=120)
+        version = proc.stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        version = "unknown"
+    return f"dlltool:{dlltool}:{version}"
+
+
+def _sources(defs: Path, skip: set[str]) -> list[tuple[str, Path, bool]]:
+    """(stem, path, is_template) for every source in defs, sorted by stem."""
+    found: dict[str, tuple[Path, bool]] = {}
+    for path in sorted(defs.iterdir()):
+        if not path.is_file():
+            continue
+        if path.name.endswith(".def.in"):
+            found[path.name[: -len(".def.in")]] = (path, True)
+        elif path.name.endswith(".def"):
+            found.setdefault(path.name[: -len(".def")], (path, False))
+    return [(stem, path, tmpl) for stem, (path, tmpl) in sorted(found.items()) if stem not in skip]
+
+
+def _include_digest(include_dirs: list[Path]) -> str:
+    """Hash of every *.def.in reachable through -I, in search order."""
+    h = hashlib.sha256()
+    for d in include_dirs:
+        h.update(b"dir\0" + str(d).encode() + b"\0")
+        if not d.is_dir():
+            continue
+        for path in sorted(d.glob("*.def.in")):
+            h.update(path.name.encode() + b"\0" + path.read_bytes() + b"\0")
+    return h.hexdigest()
+
+
+def _dll_name(def_text: str, stem: str) -> str:
+    """First LIBRARY directive's name (quotes stripped), else <stem>.dll."""
+    for line in def_text.splitlines():
+        if line.startswith("LIBRARY"):
+            fields = line.split()
+            name = fields[1].replace('"', "") if len(fields) > 1 else ""
+            return name or f"{stem}.dll"
+    return f"{stem}.dll"
+
+
+class _Driver:
+    def __init__(self, args: argparse.Namespace):
+        self.zig = args.zig
+        self.dlltool = args.dlltool
+        self.includes = [Path(d) for d in args.include]
+        self.cache_dir = Path(args.cache_dir) if args.cache_dir else None
+        self.zig_version = _zig_version(args.zig)
+        self.writer_id = _writer_id(args.dlltool) if self.cache_dir else ""
+        self.include_digest = _include_digest(self.includes)
+
+    def _key(self, job: _Job, src_bytes: bytes) -> str:
+        h = hashlib.sha256()
+        for part in (CACHE_VERSION, job.stem, job.machine, self.zig_version, self.writer_id):
+            h.update(part.encode() + b"\0")
+        h.update(hashlib.sha256(src_bytes).digest())
+        if job.template:
+            h.update(job.triple.encode() + b"\0" + self.include_digest.encode())
+        return h.hexdigest()
+
+    def _cache_entry(self, key: str) -> Path | None:
+        return self.cache_dir / key[:2] / key if self.cache_dir else None
+
+    def _cache_fetch(self, job: _Job, entry: Path | None) -> bool:
+        if entry is None:
+            return False
+        lib = entry / "lib.a"
+        try:
+            if not lib.is_file() or lib.stat().st_size == 0:
+                return False
+            if job.template:
+                shutil.copyfile(entry / "out.def", job.outdir / f"{job.stem}.def")
+            shutil.copyfile(lib, job.lib)
+            return True
+        except OSError:
+            job.lib.unlink(missing_ok=True)
+            return False
+
+    def _cache_store(self, job: _Job, entry: Path | None, def_path: Path) -> None:
+        if entry is None or entry.exists():
+            return
+        try:
+            entry.parent.mkdir(parents=True, exist_ok=True)
+            tmp = Path(tempfile.mkdtemp(prefix=".tmp-", dir=entry.parent))
+            shutil.copyfile(job.lib, tmp / "lib.a")
+            if job.template:
+                shutil.copyfile(def_path, tmp / "out.def")
+            try:
+                os.replace(tmp, entry)
+            except OSError:
+                # Lost a race with another writer of the same key: theirs is
+                # identical by construction.
+                shutil.rmtree(tmp, ignore_errors=True)
+        except OSError:
+            pass
+
+    def _preprocess(self, job: _Job, def_path: Path) -> bool:
+        cmd = [self.zig, "cc", "-E", "-P", "-target", job.triple, "-x", "assembler-with-cpp"]
+        cmd += [f"-I{d}" for d in self.includes]
+        cmd.append(str(job.src))
+        try:
+            with open(def_path, "wb") as out:
+                proc = subprocess.run(cmd, stdout=out, stderr=subprocess.DEVNULL)
+        except OSError:
+            proc = None
+        if proc is None or proc.returncode != 0:
+            def_path.unlink(missing_ok=True)
+            return False
+        return True
+
+    def _write_lib(self, job: _Job, def_path: Path, dll: str) -> bool:
+        if self.dlltool:
+            proc = subprocess.run(
+                [self.dlltool, "-m", job.machine, "-D", dll, "-d", str(def_path), "-l", str(job.lib)],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            return proc.returncode == 0
+        try:
+            data = coff_implib.build_import_library(
+                def_path.read_text(encoding="latin-1"), job.machine, dll)
+            coff_implib.write_file(str(job.lib), data)
+        except (coff_implib.DefError, OSError):
+            return False
+        return True
+
+    def run(self, job: _Job) -> str:
+        """Returns one of skipped / cached / ok / failed / dropped."""
+        if job.lib.is_file():
+            return "skipped"
+        try:
+            src_bytes = job.src.read_bytes()
+        except OSError:
+            return "dropped"
+        entry = self._cache_entry(self._key(job, src_bytes))
+        if self._cache_fetch(job, entry):
+            return "cached"
+
+        def_path = job.src
+        if job.template:
+            def_path = job.outdir / f"{job.stem}.def"
+            if not self._preprocess(job, def_path):
+                return "dropped"
+        try:
+            dll = _dll_name(def_path.read_text(errors="replace"), job.stem)
+        except OSError:
+            dll = f"{job.stem}.dll"
+        if not self._write_lib(job, def_path, dll):
+            print(
+                f"WARNING: failed to generate lib{job.stem}.a from {def_path} (machine={job.machine})",
+                file=sys.stderr,
+            )
+            return "failed"
+        self._cache_store(job, entry, def_path)
+        return "ok"
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--zig", required=True, help="zig binary used for `zig cc -E` and the cache key")
+    parser.add_argument("--dlltool", default=None,
+                        help="fork this llvm-dlltool per lib instead of writing archives in-process")
+    parser.add_argument("--defs", required=True, help="directory of .def/.def.in sources")
+    parser.add_argument("--arch", action="append", required=True, type=_parse_arch,
+                        help="'winarch|dlltool machine|zig triple|outdir' (repeatable)")
+    parser.add_argument("-I", dest="include", action="append", default=[], help="preprocessor include dir (repeatable)")
+    parser.add_argument("--skip", action="append", default=[], help="source stem to ignore (repeatable)")
+    parser.add_argument("--jobs", type=int, default=int(os.environ.get("CPU_COUNT") or os.cpu_count() or 1))
+    parser.add_argument("--cache-dir", default=None, help="content-addressed result cache (omit or empty to disable)")
+    args = parser.parse_args(argv)
+
+    defs = Path(args.defs)
+    if not defs.is_dir():
+        parser.error(f"--defs {defs} is not a directory")
+    sources = _sources(defs, set(args.skip))
+    driver = _Driver(args)
+
+    jobs = []
+    for _winarch, machine, triple, outdir in args.arch:
+        outdir.mkdir(parents=True, exist_ok=True)
+        jobs += [_Job(stem, src, tmpl, machine, triple, outdir) for stem, src, tmpl in sources]
+
+    census = {"ok": 0, "failed": 0, "skipped": 0, "cached": 0, "dropped": 0}
+    workers = max(1, min(args.jobs, len(jobs)))
+    if workers == 1:
+        outcomes = [driver.run(job) for job in jobs]
+    elif args.dlltool:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            outcomes = list(pool.map(driver.run, jobs))
+    else:
+        # A few batches per worker: large enough to amortise pickling the
+        # driver and the jobs, small enough to even out uneven .def sizes.
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outcomes = list(pool.map(driver.run, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+    for outcome in outcomes:
+        census[outcome] += 1
+
+    # "ok" covers every lib produced this run, cache hits included, so the
+    # bash-side ok/failed/skipped arithmetic reads the same as before.
+    ok = census["ok"] + census["cached"]
+    attempts = ok + census["failed"]
+    print(f"attempts={attempts} ok={ok} failed={census['failed']} "
+          f"skipped={census['skipped']} cached={census['cached']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,18 +1,23 @@
 /*
  * nonunix_common.h - shared helpers for non-unix C shims.
  *
- * Included by zig-cc-nonunix.c and zig-tool-nonunix.c.
+ * Included by zig-cc-nonunix.c, zig-tool-nonunix.c, zig-windres-nonunix.c
+ * and cross-zig-shim.c.
  * All functions are static inline so no shared state or linkage issues arise.
  */
 
 #ifndef NONUNIX_COMMON_H
 #define NONUNIX_COMMON_H
 
+#include <fcntl.h>
+#include <io.h>
 #include <stdio.h>
 #include <stdlib.h>
 #include <string.h>
 #include <windows.h>
 
+#include "response_file.h"   /* zig_rsp_command_line() */
+
 /* Ensure zig can resolve its cache directory.
  * ZIG_GLOBAL_CACHE_DIR overrides zig's getAppDataDir() lookup entirely.
  * Always set it if unset: mirrors zig's resolution (APPDATA > USERPROFILE
@@ -74,4 +79,126 @@ static inline void restore_msys2_system32_path(void) {
     }
 }
 
+/* Console Ctrl-C/Ctrl-Break reach every process on the console, zig
+ * included.  Ignore them in the wrapper so it keeps waiting and reports
+ * zig's own exit status instead of dying first. */
+static inline BOOL WINAPI zig_spawn_ctrl_handler(DWORD type) {
+    (void)type;
+    return TRUE;
+}
+
+/* Run zig and wait for it; the Windows stand-in for exec.
+ *
+ * Windows has no exec, so the wrapper has to stay alive as zig's parent --
+ * but it must never outlive its purpose, nor let zig outlive it:
+ *   - the command line is quoted here (zig_rsp_command_line, the exact
+ *     inverse of the CRT's argv splitting) and handed to CreateProcessW as
+ *     is, rather than through _spawnv's CRT re-quoting, which mangles
+ *     arguments with embedded quotes or trailing backslashes;
+ *   - stdio handles are inherited explicitly (STARTF_USESTDHANDLES), so
+ *     redirected build-tool pipes reach zig;
+ *   - zig starts suspended inside a job object with
+ *     JOB_OBJECT_LIMIT_KILL_ON_JOB_CLOSE.  When a build tool kills the
+ *     wrapper, the last job handle closes and zig (with everything it
+ *     spawned) dies too, instead of lingering and holding output files.
+ *     If the job cannot be set up (e.g. an enclosing job forbids nesting
+ *     on pre-Windows 8 systems), zig still runs, just unguarded.
+ *
+ * Returns zig's exit code, or -1 if it could not be started (GetLastError()
+ * is left describing the failure for the caller's message). */
+static inline int zig_spawn_wait(const char *zig_path, const char *const argv[]) {
+    int argc = 0;
+    while (argv[argc])
+        argc++;
+
+    /* Test-observability hook, as in unix_common.h's exec_zig(): write the
+     * final argv NUL-terminated to stdout (binary mode, so no CRLF
+     * translation) and report success instead of starting zig. */
+    const char *dry = getenv("ZIG_WRAPPER_DRY_EXEC");
+    if (dry && *dry && strcmp(dry, "0") != 0) {
+        fflush(stdout);
+        _setmode(_fileno(stdout), _O_BINARY);
+        for (int i = 0; i < argc; i++)
+            fwrite(argv[i], 1, strlen(argv[i]) + 1, stdout);
+        return fflush(stdout) == 0 ? 0 : 1;
+    }
+
+    char *cmdline = zig_rsp_command_line(argv, argc);
+    if (!cmdline) {
+        SetLastError(ERROR_NOT_ENOUGH_MEMORY);
+        return -1;
+    }
+
+    /* The shims work in the ANSI code page (narrow main()), as _spawnv did. */
+    int wpath_len = MultiByteToWideChar(CP_ACP, 0, zig_path, -1, NULL, 0);
+    int wcmd_len = MultiByteToWideChar(CP_ACP, 0, cmdline, -1, NULL, 0);
+    wchar_t *wpath = wpath_len > 0 ? (wchar_t *)malloc(sizeof(wchar_t) * (size_t)wpath_len) : NULL;
+    wchar_t *wcmd = wcmd_len > 0 ? (wchar_t *)malloc(sizeof(wchar_t) * (size_t)wcmd_len) : NULL;
+    if (!wpath || !wcmd) {
+        free(cmdline);
+        free(wpath);
+        free(wcmd);
+        SetLastError(ERROR_NOT_ENOUGH_MEMORY);
+        return -1;
+    }
+    MultiByteToWideChar(CP_ACP, 0, zig_path, -1, wpath, wpath_len);
+    MultiByteToWideChar(CP_ACP, 0, cmdline, -1, wcmd, wcmd_len);
+    free(cmdline);
+
+    HANDLE job = CreateJobObjectW(NULL, NULL);
+    if (job) {
+        JOBOBJECT_EXTENDED_LIMIT_INFORMATION limits;
+        memset(&limits, 0, sizeof limits);
+        limits.BasicLimitInformation.LimitFlags = JOB_OBJECT_LIMIT_KILL_ON_JOB_CLOSE;
+        if (!SetInformationJobObject(job, JobObjectExtendedLimitInformation,
+                                     &limits, sizeof limits)) {
+            CloseHandle(job);
+            job = NULL;
+        }
+    }
+
+    STARTUPINFOW si;
+    PROCESS_INFORMATION pi;
+    memset(&si, 0, sizeof si);
+    memset(&pi, 0, sizeof pi);
+    si.cb = sizeof si;
+    si.dwFlags = STARTF_USESTDHANDLES;
+    si.hStdInput = GetStdHandle(STD_INPUT_HANDLE);
+    si.hStdOutput = GetStdHandle(STD_OUTPUT_HANDLE);
+    si.hStdError = GetStdHandle(STD_ERROR_HANDLE);
+
+    /* Flush anything the wrapper printed so it precedes zig's output. */
+    fflush(stdout);
+    fflush(stderr);
+
+    BOOL started = CreateProcessW(wpath, wcmd, NULL, NULL, TRUE, CREATE_SUSPENDED,
+                                  NULL, NULL, &si, &pi);
+    DWORD err = GetLastError();
+    free(wpath);
+    free(wcmd);
+    if (!started) {
+        if (job)
+            CloseHandle(job);
+        SetLastError(err);
+        return -1;
+    }
+
+    if (job && !AssignProcessToJobObject(job, pi.hProcess)) {
+        CloseHandle(job);
+        job = NULL;
+    }
+    SetConsoleCtrlHandler(zig_spawn_ctrl_handler, TRUE);
+    ResumeThread(pi.hThread);
+    CloseHandle(pi.hThread);
+
+    DWORD code = 1;
+    WaitForSingleObject(pi.hProcess, INFINITE);
+    if (!GetExitCodeProcess(pi.hProcess, &code))
+        code = 1;
+    CloseHandle(pi.hProcess);
+    if (job)
+        CloseHandle(job);
+    return (int)code;
+}
+
 #endif /* NONUNIX_COMMON_H */
@@ -0,0 +1,447 @@
+/*
+ * response_file.h - @file response-file handling for the cc/c++ C shims.
+ *
+ * Included by zig-cc-unix.c and zig-cc-nonunix.c, AFTER their *_common.h
+ * (unix_common.h's feature-test macros must precede every system header).
+ * All functions are static inline, as in the *_common.h headers.
+ *
+ * CMake and ninja spill long compile/link lines into response files.  Left
+ * unexpanded, every flag inside one bypasses R1-R14 and the hand-written
+ * drops, so the shims:
+ *   1. expand each @file argument in place into a logical argv -- streamed
+ *      through getc() a token at a time, recursing into nested @files as
+ *      GCC does;
+ *   2. run the normal pipeline over that logical argv;
+ *   3. if the pipeline left the logical args untouched, pass the ORIGINAL
+ *      argv on (the @file references survive and nothing is written);
+ *      otherwise write the translated args into ONE new response file and
+ *      pass @<that file>, so the line stays as short as the build system
+ *      made it.  No extra process is spawned either way.
+ *
+ * Quoting follows the host's compiler driver: GNU (libiberty buildargv) on
+ * unix, MSVC (CommandLineToArgvW) on Windows -- ZIG_RSP_NATIVE.  Both
+ * styles are available on every host so the parity suite can exercise them.
+ *
+ * Written files are content-addressed under
+ * $ZIG_GLOBAL_CACHE_DIR/zig-wrapper/rsp/<hash>.rsp: repeated link lines
+ * share one file, and nothing has to be deleted after exec() -- which the
+ * unix shim could not do anyway, since it never regains control.
+ */
+
+#ifndef RESPONSE_FILE_H
+#define RESPONSE_FILE_H
+
+#include <errno.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#ifdef _WIN32
+#  include <direct.h>
+#  include <process.h>
+#  define ZIG_RSP_SEP "\\"
+#else
+#  include <sys/stat.h>
+#  include <unistd.h>
+#  define ZIG_RSP_SEP "/"
+#endif
+
+typedef enum { ZIG_RSP_GNU, ZIG_RSP_MSVC } zig_rsp_style;
+
+#ifdef _WIN32
+#  define ZIG_RSP_NATIVE ZIG_RSP_MSVC
+#else
+#  define ZIG_RSP_NATIVE ZIG_RSP_GNU
+#endif
+
+/* Nested @file references deeper than this are kept literally, which also
+ * stops a self-including response file from recursing forever. */
+#define ZIG_RSP_MAX_DEPTH 16
+
+/* The logical argv.  When no argument starts with '@', argv aliases the
+ * caller's array and nothing is allocated; otherwise it is a malloc'd
+ * array mixing borrowed argv strings and malloc'd file tokens, all of
+ * which live until the process exits or execs. */
+typedef struct {
+    char **argv;
+    int argc;
+    int cap;
+    int expanded;   /* number of @file arguments actually read */
+} zig_rsp_args;
+
+/* Growable byte buffer: one token while parsing, a whole file's contents
+ * while writing. */
+typedef struct {
+    char *buf;
+    size_t len;
+    size_t cap;
+} zig_rsp_buf;
+
+static inline int zig_rsp_buf_put(zig_rsp_buf *b, char c) {
+    if (b->len + 1 >= b->cap) {
+        size_t cap = b->cap ? b->cap * 2 : 256;
+        char *grown = (char *)realloc(b->buf, cap);
+        if (!grown)
+            return -1;
+        b->buf = grown;
+        b->cap = cap;
+    }
+    b->buf[b->len++] = c;
+    b->buf[b->len] = '\0';
+    return 0;
+}
+
+static inline int zig_rsp_buf_puts(zig_rsp_buf *b, const char *s) {
+    for (; *s; s++)
+        if (zig_rsp_buf_put(b, *s) != 0)
+            return -1;
+    return 0;
+}
+
+static inline int zig_rsp_push(zig_rsp_args *out, char *arg) {
+    if (out->argc >= out->cap) {
+        int cap = out->cap ? out->cap * 2 : 64;
+        char **grown = (char **)realloc(out->argv, sizeof(char *) * (size_t)cap);
+        if (!grown)
+            return -1;
+        out->argv = grown;
+        out->cap = cap;
+    }
+    out->argv[out->argc++] = arg;
+    return 0;
+}
+
+static inline int zig_rsp_add(zig_rsp_args *out, char *arg, int owned,
+                              zig_rsp_style style, int depth);
+
+/* Hand one finished token to zig_rsp_add (which may recurse into it). */
+static inline int zig_rsp_emit(zig_rsp_args *out, zig_rsp_buf *tok,
+                               zig_rsp_style style, int depth) {
+    char *arg = (char *)malloc(tok->len + 1);
+    if (!arg)
+        return -1;
+    memcpy(arg, tok->buf ? tok->buf : "", tok->len);
+    arg[tok->len] = '\0';
+    tok->len = 0;
+    return zig_rsp_add(out, arg, 1, style, depth);
+}
+
+/* GNU rules (libiberty buildargv): whitespace separates; '...' and "..."
+ * group and are removed; a backslash escapes the next character anywhere,
+ * including inside either kind of quote. */
+static inline int zig_rsp_parse_gnu(FILE *f, zig_rsp_args *out, int depth) {
+    zig_rsp_buf tok = { NULL, 0, 0 };
+    int c, in_tok = 0, squote = 0, dquote = 0, rc = 0;
+    while (rc == 0 && (c = getc(f)) != EOF) {
+        if (!squote && !dquote && (c == ' ' || c == '\t' || c == '\n'
+                                   || c == '\r' || c == '\v' || c == '\f')) {
+            if (in_tok)
+                rc = zig_rsp_emit(out, &tok, ZIG_RSP_GNU, depth);
+            in_tok = 0;
+            continue;
+        }
+        in_tok = 1;
+        if (c == '\\') {
+            if ((c = getc(f)) == EOF)
+                break;
+            rc = zig_rsp_buf_put(&tok, (char)c);
+        } else if (squote && c == '\'') {
+            squote = 0;
+        } else if (dquote && c == '"') {
+            dquote = 0;
+        } else if (!squote && !dquote && c == '\'') {
+            squote = 1;
+        } else if (!squote && !dquote && c == '"') {
+            dquote = 1;
+        } else {
+            rc = zig_rsp_buf_put(&tok, (char)c);
+        }
+    }
+    if (rc == 0 && in_tok)
+        rc = zig_rsp_emit(out, &tok, ZIG_RSP_GNU, depth);
+    free(tok.buf);
+    return rc;
+}
+
+/* MSVC rules (CommandLineToArgvW, as clang applies them to response files):
+ * whitespace separates outside quotes; "..." groups; 2n backslashes before
+ * a quote give n backslashes and the quote toggles quoting, 2n+1 give n
+ * backslashes and a literal quote; backslashes not before a quote are
+ * literal, so C:\paths survive; "" inside quotes is a literal quote. */
+static inline int zig_rsp_parse_msvc(FILE *f, zig_rsp_args *out, int depth) {
+    zig_rsp_buf tok = { NULL, 0, 0 };
+    int c, in_tok = 0, quoted = 0, rc = 0;
+    while (rc == 0 && (c = getc(f)) != EOF) {
+        if (!quoted && (c == ' ' || c == '\t' || c == '\n' || c == '\r')) {
+            if (in_tok)
+                rc = zig_rsp_emit(out, &tok, ZIG_RSP_MSVC, depth);
+            in_tok = 0;
+            continue;
+        }
+        in_tok = 1;
+        if (c == '\\') {
+            size_t n = 1;
+            while ((c = getc(f)) == '\\')
+                n++;
+            if (c == '"') {
+                size_t k;
+                for (k = 0; rc == 0 && k < n / 2; k++)
+                    rc = zig_rsp_buf_put(&tok, '\\');
+                if (n % 2 == 0)
+                    quoted = !quoted;
+                else if (rc == 0)
+                    rc = zig_rsp_buf_put(&tok, '"');
+            } else {
+                size_t k;
+                for (k = 0; rc == 0 && k < n; k++)
+                    rc = zig_rsp_buf_put(&tok, '\\');
+                if (c != EOF)
+                    ungetc(c, f);
+            }
+        } else if (c == '"') {
+            if (quoted) {
+                int next = getc(f);
+                if (next == '"')
+                    rc = zig_rsp_buf_put(&tok, '"');
+                else {
+                    quoted = 0;
+                    if (next != EOF)
+                        ungetc(next, f);
+                }
+            } else {
+                quoted = 1;
+            }
+        } else {
+            rc = zig_rsp_buf_put(&tok, (char)c);
+        }
+    }
+    if (rc == 0 && in_tok)
+        rc = zig_rsp_emit(out, &tok, ZIG_RSP_MSVC, depth);
+    free(tok.buf);
+    return rc;
+}
+
+/* Append arg, expanding it first if it is a readable @file.  Like GCC, an
+ * @file that cannot be opened is passed through literally.  owned says
+ * whether arg is ours to free once it has been expanded away. */
+static inline int zig_rsp_add(zig_rsp_args *out, char *arg, int owned,
+                              zig_rsp_style style, int depth) {
+    if (arg[0] == '@' && arg[1] != '\0' && depth < ZIG_RSP_MAX_DEPTH) {
+        FILE *f = fopen(arg + 1, "rb");
+        if (f) {
+            int rc = style == ZIG_RSP_MSVC ? zig_rsp_parse_msvc(f, out, depth + 1)
+                                           : zig_rsp_parse_gnu(f, out, depth + 1);
+            fclose(f);
+            if (rc == 0) {
+                out->expanded++;
+                if (owned)
+                    free(arg);
+            }
+            return rc;
+        }
+    }
+    return zig_rsp_push(out, arg);
+}
+
+/* Expand every @file in argv[0..argc).  Returns 0, or -1 on allocation
+ * failure.  Without any '@' argument this is a single scan and out->argv
+ * aliases argv. */
+static inline int zig_rsp_expand(int argc, char *const argv[], zig_rsp_style style,
+                                 zig_rsp_args *out) {
+    int i, any = 0;
+    out->argv = (char **)argv;
+    out->argc = argc;
+    out->cap = 0;
+    out->expanded = 0;
+    for (i = 0; i < argc && !any; i++)
+        any = argv[i][0] == '@';
+    if (!any)
+        return 0;
+
+    out->argv = NULL;
+    out->argc = 0;
+    for (i = 0; i < argc; i++)
+        if (zig_rsp_add(out, argv[i], 0, style, 0) != 0)
+            return -1;
+    return 0;
+}
+
+/* Non-zero iff a[0..na) and b[0..nb) are the same token sequence. */
+static inline int zig_rsp_same(const char *const *a, int na, char *const *b, int nb) {
+    int i;
+    if (na != nb)
+        return 0;
+    for (i = 0; i < na; i++)
+        if (strcmp(a[i], b[i]) != 0)
+            return 0;
+    return 1;
+}
+
+/* Append one token, quoted so that the matching parser above reads it back
+ * unchanged; plain tokens are written bare. */
+static inline int zig_rsp_quote(zig_rsp_buf *b, const char *s, zig_rsp_style style) {
+    const char *special = style == ZIG_RSP_MSVC ? " \t\n\r\"" : " \t\n\r\v\f'\"\\";
+    if (*s && !strpbrk(s, special))
+        return zig_rsp_buf_puts(b, s);
+
+    if (zig_rsp_buf_put(b, '"') != 0)
+        return -1;
+    if (style == ZIG_RSP_GNU) {
+        for (; *s; s++) {
+            if ((*s == '"' || *s == '\\') && zig_rsp_buf_put(b, '\\') != 0)
+                return -1;
+            if (zig_rsp_buf_put(b, *s) != 0)
+                return -1;
+        }
+    } else {
+        /* Backslashes are only special before a quote -- including the
+         * closing one -- where they are doubled. */
+        size_t n = 0, k;
+        for (; *s; s++) {
+            if (*s == '\\') {
+                n++;
+                continue;
+            }
+            for (k = 0; k < (*s == '"' ? 2 * n + 1 : n); k++)
+                if (zig_rsp_buf_put(b, '\\') != 0)
+                    return -1;
+            n = 0;
+            if (zig_rsp_buf_put(b, *s) != 0)
+                return -1;
+        }
+        for (k = 0; k < 2 * n; k++)
+            if (zig_rsp_buf_put(b, '\\') != 0)
+                return -1;
+    }
+    return zig_rsp_buf_put(b, '"');
+}
+
+/* MSVC quoting is CommandLineToArgvW's, i.e. how a child's CRT splits the
+ * lpCommandLine CreateProcess hands it, so nonunix_common.h's launcher
+ * builds its command lines here too.  argv[0] is the one exception: the CRT
+ * reads it up to the next quote with no backslash processing, so it is only
+ * wrapped in quotes (paths contain no '"').  Returns a malloc'd string, or
+ * NULL on allocation failure. */
+static inline char *zig_rsp_command_line(const char *const argv[], int argc) {
+    zig_rsp_buf b = { NULL, 0, 0 };
+    int i;
+    for (i = 0; i < argc; i++) {
+        int rc;
+        if (i == 0 && (!*argv[0] || strpbrk(argv[0], " \t")))
+            rc = zig_rsp_buf_put(&b, '"') || zig_rsp_buf_puts(&b, argv[0])
+                 || zig_rsp_buf_put(&b, '"');
+        else if (i == 0)
+            rc = zig_rsp_buf_puts(&b, argv[0]);
+        else
+            rc = zig_rsp_buf_put(&b, ' ') || zig_rsp_quote(&b, argv[i], ZIG_RSP_MSVC);
+        if (rc) {
+            free(b.buf);
+            return NULL;
+        }
+    }
+    if (!b.buf) {
+        b.buf = (char *)malloc(1);
+        if (b.buf)
+            b.buf[0] = '\0';
+    }
+    return b.buf;
+}
+
+static inline int zig_rsp_mkdir(const char *path) {
+#ifdef _WIN32
+    int rc = _mkdir(path);
+#else
+    int rc = mkdir(path, 0755);
+#endif
+    return rc == 0 || errno == EEXIST ? 0 : -1;
+}
+
+/* Non-zero iff path exists and holds exactly data[0..len). */
+static inline int zig_rsp_file_matches(const char *path, const char *data, size_t len) {
+    FILE *f = fopen(path, "rb");
+    if (!f)
+        return 0;
+    int same = 1;
+    size_t i;
+    for (i = 0; same && i < len; i++)
+        same = getc(f) == (unsigned char)data[i];
+    same = same && getc(f) == EOF;
+    fclose(f);
+    return same;
+}
+
+/* Write argv[0..argc) as a response file in style and return a malloc'd
+ * "@<path>" argument for it, or NULL if anything failed (the caller then
+ * passes the translated args inline). */
+static inline char *zig_rsp_write(const char *const *argv, int argc, zig_rsp_style style) {
+    const char *base = getenv("ZIG_GLOBAL_CACHE_DIR");
+    if (!base || !*base)
+        return NULL;
+
+    zig_rsp_buf content = { NULL, 0, 0 };
+    int i;
+    for (i = 0; i < argc; i++) {
+        if (zig_rsp_quote(&content, argv[i], style) != 0
+            || zig_rsp_buf_put(&content, '\n') != 0) {
+            free(content.buf);
+            return NULL;
+        }
+    }
+
+    unsigned long long h = 0xcbf29ce484222325ULL;
+    size_t j;
+    for (j = 0; j < content.len; j++) {
+        h ^= (unsigned char)content.buf[j];
+        h *= 0x100000001b3ULL;
+    }
+
+    char dir[4096], rspdir[4096], path[4096], tmp[4096];
+    int n1 = snprintf(dir, sizeof dir, "%s" ZIG_RSP_SEP "zig-wrapper", base);
+    int n2 = snprintf(rspdir, sizeof rspdir, "%s" ZIG_RSP_SEP "rsp", dir);
+    if (n1 <= 0 || (size_t)n1 >= sizeof dir || n2 <= 0 || (size_t)n2 >= sizeof rspdir
+        || zig_rsp_mkdir(base) != 0 || zig_rsp_mkdir(dir) != 0 || zig_rsp_mkdir(rspdir) != 0) {
+        free(content.buf);
+        return NULL;
+    }
+    n1 = snprintf(path, sizeof path, "%s" ZIG_RSP_SEP "%016llx.rsp", rspdir, h);
+#ifdef _WIN32
+    n2 = snprintf(tmp, sizeof tmp, "%s.%d.tmp", path, _getpid());
+#else
+    n2 = snprintf(tmp, sizeof tmp, "%s.%ld.tmp", path, (long)getpid());
+#endif
+    if (n1 <= 0 || (size_t)n1 >= sizeof path || n2 <= 0 || (size_t)n2 >= sizeof tmp) {
+        free(content.buf);
+        return NULL;
+    }
+
+    /* Content-addressed: an identical file is reused as-is.  Otherwise write
+     * a private temp file and rename it into place, so a concurrent reader
+     * never sees a partial file.  rename() onto an existing file fails on
+     * Windows; that only happens when a racing writer got there first, and
+     * its file is verified like any other. */
+    int ok = zig_rsp_file_matches(path, content.buf, content.len);
+    if (!ok) {
+        FILE *f = fopen(tmp, "wb");
+        if (f) {
+            size_t wrote = fwrite(content.buf, 1, content.len, f);
+            int closed = fclose(f) == 0;
+            if (wrote == content.len && closed && rename(tmp, path) == 0)
+                ok = 1;
+            else
+                remove(tmp);
+        }
+        if (!ok)
+            ok = zig_rsp_file_matches(path, content.buf, content.len);
+    }
+    free(content.buf);
+    if (!ok)
+        return NULL;
+
+    char *arg = (char *)malloc(strlen(path) + 2);
+    if (!arg)
+        return NULL;
+    arg[0] = '@';
+    memcpy(arg + 1, path, strlen(path) + 1);
+    return arg;
+}
+
+#endif /* RESPONSE_FILE_H */
@@ -45,12 +45,14 @@
 #endif
 
 #include <errno.h>
+#include <fcntl.h>
 #include <limits.h>
 #include <stdio.h>
 #include <stdlib.h>
 #include <string.h>
 #include <sys/stat.h>
 #include <sys/types.h>
+#include <time.h>
 #include <unistd.h>
 
 #ifndef PATH_MAX
@@ -102,12 +104,29 @@ static inline void init_zig_global_cache_dir(void) {
     setenv("ZIG_GLOBAL_CACHE_DIR", base, 0);
 }
 
+/* One-entry memo of the last zig_sysroot_is_dir() verdict: run_cc asks
+ * about the same sysroot up to three times per invocation (STEP 1, the
+ * translation-cache key, the -isysroot/-L gate), and one stat() is all
+ * the answer needs.  Nothing outlives the process: a file-backed stamp
+ * would cost more metadata round trips per call than the stat it saves. */
+static char zig_sysroot_memo_path[PATH_MAX];
+static int zig_sysroot_memo_dir = -1;
+
 /* Returns non-zero iff path is non-NULL, non-empty, and names a directory. */
 static inline int zig_sysroot_is_dir(const char *path) {
     struct stat st;
+    size_t n;
     if (!path || !*path)
         return 0;
-    return stat(path, &st) == 0 && S_ISDIR(st.st_mode);
+    if (zig_sysroot_memo_dir >= 0 && strcmp(path, zig_sysroot_memo_path) == 0)
+        return zig_sysroot_memo_dir;
+    int is_dir = stat(path, &st) == 0 && S_ISDIR(st.st_mode);
+    n = strlen(path);
+    if (n < sizeof zig_sysroot_memo_path) {
+        memcpy(zig_sysroot_memo_path, path, n + 1);
+        zig_sysroot_memo_dir = is_dir;
+    }
+    return is_dir;
 }
 
 /* C mirror of recipe/scripts/_zig-cc-common.sh:29-38 -- the two must stay in
@@ -238,9 +257,555 @@ static inline const char *zig_resolve_zig_bin(const char *baked,
     return baked;
 }
 
+/* ---- Opt-in persistent translation cache --------------------------------
+ *
+ * ZIG_WRAPPER_TRANSLATE_CACHE=1 (same truthiness as ZIG_WRAPPER_PRINT_ARGV)
+ * lets run_cc() skip STEPs 2-10 on a repeat of an invocation it has already
+ * translated.  The store is one fixed-size file,
+ * $ZIG_GLOBAL_CACHE_DIR/zig-wrapper/translate-v2.cache, read and written
+ * with pread/pwrite:
+ *
+ *   [header: 64 bytes][index: SETS x WAYS zig_tc_slot][data: SETS x WAYS x DATA]
+ *
+ * A key maps to set hash % SETS, whose WAYS index entries are contiguous;
+ * each entry's DATA-byte area holds the full key bytes, then the payload
+ * (the final argv minus argv[0], NUL-separated).  Within a set an empty
+ * entry is taken first, else the least-recently-stored one (lowest tick) is
+ * evicted, so the file never grows past ZIG_TC_FILE_SIZE.  A hit needs the
+ * hash, the exact key bytes AND the key+payload checksum to match -- a
+ * colliding hash, a torn write from a killed writer, or a store racing the
+ * read reads as a miss, never as a wrong argv.
+ *
+ * The two halves cost differently on purpose.  A lookup is open(O_RDONLY)
+ * of the existing file, three small preads (header, the set's index, the
+ * one matching data area) and close -- no mkdir, no lock, no resize, no
+ * mapping, and it writes nothing (hits do not refresh an entry's tick).
+ * Even so, on a Linux runner a warm hit (~20 us) does not beat translating
+ * a typical compile line (~10 us; bench_wrapper_overhead.py times both
+ * from ZIG_WRAPPER_TRACE), which is why the cache stays opt-in.
+ * Creating the directory and file, resizing or re-stamping a foreign one,
+ * and the exclusive fcntl() lock that serialises parallel make/ninja
+ * writers all happen only on a store, i.e. after a miss that translated
+ * anyway.  A store writes the data area before its index entry, so a
+ * lock-free reader sees the old entry (checksum mismatch: miss) or the new
+ * one complete.  Any failure -- no cache dir, read-only filesystem, short
+ * file -- silently disables the cache for that call; the wrapper then
+ * behaves exactly as if it were unset.
+ *
+ * Only the caller knows what the translation depends on, so the key is
+ * assembled by the caller (see cc_cache_key in zig-cc-unix.c). */
+#define ZIG_TC_MAGIC "ZIGTRC2"
+#define ZIG_TC_SETS 64
+#define ZIG_TC_WAYS 8
+#define ZIG_TC_DATA_SIZE 8192
+#define ZIG_TC_HEADER_SIZE 64
+#define ZIG_TC_ENTRIES ((size_t)ZIG_TC_SETS * ZIG_TC_WAYS)
+#define ZIG_TC_DATA_OFFSET ((size_t)ZIG_TC_HEADER_SIZE + ZIG_TC_ENTRIES * sizeof(zig_tc_slot))
+#define ZIG_TC_FILE_SIZE (ZIG_TC_DATA_OFFSET + ZIG_TC_ENTRIES * ZIG_TC_DATA_SIZE)
+
+typedef struct {
+    char magic[8];
+    uint32_t sets;
+    uint32_t ways;
+    uint32_t data_size;
+    uint32_t reserved;
+    uint64_t tick;          /* global store clock, bumped on every store */
+} zig_tc_header;
+
+/* One index entry; its key and payload live in the entry's data area. */
+typedef struct {
+    uint64_t hash;          /* FNV-1a of the key; 0 marks an empty entry */
+    uint64_t tick;          /* header tick at store */
+    uint64_t check;         /* FNV-1a of key + payload bytes */
+    uint32_t key_len;
+    uint32_t payload_len;
+    uint32_t payload_argc;
+    uint32_t reserved;
+} zig_tc_slot;
+
+/* Growable byte buffer the key is built in: a sequence of NUL-terminated
+ * fields, so field boundaries are unambiguous (argv strings cannot contain
+ * NUL).  oom latches on allocation failure and makes the key unusable. */
+typedef struct {
+    char *buf;
+    size_t len;
+    size_t cap;
+    int oom;
+} zig_tc_key;
+
+static inline int zig_tc_enabled(void) {
+    const char *v = getenv("ZIG_WRAPPER_TRANSLATE_CACHE");
+    return v && *v && strcmp(v, "0") != 0;
+}
+
+static inline uint64_t zig_tc_fnv1a(uint64_t h, const void *data, size_t len) {
+    const unsigned char *p = (const unsigned char *)data;
+    size_t i;
+    for (i = 0; i < len; i++) {
+        h ^= p[i];
+        h *= 0x100000001b3ULL;
+    }
+    return h;
+}
+
+static inline void zig_tc_key_add_bytes(zig_tc_key *k, const char *s, size_t n) {
+    if (k->oom)
+        return;
+    if (k->len + n + 1 > k->cap) {
+        size_t cap = k->cap ? k->cap : 1024;
+        while (cap < k->len + n + 1)
+            cap *= 2;
+        char *grown = (char *)realloc(k->buf, cap);
+        if (!grown) {
+            k->oom = 1;
+            return;
+        }
+        k->buf = grown;
+        k->cap = cap;
+    }
+    memcpy(k->buf + k->len, s, n);
+    k->len += n;
+    k->buf[k->len++] = '\0';
+}
+
+static inline void zig_tc_key_add(zig_tc_key *k, const char *s) {
+    zig_tc_key_add_bytes(k, s ? s : "", s ? strlen(s) : 0);
+}
+
+/* Environment fields: "=value" when set (even to ""), a lone "\1" when
+ * unset, so an unset variable and an empty one key differently -- the
+ * translation treats them differently (e.g. CONDA_BUILD_SYSROOT). */
+static inline void zig_tc_key_add_env(zig_tc_key *k, const char *name) {
+    const char *v = getenv(name);
+    if (!v) {
+        zig_tc_key_add_bytes(k, "\1", 1);
+        return;
+    }
+    size_t n = strlen(v);
+    char *field = (char *)malloc(n + 2);
+    if (!field) {
+        k->oom = 1;
+        return;
+    }
+    field[0] = '=';
+    memcpy(field + 1, v, n + 1);
+    zig_tc_key_add_bytes(k, field, n + 1);
+    free(field);
+}
+
+static inline int zig_tc_lock(int fd, short type) {
+    struct flock fl;
+    memset(&fl, 0, sizeof fl);
+    fl.l_type = type;
+    fl.l_whence = SEEK_SET;
+    while (fcntl(fd, type == F_UNLCK ? F_SETLK : F_SETLKW, &fl) != 0) {
+        if (errno != EINTR)
+            return -1;
+    }
+    return 0;
+}
+
+/* $ZIG_GLOBAL_CACHE_DIR/zig-wrapper/translate-v2.cache into path.  Returns
+ * 0, or -1 if the variable is unset or the path too long. */
+static inline int zig_tc_path(char path[PATH_MAX]) {
+    const char *base = getenv("ZIG_GLOBAL_CACHE_DIR");
+    if (!base || !*base)
+        return -1;
+    int n = snprintf(path, PATH_MAX, "%s/zig-wrapper/translate-v2.cache", base);
+    return n > 0 && n < PATH_MAX ? 0 : -1;
+}
+
+static inline int zig_tc_read_header(int fd, zig_tc_header *hdr) {
+    return pread(fd, hdr, sizeof *hdr, 0) == (ssize_t)sizeof *hdr
+        && memcmp(hdr->magic, ZIG_TC_MAGIC, sizeof hdr->magic) == 0
+        && hdr->sets == ZIG_TC_SETS && hdr->ways == ZIG_TC_WAYS
+        && hdr->data_size == ZIG_TC_DATA_SIZE;
+}
+
+static inline uint64_t zig_tc_key_hash(const zig_tc_key *k) {
+    uint64_t h = zig_tc_fnv1a(0xcbf29ce484222325ULL, k->buf, k->len);
+    return h ? h : 1;
+}
+
+static inline size_t zig_tc_first_entry(uint64_t hash) {
+    return (size_t)(hash % ZIG_TC_SETS) * ZIG_TC_WAYS;
+}
+
+static inline off_t zig_tc_index_offset(size_t entry) {
+    return (off_t)(ZIG_TC_HEADER_SIZE + entry * sizeof(zig_tc_slot));
+}
+
+static inline off_t zig_tc_data_offset(size_t entry) {
+    return (off_t)(ZIG_TC_DATA_OFFSET + entry * ZIG_TC_DATA_SIZE);
+}
+
+static inline int zig_tc_read_set(int fd, uint64_t hash, zig_tc_slot set[ZIG_TC_WAYS]) {
+    ssize_t want = (ssize_t)(sizeof(zig_tc_slot) * ZIG_TC_WAYS);
+    return pread(fd, set, (size_t)want, zig_tc_index_offset(zig_tc_first_entry(hash))) == want;
+}
+
+/* Look key up.  On a hit returns a malloc'd, NULL-terminated argv of
+ * *out_argc + 1 entries whose slot [0] is left NULL for the caller's zig
+ * binary (exactly the shape exec_zig() takes); the strings live in the same
+ * allocation.  Returns NULL on a miss or any error -- including no cache
+ * file yet, which only zig_tc_store() creates. */
+static inline char **zig_tc_lookup(const zig_tc_key *k, int *out_argc) {
+    char path[PATH_MAX];
+    if (k->oom || !k->len || zig_tc_path(path) != 0)
+        return NULL;
+    int fd = open(path, O_RDONLY | O_CLOEXEC);
+    if (fd < 0)
+        return NULL;
+
+    uint64_t hash = zig_tc_key_hash(k);
+    zig_tc_header hdr;
+    zig_tc_slot set[ZIG_TC_WAYS];
+    char **result = NULL;
+    int way;
+    if (!zig_tc_read_header(fd, &hdr) || !zig_tc_read_set(fd, hash, set))
+        goto out;
+    for (way = 0; way < ZIG_TC_WAYS; way++) {
+        const zig_tc_slot *slot = &set[way];
+        if (slot->hash != hash || slot->key_len != k->len
+            || (size_t)slot->key_len + slot->payload_len > ZIG_TC_DATA_SIZE)
+            continue;
+
+        size_t argc = slot->payload_argc;
+        size_t plen = slot->payload_len;
+        size_t dlen = slot->key_len + plen;
+        /* Read key and payload straight into the result's string area;
+         * the argv pointers go in front once the bytes check out. */
+        result = (char **)malloc(sizeof(char *) * (argc + 2) + dlen);
+        if (!result)
+            break;
+        char *data = (char *)(result + argc + 2);
+        const char *payload = data + slot->key_len;
+        size_t nul = 0, j;
+        if (pread(fd, data, dlen, zig_tc_data_offset(zig_tc_first_entry(hash) + (size_t)way))
+                != (ssize_t)dlen
+            || memcmp(data, k->buf, k->len) != 0
+            || zig_tc_fnv1a(zig_tc_fnv1a(0xcbf29ce484222325ULL, data, slot->key_len),
+                            payload, plen) != slot->check) {
+            free(result);   /* torn, racing or corrupt: a miss; store overwrites */
+            result = NULL;
+            break;
+        }
+        for (j = 0; j < plen; j++)
+            nul += payload[j] == '\0';
+        if (nul != argc || (plen && payload[plen - 1] != '\0')) {
+            free(result);
+            result = NULL;
+            break;
+        }
+        const char *str = payload;
+        result[0] = NULL;
+        for (j = 0; j < argc; j++) {
+            result[j + 1] = (char *)str;
+            str += strlen(str) + 1;
+        }
+        result[argc + 1] = NULL;
+        *out_argc = (int)argc;
+        break;
+    }
+out:
+    close(fd);
+    return result;
+}
+
+/* Store argv[0..argc) under key, evicting the set's oldest entry if it is
+ * full; creates the directory and the file (and wipes a foreign-layout or
+ * wrong-size one) on the way.  Entries whose key and payload do not fit in
+ * one data area are silently not cached. */
+static inline void zig_tc_store(const zig_tc_key *k, const char *const *argv, int argc) {
+    char path[PATH_MAX];
+    if (k->oom || !k->len || argc < 0 || zig_tc_path(path) != 0)
+        return;
+    size_t plen = 0;
+    int i;
+    for (i = 0; i < argc; i++)
+        plen += strlen(argv[i]) + 1;
+    if (k->len + plen > ZIG_TC_DATA_SIZE)
+        return;
+
+    int fd = open(path, O_RDWR | O_CREAT | O_CLOEXEC, 0644);
+    if (fd < 0 && errno == ENOENT) {
+        /* zig itself creates ZIG_GLOBAL_CACHE_DIR lazily, so the wrapper
+         * may run first. */
+        const char *base = getenv("ZIG_GLOBAL_CACHE_DIR");
+        char dir[PATH_MAX];
+        snprintf(dir, sizeof dir, "%s/zig-wrapper", base);
+        if ((mkdir(base, 0755) == 0 || errno == EEXIST) && (mkdir(dir, 0755) == 0 || errno == EEXIST))
+            fd = open(path, O_RDWR | O_CREAT | O_CLOEXEC, 0644);
+    }
+    if (fd < 0)
+        return;
+    char *data = NULL;
+    if (zig_tc_lock(fd, F_WRLCK) != 0)
+        goto out;
+
+    /* A new, resized, or foreign-layout file is zeroed (sparse, via
+     * ftruncate) and re-stamped; a header mismatch therefore costs the old
+     * entries, never correctness. */
+    struct stat st;
+    zig_tc_header hdr;
+    if (fstat(fd, &st) != 0 || (size_t)st.st_size != ZIG_TC_FILE_SIZE || !zig_tc_read_header(fd, &hdr)) {
+        memset(&hdr, 0, sizeof hdr);
+        memcpy(hdr.magic, ZIG_TC_MAGIC, sizeof hdr.magic);
+        hdr.sets = ZIG_TC_SETS;
+        hdr.ways = ZIG_TC_WAYS;
+        hdr.data_size = ZIG_TC_DATA_SIZE;
+        if (ftruncate(fd, 0) != 0 || ftruncate(fd, (off_t)ZIG_TC_FILE_SIZE) != 0)
+            goto out;
+    }
+
+    uint64_t hash = zig_tc_key_hash(k);
+    zig_tc_slot set[ZIG_TC_WAYS];
+    if (!zig_tc_read_set(fd, hash, set))
+        goto out;
+    int victim = -1;
+    int way;
+    for (way = 0; way < ZIG_TC_WAYS; way++) {
+        if (set[way].hash == hash && set[way].key_len == k->len) {
+            victim = way;   /* same hash: almost surely this key; refresh it */
+            break;
+        }
+        if (victim < 0 || (set[victim].hash != 0 && (set[way].hash == 0 || set[way].tick < set[victim].tick)))
+            victim = way;
+    }
+
+    data = (char *)malloc(k->len + plen);
+    if (!data)
+        goto out;
+    memcpy(data, k->buf, k->len);
+    char *p = data + k->len;
+    for (i = 0; i < argc; i++) {
+        size_t n = strlen(argv[i]) + 1;
+        memcpy(p, argv[i], n);
+        p += n;
+    }
+    zig_tc_slot *slot = &set[victim];
+    slot->key_len = (uint32_t)k->len;
+    slot->payload_len = (uint32_t)plen;
+    slot->payload_argc = (uint32_t)argc;
+    slot->check = zig_tc_fnv1a(zig_tc_fnv1a(0xcbf29ce484222325ULL, data, k->len),
+                               data + k->len, plen);
+    slot->tick = ++hdr.tick;
+    slot->hash = hash;
+    size_t entry = zig_tc_first_entry(hash) + (size_t)victim;
+    /* Data area first, index entry second: see the reader's side above. */
+    if (pwrite(fd, data, k->len + plen, zig_tc_data_offset(entry)) == (ssize_t)(k->len + plen)
+        && pwrite(fd, slot, sizeof *slot, zig_tc_index_offset(entry)) == (ssize_t)sizeof *slot)
+        (void)pwrite(fd, &hdr, sizeof hdr, 0);
+out:
+    free(data);
+    close(fd);
+}
+
+/* ---- Opt-in per-invocation tracing --------------------------------------
+ *
+ * ZIG_WRAPPER_TRACE answers "how much of the build is the wrapper, not zig".
+ * Set to 1 (same truthiness as ZIG_WRAPPER_PRINT_ARGV), every wrapper
+ * process appends ONE JSON line to
+ *   $ZIG_GLOBAL_CACHE_DIR/zig-wrapper/trace/trace-<pid>.jsonl
+ * just before it execs zig (or, for intercepts and error exits, at exit).
+ * A value containing '/' names the trace directory instead.  One file per
+ * pid means parallel make/ninja jobs never share a file descriptor or a
+ * lock; a recycled pid simply appends a second line.
+ *
+ *   {"v":1,"pid":N,"tool":"cc","outcome":"exec","start_ns":N,
+ *    "argc_raw":N,"argc_in":N,"argc_out":N,"argv_bytes_in":N,
+ *    "argv_bytes_out":N,"wrapper_ns":N,"steps_ns":{"dispatch":N,...}}
+ *
+ * tool is the dispatch arm; outcome is exec / cache-hit / intercept /
+ * return; argc_in counts the logical args after @file expansion and
+ * argc_out the args handed to zig (argv[0] excluded from both);
+ * wrapper_ns runs from main() to the execv() call.  steps_ns holds one
+ * monotonic duration per zig_trace_step enum below, 0 for steps the arm
+ * never reached.  Time spent inside execv() and zig itself is not the
+ * wrapper's and is not recorded.  testing/summarize_wrapper_trace.py
+ * aggregates a directory of these files.
+ *
+ * Disabled, every hook is one branch on a static flag.  The one piece of
+ * file-scope state in this header: a trace describes exactly one process,
+ * so there is nothing to pass around.  Tracing never changes behaviour --
+ * any failure to create or write the file drops the record. */
+enum zig_trace_step {
+    ZIG_TRACE_DISPATCH,     /* main(): cache-dir init, zig-bin resolution */
+    ZIG_TRACE_SYSROOT,      /* run_cc STEP 1 */
+    ZIG_TRACE_RSP,          /* STEP 1a */
+    ZIG_TRACE_CACHE,        /* STEP 1b lookup */
+    ZIG_TRACE_LLD_SCAN,     /* STEP 2+3 */
+    ZIG_TRACE_TRANSLATE,    /* STEP 4 */
+    ZIG_TRACE_POST,         /* STEPs 5-10 */
+    ZIG_TRACE_FORCE_LOAD,   /* STEP 10b */
+    ZIG_TRACE_ASSEMBLE,     /* STEP 11: argv, @file re-pack, cache store */
+    ZIG_TRACE_EXEC,         /* last mark to the execv() call */
+    ZIG_TRACE_NSTEPS
+};
+
+static const char *const zig_trace_step_names[ZIG_TRACE_NSTEPS] = {
+    "dispatch", "sysroot", "rsp", "cache", "lld_scan", "translate",
+    "post", "force_load", "assemble", "exec",
+};
+
+typedef struct {
+    int on;
+    int done;
+    const char *tool;
+    const char *outcome;
+    uint64_t start_ns;      /* CLOCK_REALTIME, for lining records up */
+    uint64_t t0;            /* CLOCK_MONOTONIC at zig_trace_begin() */
+    uint64_t mark;
+    uint64_t steps[ZIG_TRACE_NSTEPS];
+    long argc_raw, argc_in, argv_bytes_in;
+} zig_trace;
+
+static zig_trace zig_trace_state;
+
+static inline uint64_t zig_trace_clock(clockid_t id) {
+    struct timespec ts;
+    if (clock_gettime(id, &ts) != 0)
+        return 0;
+    return (uint64_t)ts.tv_sec * 1000000000u + (uint64_t)ts.tv_nsec;
+}
+
+static inline long zig_trace_argv_bytes(int argc, char *const argv[]) {
+    long n = 0;
+    int i;
+    for (i = 0; i < argc && argv[i]; i++)
+        n += (long)strlen(argv[i]) + 1;
+    return n;
+}
+
+/* Attribute the time since the previous mark to step. */
+static inline void zig_trace_step(int step) {
+    if (!zig_trace_state.on)
+        return;
+    uint64_t now = zig_trace_clock(CLOCK_MONOTONIC);
+    zig_trace_state.steps[step] += now - zig_trace_state.mark;
+    zig_trace_state.mark = now;
+}
+
+static inline void zig_trace_tool(const char *tool) {
+    zig_trace_state.tool = tool;
+}
+
+static inline void zig_trace_outcome(const char *outcome) {
+    zig_trace_state.outcome = outcome;
+}
+
+/* The logical argv after @file expansion (argv[0] excluded). */
+static inline void zig_trace_args_in(int argc, char *const argv[]) {
+    if (!zig_trace_state.on)
+        return;
+    zig_trace_state.argc_in = argc;
+    zig_trace_state.argv_bytes_in = zig_trace_argv_bytes(argc, argv);
+}
+
+/* Append the record.  exec_argv is the argv about to be exec'd, or NULL on
+ * the atexit path.  Runs at most once. */
+static inline void zig_trace_flush(char *const exec_argv[]) {
+    zig_trace *t = &zig_trace_state;
+    if (!t->on || t->done)
+        return;
+    t->done = 1;
+    if (exec_argv)
+        zig_trace_step(ZIG_TRACE_EXEC);
+    uint64_t wrapper_ns = zig_trace_clock(CLOCK_MONOTONIC) - t->t0;
+
+    long argc_out = 0, bytes_out = 0;
+    if (exec_argv) {
+        while (exec_argv[argc_out + 1])
+            argc_out++;
+        bytes_out = zig_trace_argv_bytes((int)argc_out, exec_argv + 1);
+    }
+
+    const char *v = getenv("ZIG_WRAPPER_TRACE");
+    const char *base = getenv("ZIG_GLOBAL_CACHE_DIR");
+    char dir[PATH_MAX];
+    int n;
+    if (strchr(v, '/')) {
+        n = snprintf(dir, sizeof dir, "%s", v);
+    } else {
+        if (!base || !*base)
+            return;
+        n = snprintf(dir, sizeof dir, "%s/zig-wrapper", base);
+        if (n <= 0 || (size_t)n >= sizeof dir)
+            return;
+        mkdir(base, 0755);
+        mkdir(dir, 0755);
+        n = snprintf(dir, sizeof dir, "%s/zig-wrapper/trace", base);
+    }
+    if (n <= 0 || (size_t)n >= sizeof dir)
+        return;
+    if (mkdir(dir, 0755) != 0 && errno != EEXIST)
+        return;
+
+    char rec[1024];
+    int len = snprintf(rec, sizeof rec,
+        "{\"v\":1,\"pid\":%ld,\"tool\":\"%s\",\"outcome\":\"%s\","
+        "\"start_ns\":%llu,\"argc_raw\":%ld,\"argc_in\":%ld,\"argc_out\":%ld,"
+        "\"argv_bytes_in\":%ld,\"argv_bytes_out\":%ld,\"wrapper_ns\":%llu,"
+        "\"steps_ns\":{",
+        (long)getpid(), t->tool ? t->tool : "unknown",
+        t->outcome ? t->outcome : (exec_argv ? "exec" : "return"),
+        (unsigned long long)t->start_ns, t->argc_raw, t->argc_in, argc_out,
+        t->argv_bytes_in, bytes_out, (unsigned long long)wrapper_ns);
+    int i;
+    for (i = 0; i < ZIG_TRACE_NSTEPS && len > 0 && (size_t)len < sizeof rec; i++)
+        len += snprintf(rec + len, sizeof rec - (size_t)len, "%s\"%s\":%llu", i ? "," : "",
+                        zig_trace_step_names[i], (unsigned long long)t->steps[i]);
+    if (len <= 0 || (size_t)len + 3 > sizeof rec)
+        return;
+    memcpy(rec + len, "}}\n", 3);
+    len += 3;
+
+    char path[PATH_MAX];
+    n = snprintf(path, sizeof path, "%s/trace-%ld.jsonl", dir, (long)getpid());
+    if (n <= 0 || (size_t)n >= sizeof path)
+        return;
+    int fd = open(path, O_WRONLY | O_CREAT | O_APPEND | O_CLOEXEC, 0644);
+    if (fd < 0)
+        return;
+    /* Best-effort: a short write leaves a torn line the summarizer skips. */
+    ssize_t w = write(fd, rec, (size_t)len);
+    (void)w;
+    close(fd);
+}
+
+static void zig_trace_atexit(void) {
+    zig_trace_flush(NULL);
+}
+
+/* First thing in main().  argv is the wrapper's own argv. */
+static inline void zig_trace_begin(int argc, char *argv[]) {
+    const char *v = getenv("ZIG_WRAPPER_TRACE");
+    if (!v || !*v || strcmp(v, "0") == 0)
+        return;
+    zig_trace *t = &zig_trace_state;
+    t->on = 1;
+    t->start_ns = zig_trace_clock(CLOCK_REALTIME);
+    t->t0 = t->mark = zig_trace_clock(CLOCK_MONOTONIC);
+    t->argc_raw = t->argc_in = argc - 1;
+    t->argv_bytes_in = zig_trace_argv_bytes(argc - 1, argv + 1);
+    atexit(zig_trace_atexit);
+}
+
 /* Replace this process with zig.  Returns only on failure. */
 static inline int exec_zig(const char *zig_bin, char *const argv[]) {
-    /* Test-observability hook: print the final argv instead of exec'ing. */
+    zig_trace_flush(argv);
+
+    /* Test-observability hooks: emit the final argv instead of exec'ing.
+     * ZIG_WRAPPER_DRY_EXEC writes each entry NUL-terminated, so arguments
+     * containing newlines survive and no zig install is needed;
+     * ZIG_WRAPPER_PRINT_ARGV is the older one-per-line form. */
+    const char *dry = getenv("ZIG_WRAPPER_DRY_EXEC");
+    if (dry && *dry && strcmp(dry, "0") != 0) {
+        int i;
+        for (i = 0; argv[i]; i++)
+            fwrite(argv[i], 1, strlen(argv[i]) + 1, stdout);
+        exit(fflush(stdout) == 0 ? 0 : 1);
+    }
     const char *print_argv = getenv("ZIG_WRAPPER_PRINT_ARGV");
     if (print_argv && *print_argv && strcmp(print_argv, "0") != 0) {
         int i;
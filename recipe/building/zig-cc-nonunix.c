@@ -1,7 +1,7 @@
 /*
  * non-unix compiler wrapper: invokes zig cc/c++ with flag filtering.
  *
- * Compiled twice at install time with different @ZIG_CC_MODE@:
+ * Compiled twice at install time with different ZIG_CC_MODE:
  *   zig-cc.exe  (mode = "cc")
  *   zig-cxx.exe (mode = "c++")
  *
@@ -17,29 +17,49 @@
  * owned by R8/R9 (--version-script/--dynamic-list/--gc-sections/
  * --build-id/--allow-shlib-undefined).
  *
- * Placeholders replaced at install time:
+ * @file response-file arguments are expanded (MSVC quoting) before any of
+ * that runs and re-packed afterwards -- see response_file.h.
+ *
+ * Defined at install time with -D (_compile_c_shim in install_zig_activation.py;
+ * the "@NAME@" fallbacks below only keep the bare file compilable):
  *   ZIG_CC_MODE      - "cc" or "c++"
  *   ZIG_BIN_NAME     - zig binary filename (e.g. x86_64-w64-mingw32-zig.exe)
  *   ZIG_TARGET       - zig target triplet (e.g. x86_64-windows-msvc)
  *   ZIG_TARGET_ARCH  - zig target arch (e.g. "x86_64", "aarch64")
+ *   ZIG_BAKED_PROBES - R14's install-time answers (see zig-cc-unix.c)
  *
  * Compiled during package build with zig cc.
  */
 
 #include "nonunix_common.h"
+#include "response_file.h"
 #include "_translate.inc"
 #include <stdio.h>
 #include <stdlib.h>
 #include <string.h>
 #include <ctype.h>
-#include <process.h>
 #include <windows.h>
 
+#ifndef ZIG_CC_MODE
 #define ZIG_CC_MODE "@ZIG_CC_MODE@"
+#endif
+#ifndef ZIG_BIN_NAME
 #define ZIG_BIN_NAME "@ZIG_BIN_NAME@"
+#endif
+#ifndef ZIG_TARGET
 #define ZIG_TARGET "@ZIG_TARGET@"
+#endif
+#ifndef ZIG_TARGET_ARCH
 #define ZIG_TARGET_ARCH "@ZIG_TARGET_ARCH@"
-#define IS_MINGW_TARGET @IS_MINGW_TARGET@
+#endif
+#ifndef ZIG_BAKED_PROBES
+#define ZIG_BAKED_PROBES "@ZIG_BAKED_PROBES@"
+#endif
+#ifndef IS_MINGW_TARGET
+#define IS_MINGW_TARGET 0
+#endif
+
+static const char *const zig_baked_probes[2 * ZIG_TR_N_PROBES] = { ZIG_BAKED_PROBES };
 
 /* --- Flag classification helpers --- */
 static int starts_with(const char *s, const char *prefix) {
@@ -85,7 +105,7 @@ static char *translate_wl_entry(const char *arg)
  * inside zig_translate_flags() owns keep+use_lld handling for the -Xlinker
  * Bsymbolic pair, and this pre-filter runs BEFORE the generated call, so
  * dropping them here would silently defeat R8 (a -Xlinker -Bsymbolic pair
- * must pass through to reach zig_tr_is_xlinker_bsymbolic). */
+ * must pass through to reach R8's -Xlinker arm in zig_translate_flags). */
 static int is_xlinker_drop(const char *arg) {
     return str_eq(arg, "--color-diagnostics") ||
            starts_with(arg, "--dependency-file=");
@@ -194,7 +214,16 @@ int main(int argc, char *argv[]) {
      *    -Wl,--build-id/-Wl,--allow-shlib-undefined and their bare
      *    -Xlinker <arg> equivalents)
      */
-    const char **pre_argv = malloc(sizeof(char *) * (size_t)(argc + 1));
+    /* Expand @file arguments (MSVC quoting, see response_file.h) so the
+     * pre-filter and the translator see the logical argv; the final argv
+     * assembly below re-packs it. */
+    zig_rsp_args rsp;
+    if (zig_rsp_expand(argc - 1, argv + 1, ZIG_RSP_NATIVE, &rsp) != 0) {
+        fprintf(stderr, "ERROR: zig-%s: malloc failed\n", ZIG_CC_MODE);
+        return 1;
+    }
+
+    const char **pre_argv = malloc(sizeof(char *) * (size_t)(rsp.argc + 1));
     if (!pre_argv) {
         fprintf(stderr, "ERROR: zig-%s: malloc failed\n", ZIG_CC_MODE);
         return 1;
@@ -203,11 +232,11 @@ int main(int argc, char *argv[]) {
     int use_lld_extra = 0;
     {
         int grab_next = 0;
-        for (int i = 1; i < argc; i++) {
-            const char *arg = argv[i];
+        for (int i = 0; i < rsp.argc; i++) {
+            const char *arg = rsp.argv[i];
 
             if (is_lld_trigger(arg)) use_lld_extra = 1;
-            if (str_eq(arg, "-Xlinker") && i + 1 < argc && is_xlinker_lld_trigger(argv[i + 1]))
+            if (str_eq(arg, "-Xlinker") && i + 1 < rsp.argc && is_xlinker_lld_trigger(rsp.argv[i + 1]))
                 use_lld_extra = 1;
 
             if (grab_next) {
@@ -235,6 +264,7 @@ int main(int argc, char *argv[]) {
     profile.conda_prefix = conda_prefix;
     profile.zig_target_arch = ZIG_TARGET_ARCH;
     profile.sysroot = NULL;  /* R12 is unix-only; the win shim has no sysroot concept. */
+    profile.probes = zig_baked_probes;
 
     int mode_is_cxx = str_eq(ZIG_CC_MODE, "c++");
     char **out_argv = NULL;
@@ -245,8 +275,8 @@ int main(int argc, char *argv[]) {
                                      &mode_is_cxx);
     free(pre_argv);
 
-    /* R2/R3 (-print-search-dirs / -print-file-name=) already printed to
-     * stdout inside zig_translate_flags(); exit immediately. */
+    /* R2/R3/R14 (-print-search-dirs / -print-file-name= / baked probes)
+     * already printed inside zig_translate_flags(); exit immediately. */
     if (tr_rc == 2)
         return 0;
     if (tr_rc != 0) {
@@ -329,6 +359,8 @@ int main(int argc, char *argv[]) {
 
     /* Build final argv: zig mode [-fuse-ld=lld] [-target TARGET] <filtered...> */
     int max_args = fi + 8;
+    if (rsp.expanded)
+        max_args += argc;   /* room for the original argv, see below */
     const char **new_argv = malloc(sizeof(char *) * max_args);
     if (!new_argv) {
         fprintf(stderr, "ERROR: zig-%s: malloc failed\n", ZIG_CC_MODE);
@@ -349,19 +381,38 @@ int main(int argc, char *argv[]) {
     for (int i = 0; i < fi; i++)
         new_argv[ni++] = filtered[i];
 
+    /* Re-pack the expanded @file contents: untouched by translation ->
+     * pass the caller's @file arguments through; changed -> one translated
+     * response file (inline if it cannot be written). */
+    if (rsp.expanded) {
+        int tail = ni - fi;
+        if (zig_rsp_same(filtered, fi, rsp.argv, rsp.argc)) {
+            ni = tail;
+            for (int i = 1; i < argc; i++)
+                new_argv[ni++] = argv[i];
+        } else {
+            char *rsp_arg = zig_rsp_write(filtered, fi, ZIG_RSP_NATIVE);
+            if (rsp_arg) {
+                ni = tail;
+                new_argv[ni++] = rsp_arg;
+            }
+        }
+    }
+
     new_argv[ni] = NULL;
 
     restore_msys2_system32_path();
 
-    /* Execute zig */
-    int ret = (int)_spawnv(_P_WAIT, zig_path, new_argv);
-    free(filtered);
-    free(new_argv);
-
+    /* Execute zig (CreateProcessW inside a kill-on-close job object) */
+    int ret = zig_spawn_wait(zig_path, new_argv);
     if (ret == -1) {
-        fprintf(stderr, "ERROR: zig-%s: failed to exec %s: %s\n",
-                ZIG_CC_MODE, zig_path, strerror(errno));
+        fprintf(stderr, "ERROR: zig-%s: failed to exec %s: error %lu\n",
+                ZIG_CC_MODE, zig_path, (unsigned long)GetLastError());
+        free(filtered);
+        free(new_argv);
         return 1;
     }
+    free(filtered);
+    free(new_argv);
     return ret;
 }
@@ -1,7 +1,9 @@
 /*
  * unix toolchain wrapper: a busybox-style multiplexer.
  *
- * ONE binary, compiled once at install time and cp -f'd to each wrapper name.
+ * ONE binary, compiled once at install time and given each wrapper name by
+ * install_zig_activation._link_or_copy: a hard link, else a reflink, else a
+ * plain copy.
  * The tool is selected by basename(argv[0]) with @WRAPPER_PREFIX@ stripped:
  *
  *   zig-cc       -> zig cc   + full flag filtering  (see run_cc)
@@ -22,14 +24,15 @@
  *
  * run_cc() is a port of recipe/scripts/_zig-cc-common.sh (sourced by
  * zig-cc.sh / zig-cxx.sh).  Every numbered STEP inside it cites the bash line
- * range it replaces.  The R1-R13 de-dup rules (see recipe/building/
+ * range it replaces.  The R1-R14 de-dup rules (see recipe/building/
  * flag_rules.py) are delegated to the generated, portable
  * zig_translate_flags() (_translate.inc); only the out-of-scope hand-written
  * logic (sysroot, the extra LLD-trigger scan, the -Xlinker general pre-filter,
  * the ppc64le hard error, the GCC-only post-translation drops, and the macOS
  * deployment-target rewrite) remains there.
  *
- * Placeholders replaced at install time:
+ * Defined at install time with -D (_compile_c_shim in install_zig_activation.py;
+ * the "@NAME@" fallbacks below only keep the bare file compilable):
  *   ZIG_BIN          - baked zig path.  NOTE: install bakes the LITERAL
  *                      "${CONDA_PREFIX}/bin/<triplet>-zig"; C cannot expand
  *                      that, so it is resolved via zig_resolve_zig_bin(),
@@ -37,21 +40,39 @@
  *   ZIG_TARGET       - zig target triplet (e.g. x86_64-linux-gnu)
  *   ZIG_TARGET_ARCH  - zig target arch (e.g. "x86_64", "aarch64")
  *   WRAPPER_PREFIX   - installed-name prefix (e.g. "x86_64-conda-linux-gnu-")
+ *   ZIG_BAKED_PROBES - R14's install-time answers: stdout, stderr literals
+ *                      for each probe in flag_rules.py's order, prefix
+ *                      spelled {conda_prefix}; "" "" leaves a probe to zig
+ *                      (_bake_cc_probes)
  *
  * Compiled during package build with zig cc.
  */
 
 #include "unix_common.h"
+#include "response_file.h"
 #include "_translate.inc"
 #include <stdio.h>
 #include <stdlib.h>
 #include <string.h>
 #include <ctype.h>
 
+#ifndef ZIG_BIN
 #define ZIG_BIN "@ZIG_BIN@"
+#endif
+#ifndef ZIG_TARGET
 #define ZIG_TARGET "@ZIG_TARGET@"
+#endif
+#ifndef ZIG_TARGET_ARCH
 #define ZIG_TARGET_ARCH "@ZIG_TARGET_ARCH@"
+#endif
+#ifndef WRAPPER_PREFIX
 #define WRAPPER_PREFIX "@WRAPPER_PREFIX@"
+#endif
+#ifndef ZIG_BAKED_PROBES
+#define ZIG_BAKED_PROBES "@ZIG_BAKED_PROBES@"
+#endif
+
+static const char *const zig_baked_probes[2 * ZIG_TR_N_PROBES] = { ZIG_BAKED_PROBES };
 
 /* --- small string helpers --- */
 static int starts_with(const char *s, const char *prefix) {
@@ -77,8 +98,8 @@ static int str_eq(const char *a, const char *b) {
 
 /* -Wl,-O[0-9]* glob: literal "-Wl,-O" followed by at least one digit,
  * then anything. _zig-cc-common.sh:73 -- this is a shell glob, not a
- * literal string; ported the same way _translate.inc:63-75 ports the
- * sibling -Wl,-O* case for R9. */
+ * literal string; _translate.inc's zig_tr_classify covers the sibling
+ * -Wl,-O* case for R9 with one trie arm per leading digit. */
 static int is_wl_o_digit(const char *arg) {
     if (!starts_with(arg, "-Wl,-O")) return 0;
     const char *suffix = arg + 6; /* strlen("-Wl,-O") */
@@ -187,6 +208,74 @@ static char *build_l_flag(const char *sysroot, const char *suffix) {
     return buf;
 }
 
+/* Open-addressed string set for STEP 10b, keyed by pointer-to-argv-string
+ * contents.  Sized to at least twice the arg count up front, so it never
+ * grows and a probe always finds a free slot. */
+enum { AR_FORCED = 1, AR_PROBED = 2, AR_IS_FILE = 4, AR_EMITTED = 8 };
+
+typedef struct {
+    const char *key;
+    uint64_t hash;
+    int flags;
+} ar_entry;
+
+typedef struct {
+    ar_entry *slots;
+    size_t mask;
+} ar_set;
+
+static int ar_set_init(ar_set *set, int n) {
+    size_t cap = 16;
+    while (cap < 2 * (size_t)n + 2)
+        cap <<= 1;
+    set->slots = (ar_entry *)calloc(cap, sizeof(ar_entry));
+    set->mask = cap - 1;
+    return set->slots ? 0 : -1;
+}
+
+/* The entry for key, inserted with flags 0 if absent. */
+static ar_entry *ar_set_get(ar_set *set, const char *key) {
+    uint64_t h = zig_tc_fnv1a(0xcbf29ce484222325ULL, key, strlen(key));
+    size_t i = (size_t)h & set->mask;
+    while (set->slots[i].key) {
+        if (set->slots[i].hash == h && str_eq(set->slots[i].key, key))
+            return &set->slots[i];
+        i = (i + 1) & set->mask;
+    }
+    set->slots[i].key = key;
+    set->slots[i].hash = h;
+    return &set->slots[i];
+}
+
+/* Key for the opt-in translation cache (unix_common.h): everything STEPs
+ * 2-10 read besides the filesystem.  The sysroot is resolved per call (it
+ * depends on what exists on disk), so it enters the key as its resolved
+ * string plus the is-a-directory verdict rather than as CONDA_BUILD_SYSROOT.
+ * The raw argv is keyed verbatim: two argvs that translate identically
+ * after normalisation still get separate entries, which costs a slot but
+ * can never return the wrong translation.  STEP 10b's archive probing is
+ * the one filesystem dependency left, so run_cc never stores an -all_load
+ * line.  The baked probes are keyed so that a probe zig answered before a
+ * reinstall baked it is not replayed from the cache instead. */
+static void cc_cache_key(zig_tc_key *k, const char *prog, int mode_is_cxx,
+                         const char *sysroot, int argc, char *argv[]) {
+    int i;
+    zig_tc_key_add(k, "zig-cc-unix/1");
+    zig_tc_key_add(k, prog);
+    zig_tc_key_add(k, mode_is_cxx ? "c++" : "cc");
+    zig_tc_key_add(k, ZIG_TARGET);
+    zig_tc_key_add(k, ZIG_TARGET_ARCH);
+    zig_tc_key_add(k, WRAPPER_PREFIX);
+    for (i = 0; i < 2 * ZIG_TR_N_PROBES; i++)
+        zig_tc_key_add(k, zig_baked_probes[i]);
+    zig_tc_key_add_env(k, "CONDA_PREFIX");
+    zig_tc_key_add_env(k, "MACOSX_DEPLOYMENT_TARGET");
+    zig_tc_key_add(k, sysroot);
+    zig_tc_key_add(k, zig_sysroot_is_dir(sysroot) ? "dir" : "nodir");
+    for (i = 1; i < argc; i++)
+        zig_tc_key_add(k, argv[i]);
+}
+
 /* zig-cc / zig-cxx.  Port of recipe/scripts/_zig-cc-common.sh.
  * argv is the FULL argv (argv[0] is the wrapper name); raw args start at 1,
  * exactly as before the multiplexer refactor. */
@@ -203,9 +292,43 @@ static int run_cc(const char *zig_bin, const char *prog, int mode_is_cxx,
      * folded into it. The returned string feeds profile.sysroot
      * REGARDLESS of whether it is a directory (R12 prints it verbatim,
      * see _translate.inc's zig_tr_print_sysroot); the -isysroot/-L
-     * flag group below is gated separately on zig_sysroot_is_dir(). */
+     * flag group below is gated separately on zig_sysroot_is_dir(),
+     * which answers from the verdict STEP 1 already took rather than
+     * re-stat'ing. */
     int target_is_native = str_eq(ZIG_TARGET, "native");
     const char *sysroot = zig_resolve_sysroot(conda_prefix, ZIG_TARGET_ARCH, target_is_native);
+    zig_trace_step(ZIG_TRACE_SYSROOT);
+
+    /* ---- STEP 1a (response_file.h): expand @file arguments in place, so
+     * every later STEP sees the logical argv; STEP 11 re-packs it. ---- */
+    zig_rsp_args rsp;
+    if (zig_rsp_expand(argc - 1, argv + 1, ZIG_RSP_NATIVE, &rsp) != 0) {
+        fprintf(stderr, "ERROR: %s: malloc failed\n", prog);
+        return 1;
+    }
+    zig_trace_args_in(rsp.argc, rsp.argv);
+    zig_trace_step(ZIG_TRACE_RSP);
+
+    /* ---- STEP 1b (opt-in, see unix_common.h): translation cache.  A hit
+     * carries the complete STEP 11 argv minus argv[0], so STEPs 2-10 are
+     * skipped outright.  Misses fall through and are stored at STEP 11.
+     * Lines with an expanded @file bypass it: the key holds the @file
+     * name, not its contents. ---- */
+    zig_tc_key tc_key = { NULL, 0, 0, 0 };
+    int tc_on = !rsp.expanded && zig_tc_enabled();
+    if (tc_on) {
+        cc_cache_key(&tc_key, prog, mode_is_cxx, sysroot, argc, argv);
+        int hit_argc = 0;
+        char **hit = zig_tc_lookup(&tc_key, &hit_argc);
+        if (hit) {
+            free(tc_key.buf);
+            hit[0] = (char *)zig_bin;
+            zig_trace_step(ZIG_TRACE_CACHE);
+            zig_trace_outcome("cache-hit");
+            return exec_zig(zig_bin, hit);
+        }
+    }
+    zig_trace_step(ZIG_TRACE_CACHE);
 
     /* Exactly 6 slots: -isysroot, <sr>, and 4 -L flags -- a fixed,
      * known count (not a guessed bound), mirroring bash's fixed
@@ -239,8 +362,8 @@ static int run_cc(const char *zig_bin, const char *prog, int mode_is_cxx,
      * foo"). This ordering is a deliberate deviation from
      * zig-cc-nonunix.c for exactness against the bash source -- see
      * report caveat (c). */
-    int raw_argc = argc - 1;
-    char **raw_argv = argv + 1;
+    int raw_argc = rsp.argc;
+    char **raw_argv = rsp.argv;
     const char **pre_args = (const char **)malloc(sizeof(char *) * (size_t)(raw_argc + 1));
     if (!pre_args) {
         fprintf(stderr, "ERROR: %s: malloc failed\n", prog);
@@ -277,9 +400,10 @@ static int run_cc(const char *zig_bin, const char *prog, int mode_is_cxx,
          * appended, matching bash's dropped-trailing-token edge case
          * at :101 (the `if` guarding the next-token lookup fails). */
     }
+    zig_trace_step(ZIG_TRACE_LLD_SCAN);
 
     /* ---- STEP 4 (_zig-cc-common.sh:116-123): fill the translate
-     * profile and delegate the R1-R9 de-dup rules to the generated
+     * profile and delegate the R1-R14 rules to the generated
      * translator. ---- */
     zig_translate_profile profile;
     profile.is_win = 0;
@@ -287,6 +411,14 @@ static int run_cc(const char *zig_bin, const char *prog, int mode_is_cxx,
     profile.conda_prefix = conda_prefix;
     profile.zig_target_arch = ZIG_TARGET_ARCH;
     profile.sysroot = sysroot;
+    /* R14's answers were baked from a plain `zig cc -target ZIG_TARGET`
+     * line. When this call's line would differ -- STEP 8 rewrites a macOS
+     * target from MACOSX_DEPLOYMENT_TARGET, or the sysroot group above is
+     * injected -- -dumpmachine/-v could answer differently, so zig does. */
+    const char *dep_target = getenv("MACOSX_DEPLOYMENT_TARGET");
+    int line_as_baked = n_sysroot_flags == 0
+        && !(dep_target && *dep_target && strstr(ZIG_TARGET, "-macos") != NULL);
+    profile.probes = line_as_baked ? zig_baked_probes : NULL;
 
     /* mode_is_cxx is the caller's parameter (:122, caller-owns-init per
      * _translate.inc); zig_translate_flags may flip it. */
@@ -296,11 +428,14 @@ static int run_cc(const char *zig_bin, const char *prog, int mode_is_cxx,
     int tr_rc = zig_translate_flags(pi, (char *const *)pre_args, &profile,
                                      &out_argv, &out_argc, &use_lld_gen, &mode_is_cxx);
     free(pre_args);
+    zig_trace_step(ZIG_TRACE_TRANSLATE);
 
     /* R2/R3/etc intercepts already printed to stdout; bash's
      * intercepts `exit 0`. */
-    if (tr_rc == 2)
+    if (tr_rc == 2) {
+        zig_trace_outcome("intercept");
         return 0;
+    }
     if (tr_rc != 0) {
         fprintf(stderr, "ERROR: %s: malloc failed\n", prog);
         return 1;
@@ -385,6 +520,7 @@ static int run_cc(const char *zig_bin, const char *prog, int mode_is_cxx,
         }
     }
     int inject_target = !has_target;
+    zig_trace_step(ZIG_TRACE_POST);
 
     /* ---- STEP 10b (replaces recipe/scripts/_zig-force-load-common.sh:29-96):
      * -all_load rewrite.
@@ -438,24 +574,42 @@ static int run_cc(const char *zig_bin, const char *prog, int mode_is_cxx,
 
         /* Emit -force_load per archive, skipping any already named by an
          * explicit -force_load so the same input is not marked must_link
-         * twice. */
+         * twice, and emitting each distinct archive once.  One pass marks
+         * the explicit operands in a hash set, a second probes each .a
+         * against it: linear in the line, where the old per-archive rescan
+         * of every arg went quadratic on static-bundle links with
+         * thousands of archives.  The set also caches the is-a-file
+         * verdict, so a path repeated on the line is stat()ed once. */
+        ar_set set;
+        if (ar_set_init(&set, fi) != 0) {
+            fprintf(stderr, "ERROR: %s: malloc failed\n", prog);
+            free(filtered);
+            free(force_load_extra);
+            return 1;
+        }
+        for (i = 0; i < fi; i++) {
+            if (str_eq(filtered[i], "-force_load") && i + 1 < fi)
+                ar_set_get(&set, filtered[i + 1])->flags |= AR_FORCED;
+            else if (starts_with(filtered[i], "-Wl,-force_load,"))
+                ar_set_get(&set, filtered[i] + strlen("-Wl,-force_load,"))->flags |= AR_FORCED;
+        }
         for (i = 0; i < fi; i++) {
             const char *arg = filtered[i];
             if (str_eq(arg, "-force_load")) { i++; continue; }
             if (starts_with(arg, "-Wl,-force_load,")) continue;
-            if (!ends_with(arg, ".a") || !is_regular_file(arg)) continue;
-            int dup = 0, j;
-            for (j = 0; j < fi; j++) {
-                if (str_eq(filtered[j], "-force_load") && j + 1 < fi
-                    && str_eq(filtered[j + 1], arg)) { dup = 1; break; }
-                if (starts_with(filtered[j], "-Wl,-force_load,")
-                    && str_eq(filtered[j] + strlen("-Wl,-force_load,"), arg)) { dup = 1; break; }
-            }
-            if (dup) continue;
+            if (!ends_with(arg, ".a")) continue;
+            ar_entry *e = ar_set_get(&set, arg);
+            if (e->flags & (AR_FORCED | AR_EMITTED)) continue;
+            if (!(e->flags & AR_PROBED))
+                e->flags |= AR_PROBED | (is_regular_file(arg) ? AR_IS_FILE : 0);
+            if (!(e->flags & AR_IS_FILE)) continue;
+            e->flags |= AR_EMITTED;
             force_load_extra[n_force_load_extra++] = "-force_load";
             force_load_extra[n_force_load_extra++] = arg;
         }
+        free(set.slots);
     }
+    zig_trace_step(ZIG_TRACE_FORCE_LOAD);
 
     /* ---- STEP 11 (_zig-cc-common.sh:192): assemble the final argv
      * and exec. argv[0] is the zig binary path itself, matching
@@ -466,6 +620,8 @@ static int run_cc(const char *zig_bin, const char *prog, int mode_is_cxx,
      * _exec_args=("${_mode}" "${_lld_flag[@]}" "${_target_flag[@]}"
      * "${_sysroot_flags[@]}" "${_final_args[@]}"). */
     int max_args = fi + n_sysroot_flags + n_force_load_extra + 6;
+    if (rsp.expanded)
+        max_args += argc;   /* room for the original argv, see below */
     const char **new_argv = (const char **)malloc(sizeof(char *) * (size_t)max_args);
     if (!new_argv) {
         fprintf(stderr, "ERROR: %s: malloc failed\n", prog);
@@ -489,8 +645,35 @@ static int run_cc(const char *zig_bin, const char *prog, int mode_is_cxx,
         new_argv[ni++] = filtered[i];
     for (i = 0; i < n_force_load_extra; i++)
         new_argv[ni++] = force_load_extra[i];
+
+    /* STEP 1a's re-pack: the logical args sit at new_argv[tail..ni).  If
+     * translation left them exactly as expanded, pass the caller's @file
+     * arguments through unchanged; otherwise move them into one translated
+     * response file.  If that cannot be written they stay inline. */
+    if (rsp.expanded) {
+        int tail = ni - fi - n_force_load_extra;
+        if (zig_rsp_same(new_argv + tail, ni - tail, rsp.argv, rsp.argc)) {
+            ni = tail;
+            for (i = 1; i < argc; i++)
+                new_argv[ni++] = argv[i];
+        } else {
+            char *rsp_arg = zig_rsp_write(new_argv + tail, ni - tail, ZIG_RSP_NATIVE);
+            if (rsp_arg) {
+                ni = tail;
+                new_argv[ni++] = rsp_arg;
+            }
+        }
+    }
     new_argv[ni] = NULL;
 
+    /* STEP 1b's store half.  Intercepts (tr_rc == 2) and error exits
+     * returned long before here, so only real compile/link lines land in
+     * the cache. */
+    if (tc_on && !has_all_load)
+        zig_tc_store(&tc_key, new_argv + 1, ni - 1);
+    free(tc_key.buf);
+    zig_trace_step(ZIG_TRACE_ASSEMBLE);
+
     /* exec_zig() replaces this process on success and returns only on
      * failure (it prints its own error). filtered/new_argv are
      * intentionally not freed on the success path -- the process image
@@ -707,7 +890,15 @@ static zig_mode mode_from_argv0(const char *argv0, const char **out_prog) {
     return MODE_UNKNOWN;
 }
 
+/* Dispatch-arm names for ZIG_WRAPPER_TRACE records, indexed by zig_mode. */
+static const char *const mode_names[] = {
+    "unknown", "cc", "cxx", "ar", "ranlib", "asm", "rc", "lld", "windres",
+    "force-load-cc", "force-load-cxx",
+};
+
 int main(int argc, char *argv[]) {
+    zig_trace_begin(argc, argv);
+
     /* Uniform across every tool -- this is the Phase 0 cache-dir fix that the
      * bash side achieves by having all ten wrappers source
      * _zig-cache-common.sh. */
@@ -725,6 +916,8 @@ int main(int argc, char *argv[]) {
     }
 
     const char *zig_bin = zig_resolve_zig_bin(ZIG_BIN, WRAPPER_PREFIX);
+    zig_trace_tool(mode_names[mode]);
+    zig_trace_step(ZIG_TRACE_DISPATCH);
 
     switch (mode) {
     case MODE_CC:      return run_cc(zig_bin, prog, 0, argc, argv);
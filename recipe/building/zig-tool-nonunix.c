@@ -1,7 +1,7 @@
 /*
  * non-unix simple tool wrapper: prepends configured args to argv and execs zig.
  *
- * Compiled once per tool at install time with different @ZIG_PREFIX_ARGS@:
+ * Compiled once per tool at install time with different ZIG_PREFIX_ARGS:
  *   zig-ar.exe      args = { "ar" }
  *   zig-ranlib.exe  args = { "ranlib" }
  *   zig-rc.exe      args = { "rc" }
@@ -11,7 +11,8 @@
  * No flag filtering. Mirrors the MSYS2 PATH and ZIG_GLOBAL_CACHE_DIR
  * setup from zig-cc-nonunix.c so behavior is identical to those shims.
  *
- * Placeholders replaced at install time:
+ * Defined at install time with -D (_compile_c_shim in install_zig_activation.py;
+ * the "@NAME@" fallbacks below only keep the bare file compilable):
  *   ZIG_BIN_NAME     - zig binary filename (e.g. x86_64-w64-mingw32-zig.exe)
  *   ZIG_PREFIX_ARGS  - C array initializer fragment of prepended args
  *
@@ -22,13 +23,16 @@
 #include <stdio.h>
 #include <stdlib.h>
 #include <string.h>
-#include <errno.h>
-#include <process.h>
 #include <windows.h>
 
+#ifndef ZIG_BIN_NAME
 #define ZIG_BIN_NAME "@ZIG_BIN_NAME@"
+#endif
+#ifndef ZIG_PREFIX_ARGS
+#define ZIG_PREFIX_ARGS "@ZIG_PREFIX_ARGS@"
+#endif
 
-static const char *PREFIX_ARGS[] = { @ZIG_PREFIX_ARGS@ };
+static const char *PREFIX_ARGS[] = { ZIG_PREFIX_ARGS };
 static const size_t PREFIX_ARGS_COUNT = sizeof(PREFIX_ARGS) / sizeof(PREFIX_ARGS[0]);
 
 static int find_zig(char *out, size_t out_size) {
@@ -71,14 +75,14 @@ int main(int argc, char *argv[]) {
 
     restore_msys2_system32_path();
 
-    /* Execute zig. */
-    int ret = (int)_spawnv(_P_WAIT, zig_path, new_argv);
-    free(new_argv);
-
+    /* Execute zig (CreateProcessW inside a kill-on-close job object). */
+    int ret = zig_spawn_wait(zig_path, new_argv);
     if (ret == -1) {
-        fprintf(stderr, "ERROR: zig-tool: failed to exec %s: %s\n",
-                zig_path, strerror(errno));
+        fprintf(stderr, "ERROR: zig-tool: failed to exec %s: error %lu\n",
+                zig_path, (unsigned long)GetLastError());
+        free(new_argv);
         return 1;
     }
+    free(new_argv);
     return ret;
 }
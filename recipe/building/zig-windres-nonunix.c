@@ -5,7 +5,8 @@
  * windres and zig rc both process Windows resource (.rc) files, but differ in
  * output flag naming: windres uses -o, zig rc uses -fo.
  *
- * Placeholder replaced at install time:
+ * Defined at install time with -D (_compile_c_shim in install_zig_activation.py;
+ * the "@NAME@" fallback below only keeps the bare file compilable):
  *   ZIG_BIN_NAME   - zig binary filename (e.g. x86_64-w64-mingw32-zig.exe)
  *
  * Compiled during package build with zig cc.
@@ -15,10 +16,11 @@
 #include <stdio.h>
 #include <stdlib.h>
 #include <string.h>
-#include <process.h>
 #include <windows.h>
 
+#ifndef ZIG_BIN_NAME
 #define ZIG_BIN_NAME "@ZIG_BIN_NAME@"
+#endif
 
 /* --- Find zig binary --- */
 static int find_zig(char *out, size_t out_size) {
@@ -86,12 +88,12 @@ int main(int argc, char *argv[]) {
 
     restore_msys2_system32_path();
 
-    /* Execute zig rc */
-    int ret = (int)_spawnv(_P_WAIT, zig_path, new_argv);
+    /* Execute zig rc (CreateProcessW inside a kill-on-close job object) */
+    int ret = zig_spawn_wait(zig_path, new_argv);
 
     if (ret == -1) {
-        fprintf(stderr, "ERROR: zig-windres: failed to exec %s: %s\n",
-                zig_path, strerror(errno));
+        fprintf(stderr, "ERROR: zig-windres: failed to exec %s: error %lu\n",
+                zig_path, (unsigned long)GetLastError());
         free(new_argv);
         return 1;
     }
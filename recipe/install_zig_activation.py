@@ -15,6 +15,8 @@ All wrapper content lives in recipe/scripts/ as templates with @PLACEHOLDER@
 substitution — no script content is generated inline.
 """
 
+import atexit
+import functools
 import os
 import re
 import shutil
@@ -22,6 +24,7 @@ import stat
 import subprocess
 import sys
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 
@@ -120,11 +123,41 @@ def main():
     print("=== Zig Activation Package Installation Complete ===")
 
 
+# @NAME@ placeholders. Anything else with an @ in it (bash "$@",
+# "${arr[@]}", batch "@echo off") has no uppercase run closed by a second @.
+_PLACEHOLDER_RE = re.compile(r"@([A-Z][A-Z0-9_]*)@")
+
+
+class TemplateError(ValueError):
+    """A template token with no value, or a -D'd shim missing a define."""
+
+
+@functools.lru_cache(maxsize=None)
+def _parse_template(src: Path) -> tuple:
+    """(literal, NAME, literal, NAME, ..., literal) for the template at src.
+
+    Cached: the cross build runs install_zig_cc_wrappers() twice over the
+    same helper templates.
+    """
+    return tuple(_PLACEHOLDER_RE.split(src.read_text()))
+
+
+def _render_template(src: Path, replacements: dict) -> str:
+    """Substitute every @NAME@ in src from replacements (keyed by NAME) in
+    one pass. Raises TemplateError naming every token with no value."""
+    parts = _parse_template(src)
+    names = parts[1::2]
+    missing = sorted({n for n in names if n not in replacements})
+    if missing:
+        raise TemplateError(f"{src}: no value for {', '.join('@' + n + '@' for n in missing)}")
+    out = list(parts)
+    out[1::2] = [replacements[n] for n in names]
+    return "".join(out)
+
+
 def _install_template(src: Path, dst: Path, replacements: dict, executable: bool = False):
-    """Read a template file, apply @PLACEHOLDER@ substitutions, write to dst."""
-    content = src.read_text()
-    for placeholder, value in replacements.items():
-        content = content.replace(placeholder, value)
+    """Render a template file (see _render_template), write to dst."""
+    content = _render_template(src, replacements)
     dst.parent.mkdir(parents=True, exist_ok=True)
     dst.write_text(content)
     if executable:
@@ -169,8 +202,69 @@ def _find_zig_compiler() -> str:
     )
 
 
-def _compile_c_shim(src: Path, dst: Path, replacements: dict, extra_args: tuple = (), target: str | None = None):
-    """Compile a C shim with @PLACEHOLDER@ substitution using zig cc.
+def _c_define(name: str, value) -> str:
+    """-D flag for one shim macro: str -> C string literal, tuple of str ->
+    comma-separated literals (an array initializer), int -> bare number."""
+    def lit(v: str) -> str:
+        out = []
+        for ch in v:
+            if ch in '\\"':
+                out.append("\\" + ch)
+            elif ch == "\n":
+                out.append("\\n")
+            elif ch < " " or ch == "\x7f":
+                out.append(f"\\{ord(ch):03o}")
+            else:
+                out.append(ch)
+        return '"' + "".join(out) + '"'
+
+    if isinstance(value, bool) or isinstance(value, int):
+        return f"-D{name}={int(value)}"
+    if isinstance(value, tuple):
+        return f"-D{name}=" + ", ".join(lit(v) for v in value)
+    return f"-D{name}={lit(value)}"
+
+
+_shim_cache_dir: str | None = None
+
+
+def _shim_env() -> dict:
+    """Environment for shim compiles: one ZIG_GLOBAL_CACHE_DIR for all of
+    them, so the target's libc/compiler_rt are built by the first compile
+    and reused by every later one, parallel or not."""
+    global _shim_cache_dir
+    env = dict(os.environ)
+    if not env.get("ZIG_GLOBAL_CACHE_DIR"):
+        if _shim_cache_dir is None:
+            _shim_cache_dir = tempfile.mkdtemp(prefix="zig-shim-cache-")
+            atexit.register(shutil.rmtree, _shim_cache_dir, True)
+        env["ZIG_GLOBAL_CACHE_DIR"] = _shim_cache_dir
+    return env
+
+
+# `#define NAME "@NAME@"`: the install-time macros a shim source expects.
+_SHIM_FALLBACK_RE = re.compile(r'^#define ([A-Z][A-Z0-9_]*) "@\1@"$', re.MULTILINE)
+
+
+@functools.lru_cache(maxsize=None)
+def _shim_macros(src: Path) -> tuple:
+    """Names of the "@NAME@"-fallback macros src must be given with -D."""
+    return tuple(_SHIM_FALLBACK_RE.findall(src.read_text()))
+
+
+def _compile_c_shim(src: Path, dst: Path, defines: dict, extra_args: tuple = (), target: str | None = None) -> str:
+    """Compile a C shim with zig cc, its configuration passed as -D macros.
+    Returns the progress lines to print (the caller prints them, so pooled
+    compiles report whole lines in order).
+
+    Each shim source #defines an "@NAME@" fallback under #ifndef for every
+    macro it takes, so the bare file still compiles for syntax checks; the
+    real values always come from defines (see _c_define). The source is
+    compiled in place -- no rewritten temp copy -- so every variant of a
+    shim shares one input file and only its -D flags differ. The -D flags
+    are part of zig's cache manifest, so each variant is still its own
+    cache entry; what the variants share is the target's libc/compiler_rt
+    build (see _shim_env).
 
     extra_args carries platform-specific link flags (e.g. "-lkernel32" for
     non-Unix targets) appended to the compile command.
@@ -187,33 +281,94 @@ def _compile_c_shim(src: Path, dst: Path, replacements: dict, extra_args: tuple
     wrappers this C port replaces were architecture-neutral text scripts,
     so this concern is introduced by the C port itself.
     """
-    content = src.read_text()
-    for placeholder, value in replacements.items():
-        content = content.replace(placeholder, value)
-
+    missing = sorted(set(_shim_macros(src)) - set(defines))
+    if missing:
+        raise TemplateError(f"{src}: no -D value for {', '.join(missing)}")
     dst.parent.mkdir(parents=True, exist_ok=True)
     zig_bin = _find_zig_compiler()
 
-    with tempfile.TemporaryDirectory() as tmpdir:
-        tmp_src = Path(tmpdir) / src.name
-        tmp_src.write_text(content)
-        target_args = ["-target", target] if target else []
-        subprocess.check_call([
-            zig_bin, "cc",
-            *target_args,
-            "-O2",
-            f"-I{src.parent}",
-            "-o", str(dst),
-            str(tmp_src),
-            *extra_args,
-        ])
-
+    target_args = ["-target", target] if target else []
+    subprocess.check_call([
+        zig_bin, "cc",
+        *target_args,
+        "-O2",
+        f"-I{src.parent}",
+        *(_c_define(name, value) for name, value in defines.items()),
+        "-o", str(dst),
+        str(src),
+        *extra_args,
+    ], env=_shim_env())
+
+    report = []
     pdb = dst.with_suffix(".pdb")
     if pdb.exists():
         pdb.unlink()
-        print(f"  Removed: {pdb}")
-
-    print(f"  Compiled: {dst}" + (f" (-target {target})" if target else ""))
+        report.append(f"  Removed: {pdb}")
+
+    report.append(f"  Compiled: {dst}" + (f" (-target {target})" if target else ""))
+    return "\n".join(report)
+
+
+def _compile_c_shims(jobs: list[tuple]):
+    """Run _compile_c_shim(*job) for every job: the first alone, to warm the
+    shared zig cache (see _shim_env), then the rest in a pool bounded by
+    CPU_COUNT. Each compile is its own zig process, so threads suffice."""
+    if not jobs:
+        return
+    print(_compile_c_shim(*jobs[0]))
+    workers = max(1, int(os.environ.get("CPU_COUNT") or os.cpu_count() or 1))
+    with ThreadPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        # Printed here, in submission order; map re-raises the first
+        # CalledProcessError when it is reached, as the serial loop did.
+        for report in pool.map(lambda job: _compile_c_shim(*job), jobs[1:]):
+            print(report)
+
+
+def _reflink(src: Path, dst: Path) -> bool:
+    """Copy-on-write clone of src to dst (Linux FICLONE, macOS clonefile)."""
+    if sys.platform.startswith("linux"):
+        import fcntl
+
+        FICLONE = 0x40049409
+        try:
+            with open(src, "rb") as fin, open(dst, "wb") as fout:
+                fcntl.ioctl(fout.fileno(), FICLONE, fin.fileno())
+            return True
+        except OSError:
+            dst.unlink(missing_ok=True)
+            return False
+    if sys.platform == "darwin":
+        import ctypes
+
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            return libc.clonefile(os.fsencode(src), os.fsencode(dst), 0) == 0
+        except (OSError, AttributeError):
+            return False
+    return False
+
+
+def _link_or_copy(src: Path, dst: Path) -> str:
+    """Make dst another name for src: a hard link (one inode, one set of
+    pages in the page cache and in the package), else a reflink (shared
+    extents), else a plain copy.  Returns which one was made.
+
+    All three are plain files under the same prefix, so the package stays
+    relocatable; the multiplexer dispatches on basename(argv[0]), which is
+    the invoked name whichever way the file was made.
+    """
+    dst.unlink(missing_ok=True)
+    try:
+        os.link(src, dst)
+        return "hard link"
+    except OSError:
+        pass
+    if _reflink(src, dst):
+        shutil.copymode(src, dst)
+        return "reflink"
+    shutil.copyfile(src, dst)
+    shutil.copymode(src, dst)
+    return "copy"
 
 
 def _strip_glibc_version(triplet: str) -> str:
@@ -241,6 +396,46 @@ def _with_glibc_floor(triplet: str, arch: str) -> str:
     return f"{_strip_glibc_version(triplet)}.{floor}"
 
 
+# R14_baked_probes' values in flag_rules.py, in the same order: the shims
+# index ZIG_BAKED_PROBES by position.
+_CC_PROBES = ("-dumpversion", "-dumpmachine", "--version", "-v")
+
+
+def _bake_cc_probes(zig_exe: Path | None, cc_target: str, prefix: Path) -> tuple:
+    """R14's ZIG_BAKED_PROBES: (stdout, stderr) for each of _CC_PROBES, as
+    `zig cc -target <cc_target> <probe>` answers them, flattened into one
+    tuple of string literals.
+
+    The installed prefix is spelled {conda_prefix} so the shim prints the
+    prefix it runs in. The shims replay these only for a line without the
+    sysroot flags or a MACOSX_DEPLOYMENT_TARGET rewrite, so the probes run
+    without either too. A probe that fails or times out is left as ("", ""),
+    as is every probe when zig_exe is None or missing (the shim runs on
+    another machine, or this prefix has no zig): the shim then hands it to
+    zig as before.
+    """
+    answers, baked = [], []
+    for probe in _CC_PROBES:
+        out = err = ""
+        if zig_exe is not None and zig_exe.is_file():
+            target_args = ["-target", cc_target] if cc_target else []
+            try:
+                env = _shim_env()
+                env.pop("MACOSX_DEPLOYMENT_TARGET", None)
+                proc = subprocess.run([str(zig_exe), "cc", *target_args, probe], capture_output=True,
+                                      text=True, timeout=60, env=env)
+            except (OSError, subprocess.SubprocessError):
+                proc = None
+            if proc is not None and proc.returncode == 0:
+                out = proc.stdout.replace(str(prefix), "{conda_prefix}")
+                err = proc.stderr.replace(str(prefix), "{conda_prefix}")
+        answers += [out, err]
+        if out or err:
+            baked.append(probe)
+    print(f"  Baked cc probes: {' '.join(baked) if baked else '(none)'}")
+    return tuple(answers)
+
+
 def _find_zig_bin(conda_triplet: str, is_nonunix: bool = False) -> str:
     """Return the zig binary reference for wrappers.
 
@@ -278,11 +473,11 @@ def install_activation_scripts(
 
     scripts_dir = recipe_dir / "scripts"
     replacements = {
-        "@ZIG_TRIPLET@": zig_triplet,
-        "@CONDA_TRIPLET@": conda_triplet,
-        "@CROSS_TARGET_TRIPLET@": cross_target_triplet,
-        "@CONDA_ZIG_BUILD@": conda_zig_build,
-        "@CONDA_ZIG_HOST@": conda_zig_host,
+        "ZIG_TRIPLET": zig_triplet,
+        "CONDA_TRIPLET": conda_triplet,
+        "CROSS_TARGET_TRIPLET": cross_target_triplet,
+        "CONDA_ZIG_BUILD": conda_zig_build,
+        "CONDA_ZIG_HOST": conda_zig_host,
     }
 
     if is_nonunix:
@@ -312,10 +507,10 @@ def install_zig_cc_wrappers(
     target_arch = zig_triplet.split("-")[0] if "-" in zig_triplet else ""
 
     replacements = {
-        "@ZIG_BIN@": zig_bin,
-        "@ZIG_TARGET@": cc_target,
-        "@ZIG_TARGET_ARCH@": target_arch,
-        "@WRAPPER_PREFIX@": f"{conda_triplet}-",
+        "ZIG_BIN": zig_bin,
+        "ZIG_TARGET": cc_target,
+        "ZIG_TARGET_ARCH": target_arch,
+        "WRAPPER_PREFIX": f"{conda_triplet}-",
     }
 
     if is_nonunix:
@@ -323,46 +518,49 @@ def install_zig_cc_wrappers(
         # Extract zig binary filename from full %CONDA_PREFIX%\... path once
         zig_bin_name = zig_bin.rsplit("\\", 1)[-1]
 
-        # Compile zig-cc.exe and zig-cxx.exe (native .exe with flag filtering)
+        # Every .exe below is an independent `zig cc` run: queue them all
+        # and compile them as one parallel batch (_compile_c_shims).
+        shims = []
+        common = {"ZIG_BIN_NAME": zig_bin_name}
+
+        # zig-cc.exe and zig-cxx.exe (native .exe with flag filtering)
         cc_src = recipe_dir / "building" / "zig-cc-nonunix.c"
         if cc_src.exists():
             is_mingw = "mingw32" in conda_triplet
+            # A shim that runs on the target cannot ask this machine's zig.
+            probe_zig = None if shim_on_target else wrapper_dir / zig_bin_name
+            probes = _bake_cc_probes(probe_zig, cc_target, prefix)
             for mode, exe_name in [("cc", "zig-cc"), ("c++", "zig-cxx")]:
-                mode_replacements = {
-                    **replacements,
-                    "@ZIG_CC_MODE@": mode,
-                    "@ZIG_BIN_NAME@": zig_bin_name,
-                    "@IS_MINGW_TARGET@": "1" if is_mingw else "0",
+                mode_defines = {
+                    **common,
+                    "ZIG_CC_MODE": mode,
+                    "ZIG_TARGET": cc_target,
+                    "ZIG_TARGET_ARCH": target_arch,
+                    "IS_MINGW_TARGET": is_mingw,
+                    "ZIG_BAKED_PROBES": probes,
                 }
-                _compile_c_shim(cc_src, wrapper_dir / f"{conda_triplet}-{exe_name}.exe", mode_replacements, extra_args=("-lkernel32",))
+                shims.append((cc_src, wrapper_dir / f"{conda_triplet}-{exe_name}.exe", mode_defines, ("-lkernel32",)))
 
-        # Compile .exe shims for simple pass-through tools
+        # .exe shims for simple pass-through tools
         tool_src = recipe_dir / "building" / "zig-tool-nonunix.c"
         if tool_src.exists():
-            zig_target_for_asm = replacements.get("@ZIG_TARGET@", "native")
             tool_prefix_args = {
-                "zig-ar":     '"ar"',
-                "zig-ranlib": '"ranlib"',
-                "zig-rc":     '"rc"',
-                "zig-lld":    '"lld-link"',
-                "zig-asm":    f'"cc", "-target", "{zig_target_for_asm}", "-mcpu=baseline"',
+                "zig-ar":     ("ar",),
+                "zig-ranlib": ("ranlib",),
+                "zig-rc":     ("rc",),
+                "zig-lld":    ("lld-link",),
+                "zig-asm":    ("cc", "-target", cc_target or "native", "-mcpu=baseline"),
             }
             for name, prefix_args in tool_prefix_args.items():
-                tool_replacements = {
-                    **replacements,
-                    "@ZIG_BIN_NAME@": zig_bin_name,
-                    "@ZIG_PREFIX_ARGS@": prefix_args,
-                }
-                _compile_c_shim(tool_src, wrapper_dir / f"{conda_triplet}-{name}.exe", tool_replacements, extra_args=("-lkernel32",))
+                tool_defines = {**common, "ZIG_PREFIX_ARGS": prefix_args}
+                shims.append((tool_src, wrapper_dir / f"{conda_triplet}-{name}.exe", tool_defines, ("-lkernel32",)))
 
-        # Compile zig-windres.exe (dedicated shim with -o -> -fo translation)
+        # zig-windres.exe (dedicated shim with -o -> -fo translation)
         windres_src = recipe_dir / "building" / "zig-windres-nonunix.c"
         if windres_src.exists():
-            windres_replacements = {
-                **replacements,
-                "@ZIG_BIN_NAME@": zig_bin_name,
-            }
-            _compile_c_shim(windres_src, wrapper_dir / f"{conda_triplet}-zig-windres.exe", windres_replacements, extra_args=("-lkernel32",))
+            shims.append((windres_src, wrapper_dir / f"{conda_triplet}-zig-windres.exe", common, ("-lkernel32",)))
+
+        _compile_c_shims(shims)
 
     else:
         wrapper_dir = prefix / "bin"
@@ -381,9 +579,10 @@ def install_zig_cc_wrappers(
             if src.exists():
                 _install_template(src, wrapper_dir / f"{conda_triplet}-{helper}", replacements)
 
-        # The C multiplexer: ONE binary compiled once, then copied to each
+        # The C multiplexer: ONE binary compiled once, then hard-linked (or
+        # reflinked, or as a last resort copied -- see _link_or_copy) to each
         # wrapper name. It dispatches on basename(argv[0]) with the
-        # @WRAPPER_PREFIX@ stripped, so every copy behaves as its own tool.
+        # @WRAPPER_PREFIX@ stripped, so every name behaves as its own tool.
         # Covers all 10 names, including zig-force-load-cc / zig-force-load-cxx
         # (formerly bash, now dispatch arms in zig-cc-unix.c).
         mux_names = [
@@ -400,13 +599,15 @@ def install_zig_cc_wrappers(
         # macOS: reserve Mach-O header padding, else conda's post-build
         # install_name_tool rpath rewrite fails ("load commands do not fit").
         mux_extra = ("-Wl,-headerpad_max_install_names",) if "darwin" in conda_triplet else ()
+        # A multiplexer that runs on the target cannot ask this machine's zig.
+        probe_zig = None if shim_on_target else wrapper_dir / f"{conda_triplet}-zig"
+        mux_defines = {**replacements, "ZIG_BAKED_PROBES": _bake_cc_probes(probe_zig, cc_target, prefix)}
         first = wrapper_dir / f"{conda_triplet}-{mux_names[0]}"
-        _compile_c_shim(mux_src, first, replacements, extra_args=mux_extra, target=shim_target)
+        print(_compile_c_shim(mux_src, first, mux_defines, extra_args=mux_extra, target=shim_target))
         for name in mux_names[1:]:
             dst = wrapper_dir / f"{conda_triplet}-{name}"
-            shutil.copyfile(first, dst)
-            shutil.copymode(first, dst)
-            print(f"  Installed (multiplexer copy): {dst}")
+            how = _link_or_copy(first, dst)
+            print(f"  Installed (multiplexer {how}): {dst}")
 
 
 def install_unix_cross_wrappers(
@@ -423,9 +624,9 @@ def install_unix_cross_wrappers(
     cc_triplet = _strip_glibc_version(zig_triplet)
 
     replacements = {
-        "@NATIVE_ZIG@": native_zig,
-        "@CC_TRIPLET@": cc_triplet,
-        "@ZIG_TRIPLET@": zig_triplet,
+        "NATIVE_ZIG": native_zig,
+        "CC_TRIPLET": cc_triplet,
+        "ZIG_TRIPLET": zig_triplet,
     }
     _install_template(
         recipe_dir / "building" / "cross-zig.sh",
@@ -452,17 +653,17 @@ def install_nonunix_cross_wrappers(
     # Strip glibc version for cc/c++ commands (clang rejects ".2.17" suffix)
     cc_triplet = _strip_glibc_version(zig_triplet)
 
-    replacements = {
-        "@NATIVE_ZIG_EXE@": native_zig_exe,
-        "@CC_TRIPLET@": cc_triplet,
-        "@ZIG_TRIPLET@": zig_triplet,
+    defines = {
+        "NATIVE_ZIG_EXE": native_zig_exe,
+        "CC_TRIPLET": cc_triplet,
+        "ZIG_TRIPLET": zig_triplet,
     }
-    _compile_c_shim(
+    print(_compile_c_shim(
         recipe_dir / "building" / "cross-zig-shim.c",
         bin_dir / f"{target_triplet}-zig.exe",
-        replacements,
+        defines,
         extra_args=("-lkernel32",),
-    )
+    ))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,229 @@
+"""
+Persistent bash worker for the wrapper test scripts.
+
+The parity suite and the fuzzer used to spawn one bash per case, re-source
+the wrapper fragments in it and parse its output; at a few thousand cases
+that process startup is most of the run. A BashWorker starts bash ONCE,
+runs a setup script in it (typically `source` of the fragments plus the
+definition of one or more handler functions), then serves requests over
+its stdin/stdout until closed.
+
+Protocol (all fields NUL-terminated, so any argv -- newlines, spaces,
+quotes, \\x1f -- passes through unquoted):
+
+    request:  <seq> \\0 <function> \\0 <nargs> \\0 <arg> \\0 ...
+    reply:    <stdout> \\0 <stderr> \\0 <seq> <rc> \\n
+
+Each request runs `<function> "$@"` in a fresh subshell of the worker, so
+an `exit` in the code under test (the intercepts) only ends that request,
+and no variable it sets leaks into the next one. Handlers must not write
+NUL bytes. <stderr> loses its trailing newlines (it passes through a
+command substitution).
+
+Failure handling:
+  - timeout: the worker's process group is killed, a new worker is
+    started, and the request's reply has timed_out=True (rc -1). It is
+    not retried -- it would only time out again.
+  - crash (the worker's stdout closes mid-request): a new worker is
+    started and the request retried once; a second crash raises
+    BashWorkerError.
+
+Not a test script: imported by test_flag_translation_parity.py,
+fuzz_flag_translation.py and test_zig_toolchain.py.
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import shutil
+import signal
+import subprocess
+import sys
+import threading
+from dataclasses import dataclass
+
+_LOOP = r"""
+exec 3>&1
+while IFS= read -r -d '' _bw_seq && IFS= read -r -d '' _bw_fn && IFS= read -r -d '' _bw_n; do
+    _bw_args=()
+    while (( ${#_bw_args[@]} < _bw_n )); do
+        IFS= read -r -d '' _bw_a || exit 0
+        _bw_args+=("$_bw_a")
+    done
+    _bw_err=$( ( "$_bw_fn" ${_bw_args[@]+"${_bw_args[@]}"} ) </dev/null 2>&1 1>&3 3>&- )
+    _bw_rc=$?
+    printf '\0%s\0%s %s\n' "$_bw_err" "$_bw_seq" "$_bw_rc"
+done
+"""
+
+
+class BashWorkerError(RuntimeError):
+    """The worker could not be started or kept dying."""
+
+
+@dataclass(frozen=True)
+class BashReply:
+    rc: int
+    stdout: str
+    stderr: str
+    timed_out: bool = False
+
+
+class BashWorker:
+    """One long-lived bash serving handler calls (see the module docstring).
+
+    setup  -- bash run once per worker process before the request loop.
+    args   -- its positional parameters ($1 ...), so paths need no quoting.
+    env    -- environment for bash (default: inherit).
+    cwd    -- working directory for bash.
+    timeout -- seconds allowed per request.
+    """
+
+    def __init__(self, setup: str, *, args: list[str] | None = None, env: dict[str, str] | None = None,
+                 cwd: str | None = None, timeout: float = 15.0, bash: str | None = None):
+        self._bash = bash or shutil.which("bash")
+        if not self._bash:
+            raise BashWorkerError("bash not found on PATH")
+        self._script = setup + "\n" + _LOOP
+        self._args = list(args or [])
+        self._env = env
+        self._cwd = cwd
+        self.timeout = timeout
+        self.restarts = 0
+        self._seq = 0
+        self._proc: subprocess.Popen | None = None
+        self._chunks: queue.Queue | None = None
+        self._buf = b""
+        self._start()
+
+    # -- process management -------------------------------------------------
+    def _start(self) -> None:
+        self._proc = subprocess.Popen(
+            [self._bash, "-c", self._script, "bash-worker", *self._args],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            env=self._env, cwd=self._cwd, start_new_session=sys.platform != "win32",
+        )
+        self._chunks = queue.Queue()
+        self._buf = b""
+        threading.Thread(target=self._pump, args=(self._proc.stdout, self._chunks), daemon=True).start()
+
+    @staticmethod
+    def _pump(stream, chunks: queue.Queue) -> None:
+        # A thread rather than select(): pipes are not selectable on Windows.
+        while True:
+            try:
+                data = os.read(stream.fileno(), 65536)
+            except OSError:
+                data = b""
+            chunks.put(data)
+            if not data:
+                return
+
+    def _kill(self) -> None:
+        proc = self._proc
+        if proc is None or proc.poll() is not None:
+            return
+        try:
+            if sys.platform == "win32":
+                subprocess.run(["taskkill", "/T", "/F", "/PID", str(proc.pid)], capture_output=True, timeout=5)
+            else:
+                os.killpg(proc.pid, signal.SIGKILL)
+        except (OSError, subprocess.SubprocessError):
+            proc.kill()
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            pass
+
+    def _restart(self) -> None:
+        self._kill()
+        self.restarts += 1
+        self._start()
+
+    def close(self) -> None:
+        if self._proc is None:
+            return
+        try:
+            self._proc.stdin.close()
+            self._proc.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            self._kill()
+        self._proc = None
+
+    def __enter__(self) -> BashWorker:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # -- framing --------------------------------------------------------------
+    def _encode(self, seq: int, func: str, args: list[str]) -> bytes:
+        fields = [str(seq), func, str(len(args)), *args]
+        return b"".join(os.fsencode(f) + b"\0" for f in fields)
+
+    @staticmethod
+    def _send(stdin, data: bytes) -> None:
+        try:
+            stdin.write(data)
+            stdin.flush()
+        except (BrokenPipeError, OSError):
+            pass  # surfaces as a crash on the read side
+
+    def _read_reply(self, seq: int) -> BashReply | None:
+        """The reply for seq, a timed-out reply, or None if the worker died."""
+        while True:
+            parts = self._buf.split(b"\0", 2)
+            if len(parts) == 3 and b"\n" in parts[2]:
+                trailer, self._buf = parts[2].split(b"\n", 1)
+                got_seq, rc = trailer.decode().split()
+                if int(got_seq) != seq:
+                    raise BashWorkerError(f"reply for request {got_seq} while waiting for {seq}")
+                return BashReply(rc=int(rc), stdout=os.fsdecode(parts[0]), stderr=os.fsdecode(parts[1]))
+            try:
+                data = self._chunks.get(timeout=self.timeout)
+            except queue.Empty:
+                self._restart()
+                return BashReply(rc=-1, stdout="", stderr=f"TIMEOUT after {self.timeout:g}s", timed_out=True)
+            if not data:
+                return None
+            self._buf += data
+
+    # -- API ------------------------------------------------------------------
+    def call(self, func: str, *args: str) -> BashReply:
+        """Run one handler call; see the module docstring for failure handling."""
+        for attempt in range(2):
+            self._seq += 1
+            self._send(self._proc.stdin, self._encode(self._seq, func, list(args)))
+            reply = self._read_reply(self._seq)
+            if reply is not None:
+                return reply
+            self._restart()
+        raise BashWorkerError(f"bash worker died twice running {func} {list(args)!r}")
+
+    def map(self, func: str, arg_lists: list[list[str]]) -> list[BashReply]:
+        """call(func, *args) for each args, pipelined: requests are written
+        from a thread while replies are read, so the worker never idles on
+        a round trip. After a timeout or crash the rest are resent to the
+        new worker."""
+        replies: list[BashReply] = []
+        while len(replies) < len(arg_lists):
+            pending = arg_lists[len(replies):]
+            first = self._seq + 1
+            self._seq += len(pending)
+            payload = b"".join(self._encode(first + i, func, list(a)) for i, a in enumerate(pending))
+            # Bound to this process's stdin: after a restart the new worker
+            # must not receive the rest of the old payload.
+            writer = threading.Thread(target=self._send, args=(self._proc.stdin, payload), daemon=True)
+            writer.start()
+            for i in range(len(pending)):
+                reply = self._read_reply(first + i)
+                if reply is None:
+                    self._restart()
+                    replies.append(self.call(func, *pending[i]))
+                    break
+                replies.append(reply)
+                if reply.timed_out:
+                    break
+            writer.join(timeout=self.timeout)
+        return replies
@@ -0,0 +1,59 @@
+/*
+ * Hand-written test harness for recipe/building/response_file.h -- part of
+ * the test_flag_translation_parity.py "response-file leg".
+ *
+ * Compiled by the test script via:
+ *   cc -I recipe/building recipe/testing/_rsp_harness.c -o <tmp>
+ *
+ * Usage:
+ *   _rsp_harness <gnu|msvc> expand [args...]
+ *   _rsp_harness <gnu|msvc> write  [args...]
+ *   _rsp_harness msvc cmdline [args...]
+ *
+ * expand: runs zig_rsp_expand() over args and prints the number of @files
+ *         expanded, then every logical argv token, each field terminated
+ *         by a NUL byte (tokens may contain newlines).
+ * write:  runs zig_rsp_write() over args (needs $ZIG_GLOBAL_CACHE_DIR) and
+ *         prints the returned "@<path>" argument followed by a newline.
+ * cmdline: prints zig_rsp_command_line(args) -- the CreateProcessW command
+ *         line nonunix_common.h's launcher builds -- followed by a NUL.
+ *
+ * Exit status 1 on allocation or write failure.
+ */
+#include <stdio.h>
+#include <string.h>
+
+#include "response_file.h"
+
+int main(int argc, char *argv[]) {
+    if (argc < 3) {
+        fprintf(stderr, "usage: %s <gnu|msvc> <expand|write> [args...]\n", argv[0]);
+        return 1;
+    }
+    zig_rsp_style style = strcmp(argv[1], "msvc") == 0 ? ZIG_RSP_MSVC : ZIG_RSP_GNU;
+
+    if (strcmp(argv[2], "write") == 0) {
+        char *arg = zig_rsp_write((const char *const *)(argv + 3), argc - 3, style);
+        if (!arg)
+            return 1;
+        printf("%s\n", arg);
+        return 0;
+    }
+
+    if (strcmp(argv[2], "cmdline") == 0) {
+        char *line = zig_rsp_command_line((const char *const *)(argv + 3), argc - 3);
+        if (!line)
+            return 1;
+        printf("%s%c", line, '\0');
+        return 0;
+    }
+
+    zig_rsp_args rsp;
+    if (zig_rsp_expand(argc - 3, argv + 3, style, &rsp) != 0)
+        return 1;
+    int i;
+    printf("%d%c", rsp.expanded, '\0');
+    for (i = 0; i < rsp.argc; i++)
+        printf("%s%c", rsp.argv[i], '\0');
+    return 0;
+}
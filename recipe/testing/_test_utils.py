@@ -6,19 +6,40 @@ duplication. Import from this module rather than redefining locally.
 
 from __future__ import annotations
 
+import contextlib
+import functools
+import io
+import json
 import os
 import platform as _platform
+import shutil
 import signal
 import subprocess
 import sys
 import tempfile
+import threading
+import time
+import traceback
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
+from typing import Callable, Iterator
+
+try:
+    import resource
+except ImportError:  # Windows: wall time only
+    resource = None
 
 # ---------------------------------------------------------------------------
 # Result tracking
 # ---------------------------------------------------------------------------
 _results: dict[str, list[str]] = {"PASS": [], "FAIL": [], "WARN": [], "SKIP": []}
 
+# The same results with their details and owning test, for write_reports().
+_checks: list[dict] = []
+_current_test: str | None = None
+
 
 def _record(status: str, name: str, detail: str = "") -> None:
     tag = f"  {status}: {name}"
@@ -26,6 +47,7 @@ def _record(status: str, name: str, detail: str = "") -> None:
         tag += f" ({detail})"
     print(tag)
     _results[status].append(name)
+    _checks.append({"status": status, "name": name, "detail": detail, "test": _current_test})
 
 
 def PASS(name: str, detail: str = "") -> None:
@@ -76,6 +98,27 @@ def setup_zig_global_cache_dir() -> None:
             )
 
 
+@contextlib.contextmanager
+def temp_env(**values: str | None) -> Iterator[None]:
+    """Set each named variable in os.environ (None unsets it) for the
+    duration of the with-block, then restore every one of them as it was
+    before -- including any the block itself changed again."""
+    saved = {k: os.environ.get(k) for k in values}
+    try:
+        for k, v in values.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+        yield
+    finally:
+        for k, v in saved.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+
+
 # ---------------------------------------------------------------------------
 # Emulation detection
 # ---------------------------------------------------------------------------
@@ -96,22 +139,159 @@ _native_machine = _platform.machine()
 _is_emulated = bool(os.environ.get("QEMU_EXECVE", ""))
 
 
+# ---------------------------------------------------------------------------
+# Timeout scaling
+# ---------------------------------------------------------------------------
+# _run() timeouts are sized for a native runner. Under qemu-user every zig
+# invocation is 5-20x slower, and a fixed limit is either spuriously hit or
+# padded for the worst lane. calibrate_timeouts() times a fixed CPU loop
+# and an interpreter start-up (exec + loader, what qemu slows most) against
+# their native-runner figures and scales every _run() timeout by the larger
+# ratio. It measures rather than trusting _is_emulated: binfmt-emulated
+# lanes do not set QEMU_EXECVE. $ZIG_TEST_TIMEOUT_SCALE overrides it.
+# The native figures are per build platform: process creation alone costs
+# several times more on Windows (CreateProcess, Defender scanning the new
+# image) and macOS (dyld, code-signature checks) than on Linux, so a single
+# Linux baseline would read an ordinary Windows/macOS runner as emulated.
+if _build_is_win:
+    _CALIBRATE_LOOP_S = 0.045  # _calibration_loop() on a Windows CI runner
+    _CALIBRATE_SPAWN_S = 0.080  # `python -S -c pass` on the same
+elif _build_is_mac:
+    _CALIBRATE_LOOP_S = 0.040  # _calibration_loop() on a macOS CI runner
+    _CALIBRATE_SPAWN_S = 0.045  # `python -S -c pass` on the same
+else:
+    _CALIBRATE_LOOP_S = 0.035  # _calibration_loop() on an x86_64 CI runner
+    _CALIBRATE_SPAWN_S = 0.020  # `python -S -c pass` on the same
+_MAX_TIMEOUT_SCALE = 40.0
+_timeout_scale = 1.0
+_calibration: dict = {}
+
+
+def _calibration_loop() -> float:
+    t0 = time.perf_counter()
+    x = 0
+    for i in range(300_000):
+        x = (x * 31 + i) & 0xFFFF
+    return time.perf_counter() - t0
+
+
+def _calibration_spawn() -> float:
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, "-S", "-c", "pass"], capture_output=True, timeout=120)
+    return time.perf_counter() - t0
+
+
+def calibrate_timeouts() -> float:
+    """Measure this runner's slowdown and set the _run() timeout scale from
+    it (1.0 below 1.5x, where it is noise; at most _MAX_TIMEOUT_SCALE)."""
+    global _timeout_scale, _calibration
+    override = os.environ.get("ZIG_TEST_TIMEOUT_SCALE", "")
+    if override:
+        _timeout_scale = max(1.0, float(override))
+        _calibration = {"timeout_scale": _timeout_scale, "source": "ZIG_TEST_TIMEOUT_SCALE"}
+        return _timeout_scale
+    loop_s = min(_calibration_loop() for _ in range(3))
+    spawn_s = min(_calibration_spawn() for _ in range(3))
+    slowdown = max(loop_s / _CALIBRATE_LOOP_S, spawn_s / _CALIBRATE_SPAWN_S)
+    _timeout_scale = round(min(slowdown, _MAX_TIMEOUT_SCALE), 1) if slowdown >= 1.5 else 1.0
+    _calibration = {"timeout_scale": _timeout_scale, "source": "measured", "slowdown": round(slowdown, 2),
+                    "loop_s": round(loop_s, 4), "spawn_s": round(spawn_s, 4)}
+    return _timeout_scale
+
+
+def timeout_scale() -> float:
+    """The current _run() timeout scale (1.0 until calibrate_timeouts());
+    also what a wall-clock budget measured on a native runner is scaled by."""
+    return _timeout_scale
+
+
+def describe_calibration() -> str:
+    """One line for a suite's header."""
+    if _calibration.get("source") == "measured":
+        return (f"x{_timeout_scale:g} (measured slowdown {_calibration['slowdown']:.1f}: "
+                f"loop {_calibration['loop_s'] * 1000:.0f} ms, spawn {_calibration['spawn_s'] * 1000:.0f} ms)")
+    if _calibration:
+        return f"x{_timeout_scale:g} (from {_calibration['source']})"
+    return f"x{_timeout_scale:g} (not calibrated)"
+
+
 # ---------------------------------------------------------------------------
 # Subprocess runner
 # ---------------------------------------------------------------------------
+# Every _run() is timed: wall time always; with the resource module (not on
+# Windows) also the CPU its children used and, when it set a new high-water
+# mark for this process's children, their peak RSS. RUSAGE_CHILDREN only
+# keeps a process-wide maximum, so a run below an earlier peak reports
+# max_rss_kb None rather than a number that is not its own. It also sums
+# every thread's children, so a _run() off the main thread (dry_exec_many,
+# prewarm_zig_cache) records neither: its delta would include whatever
+# its sibling threads reaped meanwhile.
+_runs: list[dict] = []
+
+
+def _child_usage() -> tuple[float, int] | None:
+    """(user+sys CPU seconds, peak RSS KiB) over this process's reaped children."""
+    if resource is None:
+        return None
+    ru = resource.getrusage(resource.RUSAGE_CHILDREN)
+    # ru_maxrss is KiB on Linux, bytes on macOS.
+    return ru.ru_utime + ru.ru_stime, ru.ru_maxrss // 1024 if _build_is_mac else ru.ru_maxrss
+
+
+def _usage_since(t0: float, before: tuple[float, int] | None) -> dict:
+    after = _child_usage()
+    usage = {"wall_s": round(time.perf_counter() - t0, 4), "cpu_s": None, "max_rss_kb": None}
+    if before is not None and after is not None:
+        usage["cpu_s"] = round(after[0] - before[0], 4)
+        if after[1] > before[1]:
+            usage["max_rss_kb"] = after[1]
+    return usage
+
+
 def _run(
     cmd: list[str],
     *,
     timeout: int = 30,
     cwd: str | Path | None = None,
+    env: dict[str, str] | None = None,
+) -> subprocess.CompletedProcess[str]:
+    """Run a command, return CompletedProcess. Never raises on non-zero rc.
+
+    timeout is for a native runner; it is multiplied by the calibrated
+    scale (see calibrate_timeouts). env replaces os.environ when given."""
+    on_main = threading.current_thread() is threading.main_thread()
+    t0, before = time.perf_counter(), _child_usage() if on_main else None
+    result = _run_process(cmd, timeout=timeout * _timeout_scale, cwd=cwd, env=env)
+    _runs.append({
+        "cmd": [os.path.basename(str(cmd[0])), *map(str, cmd[1:8])] if cmd else [],
+        "argc": len(cmd),
+        "rc": result.returncode,
+        "timeout_s": timeout * _timeout_scale,
+        "timed_out": result.stderr == "TIMEOUT",
+        "test": _current_test,
+        **_usage_since(t0, before),
+    })
+    return result
+
+
+def _run_process(
+    cmd: list[str],
+    *,
+    timeout: float,
+    cwd: str | Path | None,
+    env: dict[str, str] | None = None,
 ) -> subprocess.CompletedProcess[str]:
-    """Run a command, return CompletedProcess. Never raises on non-zero rc."""
     try:
         proc = subprocess.Popen(
             cmd,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             cwd=cwd,
+            env=env,
+            # Own process group, so the timeout killpg below takes the
+            # wrapper and its zig but not this process (or, under
+            # run_tests, the whole worker pool).
+            start_new_session=not _build_is_win,
         )
     except FileNotFoundError:
         return subprocess.CompletedProcess(cmd, returncode=-1, stdout="", stderr="NOTFOUND")
@@ -147,3 +327,381 @@ def _run(
                     except OSError:
                         pass
         return subprocess.CompletedProcess(cmd, returncode=-1, stdout="", stderr="TIMEOUT")
+
+
+# ---------------------------------------------------------------------------
+# Dry-exec argv capture
+# ---------------------------------------------------------------------------
+# With ZIG_WRAPPER_DRY_EXEC=1 every wrapper (unix mux and the non-unix
+# shims) writes the argv it would hand to zig -- argv[0] first, each entry
+# NUL-terminated -- to stdout and exits 0 instead of running zig.  Argv
+# assertions then cost one wrapper spawn and need no zig install; output
+# that is not NUL-terminated means the wrapper answered (an intercept) or
+# failed before reaching zig.
+
+def parse_dry_exec(stdout: str) -> list[str] | None:
+    """The final argv from a wrapper's dry-exec stdout, or None if it never
+    got as far as exec'ing zig."""
+    if not stdout.endswith("\0"):
+        return None
+    return stdout[:-1].split("\0")
+
+
+def dry_exec(
+    cmd: list[str],
+    *,
+    timeout: int = 30,
+    cwd: str | Path | None = None,
+    env: dict[str, str] | None = None,
+) -> tuple[list[str] | None, subprocess.CompletedProcess[str]]:
+    """Run a wrapper under ZIG_WRAPPER_DRY_EXEC; return (argv, process)
+    with argv as parse_dry_exec() gives it. env defaults to os.environ."""
+    env = dict(os.environ if env is None else env, ZIG_WRAPPER_DRY_EXEC="1")
+    env.pop("ZIG_WRAPPER_PRINT_ARGV", None)
+    result = _run(cmd, timeout=timeout, cwd=cwd, env=env)
+    return parse_dry_exec(result.stdout), result
+
+
+def dry_exec_many(
+    cmds: list[list[str]],
+    *,
+    timeout: int = 30,
+    cwd: str | Path | None = None,
+    env: dict[str, str] | None = None,
+    jobs: int | None = None,
+) -> list[tuple[list[str] | None, subprocess.CompletedProcess[str]]]:
+    """dry_exec() over a batch of command lines, jobs (default: CPU count)
+    at a time; results are in cmds order."""
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as pool:
+        return list(pool.map(lambda cmd: dry_exec(cmd, timeout=timeout, cwd=cwd, env=env), cmds))
+
+
+# ---------------------------------------------------------------------------
+# Parallel test runner
+# ---------------------------------------------------------------------------
+_test_records: list[dict] = []
+_STATUS_RANK = {"FAIL": 3, "WARN": 2, "PASS": 1, "SKIP": 0}
+
+
+def _timed_test(test: Callable[[], None], *, catch: bool = False) -> None:
+    """Run one test, appending its record (timing, checks, runs) to
+    _test_records. With catch, an exception becomes a FAIL, as it would
+    end a serial run with a non-zero exit; without, it propagates."""
+    global _current_test
+    _current_test = test.__name__
+    n_checks, n_runs = len(_checks), len(_runs)
+    t0, before = time.perf_counter(), _child_usage()
+    try:
+        test()
+    except Exception as exc:
+        if not catch:
+            raise
+        print(traceback.format_exc(), end="")
+        FAIL(f"{test.__name__} raised", f"{type(exc).__name__}: {exc}")
+    finally:
+        _current_test = None
+        checks, runs = _checks[n_checks:], _runs[n_runs:]
+        _test_records.append({
+            "name": test.__name__,
+            "status": max((c["status"] for c in checks), key=_STATUS_RANK.get, default="PASS"),
+            **_usage_since(t0, before),
+            "checks": checks,
+            "runs": runs,
+        })
+
+
+def _run_captured(test: Callable[[], None]) -> tuple[str, dict[str, list[str]], dict]:
+    """Run one test with its output captured; return (output, the results
+    it recorded, its test record). The module state is left as it was, so
+    the caller decides where they go."""
+    before = {k: len(v) for k, v in _results.items()}
+    marks = len(_checks), len(_runs), len(_test_records)
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        _timed_test(test, catch=True)
+    record = _test_records[-1]
+    recorded = {k: v[before[k]:] for k, v in _results.items()}
+    for k, v in _results.items():
+        del v[before[k]:]
+    for lst, mark in zip((_checks, _runs, _test_records), marks):
+        del lst[mark:]
+    return out.getvalue(), recorded, record
+
+
+def _init_worker(base: str, timeout_scale: float) -> None:
+    """Per-worker temp dir, for tempfile and for the wrappers/zig it runs;
+    the parent's timeout scale (lost under the spawn start method)."""
+    global _timeout_scale
+    _timeout_scale = timeout_scale
+    tmp = tempfile.mkdtemp(prefix=f"worker-{os.getpid()}-", dir=base)
+    tempfile.tempdir = tmp
+    for var in ("TMPDIR", "TEMP", "TMP"):
+        os.environ[var] = tmp
+
+
+def _run_isolated(test: Callable[[], None], base: str) -> tuple[str, dict[str, list[str]], dict]:
+    """_run_captured in a one-off worker: a test that kills its process
+    (OOM, os._exit, a crash in an extension) becomes a FAIL, not the end
+    of the run."""
+    with ProcessPoolExecutor(max_workers=1, initializer=_init_worker,
+                             initargs=(base, _timeout_scale)) as solo:
+        try:
+            return solo.submit(_run_captured, test).result()
+        except BrokenProcessPool:
+            pass
+    died = functools.partial(FAIL, f"{test.__name__} worker process died")
+    functools.update_wrapper(died, test)
+    return _run_captured(died)
+
+
+def run_tests(
+    tests: list[Callable[[], None]],
+    *,
+    jobs: int = 1,
+    serial: tuple[Callable[[], None], ...] = (),
+    cost: dict[str, float] | None = None,
+) -> None:
+    """Run test functions and report them in the given order.
+
+    jobs <= 1 runs them inline, exactly as calling each in turn would.
+    Otherwise the tests in `serial` (timing-sensitive ones) run first in
+    this process with nothing else running, then the rest run jobs at a
+    time in worker processes, each with its own temp dir; everything else
+    in the environment -- ZIG_GLOBAL_CACHE_DIR in particular, which zig
+    locks per entry -- is shared. Each test's output is printed as one
+    block, in order, and its results merged into _results in that order,
+    so the summary and exit code read as for a serial run. Workers take
+    the tests heaviest first by `cost` (expected seconds by test name,
+    e.g. load_test_costs() of an earlier report; unknown tests keep their
+    order after the known ones), so a long test does not start last and
+    hold the run open on its own. If the pool
+    cannot start, the tests run inline; if a worker dies, each unfinished
+    test is rerun in a worker of its own (see _run_isolated).
+    """
+    if jobs <= 1:
+        for test in tests:
+            _timed_test(test)
+        return
+
+    done = {test: _run_captured(test) for test in tests if test in serial}
+    pending = [test for test in tests if test not in serial]
+    base = tempfile.mkdtemp(prefix="zig_tests_")
+    pool = ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(base, _timeout_scale))
+    try:
+        try:
+            costs = cost or {}
+            heaviest_first = sorted(pending, key=lambda t: -costs.get(t.__name__, 0.0))
+            futures = {test: pool.submit(_run_captured, test) for test in heaviest_first}
+        except (OSError, RuntimeError):
+            futures = {}  # no usable process pool (sandboxed runner, etc.)
+        for test in tests:
+            if test in futures:
+                try:
+                    done[test] = futures[test].result()
+                except BrokenProcessPool:
+                    done[test] = _run_isolated(test, base)
+                except Exception:
+                    # Not a test failure (_run_captured catches those) but
+                    # the hand-off: e.g. a test that does not pickle.
+                    done[test] = _run_captured(test)
+            elif test not in done:
+                done[test] = _run_captured(test)
+            output, recorded, record = done[test]
+            print(output, end="")
+            for status, names in recorded.items():
+                _results[status].extend(names)
+            _checks.extend(record["checks"])
+            _runs.extend(record["runs"])
+            _test_records.append(record)
+    finally:
+        pool.shutdown(cancel_futures=True)
+        shutil.rmtree(base, ignore_errors=True)
+
+
+# ---------------------------------------------------------------------------
+# ZIG_GLOBAL_CACHE_DIR pre-warm
+# ---------------------------------------------------------------------------
+# The first link for a target builds its libc (glibc stubs / musl / mingw),
+# compiler-rt and, for C++, libunwind, libc++abi and libc++ into the global
+# cache -- minutes under qemu. prewarm_zig_cache() does those builds up
+# front, all of a suite's links at once, so the suite's own links (and those
+# of every later suite sharing the cache) are cache hits. zig takes a lock
+# file per cache entry, so the cache cannot be made literally read-only;
+# "shared" here means every suite resolves the same ZIG_GLOBAL_CACHE_DIR.
+_WARM_SOURCES = {
+    "c": ("warm.c", '#include <stdio.h>\nint main(void) { puts("warm"); return 0; }\n'),
+    "c++": ("warm.cpp", "#include <stdexcept>\n#include <string>\n"
+                        "int main(int argc, char **) {\n"
+                        '    try { if (argc > 8) throw std::runtime_error("warm"); }\n'
+                        "    catch (const std::exception &e) { return (int)std::string(e.what()).size(); }\n"
+                        "    return 0;\n}\n"),
+}
+_WARM_RUNTIMES = {
+    "c": ("c", "compiler_rt"),
+    "c++": ("c", "compiler_rt", "unwind", "c++abi", "c++"),
+}
+
+
+def _cached_runtimes(cache: Path) -> set[tuple[str, str]]:
+    """(runtime, o/ entry) for every runtime library in the cache; the
+    runtime is the library stem (libc++.a -> "c++", glibc's libc.so.6 -> "c")."""
+    found: set[tuple[str, str]] = set()
+    try:
+        entries = list(os.scandir(cache / "o"))
+    except OSError:
+        return found
+    for entry in entries:
+        try:
+            names = os.listdir(entry.path)
+        except OSError:
+            continue
+        for name in names:
+            stem, ext = os.path.splitext(name)
+            if name == "libc.so.6":
+                found.add(("c", entry.name))
+            elif ext in (".a", ".lib") and stem.startswith("lib"):
+                found.add((stem[3:], entry.name))
+    return found
+
+
+def prewarm_zig_cache(links: list[tuple[list[str], str, str]], *, jobs: int | None = None,
+                      timeout: int = 600) -> dict:
+    """Run each (compiler argv, "c" | "c++", output name) link of a small
+    program, up to `jobs` at a time (default: all at once), and report
+    which of the runtimes they need were already cached (hit) or had to be
+    built (miss). Failed links are only counted -- the tests that need
+    the same link report them properly."""
+    setup_zig_global_cache_dir()
+    cache = Path(os.environ["ZIG_GLOBAL_CACHE_DIR"])
+    needed = {rt for _, lang, _ in links for rt in _WARM_RUNTIMES[lang]}
+    t0 = time.perf_counter()
+    before = _cached_runtimes(cache)
+    with tempfile.TemporaryDirectory() as td:
+        for name, text in _WARM_SOURCES.values():
+            Path(td, name).write_text(text)
+
+        def link(spec: tuple[list[str], str, str]) -> subprocess.CompletedProcess:
+            argv, lang, out = spec
+            return _run([*argv, _WARM_SOURCES[lang][0], "-o", out], cwd=td, timeout=timeout)
+
+        with ThreadPoolExecutor(max_workers=max(1, jobs or len(links))) as pool:
+            results = list(pool.map(link, links))
+    built = {rt for rt, _ in _cached_runtimes(cache) - before}
+    cached = {rt for rt, _ in before}
+    stats = {
+        "hit": sorted(needed & cached - built),
+        "miss": sorted(needed & built),
+        "failed": sum(r.returncode != 0 for r in results),
+        "wall_s": round(time.perf_counter() - t0, 2),
+    }
+    line = f"  [warm] {cache}: {len(stats['hit'])} hit, {len(stats['miss'])} miss"
+    if stats["miss"]:
+        line += f" (built {', '.join('lib' + rt for rt in stats['miss'])})"
+    if stats["failed"]:
+        line += f", {stats['failed']}/{len(links)} links failed"
+    print(f"{line} in {stats['wall_s']:.1f} s")
+    return stats
+
+
+# ---------------------------------------------------------------------------
+# Structured reports
+# ---------------------------------------------------------------------------
+_REPORT_VERSION = 1
+
+
+def _loose_record() -> dict | None:
+    """Checks recorded outside any test function, as a pseudo-test."""
+    loose = [c for c in _checks if c["test"] is None]
+    if not loose:
+        return None
+    return {"name": "(top level)",
+            "status": max((c["status"] for c in loose), key=_STATUS_RANK.get),
+            "wall_s": 0.0, "cpu_s": None, "max_rss_kb": None,
+            "checks": loose, "runs": [r for r in _runs if r["test"] is None]}
+
+
+def report(suite: str, meta: dict | None = None) -> dict:
+    """The run as one JSON-able dict: per test, its status (worst check),
+    wall/child-CPU/peak-RSS and every check and _run() it made."""
+    tests = list(_test_records)
+    loose = _loose_record()
+    if loose:
+        tests.append(loose)
+    return {
+        "version": _REPORT_VERSION,
+        "suite": suite,
+        "platform": sys.platform,
+        "machine": _native_machine,
+        "meta": meta or {},
+        "calibration": _calibration or {"timeout_scale": _timeout_scale},
+        "counts": {k: len(v) for k, v in _results.items()},
+        "tests": tests,
+    }
+
+
+def _junit(rep: dict) -> ET.ElementTree:
+    """One <testcase> per test function (time = its wall time); FAILs
+    become its <failure>, an all-SKIP test <skipped>, and every check is
+    listed in <system-out>."""
+    root = ET.Element("testsuites")
+    tests = rep["tests"]
+    suite = ET.SubElement(root, "testsuite", {
+        "name": rep["suite"],
+        "tests": str(len(tests)),
+        "failures": str(sum(t["status"] == "FAIL" for t in tests)),
+        "skipped": str(sum(t["status"] == "SKIP" for t in tests)),
+        "errors": "0",
+        "time": f"{sum(t['wall_s'] for t in tests):.3f}",
+    })
+    for t in tests:
+        case = ET.SubElement(suite, "testcase", {"classname": rep["suite"], "name": t["name"],
+                                                 "time": f"{t['wall_s']:.3f}"})
+        failed = [c for c in t["checks"] if c["status"] == "FAIL"]
+        if failed:
+            failure = ET.SubElement(case, "failure", {"message": "; ".join(c["name"] for c in failed)})
+            failure.text = "\n".join(f"{c['name']}: {c['detail']}" for c in failed)
+        elif t["status"] == "SKIP":
+            ET.SubElement(case, "skipped", {"message": "; ".join(c["detail"] or c["name"] for c in t["checks"])})
+        out = ET.SubElement(case, "system-out")
+        out.text = "\n".join(f"{c['status']}: {c['name']}" + (f" ({c['detail']})" if c["detail"] else "")
+                             for c in t["checks"])
+    return ET.ElementTree(root)
+
+
+def write_reports(suite: str, *, json_path: str | Path | None = None, junit_path: str | Path | None = None,
+                  meta: dict | None = None) -> None:
+    """Write report() as JSON and/or JUnit XML (compare_test_reports.py
+    diffs two JSON reports)."""
+    rep = report(suite, meta)
+    if json_path:
+        Path(json_path).write_text(json.dumps(rep, indent=1) + "\n")
+    if junit_path:
+        tree = _junit(rep)
+        ET.indent(tree)
+        tree.write(str(junit_path), encoding="utf-8", xml_declaration=True)
+
+
+def load_test_costs(path: str | Path | None) -> dict[str, float]:
+    """{test name: wall seconds} from an earlier JSON report, for run_tests'
+    cost; {} when there is none."""
+    if not path:
+        return {}
+    try:
+        rep = json.loads(Path(path).read_text())
+        return {t["name"]: float(t["wall_s"]) for t in rep["tests"]}
+    except (OSError, ValueError, KeyError, TypeError):
+        return {}
+
+
+def print_slowest(n: int = 5) -> None:
+    """The n slowest tests of the run, with their slowest _run()."""
+    if not _test_records:
+        return
+    print("\n=== Slowest tests (wall s / child CPU s) ===")
+    for t in sorted(_test_records, key=lambda t: -t["wall_s"])[:n]:
+        cpu = "-" if t["cpu_s"] is None else f"{t['cpu_s']:.2f}"
+        line = f"  {t['wall_s']:>8.2f} {cpu:>8}  {t['name']}"
+        if t["runs"]:
+            slow = max(t["runs"], key=lambda r: r["wall_s"])
+            line += f"  (slowest run {slow['wall_s']:.2f}s: {' '.join(slow['cmd'][:4])})"
+        print(line)
@@ -18,6 +18,10 @@
  *   - sysroot        -> "" (fixed; mirrors the empty _sr the bash leg
  *                       resolves in the parity test's tmpdir env -- see the
  *                       comment at the profile.sysroot assignment below)
+ *   - probes         -> NULL (R14 falls through), unless
+ *                       $ZIG_TR_HARNESS_PROBES holds the baked answers as
+ *                       out \x1f err \x1f out ... (2 * ZIG_TR_N_PROBES
+ *                       fields, flag_rules.py's probe order)
  *   - *out_mode_is_cxx is initialized to 1 for "cxx" mode, 0 for "cc" mode
  *     BEFORE calling zig_translate_flags, per the caller-owns-init
  *     convention documented in _translate.inc (R4 only ever downgrades
@@ -34,6 +38,16 @@
  * from a normal translation.
  *
  * On allocation failure (return 1): harness exits with status 1.
+ *
+ * Batch mode (testing/fuzz_flag_translation.py):
+ *   _translate_harness --batch < cases
+ * reads one case per line, fields separated by \x1f:
+ *   <unix|win> \x1f <cc|cxx> [\x1f flag ...]
+ * and for each case writes a "\x1e\n" frame marker, then either
+ *   R\x1f<use_lld>\x1f<mode_cxx>[\x1f<token> ...]\n      (return 0)
+ * or whatever zig_translate_flags() printed followed by "\x1d2\n"
+ * (intercept; "\x1d1\n" on allocation failure). One process runs every
+ * case, so the caller pays one exec per batch instead of one per case.
  */
 #include <string.h>
 #include <stdlib.h>
@@ -41,33 +55,125 @@
 
 #include "_translate.inc"
 
-int main(int argc, char *argv[]) {
-    if (argc < 3) {
-        fprintf(stderr, "usage: %s <unix|win> <cc|cxx> [flags...]\n", argv[0]);
-        return 1;
-    }
-
-    const char *profile_name = argv[1];
-    const char *mode_name = argv[2];
+static const char *harness_probes[2 * ZIG_TR_N_PROBES];
+static const char *const *harness_probes_in_use = NULL;
 
-    const char *conda_prefix = getenv("CONDA_PREFIX");
-    if (!conda_prefix || conda_prefix[0] == '\0') conda_prefix = "/opt/conda";
+/* $ZIG_TR_HARNESS_PROBES -> harness_probes, split in place. A short or
+ * missing value leaves every probe unbaked. */
+static void load_probes(void) {
+    const char *env = getenv("ZIG_TR_HARNESS_PROBES");
+    char *p;
+    int n = 0;
+    if (!env || !(p = (char *)malloc(strlen(env) + 1))) return;
+    strcpy(p, env);
+    harness_probes[n++] = p;
+    for (; *p && n < 2 * ZIG_TR_N_PROBES; p++) {
+        if (*p == '\x1f') {
+            *p = '\0';
+            harness_probes[n++] = p + 1;
+        }
+    }
+    if (n == 2 * ZIG_TR_N_PROBES)
+        harness_probes_in_use = harness_probes;
+}
 
-    zig_translate_profile profile;
+static void init_profile(zig_translate_profile *profile, const char *profile_name, const char *conda_prefix) {
     if (strcmp(profile_name, "win") == 0) {
-        profile.is_win = 1;
-        profile.is_win_target = 1;
+        profile->is_win = 1;
+        profile->is_win_target = 1;
     } else {
-        profile.is_win = 0;
-        profile.is_win_target = 0;
+        profile->is_win = 0;
+        profile->is_win_target = 0;
     }
-    profile.conda_prefix = conda_prefix;
-    profile.zig_target_arch = "x86_64";
+    profile->conda_prefix = conda_prefix;
+    profile->zig_target_arch = "x86_64";
     /* The parity env yields an empty _sr on the bash leg: CONDA_PREFIX is a
      * tmpdir with no <arch>-conda-linux-gnu/sysroot, and CONDA_BUILD_SYSROOT is
      * popped by the test (test_flag_translation_parity.py:161). "" is the
      * faithful mirror. Real sysroot resolution belongs to the Phase 3a shim. */
-    profile.sysroot = "";
+    profile->sysroot = "";
+    profile->probes = harness_probes_in_use;
+}
+
+/* One '\n'-terminated line from f (terminator stripped), malloc'd; NULL at EOF. */
+static char *read_line(FILE *f) {
+    size_t cap = 256, len = 0;
+    char *buf = (char *)malloc(cap);
+    int ch;
+    if (!buf) return NULL;
+    while ((ch = fgetc(f)) != EOF && ch != '\n') {
+        if (len + 1 >= cap) {
+            char *grown = (char *)realloc(buf, cap *= 2);
+            if (!grown) { free(buf); return NULL; }
+            buf = grown;
+        }
+        buf[len++] = (char)ch;
+    }
+    if (ch == EOF && len == 0) { free(buf); return NULL; }
+    buf[len] = '\0';
+    return buf;
+}
+
+static int run_batch(const char *conda_prefix) {
+    char *line;
+    while ((line = read_line(stdin)) != NULL) {
+        int nfields = 1;
+        for (char *p = line; *p; p++) nfields += (*p == '\x1f');
+        char **fields = (char **)malloc(sizeof(char *) * (size_t)nfields);
+        if (!fields) return 1;
+        int nf = 0;
+        fields[nf++] = line;
+        for (char *p = line; *p; p++) {
+            if (*p == '\x1f') {
+                *p = '\0';
+                fields[nf++] = p + 1;
+            }
+        }
+
+        zig_translate_profile profile;
+        init_profile(&profile, fields[0], conda_prefix);
+        int out_mode_is_cxx = (nf > 1 && strcmp(fields[1], "cxx") == 0) ? 1 : 0;
+        char **out_argv = NULL;
+        int out_argc = 0;
+        int out_use_lld = 0;
+
+        fputs("\x1e\n", stdout);
+        int rc = nf > 2 ? zig_translate_flags(nf - 2, fields + 2, &profile,
+                                              &out_argv, &out_argc, &out_use_lld, &out_mode_is_cxx)
+                        : zig_translate_flags(0, fields, &profile,
+                                              &out_argv, &out_argc, &out_use_lld, &out_mode_is_cxx);
+        if (rc != 0) {
+            printf("\x1d%d\n", rc);
+        } else {
+            printf("R\x1f%d\x1f%d", out_use_lld, out_mode_is_cxx);
+            for (int i = 0; i < out_argc; i++) printf("\x1f%s", out_argv[i]);
+            putchar('\n');
+            free(out_argv);
+        }
+        free(fields);
+        free(line);
+    }
+    return 0;
+}
+
+int main(int argc, char *argv[]) {
+    const char *conda_prefix = getenv("CONDA_PREFIX");
+    if (!conda_prefix || conda_prefix[0] == '\0') conda_prefix = "/opt/conda";
+    load_probes();
+
+    if (argc == 2 && strcmp(argv[1], "--batch") == 0)
+        return run_batch(conda_prefix);
+
+    if (argc < 3) {
+        fprintf(stderr, "usage: %s <unix|win> <cc|cxx> [flags...]\n       %s --batch < cases\n", argv[0], argv[0]);
+        return 1;
+    }
+
+    const char *profile_name = argv[1];
+    const char *mode_name = argv[2];
+
+    zig_translate_profile profile;
+    init_profile(&profile, profile_name, conda_prefix);
 
     /* Caller-owned init per _translate.inc contract: 1 for "cxx", 0 for "cc". */
     int out_mode_is_cxx = (strcmp(mode_name, "cxx") == 0) ? 1 : 0;
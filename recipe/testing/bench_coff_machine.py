@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Benchmark + consistency check for recipe/building/coff_machine.py batch mode.
+
+coff_machine.py used to read each archive with small fh.read() calls,
+member by member, and stop at the first real member. The batch scanner
+maps each file once, visits every member through the `/` symbol table and
+fans thousands of files out over worker processes. This script times
+both over the trees _mingw.sh generates -- lib-common/ (x86_64),
+libarm64/ and lib32/ -- and checks the scanner's answers:
+
+  1. Corpus: the installed zig's libc/mingw/{lib-common,libarm64,lib32}
+     under $CONDA_PREFIX / $PREFIX (or --root), else a synthetic tree of
+     --synthetic archives per arch written with coff_implib (the same
+     writer _mingw.sh uses), sized like the real one.
+  2. Timing: the legacy first-member reader (kept below for contrast;
+     it stops after ONE member, so it is a floor, not a like-for-like
+     baseline), scan_many(jobs=1) and scan_many(jobs=N), as files/s.
+  3. Checks: every archive in an arch dir whose members all carry one
+     known machine reports that machine and is not flagged mixed; the
+     first-member answer agrees with the legacy reader wherever the
+     legacy reader could answer; and a planted x86_64+arm64 archive is
+     flagged mixed.
+
+Timings are reported, not gated.
+
+Usage:
+    python testing/bench_coff_machine.py [--root DIR] [--synthetic N] [--jobs N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from _test_utils import PASS, FAIL, _results
+
+# Anchor: see test_flag_translation_parity.py -- parents[1] is recipe/ at
+# dev time and the staged step dir at rattler test time.
+_RECIPE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(_RECIPE_DIR / "building"))
+
+import coff_implib  # noqa: E402
+import coff_machine  # noqa: E402
+
+_ARCH_DIRS = {"lib-common": "x86_64", "libarm64": "arm64", "lib32": "i386"}
+_DLLTOOL_MACHINE = {"x86_64": "i386:x86-64", "arm64": "arm64", "i386": "i386"}
+
+
+def _legacy_detect(path: str) -> str:
+    """The pre-batch coff_machine.detect_machine(), verbatim in behaviour."""
+    try:
+        with open(path, "rb") as fh:
+            if fh.read(8) != coff_machine.ARCHIVE_MAGIC:
+                return "UNKNOWN"
+            while True:
+                header = fh.read(coff_machine.MEMBER_HEADER_SIZE)
+                if len(header) < coff_machine.MEMBER_HEADER_SIZE:
+                    return "UNKNOWN"
+                name = header[0:16].decode("ascii", errors="replace").strip()
+                if header[58:60] != b"`\n":
+                    return "UNKNOWN"
+                try:
+                    size = int(header[48:58].decode("ascii", errors="replace").strip())
+                except ValueError:
+                    return "UNKNOWN"
+                data = fh.read(size)
+                if len(data) < size:
+                    return "UNKNOWN"
+                if size % 2 == 1:
+                    fh.read(1)
+                if name.startswith("/"):
+                    continue
+                return coff_machine._machine_name(data)
+    except (OSError, ValueError):
+        return "UNKNOWN"
+
+
+def _installed_root() -> Path | None:
+    for env in ("CONDA_PREFIX", "PREFIX"):
+        root = os.environ.get(env)
+        if not root:
+            continue
+        for sub in ("lib/zig", "Library/lib/zig"):
+            cand = Path(root) / sub / "libc" / "mingw"
+            if (cand / "lib-common").is_dir():
+                return cand
+    return None
+
+
+def _synthesize(root: Path, per_arch: int) -> None:
+    rng = random.Random(0)
+    for sub, arch in _ARCH_DIRS.items():
+        (root / sub).mkdir(parents=True)
+        machine = coff_implib.MACHINES[_DLLTOOL_MACHINE[arch]]
+        for i in range(per_arch):
+            # Every 8th DLL name is long enough to need the `//` name table.
+            dll = f"api-ms-win-synthetic-l1-1-{i}.dll" if i % 8 == 0 else f"syn{i}.dll"
+            exports = [coff_implib.Export(name=f"Func{i}_{k}", data=(k % 7 == 0))
+                       for k in range(rng.randint(5, 400))]
+            data = coff_implib.write_import_library(dll, exports, machine)
+            (root / sub / f"libsyn{i}.a").write_bytes(data)
+
+
+def _plant_mixed(path: Path) -> None:
+    """An archive whose members alternate x86_64 and arm64 short imports."""
+    members = []
+    for i, machine in enumerate((coff_implib.IMAGE_FILE_MACHINE_AMD64, coff_implib.IMAGE_FILE_MACHINE_ARM64)):
+        of = coff_implib._ObjectFactory("mixed.dll", machine)
+        members.append((of.short_import(f"f{i}", 0, coff_implib.IMPORT_CODE, coff_implib.IMPORT_NAME),
+                        [f"__imp_f{i}", f"f{i}"]))
+    path.write_bytes(coff_implib._write_archive("mixed.dll", members))
+
+
+def _timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - t0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--root", help="dir holding lib-common/, libarm64/, lib32/")
+    parser.add_argument("--synthetic", type=int, default=1500,
+                        help="archives per arch when no installed tree is found")
+    parser.add_argument("--jobs", type=int, default=0, help="worker processes (default CPU_COUNT)")
+    args = parser.parse_args()
+
+    print("=== coff_machine batch scanner benchmark ===")
+    with tempfile.TemporaryDirectory(prefix="coff_machine_bench_") as td:
+        root = Path(args.root) if args.root else _installed_root()
+        if root is None:
+            root = Path(td) / "mingw"
+            _synthesize(root, args.synthetic)
+            print(f"  corpus: synthetic, {args.synthetic} archives x {len(_ARCH_DIRS)} arches")
+        else:
+            print(f"  corpus: {root}")
+
+        expected: dict[str, str] = {}
+        for sub, arch in _ARCH_DIRS.items():
+            for path in coff_machine._expand([str(root / sub)]):
+                expected[path] = arch
+        paths = sorted(expected)
+        if not paths:
+            FAIL("[bench] corpus", f"no .a/.lib files under {root}")
+            return 1
+
+        legacy, t_legacy = _timed(lambda: [_legacy_detect(p) for p in paths])
+        serial, t_serial = _timed(lambda: coff_machine.scan_many(paths, jobs=1))
+        parallel, t_parallel = _timed(lambda: coff_machine.scan_many(paths, jobs=args.jobs))
+        members = sum(info["members"] for info in serial)
+
+        print(f"  {len(paths)} archives, {members} members")
+        print(f"  {'reader':<28} {'seconds':>8} {'files/s':>10}")
+        for label, secs in (("legacy first-member reads", t_legacy), ("scan_many jobs=1", t_serial),
+                            (f"scan_many jobs={args.jobs or 'CPU_COUNT'}", t_parallel)):
+            print(f"  {label:<28} {secs:>8.3f} {len(paths) / secs if secs else 0:>10.0f}")
+
+        if [i["machine"] for i in serial] != [i["machine"] for i in parallel] or \
+                [i["machines"] for i in serial] != [i["machines"] for i in parallel]:
+            FAIL("[bench] serial and parallel scans agree")
+        else:
+            PASS("[bench] serial and parallel scans agree", f"{len(paths)} archives")
+
+        disagree = [p for p, old, new in zip(paths, legacy, serial) if old != "UNKNOWN" and old != new["machine"]]
+        if disagree:
+            FAIL("[bench] first-member machine matches the legacy reader", f"{len(disagree)} differ, e.g. {disagree[0]}")
+        else:
+            recovered = sum(1 for old, new in zip(legacy, serial) if old == "UNKNOWN" and new["machine"] != "UNKNOWN")
+            PASS("[bench] first-member machine matches the legacy reader",
+                 f"{recovered} archive(s) the legacy reader reported UNKNOWN now resolve")
+
+        wrong = [i["path"] for i in serial
+                 if len(i["machines"]) == 1 and "UNKNOWN" not in i["machines"]
+                 and (i["machine"] != expected[i["path"]] or i["mixed"])]
+        if wrong:
+            FAIL("[bench] single-arch archives report their dir's arch", f"{len(wrong)} wrong, e.g. {wrong[0]}")
+        else:
+            PASS("[bench] single-arch archives report their dir's arch")
+        mixed = [i["path"] for i in serial if i["mixed"]]
+        if mixed:
+            print(f"  NOTE: {len(mixed)} mixed-arch archive(s) in the corpus, e.g. {mixed[0]}")
+
+        planted = Path(td) / "libmixed.a"
+        _plant_mixed(planted)
+        info = coff_machine.scan_archive(str(planted))
+        if info["mixed"] and info["machines"] == {"x86_64": 1, "arm64": 1} and info["indexed"]:
+            PASS("[bench] planted x86_64+arm64 archive flagged mixed")
+        else:
+            FAIL("[bench] planted x86_64+arm64 archive flagged mixed", str(info))
+
+    n_fail = len(_results["FAIL"])
+    print(f"\n=== Results: {len(_results['PASS'])} passed, {n_fail} failed ===")
+    return 1 if n_fail else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
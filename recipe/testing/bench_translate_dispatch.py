@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the generated flag-translation dispatcher
+(recipe/building/gen_translators.py -> _translate.inc zig_tr_classify()).
+
+gen_translators flattens RULES into (form, pattern, class) rows and emits
+them as a compile-time radix trie, so classifying one argv token costs a
+walk bounded by the token's length -- NOT by the number of rules. This
+script demonstrates that claim rather than asserting it from the source:
+
+  1. Start from the real table (gen_translators._token_table(RULES)) and
+     pad it with N synthetic exact/prefix rows for N in _SCALES (shaped
+     like real flags: -Wl,--*, -f*=, -print-*, so they land in the same
+     trie branches as the real ones).
+  2. For each N, emit BOTH the trie classifier (_c_classify_fn, exactly
+     what ships in _translate.inc) and, for contrast, the pre-trie shape
+     -- one strcmp/strncmp per row in first-match order -- into one C
+     driver, compile it with cc -O2, and time classification of a fixed
+     realistic compile/link argv (passed on the command line so the
+     compiler cannot constant-fold the lookups).
+  3. Report ns/token per N for both shapes.
+
+Gate: PASS when the trie's ns/token at the largest N stays within
+_MAX_GROWTH x its N=0 figure. The linear chain's growth is reported
+only (it is the baseline being replaced, not something to gate on).
+
+Needs only python + a C compiler; SKIPs when no cc/gcc/clang is on
+PATH.
+
+Usage:
+    python testing/bench_translate_dispatch.py [--iters N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from _test_utils import PASS, FAIL, SKIP, _results
+
+# Anchor: see test_flag_translation_parity.py -- parents[1] is recipe/ at
+# dev time and the staged step dir at rattler test time.
+_RECIPE_DIR = Path(__file__).resolve().parents[1]
+_BUILDING_DIR = _RECIPE_DIR / "building"
+sys.path.insert(0, str(_BUILDING_DIR))
+
+import gen_translators  # noqa: E402
+from flag_rules import RULES  # noqa: E402
+
+_SCALES = (0, 64, 512, 4096)
+_MAX_GROWTH = 2.0
+_REPEATS = 5
+
+# One realistic conda-build compile+link line: mostly unclassified tokens
+# (the common case), plus a sprinkling of every rule family.
+_CORPUS = [
+    "-O2", "-g", "-fPIC", "-pipe", "-DNDEBUG", "-Wall", "-Wextra",
+    "-I/opt/conda/include", "-isystem", "/opt/conda/include/python3.12",
+    "-fdebug-prefix-map=/src=/usr/local/src/conda/pkg",
+    "-march=nocona", "-mtune=haswell", "-mcpu=native",
+    "-target", "x86_64-conda-linux-gnu", "--target=aarch64-conda-linux-gnu",
+    "-c", "src/module.c", "-o", "build/module.o",
+    "-Wl,-O2", "-Wl,--sort-common", "-Wl,--as-needed", "-Wl,-z,relro",
+    "-Wl,-z,now", "-Wl,-z,defs", "-Wl,--disable-new-dtags",
+    "-Wl,--gc-sections", "-Wl,--color-diagnostics",
+    "-Wl,-rpath,/opt/conda/lib", "-Wl,-rpath-link,/opt/conda/lib",
+    "-Xlinker", "-Bsymbolic", "-Wl,-Bsymbolic-functions",
+    "-L/opt/conda/lib", "-lz", "-lm", "-nostdlib++", "-Map=out.map",
+    "build/a.o", "build/b.o", "libfoo.a",
+]
+
+
+def _padded_rows(n: int) -> list[tuple[str, str, str]]:
+    rows = list(gen_translators._token_table(RULES))
+    for i in range(n):
+        shape = i % 3
+        if shape == 0:
+            rows.append(("exact", f"-Wl,--bench-exact-{i}", "R7_DROP_ALWAYS"))
+        elif shape == 1:
+            rows.append(("prefix", f"-fbench-prefix-{i}=", "R7_DROP_ALWAYS"))
+        else:
+            rows.append(("exact", f"-print-bench-{i}", "R7_DROP_ALWAYS"))
+    return rows
+
+
+def _linear_classify_fn(rows: list[tuple[str, str, str]]) -> str:
+    """The pre-trie shape: one test per row, exact rows first then prefix
+    rows longest-first (first match == longest match, as in the bash
+    jump table)."""
+    ordered = [r for r in rows if r[0] == "exact"]
+    ordered += sorted((r for r in rows if r[0] == "prefix"), key=lambda r: -len(r[1]))
+    lines = ["static int zig_tr_classify_linear(const char *a) {"]
+    for form, pattern, cls in ordered:
+        lit = gen_translators._c_str(pattern)
+        if form == "exact":
+            lines.append(f'    if (strcmp(a, "{lit}") == 0) return ZIG_TR_TOK_{cls};')
+        else:
+            lines.append(f'    if (strncmp(a, "{lit}", {len(pattern)}) == 0) return ZIG_TR_TOK_{cls};')
+    lines.append("    return ZIG_TR_TOK_NONE;")
+    lines.append("}")
+    return "\n".join(lines)
+
+
+def _driver_source(rows: list[tuple[str, str, str]]) -> str:
+    return "\n".join([
+        "#define _POSIX_C_SOURCE 199309L",
+        "#include <stdio.h>",
+        "#include <stdlib.h>",
+        "#include <string.h>",
+        "#include <time.h>",
+        "",
+        gen_translators._c_token_enum(gen_translators._token_classes(RULES)),
+        "",
+        gen_translators._c_classify_fn(rows),
+        "",
+        _linear_classify_fn(rows),
+        "",
+        """static double elapsed_ns(struct timespec t0, struct timespec t1) {
+    return (double)(t1.tv_sec - t0.tv_sec) * 1e9 + (double)(t1.tv_nsec - t0.tv_nsec);
+}
+
+/* usage: driver <trie iters> <linear iters> token...
+ * prints "<trie ns/token> <linear ns/token>" */
+int main(int argc, char **argv) {
+    long iters = atol(argv[1]);
+    long linear_iters = atol(argv[2]);
+    char **toks = argv + 3;
+    int ntok = argc - 3;
+    volatile unsigned sink = 0;
+    struct timespec t0, t1, t2;
+    long it;
+    int k;
+    clock_gettime(CLOCK_MONOTONIC, &t0);
+    for (it = 0; it < iters; it++)
+        for (k = 0; k < ntok; k++) sink += (unsigned)zig_tr_classify(toks[k]);
+    clock_gettime(CLOCK_MONOTONIC, &t1);
+    for (it = 0; it < linear_iters; it++)
+        for (k = 0; k < ntok; k++) sink += (unsigned)zig_tr_classify_linear(toks[k]);
+    clock_gettime(CLOCK_MONOTONIC, &t2);
+    printf("%.3f %.3f\\n", elapsed_ns(t0, t1) / ((double)iters * ntok),
+           elapsed_ns(t1, t2) / ((double)linear_iters * ntok));
+    return 0;
+}
+""",
+    ])
+
+
+def _measure(cc: str, workdir: Path, n: int, iters: int) -> tuple[float, float] | None:
+    src = workdir / f"bench_{n}.c"
+    exe = workdir / f"bench_{n}"
+    src.write_text(_driver_source(_padded_rows(n)))
+    proc = subprocess.run([cc, "-O2", "-std=c99", str(src), "-o", str(exe)],
+                          capture_output=True, text=True, timeout=300)
+    if proc.returncode != 0:
+        FAIL(f"[bench] compile N={n}", proc.stderr.strip()[:500])
+        return None
+    # The linear chain slows down ~proportionally to N; scale its pass
+    # count down so the largest N does not dominate the run time.
+    linear_iters = max(1, iters * 64 // (64 + n))
+    best_trie = best_linear = float("inf")
+    for _ in range(_REPEATS):
+        out = subprocess.run([str(exe), str(iters), str(linear_iters), *_CORPUS],
+                             capture_output=True, text=True, timeout=300)
+        trie_ns, linear_ns = (float(x) for x in out.stdout.split())
+        best_trie = min(best_trie, trie_ns)
+        best_linear = min(best_linear, linear_ns)
+    return best_trie, best_linear
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iters", type=int, default=20000, help="passes over the argv corpus per timing run")
+    args = parser.parse_args()
+
+    print("=== zig_tr_classify dispatch micro-benchmark ===")
+    cc = shutil.which("cc") or shutil.which("gcc") or shutil.which("clang")
+    if not cc:
+        SKIP("[bench] dispatch scaling", "no C compiler found on PATH")
+        return 0
+
+    results: dict[int, tuple[float, float]] = {}
+    with tempfile.TemporaryDirectory(prefix="zig_tr_bench_") as td:
+        for n in _SCALES:
+            m = _measure(cc, Path(td), n, args.iters)
+            if m is None:
+                return 1
+            results[n] = m
+
+    base_rows = len(gen_translators._token_table(RULES))
+    print(f"  {'rows':>6}  {'trie ns/tok':>12}  {'linear ns/tok':>14}")
+    for n, (trie_ns, linear_ns) in results.items():
+        print(f"  {base_rows + n:>6}  {trie_ns:>12.2f}  {linear_ns:>14.2f}")
+
+    lo, hi = results[_SCALES[0]][0], results[_SCALES[-1]][0]
+    growth = hi / lo if lo > 0 else float("inf")
+    linear_growth = results[_SCALES[-1]][1] / results[_SCALES[0]][1]
+    detail = f"trie x{growth:.2f}, linear x{linear_growth:.2f} from {base_rows} to {base_rows + _SCALES[-1]} rows"
+    if growth <= _MAX_GROWTH:
+        PASS("[bench] trie per-token cost independent of rule count", detail)
+    else:
+        FAIL("[bench] trie per-token cost independent of rule count", f"{detail}; limit x{_MAX_GROWTH}")
+
+    n_fail = len(_results["FAIL"])
+    print(f"\n=== Results: {len(_results['PASS'])} passed, {n_fail} failed ===")
+    return 1 if n_fail else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the per-invocation cost of the unix compiler wrappers.
+
+zig-cc-unix.c (the compiled busybox-style multiplexer) replaced the bash
+wrappers -- zig-cc.sh sourcing _zig-cc-common.sh + _translate.gen.sh, and
+the one-line zig-ar.sh / zig-ranlib.sh passthroughs -- to cut the startup
+cost every compile and archive step of a build pays. This script measures
+that cost instead of assuming it. Each case is run through three arms:
+
+  direct  -- the zig binary itself, with the argv the wrapper would pass
+             (the floor: one process spawn)
+  shim    -- zig-cc-unix.c, compiled here with cc -O2 and hard-linked as
+             zig-cc / zig-ar / zig-ranlib, the way the package installs it
+  bash    -- the retired bash wrappers, rebuilt from the shipped
+             fragments (zig-ar.sh's thin-archive strip as zig-cc-unix.c
+             documents it)
+
+"zig" is a stub that exits 0, so only wrapper overhead is timed. A small C
+driver posix_spawn()s each arm N times (stdout/stderr on /dev/null, the
+arms taking turns) and records every run's wall time; the report gives
+p50/p90/p99 per case and arm, and the shim's p50 overhead over direct.
+
+The opt-in translation cache (ZIG_WRAPPER_TRANSLATE_CACHE) saves tens of
+microseconds at most, well inside spawn-time noise, so it is timed from
+the shim's own ZIG_WRAPPER_TRACE records instead: the compile line's
+STEP 1b onwards (cache lookup, then translation if it missed), uncached
+vs warm-cache hits.
+
+Gates:
+  - shim p50 overhead over direct <= _MAX_SHIM_OVERHEAD_US per case,
+    scaled by the runner's measured slowdown (_test_utils.calibrate_timeouts)
+  - shim p50 below bash p50 per case (what replacing bash was for)
+  - a warm cache hit cheaper than translating; WARN, not FAIL, when it is
+    not -- the cache is off by default and this is the figure that says
+    whether turning it on pays
+  - with --baseline (a previous --json): no case's shim p50 overhead grew
+    past --max-ratio x its baseline figure, nor by more than
+    _NOISE_FLOOR_US where that is larger (a near-zero baseline overhead
+    makes the ratio alone meaningless)
+
+Needs python, a C compiler and a POSIX system; the bash arm also needs
+bash.
+
+Usage:
+    python testing/bench_wrapper_overhead.py [--iters N] [--bash-iters N]
+        [--json PATH] [--baseline PATH] [--max-ratio R]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from _test_utils import PASS, FAIL, SKIP, WARN, _results, calibrate_timeouts, describe_calibration
+from test_flag_translation_parity import (
+    _BASH, _BUILDING_DIR, _DEFAULT_ARCH, _DEFAULT_TARGET, _RECIPE_DIR, _UNIX_SHIM_C, _patch_common_sh,
+)
+import summarize_wrapper_trace
+
+_MAX_SHIM_OVERHEAD_US = 2000.0
+_NOISE_FLOOR_US = 250.0
+_WARMUP = 20
+_ROUNDS = 5
+_REPORT_VERSION = 1
+# Trace steps before STEP 1b: the same with the cache on or off.
+_PRE_CACHE_STEPS = ("dispatch", "sysroot", "rsp")
+
+# (case, tool, argv after the tool name). The compile line carries the
+# flags conda's activation injects, so the translation pass has work to do.
+_CASES = [
+    ("-print-file-name", "cc", ["-print-file-name=libstdc++.so"]),
+    ("-print-search-dirs", "cc", ["-print-search-dirs"]),
+    ("-c compile", "cc", ["-march=nocona", "-mtune=haswell", "-ftree-vectorize", "-fPIC",
+                          "-fstack-protector-strong", "-fno-plt", "-O2", "-pipe", "-DNDEBUG",
+                          "-I/opt/conda/include", "-c", "foo.c", "-o", "foo.o"]),
+    ("ar", "ar", ["rcsT", "libfoo.a", "a.o", "b.o"]),
+    ("ranlib", "ranlib", ["libfoo.a"]),
+]
+
+_STUB_ZIG_C = "int main(void) { return 0; }\n"
+
+_SPAWN_DRIVER_C = r"""
+#define _POSIX_C_SOURCE 200809L
+#include <fcntl.h>
+#include <spawn.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <sys/wait.h>
+#include <time.h>
+
+extern char **environ;
+
+/* usage: spawn_bench <iters> <prog> [arg...]
+ * Runs prog iters times with stdout/stderr on /dev/null and prints each
+ * run's wall time (spawn to reap) in ns, one per line. */
+int main(int argc, char **argv) {
+    long iters, i;
+    posix_spawn_file_actions_t fa;
+    if (argc < 3) return 2;
+    iters = atol(argv[1]);
+    posix_spawn_file_actions_init(&fa);
+    posix_spawn_file_actions_addopen(&fa, 1, "/dev/null", O_WRONLY, 0);
+    posix_spawn_file_actions_addopen(&fa, 2, "/dev/null", O_WRONLY, 0);
+    for (i = 0; i < iters; i++) {
+        struct timespec t0, t1;
+        pid_t pid;
+        int status;
+        clock_gettime(CLOCK_MONOTONIC, &t0);
+        if (posix_spawn(&pid, argv[2], &fa, NULL, argv + 2, environ) != 0) {
+            perror("posix_spawn");
+            return 2;
+        }
+        if (waitpid(pid, &status, 0) < 0) {
+            perror("waitpid");
+            return 2;
+        }
+        clock_gettime(CLOCK_MONOTONIC, &t1);
+        if (!WIFEXITED(status) || WEXITSTATUS(status) != 0) {
+            fprintf(stderr, "run %ld: wait status %d\n", i, status);
+            return 3;
+        }
+        printf("%lld\n", (long long)(t1.tv_sec - t0.tv_sec) * 1000000000LL + (t1.tv_nsec - t0.tv_nsec));
+    }
+    return 0;
+}
+"""
+
+# The retired bash wrappers, as thin as they were: zig-cc.sh set the mode,
+# sourced the common fragment and exec'd; zig-ar.sh / zig-ranlib.sh
+# sourced only the cache fragment. {zig} and {dir} are filled in below.
+_BASH_CC = """#!/usr/bin/env bash
+_ZIG_MODE=cc
+_self_dir="{dir}"
+source "${{_self_dir}}/_zig-cc-common.sh"
+exec "{zig}" "${{_exec_args[@]}}"
+"""
+_BASH_AR = """#!/usr/bin/env bash
+source "{dir}/_zig-cache-common.sh"
+_args=()
+for _a in "$@"; do
+    if [[ ${{#_args[@]}} -eq 0 && "$_a" =~ ^[a-zA-Z]+$ && "$_a" == *T* ]]; then
+        _args+=("${{_a//T/}}")
+    else
+        _args+=("$_a")
+    fi
+done
+exec "{zig}" ar "${{_args[@]}}"
+"""
+_BASH_RANLIB = """#!/usr/bin/env bash
+source "{dir}/_zig-cache-common.sh"
+exec "{zig}" ranlib "$@"
+"""
+
+
+def _compile(cc: str, src: Path, exe: Path, *extra: str) -> str | None:
+    """None on success, else the compiler's stderr."""
+    proc = subprocess.run([cc, "-O2", *extra, str(src), "-o", str(exe)], capture_output=True, text=True,
+                          timeout=300)
+    return None if proc.returncode == 0 else proc.stderr.strip()[:500]
+
+
+def _setup(cc: str, work: Path) -> dict[str, dict[str, Path]] | None:
+    """Build the stub zig, the spawn driver, the shim and the bash scripts;
+    {arm: {tool: executable}} (no "bash" arm without bash)."""
+    (work / "stub.c").write_text(_STUB_ZIG_C)
+    (work / "spawn_bench.c").write_text(_SPAWN_DRIVER_C)
+    zig = work / "zig"
+    for src, exe, extra in ((work / "stub.c", zig, ()),
+                            (work / "spawn_bench.c", work / "spawn_bench", ()),
+                            (_UNIX_SHIM_C, work / "zig-cc",
+                             ("-I", str(_BUILDING_DIR),
+                              *(f'-D{k}="{v}"' for k, v in {"ZIG_BIN": str(zig), "ZIG_TARGET": _DEFAULT_TARGET,
+                                                            "ZIG_TARGET_ARCH": _DEFAULT_ARCH,
+                                                            "WRAPPER_PREFIX": "", "ZIG_BAKED_PROBES": ""}.items())))):
+        err = _compile(cc, src, exe, *extra)
+        if err is not None:
+            FAIL(f"[bench] build {exe.name}", err)
+            return None
+    for tool in ("ar", "ranlib"):
+        os.link(work / "zig-cc", work / f"zig-{tool}")
+    arms = {"direct": {tool: zig for tool in ("cc", "ar", "ranlib")},
+            "shim": {tool: work / f"zig-{tool}" for tool in ("cc", "ar", "ranlib")}}
+    if _BASH:
+        bash_dir = work / "bash"
+        bash_dir.mkdir()
+        _patch_common_sh(bash_dir / "_zig-cc-common.sh", target=_DEFAULT_TARGET, arch=_DEFAULT_ARCH)
+        shutil.copy(_RECIPE_DIR / "scripts" / "_zig-cache-common.sh", bash_dir / "_zig-cache-common.sh")
+        arms["bash"] = {}
+        for tool, text in (("cc", _BASH_CC), ("ar", _BASH_AR), ("ranlib", _BASH_RANLIB)):
+            script = bash_dir / f"zig-{tool}.sh"
+            script.write_text(text.format(dir=bash_dir, zig=zig))
+            script.chmod(0o755)
+            arms["bash"][tool] = script
+    return arms
+
+
+def _argv(arm: str, exe: Path, tool: str, args: list[str]) -> list[str]:
+    # Direct is zig itself, so it takes the subcommand the wrapper would add.
+    if arm == "direct":
+        return [str(exe), tool, *args]
+    return [str(exe), *args]
+
+
+def _time_runs(driver: Path, argv: list[str], iters: int, cwd: Path, env: dict[str, str]) -> list[float] | None:
+    """Per-run wall times in microseconds, after _WARMUP discarded runs."""
+    proc = subprocess.run([str(driver), str(iters + _WARMUP), *argv], capture_output=True, text=True,
+                          cwd=str(cwd), env=env, timeout=max(120, iters))
+    if proc.returncode != 0:
+        FAIL(f"[bench] {Path(argv[0]).name} {' '.join(argv[1:])}", proc.stderr.strip()[:500])
+        return None
+    return [int(ns) / 1000 for ns in proc.stdout.split()[_WARMUP:]]
+
+
+def _time_case(driver: Path, arms: dict[str, dict[str, Path]], tool: str, case_args: list[str],
+               iters: dict[str, int], cwd: Path, env: dict[str, str]) -> dict[str, dict] | None:
+    """{arm: percentiles}. The arms take turns over _ROUNDS rounds so that
+    drift in machine load is shared between them rather than landing on
+    whichever ran last."""
+    samples: dict[str, list[float]] = {arm: [] for arm in arms}
+    for _ in range(_ROUNDS):
+        for arm, tools in arms.items():
+            got = _time_runs(driver, _argv(arm, tools[tool], tool, case_args),
+                             max(1, iters[arm] // _ROUNDS), cwd, env)
+            if got is None:
+                return None
+            samples[arm] += got
+    return {arm: _summary(s) for arm, s in samples.items()}
+
+
+def _time_translate_cache(driver: Path, work: Path, case_args: list[str], iters: int,
+                          env: dict[str, str]) -> dict[str, dict] | None:
+    """{"uncached"|"cache-hit": percentiles} of the shim's traced time from
+    STEP 1b onwards on one compile line. The cache starts empty; the
+    warm-up runs store the entry, and only cache-hit records are counted."""
+    timed = {}
+    for arm, outcome, extra in (("uncached", "exec", {}),
+                                ("cache-hit", "cache-hit", {"ZIG_WRAPPER_TRANSLATE_CACHE": "1"})):
+        trace_dir = work / f"trace-{arm}"
+        run_env = dict(env, ZIG_GLOBAL_CACHE_DIR=str(work / f"cache-{arm}"), ZIG_WRAPPER_TRACE=str(trace_dir),
+                       **extra)
+        if _time_runs(driver, [str(work / "zig-cc"), *case_args], iters, work, run_env) is None:
+            return None
+        records, _ = summarize_wrapper_trace.load([trace_dir])
+        samples = [sum(ns for step, ns in r["steps_ns"].items() if step not in _PRE_CACHE_STEPS) / 1000
+                   for r in records if r.get("outcome") == outcome]
+        if not samples:
+            FAIL(f"[bench] translation cache: {arm} records", f"no {outcome!r} trace records in {trace_dir}")
+            return None
+        timed[arm] = _summary(samples)
+    return timed
+
+
+def _percentile(sorted_us: list[float], p: float) -> float:
+    """Nearest-rank percentile."""
+    rank = max(1, -(-len(sorted_us) * p // 100))
+    return sorted_us[int(rank) - 1]
+
+
+def _summary(samples: list[float]) -> dict:
+    s = sorted(samples)
+    return {"n": len(s), "p50_us": round(_percentile(s, 50), 1), "p90_us": round(_percentile(s, 90), 1),
+            "p99_us": round(_percentile(s, 99), 1)}
+
+
+def _print_table(cases: dict[str, dict[str, dict]]) -> None:
+    print(f"  {'case':<20} {'arm':<7} {'n':>6} {'p50 us':>9} {'p90 us':>9} {'p99 us':>9} {'p50 overhead':>13}")
+    for case, arms in cases.items():
+        floor = arms["direct"]["p50_us"]
+        for arm, s in arms.items():
+            overhead = "" if arm == "direct" else f"{s['p50_us'] - floor:+.0f}"
+            print(f"  {case:<20} {arm:<7} {s['n']:>6} {s['p50_us']:>9.0f} {s['p90_us']:>9.0f} "
+                  f"{s['p99_us']:>9.0f} {overhead:>13}")
+
+
+def _gate(cases: dict[str, dict[str, dict]], scale: float, baseline: dict | None, max_ratio: float) -> None:
+    budget = _MAX_SHIM_OVERHEAD_US * scale
+    for case, arms in cases.items():
+        overhead = arms["shim"]["p50_us"] - arms["direct"]["p50_us"]
+        name = f"[bench] {case}: shim p50 overhead"
+        if overhead <= budget:
+            PASS(name, f"{overhead:.0f} us <= {budget:.0f} us")
+        else:
+            FAIL(name, f"{overhead:.0f} us > {budget:.0f} us")
+        if "bash" in arms:
+            shim, bash = arms["shim"]["p50_us"], arms["bash"]["p50_us"]
+            name = f"[bench] {case}: shim faster than bash"
+            if shim < bash:
+                PASS(name, f"p50 {shim:.0f} us vs {bash:.0f} us (x{bash / shim:.1f})")
+            else:
+                FAIL(name, f"p50 {shim:.0f} us vs {bash:.0f} us")
+        base_arms = (baseline or {}).get("cases", {}).get(case)
+        if base_arms:
+            before = base_arms["shim"]["p50_us"] - base_arms["direct"]["p50_us"]
+            name = f"[bench] {case}: shim overhead vs baseline"
+            if overhead - before > max(before * (max_ratio - 1), _NOISE_FLOOR_US):
+                FAIL(name, f"{before:.0f} us -> {overhead:.0f} us (limit x{max_ratio:g})")
+            else:
+                PASS(name, f"{before:.0f} us -> {overhead:.0f} us")
+
+
+def _gate_translate_cache(timed: dict[str, dict]) -> None:
+    uncached, hit = timed["uncached"]["p50_us"], timed["cache-hit"]["p50_us"]
+    print(f"  translation cache, STEP 1b onwards: uncached p50 {uncached:.1f} us, warm hit p50 {hit:.1f} us")
+    name = "[bench] warm translation-cache hit cheaper than translating"
+    if hit < uncached:
+        PASS(name, f"p50 {hit:.1f} us vs {uncached:.1f} us")
+    else:
+        WARN(name, f"p50 {hit:.1f} us vs {uncached:.1f} us; leave ZIG_WRAPPER_TRANSLATE_CACHE off")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iters", type=int, default=2000, help="timed runs per case for direct and shim")
+    parser.add_argument("--bash-iters", type=int, default=200,
+                        help="timed runs per case for the bash arm (~20x slower per run)")
+    parser.add_argument("--json", help="write the percentiles as JSON (a later --baseline)")
+    parser.add_argument("--baseline", help="JSON from an earlier --json run to gate shim overhead against")
+    parser.add_argument("--max-ratio", type=float, default=1.5,
+                        help="allowed growth of shim p50 overhead over --baseline (default 1.5)")
+    args = parser.parse_args()
+
+    print("=== Wrapper overhead benchmark: direct vs shim vs bash ===")
+    cc = shutil.which("cc") or shutil.which("gcc") or shutil.which("clang")
+    if os.name != "posix" or not cc or not _UNIX_SHIM_C.exists():
+        SKIP("[bench] wrapper overhead", "needs a POSIX system, a C compiler and zig-cc-unix.c")
+        return 0
+    baseline = None
+    if args.baseline:
+        try:
+            baseline = json.loads(Path(args.baseline).read_text())
+        except (OSError, ValueError) as exc:
+            FAIL("[bench] read baseline", str(exc))
+            return 1
+    scale = calibrate_timeouts()
+    print(f"  runner slowdown = {describe_calibration()}")
+    if not _BASH:
+        SKIP("[bench] bash arm", "bash not found on PATH")
+
+    with tempfile.TemporaryDirectory(prefix="zig_wrapper_bench_") as td:
+        work = Path(td)
+        arms = _setup(cc, work)
+        if arms is None:
+            return 1
+        # What an activated env would give the wrappers, minus anything that
+        # switches on optional work (trace, translation cache).
+        env = dict(os.environ, CONDA_PREFIX=str(work), HOME=str(work))
+        for var in ("CONDA_BUILD_SYSROOT", "ZIG_GLOBAL_CACHE_DIR", "XDG_DATA_HOME", "MACOSX_DEPLOYMENT_TARGET",
+                    "ZIG_WRAPPER_TRANSLATE_CACHE", "ZIG_WRAPPER_TRACE", "ZIG_WRAPPER_PRINT_ARGV",
+                    "ZIG_WRAPPER_DRY_EXEC"):
+            env.pop(var, None)
+        iters = {arm: args.bash_iters if arm == "bash" else args.iters for arm in arms}
+        cases: dict[str, dict[str, dict]] = {}
+        for case, tool, case_args in _CASES:
+            timed = _time_case(work / "spawn_bench", arms, tool, case_args, iters, work, env)
+            if timed is None:
+                return 1
+            cases[case] = timed
+        compile_args = next(case_args for case, _tool, case_args in _CASES if case == "-c compile")
+        cache_timed = _time_translate_cache(work / "spawn_bench", work, compile_args, args.iters, env)
+        if cache_timed is None:
+            return 1
+
+    _print_table(cases)
+    if args.json:
+        Path(args.json).write_text(json.dumps({
+            "version": _REPORT_VERSION, "iters": args.iters, "bash_iters": args.bash_iters,
+            "timeout_scale": scale, "cases": cases, "translate_cache": cache_timed,
+        }, indent=1) + "\n")
+    _gate(cases, scale, baseline, args.max_ratio)
+    _gate_translate_cache(cache_timed)
+
+    n_fail = len(_results["FAIL"])
+    print(f"\n=== Results: {len(_results['PASS'])} passed, {n_fail} failed, {len(_results['SKIP'])} skipped ===")
+    return 1 if n_fail else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
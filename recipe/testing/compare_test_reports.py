@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Compare two test reports and flag per-test regressions.
+
+The reports are the JSON _test_utils.write_reports() writes (e.g.
+test_zig_toolchain.py --json, or $ZIG_TEST_REPORT_DIR): one record per
+test function with its status, wall time, child CPU time and checks. A
+test regresses against the baseline when
+
+  - its status got worse (PASS/SKIP -> WARN -> FAIL), or a check that
+    did not fail in the baseline fails now;
+  - its wall time grew by more than --ratio AND by more than --min-delta
+    seconds (both, so noise on sub-second tests does not flag);
+  - likewise its child CPU time, where both reports have one.
+
+Tests present in only one report are listed, not flagged.
+
+Usage:
+    python testing/compare_test_reports.py BASELINE.json CURRENT.json
+        [--ratio R] [--min-delta S] [--json]
+
+Exit codes: 0 = no regressions, 1 = at least one, 2 = unreadable report.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+_SEVERITY = {"SKIP": 0, "PASS": 0, "WARN": 1, "FAIL": 2}
+
+
+def load(path: Path) -> dict:
+    rep = json.loads(path.read_text())
+    if not isinstance(rep, dict) or rep.get("version") != 1 or not isinstance(rep.get("tests"), list):
+        raise ValueError(f"{path}: not a version-1 test report")
+    return rep
+
+
+def _grew(base: float | None, cur: float | None, ratio: float, min_delta: float) -> bool:
+    if base is None or cur is None:
+        return False
+    return cur - base > min_delta and cur > base * ratio
+
+
+def compare(baseline: dict, current: dict, *, ratio: float = 1.5, min_delta: float = 1.0) -> dict:
+    """{"regressions": [...], "only_baseline": [...], "only_current": [...],
+    "rows": [...]} -- one row per test in both reports."""
+    base_tests = {t["name"]: t for t in baseline["tests"]}
+    cur_tests = {t["name"]: t for t in current["tests"]}
+    rows, regressions = [], []
+    for name, cur in cur_tests.items():
+        base = base_tests.get(name)
+        if base is None:
+            continue
+        reasons = []
+        if _SEVERITY[cur["status"]] > _SEVERITY[base["status"]]:
+            reasons.append(f"status {base['status']} -> {cur['status']}")
+        was_failing = {c["name"] for c in base["checks"] if c["status"] == "FAIL"}
+        newly = [c["name"] for c in cur["checks"] if c["status"] == "FAIL" and c["name"] not in was_failing]
+        if newly:
+            reasons.append("newly failing: " + "; ".join(newly[:5]))
+        if _grew(base["wall_s"], cur["wall_s"], ratio, min_delta):
+            reasons.append(f"wall {base['wall_s']:.2f}s -> {cur['wall_s']:.2f}s")
+        if _grew(base.get("cpu_s"), cur.get("cpu_s"), ratio, min_delta):
+            reasons.append(f"child CPU {base['cpu_s']:.2f}s -> {cur['cpu_s']:.2f}s")
+        row = {"name": name, "base_status": base["status"], "status": cur["status"],
+               "base_wall_s": base["wall_s"], "wall_s": cur["wall_s"], "reasons": reasons}
+        rows.append(row)
+        if reasons:
+            regressions.append(row)
+    return {
+        "regressions": regressions,
+        "only_baseline": sorted(set(base_tests) - set(cur_tests)),
+        "only_current": sorted(set(cur_tests) - set(base_tests)),
+        "rows": rows,
+    }
+
+
+def _print_report(result: dict, baseline: dict, current: dict) -> None:
+    print(f"=== {current['suite']}: {len(result['rows'])} tests compared "
+          f"({baseline.get('meta', {}).get('host') or baseline['platform']} baseline) ===")
+    scales = [rep.get("calibration", {}).get("timeout_scale", 1.0) for rep in (baseline, current)]
+    if scales[0] != scales[1]:
+        print(f"  note: runner slowdown differs (timeout scale x{scales[0]:g} -> x{scales[1]:g}); "
+              f"wall times are not like for like")
+    print(f"  {'test':<40} {'status':>11} {'base s':>8} {'now s':>8} {'ratio':>6}")
+    for row in sorted(result["rows"], key=lambda r: -r["wall_s"]):
+        ratio = row["wall_s"] / row["base_wall_s"] if row["base_wall_s"] else float("inf")
+        status = row["status"] if row["status"] == row["base_status"] else f"{row['base_status']}>{row['status']}"
+        flag = "  <-- REGRESSION" if row["reasons"] else ""
+        print(f"  {row['name']:<40} {status:>11} {row['base_wall_s']:>8.2f} {row['wall_s']:>8.2f} "
+              f"{ratio:>6.2f}{flag}")
+    for label, key in (("only in baseline", "only_baseline"), ("only in current", "only_current")):
+        if result[key]:
+            print(f"\n  {label}: {', '.join(result[key])}")
+    if result["regressions"]:
+        print(f"\n  {len(result['regressions'])} regression(s):")
+        for row in result["regressions"]:
+            print(f"    {row['name']}: {'; '.join(row['reasons'])}")
+    else:
+        print("\n  no regressions")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("current", type=Path)
+    parser.add_argument("--ratio", type=float, default=1.5, help="time growth factor that flags (default 1.5)")
+    parser.add_argument("--min-delta", type=float, default=1.0,
+                        help="seconds a test must also grow by to flag (default 1.0)")
+    parser.add_argument("--json", action="store_true", help="print the comparison as JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        baseline, current = load(args.baseline), load(args.current)
+    except (OSError, ValueError) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+    result = compare(baseline, current, ratio=args.ratio, min_delta=args.min_delta)
+    if args.json:
+        print(json.dumps(result, indent=1))
+    else:
+        _print_report(result, baseline, current)
+    return 1 if result["regressions"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+"""
+Property-based fuzzing of the flag-translation rules across every leg.
+
+test_flag_translation_parity.py pins a few dozen hand-written cases. This
+script generates random argv sequences from the token vocabulary in
+flag_rules.RULES (concat_split -Map forms, -target/--target= with every
+R5 family, -Xlinker pairs, -Wl,-z,* / -Wl,-O*, intercepts, drops), plus
+the hand-written flags the wrappers handle around the generated
+translator. It then checks two properties:
+
+  1. generated legs agree: _translate_gen.py (in-process reference) vs
+     _translate.inc through _translate_harness.c --batch (unix + win
+     profiles, ONE process for all --cases) vs _translate.gen.sh in ONE
+     long-lived bash worker (_bash_worker.py; unix profile, the first --bash-cases: the
+     bash translator itself runs at a few ms per case, so the full
+     stream through it is a --bash-cases 100000 local run, not a CI one);
+  2. the compiled unix shim (zig-cc-unix.c under ZIG_WRAPPER_DRY_EXEC)
+     produces the same exec argv / intercept output as the bash fragment
+     it ports (_zig-cc-common.sh, sourced per case in the same worker),
+     over a --shim-cases sample (one exec per case).
+
+Any divergence is shrunk to a minimal counterexample (greedy chunk and
+token deletion, re-checking only the legs that disagreed) and reported as
+a FAIL with the failing legs' outputs.
+
+Known, deliberate divergences (skipped, counted, bash legs only): a
+trailing bare -target reaching the translator -- the C and its Python
+twin keep it alone, the bash pairs it with "" (no wrapper caller passes
+one); and, shim vs fragment only, -all_load, which the shim rewrites
+(STEP 10b) and the bash fragment passes through. Python vs C skips
+nothing: the twin must match the C exactly.
+
+The C legs need a C compiler and the bash legs need bash; each leg it
+cannot run is SKIPped.
+
+Usage:
+    python testing/fuzz_flag_translation.py [--cases N] [--bash-cases N] [--shim-cases N] [--seed S]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from _bash_worker import BashReply, BashWorker
+from _test_utils import PASS, FAIL, SKIP, _results, dry_exec_many
+
+# Anchor: see test_flag_translation_parity.py -- parents[1] is recipe/ at
+# dev time and the staged step dir at rattler test time.
+_RECIPE_DIR = Path(__file__).resolve().parents[1]
+_BUILDING_DIR = _RECIPE_DIR / "building"
+sys.path.insert(0, str(_BUILDING_DIR))
+
+import _translate_gen  # noqa: E402
+from flag_rules import RULES  # noqa: E402
+from test_flag_translation_parity import (  # noqa: E402
+    _BASH, _DEFAULT_ARCH, _DEFAULT_TARGET, _TRANSLATE_GEN_SH, _UNIX_SHIM_C,
+    _compile_c_harness, _patch_common_sh,
+)
+
+_FS = "\x1f"          # field separator in harness requests / worker replies
+_FRAME = "\x1e"       # harness: starts each case's response
+_SHRINK_BUDGET = 400  # leg evaluations per counterexample
+_MAX_REPORTED = 5
+
+# Flags the wrappers handle by hand around the generated translator (bash
+# pre-filter / LLD scan / post-drop, mirrored in zig-cc-unix.c STEPs 2-7).
+_HAND_WRITTEN_ATOMS = [
+    ["-fuse-ld=lld"], ["-Wl,--gc-sections"], ["-Wl,--version-script,v.map"],
+    ["-Wl,--dynamic-list=d.list"], ["-Wl,--build-id"], ["-Wl,-all_load"],
+    ["-Xlinker", "--color-diagnostics"], ["-Xlinker", "--dependency-file=x.d"],
+    ["-Xlinker", "--gc-sections"], ["-Xlinker", "-force_load"],
+    ["-march=nocona"], ["-mtune=haswell"], ["-fno-plt"], ["-fstack-protector-strong"],
+    ["-fdebug-prefix-map=/a=/b"], ["-stdlib=libc++"], ["-lgcc_s"], ["-lgcc_eh"],
+    ["-l:libpthread.a"],
+]
+_NOISE_ATOMS = [["-c"], ["-O2"], ["foo.c"], ["-o", "out.o"], ["-Wall"], ["-DX=1"], ["-I/inc"], ["-lm"]]
+_TRIPLETS_EXTRA = ["riscv64-unknown-elf", "x86_64-conda_cos6-linux-gnu"]
+
+
+# ---------------------------------------------------------------------------
+# Vocabulary
+# ---------------------------------------------------------------------------
+def _triplets(rule: dict) -> list[str]:
+    out = list(_TRIPLETS_EXTRA)
+    for fam in rule["action"]["families"]:
+        if "prefix" in fam:
+            out += [fam["prefix"], fam["prefix"] + "13.4.0"]
+        else:
+            out += [f"x86_64{fam['infix']}", f"powerpc64le{fam['infix']}", f"aarch64{fam['infix']}-extra"]
+    return out
+
+
+def rule_atoms(rules: list[dict]) -> tuple[list[list[str]], list[list[str]]]:
+    """(atoms, intercept atoms) from RULES: each atom is the 1-2 argv
+    tokens one use of a rule takes. Raises on a rule kind this fuzzer
+    does not know, so a new kind cannot silently go unfuzzed."""
+    atoms: list[list[str]] = []
+    intercepts: list[list[str]] = []
+    for rule in rules:
+        kind, match = rule["kind"], rule["match"]
+        if kind == "intercept":
+            for v in match["values"]:
+                if match.get("sole"):
+                    # Only fires alone and with a baked answer; no leg
+                    # here bakes any, so it must translate like any flag.
+                    atoms.append([v])
+                elif match["form"] == "exact":
+                    intercepts.append([v])
+                else:
+                    intercepts += [[v + name] for name in ("libc.so", "crtbegin.o", "ld", "missing")]
+        elif kind == "rewrite":
+            tok = match["token"]
+            atoms += [[tok, "out.map"], [tok + "=out.map"], [tok + "out.map"], [tok + "="], [tok]]
+        elif kind == "mode_override":
+            atoms += [[v] for v in match["values"]]
+        elif kind == "target_translate":
+            for t in _triplets(rule):
+                atoms += [["-target", t], ["--target=" + t]]
+            atoms.append(["-target"])
+        elif kind == "option_preserve":
+            atoms += [[v + s] for v in match["values"] for s in ("native", "baseline", "skylake")]
+        elif kind == "wl_drop_gated":
+            for m in rule["members"]:
+                atoms.append([m["value"]])
+                if m["form"] == "prefix":
+                    atoms.append([m["value"] + ",/opt/lib"])
+        elif kind == "keep_trigger":
+            for m in match["members"]:
+                atoms.append(["-Xlinker", m["value"]] if m["form"] == "xlinker_pair" else [m["value"]])
+            atoms += [["-Xlinker", "--no-undefined"], ["-Xlinker"]]
+        elif kind == "z_o_split":
+            for m in rule["members"]:
+                atoms += [[m["prefix"] + v] for v in m.get("trigger_values", ())]
+                if m.get("trigger_numeric_suffix"):
+                    atoms += [[m["prefix"] + d] for d in "0123"]
+                atoms += [[m["prefix"] + "now"], [m["prefix"] + "fast"]]
+        else:
+            raise ValueError(f"fuzzer has no generator for rule kind {kind!r} ({rule['id']})")
+    return atoms, intercepts
+
+
+def gen_cases(n: int, seed: int) -> list[tuple[str, list[str]]]:
+    """n (mode, argv) cases. About 1 in 30 carries an intercept (they
+    short-circuit everything else, so more would waste the budget)."""
+    rng = random.Random(seed)
+    atoms, intercepts = rule_atoms(RULES)
+    pool = atoms * 3 + _HAND_WRITTEN_ATOMS + _NOISE_ATOMS
+    cases = []
+    for _ in range(n):
+        argv: list[str] = []
+        for _ in range(rng.randint(0, 12)):
+            argv += rng.choice(pool)
+        if rng.random() < 1 / 30:
+            argv[rng.randint(0, len(argv)):0] = rng.choice(intercepts)
+        cases.append((rng.choice(("cc", "cxx")), argv))
+    return cases
+
+
+def _trailing_bare_target(argv: list[str]) -> bool:
+    """The known divergence, after the wrappers' -Xlinker pre-filter."""
+    kept: list[str] = []
+    i = 0
+    while i < len(argv):
+        if argv[i] == "-Xlinker":
+            if i + 1 < len(argv):
+                nxt = argv[i + 1]
+                if nxt != "--color-diagnostics" and not nxt.startswith("--dependency-file="):
+                    kept += argv[i:i + 2]
+            i += 2
+            continue
+        kept.append(argv[i])
+        i += 1
+    return bool(kept) and kept[-1] == "-target"
+
+
+def _shim_only_rewrite(argv: list[str]) -> bool:
+    return _trailing_bare_target(argv) or any(a in ("-all_load", "-Wl,-all_load") for a in argv)
+
+
+# ---------------------------------------------------------------------------
+# Legs. Every leg returns, per case, a comparable outcome:
+#   ("out", tokens, use_lld, is_cxx) | ("intercept", stdout)
+# and the full legs ("shim", "bash-full"): ("out", exec argv) | ("intercept", stdout)
+# ---------------------------------------------------------------------------
+def _py_leg(cases, profile_name: str, conda_prefix: str) -> list[tuple]:
+    is_win = profile_name == "win"
+    profile = _translate_gen.Profile(is_win=is_win, is_win_target=is_win, conda_prefix=conda_prefix,
+                                     zig_target_arch=_DEFAULT_ARCH, sysroot="")
+    out = []
+    for mode, argv in cases:
+        r = _translate_gen.zig_translate_flags(argv, profile, mode == "cxx")
+        out.append(("intercept", r.stdout) if r.rc == 2 else ("out", r.argv, r.use_lld, r.mode_is_cxx))
+    return out
+
+
+def _c_leg(harness: Path, cases, profile_name: str, conda_prefix: str) -> list[tuple]:
+    request = "".join(_FS.join([profile_name, mode, *argv]) + "\n" for mode, argv in cases)
+    proc = subprocess.run([str(harness), "--batch"], input=request, capture_output=True, text=True,
+                          env=dict(os.environ, CONDA_PREFIX=conda_prefix), timeout=600)
+    frames = proc.stdout.split(_FRAME + "\n")[1:]
+    if proc.returncode != 0 or len(frames) != len(cases):
+        raise RuntimeError(f"harness --batch rc={proc.returncode}, {len(frames)}/{len(cases)} frames: "
+                           f"{proc.stderr.strip()[:300]}")
+    out = []
+    for frame in frames:
+        if frame.endswith("\x1d2\n"):
+            out.append(("intercept", frame[:-3]))
+        else:
+            fields = frame.rstrip("\n").split(_FS)
+            out.append(("out", fields[3:], int(fields[1]), int(fields[2])))
+    return out
+
+
+# Handlers for the shared bash worker (_bash_worker.py): _translate.gen.sh
+# is sourced once; "full" sources the whole patched fragment per case.
+# Replies are one R\x1f...-joined line; an intercept prints (and exits)
+# before reaching it.
+_WORKER_SH = r"""
+source "$1"
+_patched="$2"
+_fuzz_arch="$3"
+_fuzz_gen() {
+    _tr_mode_is_cxx=0
+    [[ "$1" == cxx ]] && _tr_mode_is_cxx=1
+    shift
+    _tr_in_args=("$@")
+    _tr_conda_prefix="$CONDA_PREFIX"
+    _tr_target_arch="$_fuzz_arch"
+    _tr_is_win_target=0
+    _zig_translate_flags
+    printf 'R\x1f%s\x1f%s' "$_tr_use_lld" "$_tr_mode_out"
+    (( ${#_tr_out_args[@]} )) && printf '\x1f%s' "${_tr_out_args[@]}"
+    printf '\n'
+}
+_fuzz_full() {
+    _ZIG_MODE=cc
+    [[ "$1" == cxx ]] && _ZIG_MODE=c++
+    shift
+    source "$_patched"
+    printf 'R'
+    (( ${#_exec_args[@]} )) && printf '\x1f%s' "${_exec_args[@]}"
+    printf '\n'
+}
+"""
+
+
+def _bash_worker(workdir: Path, conda_prefix: str) -> BashWorker:
+    patched = workdir / "_zig-cc-common.sh"
+    _patch_common_sh(patched, target=_DEFAULT_TARGET, arch=_DEFAULT_ARCH)
+    shutil.copy(_RECIPE_DIR / "scripts" / "_zig-cache-common.sh", workdir / "_zig-cache-common.sh")
+    env = dict(os.environ, CONDA_PREFIX=conda_prefix, HOME=conda_prefix)
+    for var in ("CONDA_BUILD_SYSROOT", "ZIG_GLOBAL_CACHE_DIR", "XDG_DATA_HOME", "MACOSX_DEPLOYMENT_TARGET"):
+        env.pop(var, None)
+    return BashWorker(_WORKER_SH, args=[str(_TRANSLATE_GEN_SH), str(patched), _DEFAULT_ARCH],
+                      env=env, cwd=str(workdir), bash=_BASH)
+
+
+def _parse_reply(reply: BashReply, full: bool) -> tuple:
+    if reply.timed_out:
+        return ("timeout",)
+    if not reply.stdout.startswith("R") or reply.stdout.count("\n") != 1:
+        return ("intercept", reply.stdout)
+    fields = reply.stdout.rstrip("\n").split(_FS)
+    if full:
+        return ("out", fields[1:])
+    return ("out", fields[3:], int(fields[1]), 1 if fields[2] == "c++" else 0)
+
+
+def _bash_gen_leg(worker: BashWorker, cases) -> list[tuple]:
+    return [_parse_reply(r, full=False) for r in worker.map("_fuzz_gen", [[mode, *argv] for mode, argv in cases])]
+
+
+def _bash_full_leg(worker: BashWorker, cases) -> list[tuple]:
+    return [_parse_reply(r, full=True) for r in worker.map("_fuzz_full", [[mode, *argv] for mode, argv in cases])]
+
+
+def _shim_leg(shim: Path, cases, conda_prefix: str, workdir: Path) -> list[tuple]:
+    env = dict(os.environ, CONDA_PREFIX=conda_prefix, HOME=conda_prefix)
+    for var in ("CONDA_BUILD_SYSROOT", "ZIG_GLOBAL_CACHE_DIR", "XDG_DATA_HOME", "MACOSX_DEPLOYMENT_TARGET",
+                "ZIG_WRAPPER_TRANSLATE_CACHE", "ZIG_WRAPPER_TRACE"):
+        env.pop(var, None)
+    cmds = [[str(shim.with_name("zig-cxx" if mode == "cxx" else "zig-cc")), *argv] for mode, argv in cases]
+    out = []
+    for argv, proc in dry_exec_many(cmds, cwd=workdir, env=env, timeout=15):
+        if argv is not None and argv[:1] == ["/bin/true"]:
+            out.append(("out", argv[1:]))
+        else:
+            out.append(("intercept", proc.stdout))
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Shrinking
+# ---------------------------------------------------------------------------
+def shrink(argv: list[str], diverges) -> list[str]:
+    """Greedy minimisation: drop halves, quarters, ... then single tokens
+    while diverges(argv) still holds. Bounded by _SHRINK_BUDGET calls."""
+    budget = _SHRINK_BUDGET
+    chunk = max(1, len(argv) // 2)
+    while chunk >= 1 and budget > 0:
+        i, progressed = 0, False
+        while i < len(argv) and budget > 0:
+            candidate = argv[:i] + argv[i + chunk:]
+            budget -= 1
+            if diverges(candidate):
+                argv, progressed = candidate, True
+            else:
+                i += chunk
+        if not progressed:
+            chunk //= 2
+    return argv
+
+
+def _compare(label: str, legs: dict, cases, skip) -> None:
+    """legs: name -> fn(cases) -> outcomes. FAILs with shrunk
+    counterexamples for cases where any two legs disagree."""
+    t0 = time.perf_counter()
+    results = {name: fn(cases) for name, fn in legs.items()}
+    elapsed = time.perf_counter() - t0
+    names = list(legs)
+    bad, skipped = [], 0
+    for idx, (mode, argv) in enumerate(cases):
+        if skip(argv):
+            skipped += 1
+            continue
+        if any(results[n][idx] != results[names[0]][idx] for n in names[1:]):
+            bad.append(idx)
+
+    detail = f"{len(cases) - skipped} cases in {elapsed:.1f}s ({skipped} known-divergent skipped)"
+    if not bad:
+        PASS(f"[fuzz] {label}", detail)
+        return
+
+    FAIL(f"[fuzz] {label}", f"{len(bad)} divergent; {detail}")
+    seen = set()
+    for idx in bad:
+        mode, argv = cases[idx]
+        disagree = [n for n in names if results[n][idx] != results[names[0]][idx]] + [names[0]]
+
+        def diverges(candidate, _mode=mode, _legs=disagree):
+            if skip(candidate):
+                return False
+            outs = [legs[n]([(_mode, candidate)])[0] for n in _legs]
+            return any(o != outs[0] for o in outs[1:])
+
+        small = shrink(list(argv), diverges)
+        key = (mode, tuple(small))
+        if key in seen:
+            continue
+        seen.add(key)
+        outs = {n: legs[n]([(mode, small)])[0] for n in disagree}
+        print(f"    counterexample ({mode}): {small!r}")
+        for n, o in outs.items():
+            print(f"      {n:<10} {o!r}")
+        if len(seen) >= _MAX_REPORTED:
+            break
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", type=int, default=100_000, help="cases for the generated-leg comparison")
+    parser.add_argument("--bash-cases", type=int, default=10_000,
+                        help="cases (a prefix of the same stream) for the generated bash leg")
+    parser.add_argument("--shim-cases", type=int, default=1000,
+                        help="cases (a prefix of the same stream) for the unix shim vs bash fragment check")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"=== Flag-translation fuzzing: {args.cases} cases, seed {args.seed} ===")
+    cases = gen_cases(args.cases, args.seed)
+    with tempfile.TemporaryDirectory(prefix="zig_tr_fuzz_") as td:
+        work = Path(td)
+        conda_prefix = work / "conda_prefix"
+        (conda_prefix / "lib").mkdir(parents=True)
+        (conda_prefix / "lib" / "libc.so").write_text("")
+        (conda_prefix / "bin").mkdir()
+        (conda_prefix / "bin" / "ld").write_text("")
+        prefix = str(conda_prefix)
+
+        harness = _compile_c_harness()
+        worker = _bash_worker(work, prefix) if _BASH and sys.platform != "win32" else None
+        try:
+            py_unix = lambda cs: _py_leg(cs, "unix", prefix)  # noqa: E731
+            if harness is None:
+                SKIP("[fuzz] generated legs agree, unix profile (python, C)", "no C compiler on PATH")
+            else:
+                _compare("generated legs agree, unix profile (python, C)",
+                         {"python": py_unix, "C": lambda cs: _c_leg(harness, cs, "unix", prefix)},
+                         cases, lambda argv: False)
+            if worker is None:
+                SKIP("[fuzz] generated legs agree, unix profile (python, bash)", "bash not found")
+            else:
+                _compare("generated legs agree, unix profile (python, bash)",
+                         {"python": py_unix, "bash": lambda cs: _bash_gen_leg(worker, cs)},
+                         cases[:args.bash_cases], _trailing_bare_target)
+
+            if harness is None:
+                SKIP("[fuzz] generated legs agree, win profile", "no C compiler on PATH")
+            else:
+                _compare("generated legs agree, win profile (python, C)",
+                         {"python": lambda cs: _py_leg(cs, "win", prefix),
+                          "C": lambda cs: _c_leg(harness, cs, "win", prefix)},
+                         cases, lambda argv: False)
+
+            cc = shutil.which("cc") or shutil.which("gcc") or shutil.which("clang")
+            if worker is None or not cc or not _UNIX_SHIM_C.exists():
+                SKIP("[fuzz] unix shim matches the bash fragment", "needs bash, a C compiler and zig-cc-unix.c")
+            else:
+                shim = work / "zig-cc"
+                defines = [f'-D{k}="{v}"' for k, v in {"ZIG_BIN": "/bin/true", "ZIG_TARGET": _DEFAULT_TARGET,
+                                                       "ZIG_TARGET_ARCH": _DEFAULT_ARCH,
+                                                       "WRAPPER_PREFIX": "", "ZIG_BAKED_PROBES": ""}.items()]
+                proc = subprocess.run([cc, "-O2", "-I", str(_BUILDING_DIR), *defines, str(_UNIX_SHIM_C),
+                                       "-o", str(shim)], capture_output=True, text=True, timeout=120)
+                if proc.returncode != 0:
+                    FAIL("[fuzz] unix shim builds", proc.stderr.strip()[:500])
+                else:
+                    os.link(shim, work / "zig-cxx")
+                    _compare("unix shim matches the bash fragment",
+                             {"bash-full": lambda cs: _bash_full_leg(worker, cs),
+                              "shim": lambda cs: _shim_leg(shim, cs, prefix, work)},
+                             cases[:args.shim_cases], _shim_only_rewrite)
+        finally:
+            if worker is not None:
+                worker.close()
+
+    n_fail = len(_results["FAIL"])
+    print(f"\n=== Results: {len(_results['PASS'])} passed, {n_fail} failed, {len(_results['SKIP'])} skipped ===")
+    return 1 if n_fail else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Summarize ZIG_WRAPPER_TRACE records from the unix multiplexer.
+
+With ZIG_WRAPPER_TRACE=1 every zig-cc-unix.c process appends one JSON line
+to $ZIG_GLOBAL_CACHE_DIR/zig-wrapper/trace/trace-<pid>.jsonl (the format is
+documented next to zig_trace_begin() in recipe/building/unix_common.h).
+A build leaves thousands of them; this folds them into one cost report:
+
+  - invocations per dispatch arm (cc, cxx, ar, ...) and outcome
+    (exec / cache-hit / intercept / return);
+  - wrapper time -- total, mean and p50/p90/p99/max -- overall and per arm;
+  - per-STEP time (sysroot, rsp, cache, lld_scan, translate, post,
+    force_load, assemble, ...), each step's share of the wrapper total;
+  - a log2 histogram of per-invocation wrapper time;
+  - argv size before/after translation;
+  - the N slowest invocations.
+
+Malformed or torn lines are counted and skipped. Time spent in zig itself
+is not in the records: compare the wrapper total against the build's wall
+time for the "wrapper vs zig" split.
+
+Usage:
+    python testing/summarize_wrapper_trace.py [DIR|FILE ...] [--json] [--top N]
+
+With no arguments, reads $ZIG_GLOBAL_CACHE_DIR/zig-wrapper/trace.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+_BAR_WIDTH = 40
+
+
+def _default_dir() -> Path | None:
+    base = os.environ.get("ZIG_GLOBAL_CACHE_DIR")
+    return Path(base) / "zig-wrapper" / "trace" if base else None
+
+
+def load(paths: list[Path]) -> tuple[list[dict], int]:
+    """(records, skipped line count) from trace files and directories."""
+    files: list[Path] = []
+    for p in paths:
+        files += sorted(p.glob("*.jsonl")) if p.is_dir() else [p]
+    records, skipped = [], 0
+    for f in files:
+        try:
+            lines = f.read_text(errors="replace").splitlines()
+        except OSError:
+            continue
+        for line in lines:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                skipped += 1
+                continue
+            if not isinstance(rec, dict) or rec.get("v") != 1 or "wrapper_ns" not in rec:
+                skipped += 1
+                continue
+            records.append(rec)
+    return records, skipped
+
+
+def _pct(sorted_vals: list[int], q: float) -> int:
+    if not sorted_vals:
+        return 0
+    return sorted_vals[min(len(sorted_vals) - 1, int(q * len(sorted_vals)))]
+
+
+def _stats(values: list[int]) -> dict:
+    vals = sorted(values)
+    total = sum(vals)
+    return {
+        "count": len(vals),
+        "total_ns": total,
+        "mean_ns": total // len(vals) if vals else 0,
+        "p50_ns": _pct(vals, 0.50),
+        "p90_ns": _pct(vals, 0.90),
+        "p99_ns": _pct(vals, 0.99),
+        "max_ns": vals[-1] if vals else 0,
+    }
+
+
+def _histogram(values: list[int]) -> list[tuple[int, int]]:
+    """[(bucket lower bound in ns, count)] over power-of-two buckets from 1 us."""
+    buckets: dict[int, int] = {}
+    for v in values:
+        lo = 1000
+        while lo * 2 <= v:
+            lo *= 2
+        buckets[lo] = buckets.get(lo, 0) + 1
+    return sorted(buckets.items())
+
+
+def summarize(records: list[dict], top: int = 10) -> dict:
+    wrapper = [int(r["wrapper_ns"]) for r in records]
+    by_arm: dict[str, list[int]] = {}
+    outcomes: dict[str, int] = {}
+    steps: dict[str, list[int]] = {}
+    for r in records:
+        arm = str(r.get("tool", "unknown"))
+        by_arm.setdefault(arm, []).append(int(r["wrapper_ns"]))
+        key = f"{arm}/{r.get('outcome', '?')}"
+        outcomes[key] = outcomes.get(key, 0) + 1
+        for name, ns in (r.get("steps_ns") or {}).items():
+            steps.setdefault(name, []).append(int(ns))
+
+    total = sum(wrapper)
+    step_rows = {}
+    for name, vals in steps.items():
+        st = _stats([v for v in vals if v])
+        st["share"] = sum(vals) / total if total else 0.0
+        step_rows[name] = st
+
+    def _mean(field: str) -> float:
+        vals = [r.get(field, 0) for r in records]
+        return sum(vals) / len(vals) if vals else 0.0
+
+    slowest = sorted(records, key=lambda r: r["wrapper_ns"], reverse=True)[:top]
+    return {
+        "records": len(records),
+        "wrapper": _stats(wrapper),
+        "arms": {arm: _stats(vals) for arm, vals in sorted(by_arm.items())},
+        "outcomes": dict(sorted(outcomes.items())),
+        "steps": step_rows,
+        "histogram": _histogram(wrapper),
+        "argv": {field: _mean(field) for field in
+                 ("argc_in", "argc_out", "argv_bytes_in", "argv_bytes_out")},
+        "slowest": [{k: r.get(k) for k in ("pid", "tool", "outcome", "wrapper_ns", "argc_in")}
+                    for r in slowest],
+    }
+
+
+def _us(ns: float) -> str:
+    return f"{ns / 1000:.1f}"
+
+
+def _print_report(s: dict, skipped: int) -> None:
+    w = s["wrapper"]
+    print(f"=== zig wrapper trace: {s['records']} invocations ({skipped} malformed lines skipped) ===")
+    print(f"  wrapper total {w['total_ns'] / 1e9:.3f} s   mean {_us(w['mean_ns'])} us   "
+          f"p50 {_us(w['p50_ns'])}   p90 {_us(w['p90_ns'])}   p99 {_us(w['p99_ns'])}   "
+          f"max {_us(w['max_ns'])} us")
+
+    print("\n  arm                    count    total s    mean us     p99 us")
+    for arm, st in s["arms"].items():
+        print(f"  {arm:<20} {st['count']:>7} {st['total_ns'] / 1e9:>10.3f} "
+              f"{_us(st['mean_ns']):>10} {_us(st['p99_ns']):>10}")
+
+    print("\n  outcome                          count")
+    for key, n in s["outcomes"].items():
+        print(f"  {key:<30} {n:>7}")
+
+    print("\n  step           share   total s    mean us     p50 us     p99 us  (mean/p50/p99 over calls that ran it)")
+    for name, st in sorted(s["steps"].items(), key=lambda kv: -kv[1]["total_ns"]):
+        print(f"  {name:<12} {st['share'] * 100:>6.1f}% {st['total_ns'] / 1e9:>9.3f} "
+              f"{_us(st['mean_ns']):>10} {_us(st['p50_ns']):>10} {_us(st['p99_ns']):>10}")
+
+    print("\n  wrapper time histogram")
+    peak = max((n for _, n in s["histogram"]), default=0)
+    for lo, n in s["histogram"]:
+        bar = "#" * max(1, round(_BAR_WIDTH * n / peak)) if peak else ""
+        print(f"  >= {_us(lo):>9} us {n:>7}  {bar}")
+
+    a = s["argv"]
+    print(f"\n  argv: {a['argc_in']:.1f} args / {a['argv_bytes_in']:.0f} B in -> "
+          f"{a['argc_out']:.1f} args / {a['argv_bytes_out']:.0f} B out (means)")
+
+    if s["slowest"]:
+        print("\n  slowest invocations")
+        for r in s["slowest"]:
+            print(f"  pid {r['pid']:<8} {r['tool']:<16} {r['outcome']:<10} {_us(r['wrapper_ns']):>10} us"
+                  f"  argc_in={r['argc_in']}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", help="trace dirs or .jsonl files")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    parser.add_argument("--top", type=int, default=10, help="slowest invocations to list")
+    args = parser.parse_args(argv)
+
+    paths = [Path(p) for p in args.paths]
+    if not paths:
+        default = _default_dir()
+        if default is None:
+            parser.error("no trace dir given and ZIG_GLOBAL_CACHE_DIR is unset")
+        paths = [default]
+    records, skipped = load(paths)
+    if not records:
+        print(f"no trace records under {', '.join(map(str, paths))}", file=sys.stderr)
+        return 1
+
+    summary = summarize(records, args.top)
+    if args.json:
+        summary["skipped"] = skipped
+        print(json.dumps(summary, indent=1))
+    else:
+        _print_report(summary, skipped)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
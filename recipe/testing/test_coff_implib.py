@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Parity test: recipe/building/coff_implib.py vs llvm-dlltool.
+
+_mingw.sh (via mingw_implibs.py) writes every MinGW import library with
+coff_implib's pure-Python writer instead of forking llvm-dlltool per lib.
+This script runs both over the same .def inputs for every Windows machine
+the feedstock ships (x86_64 / arm64 / i386) and diffs the resulting
+archives member table by member table: member order, name, size, content
+digest and the symbols the archive symbol table maps to each member.
+Whole-archive byte equality is asserted too -- the writer claims to be a
+drop-in replacement, not an approximation.
+
+Inputs:
+  - a synthetic .def exercising every grammar feature the writer handles
+    (LIBRARY/NAME, quoting, comments, @ordinal/NONAME, DATA, CONSTANT,
+    PRIVATE, `=` renames, `==` aliases, stdcall/fastcall/C++ names, a DLL
+    name long enough to need the GNU `//` name table);
+  - the feedstock's own building/mingw-defs/*.def;
+  - every .def under the installed zig's libc/mingw/lib-common (the plain
+    ones zig ships plus the .def.in expansions _mingw.sh leaves there),
+    when a zig install is found under $CONDA_PREFIX / $PREFIX.
+plus malformed inputs, which both must reject.
+
+SKIPs when llvm-dlltool is not on PATH (override with $LLVM_DLLTOOL).
+
+Usage:
+    python testing/test_coff_implib.py [--max-defs N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from pathlib import Path
+
+from _test_utils import PASS, FAIL, SKIP, _results, _run
+
+# Ensure stdout/stderr are UTF-8 on Windows (system ANSI codepage breaks
+# rattler-build's UTF-8 stream reader even when tests pass).
+if hasattr(sys.stdout, "reconfigure"):
+    sys.stdout.reconfigure(encoding="utf-8", errors="replace")
+if hasattr(sys.stderr, "reconfigure"):
+    sys.stderr.reconfigure(encoding="utf-8", errors="replace")
+
+# Anchor: see test_flag_translation_parity.py -- parents[1] is recipe/ at
+# dev time and the staged step dir at rattler test time.
+_RECIPE_DIR = Path(__file__).resolve().parents[1]
+_BUILDING_DIR = _RECIPE_DIR / "building"
+sys.path.insert(0, str(_BUILDING_DIR))
+
+import coff_implib  # noqa: E402
+
+_MACHINES = ("i386:x86-64", "arm64", "i386")
+
+_FEATURES_DEF = """\
+; every construct coff_implib.parse_def() understands
+LIBRARY "api-ms-win-core-synch-l1-2-0.dll"
+HEAPSIZE 4096,1024
+VERSION 1.2
+EXPORTS
+  Plain
+  WithOrdinal @5
+  NoName @6 NONAME
+  SpacedOrdinal @ 7 NONAME DATA
+  gVariable DATA
+  kConstant CONSTANT
+  Hidden PRIVATE
+  Alias == Plain
+  AliasData == Plain DATA
+  SelfAlias == SelfAlias
+  _Underscored
+  Stdcall@12
+  @Fastcall@8
+  Vectorcall@@16
+  ?Cpp@@YAXXZ
+  Public=Internal
+  "Quoted Name" = Plain   ; trailing comment
+  NotAnOrdinal @abc
+  Decorated@4 @9
+"""
+
+_SMALL_DEFS = {
+    "name_exe.def": "NAME prog\nEXPORTS\n  exe_export\n",
+    "no_extension.def": "LIBRARY short\nEXPORTS\n  a\n  b DATA\n",
+}
+
+# Inputs llvm-dlltool rejects; the writer must raise DefError for each.
+_BAD_DEFS = {
+    "unknown_directive.def": "LIBRARY x.dll\nFROB\nEXPORTS\n  a\n",
+    "hex_heapsize.def": "LIBRARY x.dll\nHEAPSIZE 0x10\nEXPORTS\n  a\n",
+    "bad_version.def": "LIBRARY x.dll\nVERSION 1.x\nEXPORTS\n  a\n",
+    "rename_needs_id.def": "LIBRARY x.dll\nEXPORTS\n  a = ,\n",
+    "no_dll_name.def": "EXPORTS\n  a\n",
+}
+
+
+def _member_table(data: bytes) -> list[tuple]:
+    """[(name, size, sha256[:16], (symbols...))] for each real member of a GNU archive."""
+    if data[:8] != b"!<arch>\n":
+        raise ValueError("not an archive")
+    pos, symbols, long_names, rows = 8, {}, b"", []
+    while pos + 60 <= len(data):
+        header = data[pos:pos + 60]
+        name = header[:16].decode("latin-1").rstrip()
+        size = int(header[48:58].decode("ascii").strip())
+        body = data[pos + 60:pos + 60 + size]
+        if name == "/":
+            (count,) = struct.unpack_from(">I", body, 0)
+            offsets = struct.unpack_from(f">{count}I", body, 4)
+            names = body[4 + 4 * count:].split(b"\0")
+            for off, sym in zip(offsets, names):
+                symbols.setdefault(off, []).append(sym.decode("latin-1"))
+        elif name == "//":
+            long_names = body
+        else:
+            if name.startswith("/") and name[1:].isdigit():
+                start = int(name[1:])
+                name = long_names[start:long_names.index(b"/\n", start)].decode("latin-1")
+            else:
+                name = name.rstrip("/")
+            digest = hashlib.sha256(body).hexdigest()[:16]
+            rows.append((name, size, digest, tuple(symbols.get(pos, ()))))
+        pos += 60 + size + (size & 1)
+    return rows
+
+
+def _compare(label: str, ref: bytes, mine: bytes) -> bool:
+    ref_rows, mine_rows = _member_table(ref), _member_table(mine)
+    if ref_rows != mine_rows:
+        for i, (r, m) in enumerate(zip(ref_rows, mine_rows)):
+            if r != m:
+                FAIL(label, f"member {i} differs: dlltool={r} coff_implib={m}")
+                return False
+        FAIL(label, f"member count: dlltool={len(ref_rows)} coff_implib={len(mine_rows)}")
+        return False
+    if ref != mine:
+        FAIL(label, "member tables match but archive bytes differ (header/padding)")
+        return False
+    return True
+
+
+def _installed_lib_common() -> Path | None:
+    for env in ("CONDA_PREFIX", "PREFIX"):
+        root = os.environ.get(env)
+        if not root:
+            continue
+        for sub in ("lib/zig", "Library/lib/zig"):
+            cand = Path(root) / sub / "libc" / "mingw" / "lib-common"
+            if cand.is_dir():
+                return cand
+    return None
+
+
+def _check_parity(dlltool: str, workdir: Path, defs: list[Path], group: str) -> None:
+    ok = 0
+    for def_path in defs:
+        text = def_path.read_text(encoding="latin-1")
+        for machine in _MACHINES:
+            label = f"[{group}] {def_path.name} -m {machine}"
+            out = workdir / "ref.a"
+            out.unlink(missing_ok=True)
+            proc = _run([dlltool, "-m", machine, "-d", str(def_path), "-l", str(out)], timeout=60)
+            try:
+                mine = coff_implib.build_import_library(text, machine)
+            except coff_implib.DefError as exc:
+                mine, err = None, str(exc)
+            if proc.returncode != 0 or not out.is_file():
+                if mine is not None:
+                    FAIL(label, f"dlltool rejected it ({proc.stderr.strip()[:200]}) but coff_implib accepted it")
+                else:
+                    ok += 1
+                continue
+            if mine is None:
+                FAIL(label, f"dlltool accepted it but coff_implib raised: {err}")
+                continue
+            if _compare(label, out.read_bytes(), mine):
+                ok += 1
+    total = len(defs) * len(_MACHINES)
+    if ok == total:
+        PASS(f"[{group}] coff_implib matches llvm-dlltool", f"{len(defs)} .def x {len(_MACHINES)} machines")
+
+
+def _check_cli(workdir: Path) -> None:
+    """-D overrides LIBRARY, and a rejected .def leaves no output behind."""
+    def_path = workdir / "cli.def"
+    def_path.write_text("LIBRARY wrong.dll\nEXPORTS\n  f\n")
+    lib = workdir / "libcli.a"
+    rc = coff_implib.main(["-m", "arm64", "-D", "right.dll", "-d", str(def_path), "-l", str(lib)])
+    rows = _member_table(lib.read_bytes()) if rc == 0 and lib.is_file() else []
+    if rows and all(r[0] == "right.dll" for r in rows) and rows[0][3] == ("__IMPORT_DESCRIPTOR_right",):
+        PASS("[cli] -D overrides LIBRARY")
+    else:
+        FAIL("[cli] -D overrides LIBRARY", f"rc={rc} rows={rows[:1]}")
+
+    def_path.write_text("LIBRARY x.dll\nFROB\n")
+    bad = workdir / "libbad.a"
+    rc = coff_implib.main(["-m", "arm64", "-d", str(def_path), "-l", str(bad)])
+    if rc == 1 and not bad.exists():
+        PASS("[cli] rejected .def exits 1 without writing")
+    else:
+        FAIL("[cli] rejected .def exits 1 without writing", f"rc={rc} exists={bad.exists()}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-defs", type=int, default=0,
+                        help="cap the installed lib-common corpus (0 = all)")
+    args = parser.parse_args()
+
+    print("=== coff_implib vs llvm-dlltool ===")
+    with tempfile.TemporaryDirectory(prefix="coff_implib_") as td:
+        workdir = Path(td)
+        _check_cli(workdir)
+
+        dlltool = os.environ.get("LLVM_DLLTOOL") or shutil.which("llvm-dlltool")
+        if not dlltool:
+            SKIP("[parity] coff_implib vs llvm-dlltool", "llvm-dlltool not on PATH")
+        else:
+            synthetic = []
+            for name, text in {"features.def": _FEATURES_DEF, **_SMALL_DEFS, **_BAD_DEFS}.items():
+                (workdir / name).write_text(text)
+                synthetic.append(workdir / name)
+            _check_parity(dlltool, workdir, synthetic, "synthetic")
+
+            mingw_defs = sorted((_BUILDING_DIR / "mingw-defs").glob("*.def"))
+            if mingw_defs:
+                _check_parity(dlltool, workdir, mingw_defs, "mingw-defs")
+            else:
+                SKIP("[mingw-defs] coff_implib matches llvm-dlltool", "building/mingw-defs not staged")
+
+            lib_common = _installed_lib_common()
+            if lib_common is None:
+                SKIP("[lib-common] coff_implib matches llvm-dlltool", "no zig install under $CONDA_PREFIX/$PREFIX")
+            else:
+                corpus = sorted(lib_common.glob("*.def"))
+                if args.max_defs:
+                    corpus = corpus[:args.max_defs]
+                _check_parity(dlltool, workdir, corpus, "lib-common")
+
+        for name in _BAD_DEFS:
+            try:
+                coff_implib.build_import_library(_BAD_DEFS[name], "i386:x86-64")
+            except coff_implib.DefError:
+                continue
+            FAIL(f"[reject] {name}", "coff_implib accepted a malformed .def")
+            break
+        else:
+            PASS("[reject] malformed .def files raise DefError", f"{len(_BAD_DEFS)} cases")
+
+    n_fail = len(_results["FAIL"])
+    print(f"\n=== Results: {len(_results['PASS'])} passed, {n_fail} failed, {len(_results['SKIP'])} skipped ===")
+    return 1 if n_fail else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
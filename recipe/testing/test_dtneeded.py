@@ -15,20 +15,28 @@ import subprocess
 import sys
 import tempfile
 
+from _test_utils import prewarm_zig_cache
+
+
+def _zig_cc(triplet: str) -> list[str]:
+    return [f"{triplet}-zig", "cc", "-target", triplet.replace("-conda", "") + ".2.17"]
+
 
 def _build(triplet: str, src: str, binary: str,
            *, verbose: bool = False, extra: list[str] | None = None) -> subprocess.CompletedProcess:
-    cmd = [f"{triplet}-zig", "cc"]
+    cmd = _zig_cc(triplet)
     if verbose:
         cmd += ["-v", "-Wl,--verbose"]
     if extra:
         cmd += extra
-    zig_target = triplet.replace("-conda", "") + ".2.17"
-    cmd += ["-target", zig_target, "-Wl,--no-as-needed", "-lm", src, "-o", binary]
+    cmd += ["-Wl,--no-as-needed", "-lm", src, "-o", binary]
     return subprocess.run(cmd, capture_output=True, text=True)
 
 
 def main(triplet: str) -> int:
+    # glibc 2.17 stubs and compiler-rt, reported as cache hit/miss apart
+    # from the link under test.
+    prewarm_zig_cache([(_zig_cc(triplet), "c", "warm")])
     with tempfile.TemporaryDirectory() as tmpdir:
         src = os.path.join(tmpdir, "foo.c")
         binary = os.path.join(tmpdir, "foo")
@@ -47,18 +47,21 @@ Exit codes:
 
 from __future__ import annotations
 
+import functools
 import os
+import random
 import re
-import shlex
 import shutil
 import subprocess
 import sys
 import tempfile
+import time
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Callable
 
-from _test_utils import PASS, FAIL, WARN, SKIP, _results
+from _bash_worker import BashWorker
+from _test_utils import PASS, FAIL, WARN, SKIP, _results, dry_exec, dry_exec_many
 
 # Anchor: __file__ is <base>/testing/<thisfile>. At local-dev time <base> is
 # recipe/; at rattler-build test time the `files: recipe:` entries (recipe.yaml)
@@ -90,6 +93,7 @@ _BUILDING_DIR = _RECIPE_DIR / "building"
 _TRANSLATE_GEN_SH = _BUILDING_DIR / "_translate.gen.sh"
 _HARNESS_C = _RECIPE_DIR / "testing" / "_translate_harness.c"
 _UNIX_SHIM_C = _BUILDING_DIR / "zig-cc-unix.c"
+_RSP_HARNESS_C = _RECIPE_DIR / "testing" / "_rsp_harness.c"
 
 
 # ---------------------------------------------------------------------------
@@ -131,6 +135,47 @@ def _parse_declare_p_array(output: str, varname: str) -> list[str] | None:
     return [re.sub(r'\\(.)', r'\1', item) for item in items]
 
 
+# Both bash legs run in persistent workers (testing/_bash_worker.py): one
+# bash per leg for the whole run instead of one per case. Each call runs in
+# its own subshell of the worker, so the fragment's intercept `exit 0` and
+# every variable it sets end with the case. The workers exit with the
+# interpreter (stdin EOF ends their request loop).
+_COMMON_HANDLER = r"""
+_capture_common() {
+    _ZIG_MODE="$1"
+    _frag="$2"
+    shift 2
+    source "$_frag"
+    declare -p _exec_args
+}
+"""
+
+
+@functools.lru_cache(maxsize=None)
+def _common_worker() -> tuple[BashWorker, Path]:
+    """The _bash_capture worker and its scratch dir (patched fragments, and
+    an empty conda_prefix/ standing in for CONDA_PREFIX and HOME)."""
+    workdir = Path(tempfile.mkdtemp(prefix="zig_cc_common_"))
+    conda_prefix = workdir / "conda_prefix"
+    conda_prefix.mkdir()
+    env = dict(os.environ)
+    env["CONDA_PREFIX"] = str(conda_prefix)
+    env["HOME"] = str(conda_prefix)
+    env.pop("CONDA_BUILD_SYSROOT", None)
+    env.pop("ZIG_GLOBAL_CACHE_DIR", None)
+    env.pop("XDG_DATA_HOME", None)
+    return BashWorker(_COMMON_HANDLER, env=env, cwd=str(workdir), bash=_BASH), workdir
+
+
+@functools.lru_cache(maxsize=None)
+def _patched_fragment(target: str, arch: str) -> Path:
+    _, workdir = _common_worker()
+    patched = workdir / f"{target}-{arch}" / "_zig-cc-common.sh"
+    patched.parent.mkdir()
+    _patch_common_sh(patched, target=target, arch=arch)
+    return patched
+
+
 def _bash_capture(
     mode: str,
     argv: list[str],
@@ -149,41 +194,14 @@ def _bash_capture(
     if not _BASH:
         return None, "", ""
 
-    with tempfile.TemporaryDirectory() as td:
-        tdp = Path(td)
-        patched = tdp / "_zig-cc-common.sh"
-        _patch_common_sh(patched, target=target, arch=arch)
-        conda_prefix = tdp / "conda_prefix"
-        conda_prefix.mkdir()
-
-        env = dict(os.environ)
-        env["CONDA_PREFIX"] = str(conda_prefix)
-        env["HOME"] = str(conda_prefix)
-        env.pop("CONDA_BUILD_SYSROOT", None)
-        env.pop("ZIG_GLOBAL_CACHE_DIR", None)
-        env.pop("XDG_DATA_HOME", None)
-
-        quoted_argv = " ".join(shlex.quote(a) for a in argv)
-        script = (
-            f"_ZIG_MODE={shlex.quote(mode)}\n"
-            f"set -- {quoted_argv}\n"
-            f"source {shlex.quote(str(patched))}\n"
-            f"declare -p {_EXEC_ARGS_VAR}\n"
-        )
-        try:
-            proc = subprocess.run(
-                [_BASH, "-c", script],
-                cwd=str(tdp),
-                env=env,
-                capture_output=True,
-                text=True,
-                timeout=15,
-            )
-        except subprocess.TimeoutExpired:
-            return None, "TIMEOUT", str(conda_prefix)
+    worker, workdir = _common_worker()
+    conda_prefix = str(workdir / "conda_prefix")
+    reply = worker.call("_capture_common", mode, str(_patched_fragment(target, arch)), *argv)
+    if reply.timed_out:
+        return None, "TIMEOUT", conda_prefix
 
-        exec_args = _parse_declare_p_array(proc.stdout, _EXEC_ARGS_VAR)
-        return exec_args, proc.stdout, str(conda_prefix)
+    exec_args = _parse_declare_p_array(reply.stdout, _EXEC_ARGS_VAR)
+    return exec_args, reply.stdout, conda_prefix
 
 
 # ---------------------------------------------------------------------------
@@ -648,6 +666,11 @@ GEN_CASES: list[GenCase] = [
         14, "-print-sysroot intercepted on unix profile, prints empty _sr",
         "cc", ["-print-sysroot"], _gen_sysroot_assert,
     ),
+    GenCase(
+        15, "two -target conda triplets each keep their own translation",
+        "cc", ["-target", "x86_64-conda-linux-gnu", "-target", "aarch64-conda-linux-gnu"],
+        _gen_both(lambda r: r.tokens[-4:] == ["-target", "x86_64-linux-gnu", "-target", "aarch64-linux-gnu"]),
+    ),
 ]
 
 
@@ -723,6 +746,35 @@ def run_generated_c_leg() -> None:
 # ---------------------------------------------------------------------------
 # Leg (B): generated-bash (_translate.gen.sh, sourced -- _zig_translate_flags)
 # ---------------------------------------------------------------------------
+_GEN_HANDLER = r"""
+source "$1"
+_capture_gen() {
+    _tr_conda_prefix="$1"
+    _tr_target_arch="$2"
+    _tr_is_win_target="$3"
+    _tr_mode_is_cxx="$4"
+    shift 4
+    _tr_in_args=("$@")
+    _zig_translate_flags
+    declare -p _tr_out_args
+    echo "$_tr_use_lld"
+    echo "$_tr_mode_out"
+}
+_capture_probe() {
+    _tr_probe_out=("$1" "$3" "$5" "$7")
+    _tr_probe_err=("$2" "$4" "$6" "$8")
+    shift 8
+    _capture_gen "$@"
+}
+"""
+
+
+@functools.lru_cache(maxsize=None)
+def _gen_worker() -> BashWorker:
+    """The _bash_gen_capture worker: _translate.gen.sh sourced once."""
+    return BashWorker(_GEN_HANDLER, args=[str(_TRANSLATE_GEN_SH)], bash=_BASH)
+
+
 def _bash_gen_capture(
     profile: str, mode: str, argv: list[str], *, conda_prefix: str, arch: str = "x86_64"
 ) -> GenResult:
@@ -731,26 +783,12 @@ def _bash_gen_capture(
 
     is_win_target = 1 if profile == "win" else 0
     mode_is_cxx = 1 if mode == "cxx" else 0
-    quoted_argv = " ".join(shlex.quote(a) for a in argv)
-    script = (
-        f"_tr_in_args=({quoted_argv})\n"
-        f"_tr_conda_prefix={shlex.quote(conda_prefix)}\n"
-        f"_tr_target_arch={shlex.quote(arch)}\n"
-        f"_tr_is_win_target={is_win_target}\n"
-        f"_tr_mode_is_cxx={mode_is_cxx}\n"
-        f"source {shlex.quote(str(_TRANSLATE_GEN_SH))}\n"
-        f"_zig_translate_flags\n"
-        f"declare -p _tr_out_args\n"
-        f'echo "$_tr_use_lld"\n'
-        f'echo "$_tr_mode_out"\n'
-    )
-    try:
-        proc = subprocess.run([_BASH, "-c", script], capture_output=True, text=True, timeout=15)
-    except subprocess.TimeoutExpired:
+    reply = _gen_worker().call("_capture_gen", conda_prefix, arch, str(is_win_target), str(mode_is_cxx), *argv)
+    if reply.timed_out:
         return GenResult(returncode=-1, tokens=[], use_lld=-1, is_cxx=-1, stdout="TIMEOUT")
 
-    tokens = _parse_declare_p_array(proc.stdout, "_tr_out_args") or []
-    lines = proc.stdout.splitlines()
+    tokens = _parse_declare_p_array(reply.stdout, "_tr_out_args") or []
+    lines = reply.stdout.splitlines()
     use_lld = -1
     mode_out = ""
     if len(lines) >= 2:
@@ -760,7 +798,7 @@ def _bash_gen_capture(
             use_lld = -1
         mode_out = lines[-1]
     is_cxx = 1 if mode_out == "c++" else 0
-    return GenResult(returncode=proc.returncode, tokens=tokens, use_lld=use_lld, is_cxx=is_cxx, stdout=proc.stdout)
+    return GenResult(returncode=reply.rc, tokens=tokens, use_lld=use_lld, is_cxx=is_cxx, stdout=reply.stdout)
 
 
 def run_generated_bash_leg() -> None:
@@ -835,9 +873,506 @@ def run_unix_shim_compile_leg() -> None:
         PASS(name)
 
 
+# ---------------------------------------------------------------------------
+# Leg (D): @file response files (response_file.h via _rsp_harness.c, then
+# end-to-end through a compiled unix shim)
+# ---------------------------------------------------------------------------
+# (style, file contents, expected tokens)
+_RSP_PARSE_CASES = [
+    ("gnu", '-O2 "a b"\tc\\ d\n\'s q\' "x\\"y" "" end\n',
+     ["-O2", "a b", "c d", "s q", 'x"y', "", "end"]),
+    ("msvc", 'C:\\dir\\f.c "a b" "x\\"y" "tail\\\\" a\\\\\\"b "q""q"\r\n',
+     ["C:\\dir\\f.c", "a b", 'x"y', "tail\\", 'a\\"b', 'q"q']),
+]
+
+_RSP_ROUND_TRIP = [
+    "plain", "a b", 'q"uote', "back\\slash", "trail\\", "", "tab\there",
+    "new\nline", "'sq'", "C:\\x y\\",
+]
+
+
+def _rsp_expand(harness: Path, style: str, args: list[str], cwd: str) -> tuple[int, list[str]] | None:
+    proc = subprocess.run([str(harness), style, "expand", *args],
+                          capture_output=True, cwd=cwd, timeout=15)
+    if proc.returncode != 0:
+        return None
+    fields = proc.stdout.decode("utf-8").split("\0")[:-1]
+    return int(fields[0]), fields[1:]
+
+
+def _split_windows_cmdline(line: str) -> list[str]:
+    """Split a command line the way the MSVC CRT builds a child's argv
+    (the post-2008 parse_cmdline rules): argv[0] runs to the next quote or
+    whitespace with no backslash processing; later arguments follow the
+    2n / 2n+1 backslash rules and "" inside quotes is a literal quote.
+
+    Reimplemented here so the launcher's quoting can be checked on Linux
+    without wine."""
+    args: list[str] = []
+    i, n = 0, len(line)
+    if line.startswith('"'):
+        end = line.find('"', 1)
+        end = n if end < 0 else end
+        args.append(line[1:end])
+        i = end + 1
+    else:
+        while i < n and line[i] not in " \t":
+            i += 1
+        args.append(line[:i])
+    while True:
+        while i < n and line[i] in " \t":
+            i += 1
+        if i >= n:
+            return args
+        cur: list[str] = []
+        quoted = False
+        while i < n and (quoted or line[i] not in " \t"):
+            c = line[i]
+            if c == "\\":
+                j = i
+                while j < n and line[j] == "\\":
+                    j += 1
+                if j < n and line[j] == '"':
+                    cur.append("\\" * ((j - i) // 2))
+                    if (j - i) % 2:
+                        cur.append('"')
+                        j += 1
+                else:
+                    cur.append("\\" * (j - i))
+                i = j
+            elif c == '"':
+                if quoted and i + 1 < n and line[i + 1] == '"':
+                    cur.append('"')
+                    i += 2
+                else:
+                    quoted = not quoted
+                    i += 1
+            else:
+                cur.append(c)
+                i += 1
+        args.append("".join(cur))
+
+
+def _check_command_line_quoting(harness: Path) -> None:
+    """nonunix_common.h's zig_spawn_wait hands CreateProcessW a command line
+    built by zig_rsp_command_line; every argv must survive the child CRT's
+    split unchanged. Seeded random argvs over the characters that matter
+    (space, tab, quote, backslash), plus an argv[0] with a space in it."""
+    name = "[rsp] CreateProcessW command line round-trips through the CRT split"
+    rng = random.Random(4)
+    alphabet = ['a', 'b', ' ', '\t', '"', '\\', '\\', 'C:']
+    argvs = [["C:\\Program Files\\zig\\zig.exe", "cc", "", "a b", 'say "hi"', "dir\\", "\\\\srv\\share\\"]]
+    for _ in range(150):
+        argvs.append(["C:\\zig\\zig.exe"] + [
+            "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 8)))
+            for _ in range(rng.randint(0, 6))
+        ])
+    for argv in argvs:
+        proc = subprocess.run([str(harness), "msvc", "cmdline", *argv],
+                              capture_output=True, timeout=15)
+        line = proc.stdout.decode("utf-8").rstrip("\0")
+        got = _split_windows_cmdline(line)
+        if proc.returncode != 0 or got != argv:
+            FAIL(name, f"argv={argv!r} line={line!r} split={got!r}")
+            return
+    PASS(name, f"{len(argvs)} argvs")
+
+
+def run_response_file_leg() -> None:
+    """Leg (D): response_file.h parses GNU and MSVC quoting, writes files
+    that read back identically, and the unix shim re-packs translated
+    @file contents into one new response file -- or passes the caller's
+    @file through untouched when translation changed nothing."""
+    print("--- Response-file leg (response_file.h) ---")
+    cc = shutil.which("cc") or shutil.which("gcc") or shutil.which("clang")
+    if not cc:
+        SKIP("[rsp] response-file leg", "no C compiler on PATH")
+        return
+
+    work = tempfile.mkdtemp(prefix="zig_rsp_")
+    harness = Path(work) / "_rsp_harness"
+    proc = subprocess.run([cc, "-I", str(_BUILDING_DIR), str(_RSP_HARNESS_C), "-o", str(harness)],
+                          capture_output=True, text=True, timeout=60)
+    if proc.returncode != 0:
+        FAIL("[rsp] harness compiles", proc.stderr.strip()[:500])
+        return
+
+    for i, (style, content, expected) in enumerate(_RSP_PARSE_CASES):
+        rsp = Path(work) / f"parse{i}.rsp"
+        rsp.write_bytes(content.encode())
+        got = _rsp_expand(harness, style, ["-first", f"@{rsp}", "-last"], work)
+        name = f"[rsp] {style} quoting parsed"
+        if got == (1, ["-first", *expected, "-last"]):
+            PASS(name)
+        else:
+            FAIL(name, f"got={got!r}")
+
+    (Path(work) / "outer.rsp").write_text("-x @inner.rsp -y\n")
+    (Path(work) / "inner.rsp").write_text("-i\n")
+    (Path(work) / "self.rsp").write_text("@self.rsp\n")
+    nested = _rsp_expand(harness, "gnu", ["@outer.rsp", "@missing.rsp"], work)
+    if nested == (2, ["-x", "-i", "-y", "@missing.rsp"]):
+        PASS("[rsp] nested @file expanded, unreadable @file kept literally")
+    else:
+        FAIL("[rsp] nested @file expanded, unreadable @file kept literally", f"got={nested!r}")
+    looped = _rsp_expand(harness, "gnu", ["@self.rsp"], work)
+    if looped is not None and looped[1] == ["@self.rsp"]:
+        PASS("[rsp] self-including @file terminates")
+    else:
+        FAIL("[rsp] self-including @file terminates", f"got={looped!r}")
+
+    env = dict(os.environ, ZIG_GLOBAL_CACHE_DIR=str(Path(work) / "cache"))
+    for style in ("gnu", "msvc"):
+        name = f"[rsp] {style} written file reads back identically"
+        paths = []
+        for _ in range(2):
+            w = subprocess.run([str(harness), style, "write", *_RSP_ROUND_TRIP],
+                               capture_output=True, text=True, env=env, timeout=15)
+            paths.append(w.stdout.strip())
+        got = _rsp_expand(harness, style, [paths[0]], work)
+        if w.returncode != 0 or not paths[0].startswith("@"):
+            FAIL(name, f"write failed rc={w.returncode} stderr={w.stderr[:300]}")
+        elif got != (1, _RSP_ROUND_TRIP):
+            FAIL(name, f"got={got!r}")
+        elif paths[0] != paths[1]:
+            FAIL(name, f"not content-addressed: {paths}")
+        else:
+            PASS(name)
+
+    _check_command_line_quoting(harness)
+    _run_rsp_shim_cases(cc, harness, Path(work), env)
+
+
+def _run_rsp_shim_cases(cc: str, harness: Path, work: Path, env: dict[str, str]) -> None:
+    """End-to-end: the unix shim (macros -D'd in, as install does) under
+    ZIG_WRAPPER_DRY_EXEC."""
+    if sys.platform == "win32" or not _UNIX_SHIM_C.exists():
+        SKIP("[rsp] unix shim re-packs @file contents", "unix shim not buildable here")
+        return
+    defines = [f'-D{name}="{value}"' for name, value in {
+        "ZIG_BIN": "/bin/true", "ZIG_TARGET": _DEFAULT_TARGET,
+        "ZIG_TARGET_ARCH": _DEFAULT_ARCH, "WRAPPER_PREFIX": ""}.items()]
+    defines.append("-DZIG_BAKED_PROBES=" + ", ".join(
+        '"' + text.replace("\n", "\\n") + '"' for answer in _BAKED_PROBES for text in answer))
+    shim = work / "zig-cc"
+    proc = subprocess.run([cc, "-I", str(_BUILDING_DIR), *defines, str(_UNIX_SHIM_C), "-o", str(shim)],
+                          capture_output=True, text=True, timeout=120)
+    if proc.returncode != 0:
+        FAIL("[rsp] unix shim builds", proc.stderr.strip()[:500])
+        return
+
+    (work / "changed.rsp").write_text('-O2 "my file.c"\n-march=nocona -mcpu=x86_64\n')
+    (work / "same.rsp").write_text("-O2 -mcpu=x86_64 foo.c\n")
+
+    def _argv(*args: str) -> list[str]:
+        argv, _ = dry_exec([str(shim), "-c", *args, "-o", "x.o"], cwd=work, env=env, timeout=15)
+        return argv or []
+
+    argv = _argv("@changed.rsp")
+    written = [a for a in argv if a.startswith("@") and a.endswith(".rsp")]
+    contents = _rsp_expand(harness, "gnu", written, str(work)) if len(written) == 1 else None
+    if (contents is not None and "-march=nocona" not in argv and contents[1][:1] == ["-c"]
+            and "my file.c" in contents[1] and "-march=nocona" not in contents[1]):
+        PASS("[rsp] unix shim translates @file contents into a new response file")
+    else:
+        FAIL("[rsp] unix shim translates @file contents into a new response file",
+             f"argv={argv} contents={contents}")
+
+    argv = _argv("@same.rsp")
+    if argv[-4:] == ["-c", "@same.rsp", "-o", "x.o"]:
+        PASS("[rsp] unix shim passes an unchanged @file through")
+    else:
+        FAIL("[rsp] unix shim passes an unchanged @file through", f"argv={argv}")
+
+    _run_dry_exec_cases(shim, work, env)
+    _run_sysroot_memo_cases(shim, work, env)
+    _run_baked_probe_shim_cases(shim, work, env)
+
+
+_DRY_EXEC_BATCH = 200
+
+
+def _run_dry_exec_cases(shim: Path, work: Path, env: dict[str, str]) -> None:
+    """ZIG_WRAPPER_DRY_EXEC: the shim's final argv comes back NUL-delimited,
+    so one argument holding a newline stays one argument, and a batch of
+    argv assertions runs at wrapper-spawn speed with no zig anywhere."""
+    argv, proc = dry_exec([str(shim), "-c", "-DMSG=a\nb", "foo.c", "-o", "x.o"], cwd=work, env=env)
+    if argv and argv[0] == "/bin/true" and "-DMSG=a\nb" in argv and argv[-2:] == ["-o", "x.o"]:
+        PASS("[dry-exec] NUL-delimited argv keeps an embedded newline in one argument")
+    else:
+        FAIL("[dry-exec] NUL-delimited argv keeps an embedded newline in one argument",
+             f"rc={proc.returncode} stdout={proc.stdout!r}")
+
+    cmds = [[str(shim), "-c", f"-DCASE={i}", "foo.c", "-o", f"o{i}.o"] for i in range(_DRY_EXEC_BATCH)]
+    t0 = time.perf_counter()
+    results = dry_exec_many(cmds, cwd=work, env=env)
+    elapsed = time.perf_counter() - t0
+    bad = [i for i, (argv, _) in enumerate(results)
+           if not argv or f"-DCASE={i}" not in argv or argv[-1] != f"o{i}.o"]
+    if bad:
+        FAIL(f"[dry-exec] batch of {_DRY_EXEC_BATCH} argv checks", f"wrong argv for cases {bad[:10]}")
+    else:
+        PASS(f"[dry-exec] batch of {_DRY_EXEC_BATCH} argv checks",
+             f"{_DRY_EXEC_BATCH / elapsed:.0f}/s")
+
+
+def _run_sysroot_memo_cases(shim: Path, work: Path, env: dict[str, str]) -> None:
+    """STEP 1's sysroot verdict (unix_common.h) is memoized per process only:
+    a sysroot that appears under $CONDA_PREFIX between two calls is seen by
+    the second, with nothing in the prefix's mtimes changing to tell it."""
+    prefix = work / "sr_prefix"
+    triplet = prefix / f"{_DEFAULT_ARCH}-conda-linux-gnu"
+    triplet.mkdir(parents=True)
+    env = dict(env, CONDA_PREFIX=str(prefix), ZIG_GLOBAL_CACHE_DIR=str(work / "sr_cache"))
+    env.pop("CONDA_BUILD_SYSROOT", None)
+
+    def _print_sysroot() -> str:
+        return subprocess.run([str(shim), "-print-sysroot"], capture_output=True, text=True,
+                              env=env, timeout=15).stdout.strip()
+
+    before = _print_sysroot()
+    mtime = triplet.stat().st_mtime
+    (triplet / "sysroot").mkdir()
+    os.utime(triplet, (mtime, mtime))
+    after = _print_sysroot()
+    if before == "" and after == str(triplet / "sysroot"):
+        PASS("[sysroot] verdict is fresh on every call")
+    else:
+        FAIL("[sysroot] verdict is fresh on every call", f"before={before!r} after={after!r}")
+
+
+def _run_baked_probe_shim_cases(shim: Path, work: Path, env: dict[str, str]) -> None:
+    """R14 end to end: the shim (built with _BAKED_PROBES) answers a lone
+    baked probe itself, in $CONDA_PREFIX, and hands zig everything else."""
+    env = dict(env, CONDA_PREFIX="/opt/baked")
+    version = subprocess.run([str(shim), "--version"], capture_output=True, text=True, env=env, timeout=15)
+    verbose = subprocess.run([str(shim), "-v"], capture_output=True, text=True, env=env, timeout=15)
+    if (version.returncode == 0 and version.stdout == "zig cc at /opt/baked/bin\n"
+            and verbose.stdout == "" and verbose.stderr == "clang version 14.0.6\nInstalledDir: /opt/baked/bin\n"):
+        PASS("[probes] unix shim replays baked --version / -v in $CONDA_PREFIX")
+    else:
+        FAIL("[probes] unix shim replays baked --version / -v in $CONDA_PREFIX",
+             f"--version={version.stdout!r} -v={verbose.stdout!r}/{verbose.stderr!r}")
+
+    sysroot = work / "probe_sysroot"
+    sysroot.mkdir(exist_ok=True)
+    results = dry_exec_many([[str(shim), "-dumpmachine"], [str(shim), "-v", "-c", "foo.c"]], cwd=work, env=env)
+    results += dry_exec_many([[str(shim), "-v"]], cwd=work, env=dict(env, CONDA_BUILD_SYSROOT=str(sysroot)))
+    unbaked, compile_v, with_sysroot = (argv or [] for argv, _ in results)
+    if ("-dumpmachine" in unbaked and "-v" in compile_v and "foo.c" in compile_v
+            and "-v" in with_sysroot and "-isysroot" in with_sysroot):
+        PASS("[probes] unix shim passes unbaked, non-lone and sysroot'd probes to zig")
+    else:
+        FAIL("[probes] unix shim passes unbaked, non-lone and sysroot'd probes to zig",
+             f"-dumpmachine={unbaked} -v -c={compile_v} -v with sysroot={with_sysroot}")
+
+
 # ===================================================================
 # Main
 # ===================================================================
+# ---------------------------------------------------------------------------
+# Leg (E): generated-Python (_translate_gen.py, imported in-process)
+# ---------------------------------------------------------------------------
+_PY_THROUGHPUT_CASES = 20000
+
+
+def _import_translate_gen():
+    if str(_BUILDING_DIR) not in sys.path:
+        sys.path.insert(0, str(_BUILDING_DIR))
+    try:
+        import _translate_gen
+    except ImportError:
+        return None
+    return _translate_gen
+
+
+def _py_profile(tg, profile: str, conda_prefix: str, probes=None):
+    # Same fields _translate_harness.c fills in for each profile.
+    is_win = profile == "win"
+    return tg.Profile(is_win=is_win, is_win_target=is_win, conda_prefix=conda_prefix,
+                      zig_target_arch="x86_64", sysroot="", probes=probes)
+
+
+# R14 answers for the probe checks, in flag_rules.py's probe order:
+# -dumpmachine is left unbaked, -v answers on stderr.
+_BAKED_PROBES = (("14.0.6\n", ""), ("", ""), ("zig cc at {conda_prefix}/bin\n", ""),
+                 ("", "clang version 14.0.6\nInstalledDir: {conda_prefix}/bin\n"))
+_PROBE_CASES = [("cc", ["-dumpversion"]), ("cxx", ["-dumpmachine"]), ("cc", ["--version"]), ("cxx", ["-v"]),
+                ("cc", ["-v", "-c", "foo.c"]), ("cc", ["--version", "-v"]), ("cc", ["-dumpversionx"])]
+
+
+def _probe_outcomes(tg, harness: Path | None, profile: str, mode: str, argv: list[str],
+                    conda_prefix: str) -> dict[str, tuple]:
+    """R14 outcome per leg: ("intercept", stdout, stderr) or ("out", tokens)."""
+    py = tg.zig_translate_flags(argv, _py_profile(tg, profile, conda_prefix, _BAKED_PROBES), mode == "cxx")
+    got = {"py": ("intercept", py.stdout, py.stderr) if py.rc == 2 else ("out", tuple(py.argv))}
+    if harness is not None:
+        env = dict(os.environ, CONDA_PREFIX=conda_prefix,
+                   ZIG_TR_HARNESS_PROBES="\x1f".join(t for answer in _BAKED_PROBES for t in answer))
+        proc = subprocess.run([str(harness), profile, mode, *argv], capture_output=True, text=True,
+                              env=env, timeout=15)
+        got["C"] = (("intercept", proc.stdout, proc.stderr) if proc.returncode == 2
+                    else ("out", tuple(t for t in proc.stdout.splitlines()
+                                       if not t.startswith(("USE_LLD=", "MODE_CXX=")))))
+    if _BASH and profile == "unix":
+        flat = [t for answer in _BAKED_PROBES for t in answer]
+        reply = _gen_worker().call("_capture_probe", *flat, conda_prefix, "x86_64", "0",
+                                   "1" if mode == "cxx" else "0", *argv)
+        tokens = _parse_declare_p_array(reply.stdout, "_tr_out_args")
+        got["bash"] = ("intercept", reply.stdout, reply.stderr) if tokens is None else ("out", tuple(tokens))
+    return got
+
+
+def _run_baked_probe_legs(tg, harness: Path | None, conda_prefix: str) -> None:
+    """R14 across the generated translators: a lone baked probe replays its
+    answer with {conda_prefix} filled in; an unbaked one, or one with
+    company, translates like any other flag."""
+    diffs, wrong = [], []
+    for profile in ("unix", "win"):
+        for mode, argv in _PROBE_CASES:
+            got = _probe_outcomes(tg, harness, profile, mode, argv, conda_prefix)
+            # Compared modulo stderr's trailing newlines, which the bash
+            # worker drops (_bash_worker.py).
+            if len({o[:2] + tuple(t.rstrip("\n") for t in o[2:]) for o in got.values()}) != 1:
+                diffs.append(f"{profile} {argv!r}: {got}")
+            index = tg._PROBES.index(argv[0]) if len(argv) == 1 and argv[0] in tg._PROBES else None
+            baked = index is not None and any(_BAKED_PROBES[index])
+            want_out, want_err = ((t.replace("{conda_prefix}", conda_prefix) for t in _BAKED_PROBES[index])
+                                  if baked else ("", ""))
+            if got["py"] != (("intercept", want_out, want_err) if baked else ("out", got["py"][1])):
+                wrong.append(f"{profile} {argv!r}: {got['py']}")
+            elif not baked and not set(argv) <= set(got["py"][1]):
+                wrong.append(f"{profile} {argv!r}: dropped a token: {got['py']}")
+    if wrong:
+        FAIL("[probes] lone baked probes replay, others translate", "; ".join(wrong[:3]))
+    else:
+        PASS("[probes] lone baked probes replay, others translate", f"{len(_PROBE_CASES)} cases x 2 profiles")
+    if diffs:
+        FAIL("[probes] generated C, Python and bash agree", "; ".join(diffs[:3]))
+    else:
+        PASS("[probes] generated C, Python and bash agree",
+             "python" + (", C" if harness else "") + (", bash (unix)" if _BASH else ""))
+
+
+def _py_capture(tg, profile: str, mode: str, argv: list[str], *, conda_prefix: str) -> GenResult:
+    r = tg.zig_translate_flags(argv, _py_profile(tg, profile, conda_prefix), mode == "cxx")
+    if r.rc == 2:
+        return GenResult(returncode=2, tokens=[], use_lld=-1, is_cxx=-1, stdout=r.stdout)
+    return GenResult(returncode=0, tokens=r.argv, use_lld=r.use_lld, is_cxx=r.mode_is_cxx, stdout="")
+
+
+def _gen_key(r: GenResult) -> tuple:
+    """What two legs must agree on: the intercept output, or the translation
+    (the C harness's stdout also carries its token dump; ignore that)."""
+    if r.returncode == 2:
+        return 2, r.stdout
+    return r.returncode, r.tokens, r.use_lld, r.is_cxx
+
+
+def _differential_corpus(tg) -> list[tuple[str, list[str]]]:
+    """(mode, argv) cases built from the generated token table: every
+    pattern bare, with a suffix, followed by each pair-completing value,
+    and after -Wl,-z,defs (use_lld on) -- so every class and both sides
+    of every pair/lookahead rule are hit at least once."""
+    patterns = list(tg._EXACT) + list(tg._PREFIX)
+    followers = ["-Bsymbolic", "x86_64-conda-linux-gnu", "foo.map", "-c"]
+    cases: list[tuple[str, list[str]]] = []
+    for pat in patterns:
+        for tok in (pat, pat + "x", pat + "x86_64-conda-linux-gnu"):
+            cases.append(("cc", [tok]))
+            cases.extend(("cc", [tok, f]) for f in followers)
+            cases.append(("cxx", ["-Wl,-z,defs", tok, "-nostdlib++"]))
+    cases += [("cc", ["-Map"]), ("cc", ["-Map="]), ("cc", ["-target"]), ("cc", ["-Xlinker"]),
+              ("cc", ["-print-file-name=libc.so"]), ("cc", ["-print-file-name=pkgconfig"]),
+              ("cc", ["-print-prog-name=ld"]),
+              ("cc", ["--target=arm64-apple-darwin20.0.0"]), ("cc", ["-mcpu=native", "-mcpu=x"])]
+    return cases
+
+
+def _bash_gen_raw(argv: list[str], mode: str, conda_prefix: str) -> tuple[str, list[str], int, int]:
+    """("out", tokens, use_lld, is_cxx) or ("intercept", [], -1, -1) with
+    stdout in place of tokens, from the generated bash (unix profile)."""
+    res = _bash_gen_capture("unix", mode, argv, conda_prefix=conda_prefix)
+    if "declare -a _tr_out_args" not in res.stdout:
+        return "intercept", [res.stdout], -1, -1
+    return "out", res.tokens, res.use_lld, res.is_cxx
+
+
+def run_generated_python_leg() -> None:
+    """Leg (E): the GENERATED Python translator (_translate_gen.py) passes
+    the golden table, agrees with the C harness (both profiles) and the
+    generated bash (unix profile) on a corpus built from the token table,
+    and reports its in-process throughput."""
+    print("--- Generated-Python leg (_translate_gen.py, in-process) ---")
+    tg = _import_translate_gen()
+    if tg is None:
+        SKIP("generated-Python leg (genPy)", "building/_translate_gen.py not importable")
+        return
+
+    conda_prefix = tempfile.mkdtemp(prefix="zig_translate_conda_")
+    for gcase in GEN_CASES:
+        name = f"[{gcase.id:02d}-genPy] {gcase.desc}"
+        unix_res = _py_capture(tg, "unix", gcase.mode, gcase.argv, conda_prefix=conda_prefix)
+        win_res = _py_capture(tg, "win", gcase.mode, gcase.argv, conda_prefix=conda_prefix)
+        ok, detail = gcase.assertion(unix_res, win_res)
+        PASS(name) if ok else FAIL(name, detail)
+
+    # Planted files so R3/R11's probe-hit branch is exercised too.
+    (Path(conda_prefix) / "lib").mkdir()
+    (Path(conda_prefix) / "lib" / "libc.so").write_text("")
+    (Path(conda_prefix) / "lib" / "pkgconfig").mkdir()  # R3 answers for any type, like [[ -e ]]
+    (Path(conda_prefix) / "bin").mkdir()
+    (Path(conda_prefix) / "bin" / "ld").write_text("")
+    corpus = _differential_corpus(tg)
+
+    harness = _compile_c_harness()
+    if harness is None:
+        SKIP("[genPy] agrees with generated C", "no C compiler found on PATH")
+    else:
+        diffs = []
+        for mode, argv in corpus:
+            for profile in ("unix", "win"):
+                c = _c_harness_capture(harness, profile, mode, argv, conda_prefix=conda_prefix)
+                py = _py_capture(tg, profile, mode, argv, conda_prefix=conda_prefix)
+                if _gen_key(c) != _gen_key(py):
+                    diffs.append(f"{profile} {mode} {argv!r}: C={c} py={py}")
+        if diffs:
+            FAIL("[genPy] agrees with generated C", f"{len(diffs)} differ, e.g. {diffs[0]}")
+        else:
+            PASS("[genPy] agrees with generated C", f"{len(corpus)} cases x 2 profiles")
+
+    if not _BASH:
+        SKIP("[genPy] agrees with generated bash", "bash unavailable")
+    else:
+        diffs = []
+        # Known divergence: a trailing bare -target is kept by the C/Python
+        # and paired with "" by the bash; no wrapper ever passes one.
+        checked = [(m, a) for m, a in corpus if a[-1] != "-target"]
+        for mode, argv in checked:
+            py = tg.zig_translate_flags(argv, _py_profile(tg, "unix", conda_prefix), mode == "cxx")
+            want = (("intercept", [py.stdout], -1, -1) if py.rc == 2
+                    else ("out", py.argv, py.use_lld, py.mode_is_cxx))
+            got = _bash_gen_raw(argv, mode, conda_prefix)
+            if got != want:
+                diffs.append(f"{mode} {argv!r}: bash={got} py={want}")
+        if diffs:
+            FAIL("[genPy] agrees with generated bash", f"{len(diffs)} differ, e.g. {diffs[0]}")
+        else:
+            PASS("[genPy] agrees with generated bash", f"{len(checked)} cases, unix profile")
+
+    _run_baked_probe_legs(tg, harness, conda_prefix)
+
+    rng = random.Random(0)
+    vocab = [a for _, argv in corpus for a in argv] + ["-c", "-O2", "foo.c", "-o", "foo.o"]
+    argvs = [[rng.choice(vocab) for _ in range(rng.randint(1, 24))] for _ in range(_PY_THROUGHPUT_CASES)]
+    profile = _py_profile(tg, "unix", "/nonexistent-conda-prefix")
+    t0 = time.perf_counter()
+    for argv in argvs:
+        tg.zig_translate_flags(argv, profile)
+    elapsed = time.perf_counter() - t0
+    PASS("[genPy] in-process throughput", f"{len(argvs) / elapsed:,.0f} argv cases/s")
+
+
 def main() -> int:
     print("=== Flag Translation Parity (golden/characterization) ===")
     print(f"  bash            = {_BASH!r}")
@@ -861,6 +1396,12 @@ def main() -> int:
     print()
     run_unix_shim_compile_leg()
 
+    print()
+    run_response_file_leg()
+
+    print()
+    run_generated_python_leg()
+
     print()
     n_pass = len(_results["PASS"])
     n_fail = len(_results["FAIL"])
@@ -885,14 +1426,16 @@ def main() -> int:
     genc_counts = _leg_counts("genC")
     genb_counts = _leg_counts("genB")
     shim_counts = _leg_counts("unix-shim")
+    rsp_counts = _leg_counts("[rsp]")
+    genpy_counts = _leg_counts("genPy")
     total_counts = (n_pass, n_fail, n_warn, n_skip)
     # actual-bash is derived by SUBTRACTION -- it is whatever is left after the
     # explicitly tagged legs.  EVERY new leg must be subtracted here too, or its
     # results silently inflate the actual-bash column (the unix-shim leg did
     # exactly that when first added: actual-bash read 14 for 13 golden cases).
     actual_bash_counts = tuple(
-        t - c - b - s
-        for t, c, b, s in zip(total_counts, genc_counts, genb_counts, shim_counts)
+        t - c - b - s - r - p
+        for t, c, b, s, r, p in zip(total_counts, genc_counts, genb_counts, shim_counts, rsp_counts, genpy_counts)
     )
 
     print()
@@ -901,6 +1444,8 @@ def main() -> int:
     print(f"  generated-C    : {genc_counts}")
     print(f"  generated-bash : {genb_counts}")
     print(f"  unix-shim      : {shim_counts}")
+    print(f"  response-file  : {rsp_counts}")
+    print(f"  generated-py   : {genpy_counts}")
 
     if n_fail:
         print("\nFailed tests (clean-lock regressions or capture errors):")
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Template coverage test for recipe/install_zig_activation.py.
+
+Every wrapper, helper and activation script is installed from a template
+under recipe/scripts/ or recipe/building/ by a single-pass @NAME@
+substitution (_render_template) that raises TemplateError on any token it
+has no value for; the C shims take the same names as -D macros, and
+_compile_c_shim refuses a shim whose "@NAME@" fallback macros are not all
+defined. This script:
+
+  1. checks the engine itself: one pass (a value containing @X@ is not
+     re-expanded), bash "$@" / "${a[@]}" and batch "@echo off" left
+     alone, unknown tokens rejected, parsed templates cached;
+  2. runs the real installers -- activation scripts, the unix and
+     non-unix wrapper suites (twice, as the cross build does) and both
+     cross wrappers -- into a scratch prefix, with a fake `zig` that just
+     records its argv into the -o file;
+  3. asserts every template under scripts/ and building/ was rendered or
+     compiled by some installer, no installed text file still carries an
+     @NAME@ token, and every shim compile got a -D for each of its macros;
+  4. bakes R14's compiler-identity probes from a fake zig and checks the
+     prefix comes back spelled {conda_prefix}, failed probes stay unbaked,
+     and the probe order matches flag_rules.py's.
+
+No zig needed; the shim-compile leg SKIPs on Windows (the fake zig is a
+shell script).
+
+Usage:
+    python testing/test_install_templates.py
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import sys
+import tempfile
+from pathlib import Path
+
+from _test_utils import PASS, FAIL, SKIP, _results
+
+# Anchor: see test_flag_translation_parity.py -- parents[1] is recipe/ at
+# dev time and the staged step dir at rattler test time.
+_RECIPE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(_RECIPE_DIR))
+
+import install_zig_activation as installer  # noqa: E402
+
+_TOKEN_RE = re.compile(r"@[A-Z][A-Z0-9_]*@")
+
+# Records its argv (one per line) as the -o output, like a compile would.
+_FAKE_ZIG = """\
+#!/bin/sh
+out=""
+prev=""
+for a in "$@"; do
+    [ "$prev" = "-o" ] && out="$a"
+    prev="$a"
+done
+[ -n "$out" ] || exit 1
+printf '%s\\n' "$@" > "$out"
+"""
+
+
+def _templates() -> list[Path]:
+    """Every file under scripts/ and building/ that install_zig_activation.py
+    renders or compiles: the scripts, the *.sh carrying @NAME@ tokens, and
+    the C shims."""
+    found = sorted(p for p in (_RECIPE_DIR / "scripts").iterdir() if p.suffix in (".sh", ".bat"))
+    found += sorted(p for p in (_RECIPE_DIR / "building").glob("*.sh") if _TOKEN_RE.search(p.read_text()))
+    found += sorted((_RECIPE_DIR / "building").glob("*.c"))
+    return found
+
+
+def _check_engine(workdir: Path) -> None:
+    src = workdir / "engine.sh"
+    src.write_text('exec "@ZIG_BIN@" "$@" "${a[@]}" # @echo off @lower@ @ZIG_BIN@@X@\n')
+    out = installer._render_template(src, {"ZIG_BIN": "@X@", "X": "x"})
+    want = 'exec "@X@" "$@" "${a[@]}" # @echo off @lower@ @X@x\n'
+    if out == want:
+        PASS("[engine] single pass, non-placeholder @ left alone")
+    else:
+        FAIL("[engine] single pass, non-placeholder @ left alone", repr(out))
+
+    try:
+        installer._render_template(src, {"ZIG_BIN": "z"})
+    except installer.TemplateError as exc:
+        PASS("[engine] unknown token raises TemplateError", str(exc).split(": ", 1)[-1])
+    else:
+        FAIL("[engine] unknown token raises TemplateError", "@X@ rendered without a value")
+
+    before = installer._parse_template.cache_info()
+    installer._render_template(src, {"ZIG_BIN": "z", "X": "x"})
+    after = installer._parse_template.cache_info()
+    if after.hits > before.hits and after.misses == before.misses:
+        PASS("[engine] parsed templates are cached")
+    else:
+        FAIL("[engine] parsed templates are cached", f"{before} -> {after}")
+
+
+def _install_all(prefix: Path) -> tuple[set[Path], int]:
+    """Run every installer into prefix; return (rendered template paths,
+    template parse misses during the second wrapper-suite pass)."""
+    rendered: set[Path] = set()
+    render = installer._render_template
+
+    def recording_render(src, replacements):
+        rendered.add(Path(src).resolve())
+        return render(src, replacements)
+
+    installer._render_template = recording_render
+    try:
+        for is_nonunix, triplet, zig_triplet in (
+            (False, "x86_64-conda-linux-gnu", "x86_64-linux-gnu.2.17"),
+            (True, "x86_64-w64-mingw32", "x86_64-windows-gnu"),
+        ):
+            root = prefix / ("nonunix" if is_nonunix else "unix")
+            installer.install_activation_scripts(
+                root, _RECIPE_DIR, zig_triplet=zig_triplet, conda_triplet=triplet,
+                cross_target_triplet=triplet, is_nonunix=is_nonunix)
+            installer.install_zig_cc_wrappers(
+                root, _RECIPE_DIR, zig_triplet=zig_triplet, conda_triplet=triplet,
+                is_nonunix=is_nonunix)
+            # The cross build's second, native-triplet suite.
+            misses = installer._parse_template.cache_info().misses
+            installer.install_zig_cc_wrappers(
+                root, _RECIPE_DIR, zig_triplet="native", conda_triplet="aarch64-conda-linux-gnu",
+                is_nonunix=is_nonunix)
+            second_pass_misses = installer._parse_template.cache_info().misses - misses
+            cross = installer.install_nonunix_cross_wrappers if is_nonunix else installer.install_unix_cross_wrappers
+            cross(root, _RECIPE_DIR, "x86_64-conda-linux-gnu", triplet, zig_triplet)
+    finally:
+        installer._render_template = render
+    return rendered, second_pass_misses
+
+
+def _check_installers(workdir: Path) -> None:
+    if sys.platform == "win32":
+        SKIP("[install] every template rendered by the installers", "fake zig is a shell script")
+        return
+    fake_zig = workdir / "fake-zig"
+    fake_zig.write_text(_FAKE_ZIG)
+    fake_zig.chmod(0o755)
+    saved = {k: os.environ.get(k) for k in ("CONDA_ZIG_BUILD", "CONDA_ZIG_HOST", "CPU_COUNT")}
+    os.environ.update(CONDA_ZIG_BUILD=str(fake_zig), CONDA_ZIG_HOST="", CPU_COUNT="4")
+    prefix = workdir / "prefix"
+    try:
+        rendered, second_pass_misses = _install_all(prefix)
+    except (installer.TemplateError, RuntimeError, OSError) as exc:
+        FAIL("[install] installers run to completion", f"{type(exc).__name__}: {exc}")
+        return
+    finally:
+        for k, v in saved.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+    PASS("[install] installers run to completion")
+
+    if second_pass_misses == 0:
+        PASS("[install] second wrapper suite re-parses no template")
+    else:
+        FAIL("[install] second wrapper suite re-parses no template", f"{second_pass_misses} cache misses")
+
+    compiled: dict[Path, list[list[str]]] = {}
+    leftovers = []
+    for path in sorted(p for p in prefix.rglob("*") if p.is_file()):
+        text = path.read_text(errors="replace")
+        argv = text.splitlines()
+        srcs = [Path(a).resolve() for a in argv if a.endswith(".c")]
+        if argv and argv[0] == "cc" and srcs:
+            compiled.setdefault(srcs[-1], []).append(argv)
+        elif _TOKEN_RE.search(text):
+            leftovers.append(f"{path.relative_to(prefix)}: {_TOKEN_RE.search(text).group(0)}")
+
+    missing = [str(t.relative_to(_RECIPE_DIR)) for t in _templates()
+               if t.resolve() not in rendered and t.resolve() not in compiled]
+    if missing:
+        FAIL("[install] every template rendered by the installers", f"never used: {', '.join(missing)}")
+    else:
+        PASS("[install] every template rendered by the installers", f"{len(_templates())} templates")
+
+    if leftovers:
+        FAIL("[install] no @NAME@ token survives installation", "; ".join(leftovers[:5]))
+    else:
+        PASS("[install] no @NAME@ token survives installation")
+
+    undefined = []
+    for src, runs in compiled.items():
+        for argv in runs:
+            given = {a[2:].split("=", 1)[0] for a in argv if a.startswith("-D")}
+            undefined += [f"{src.name}: {m}" for m in installer._shim_macros(src) if m not in given]
+    if undefined:
+        FAIL("[install] every shim compile defines all its macros", "; ".join(sorted(set(undefined))[:5]))
+    else:
+        PASS("[install] every shim compile defines all its macros",
+             f"{sum(len(r) for r in compiled.values())} shim binaries from {len(compiled)} sources")
+
+
+# Answers two probes (one on stderr, naming its own directory), fails one.
+_PROBE_ZIG = """\
+#!/bin/sh
+eval "last=\\${$#}"
+case "$last" in
+    -dumpversion) echo 19.1.7 ;;
+    -v) echo "InstalledDir: $(dirname "$0")" >&2 ;;
+    *) exit 1 ;;
+esac
+"""
+
+
+def _check_probe_baking(workdir: Path) -> None:
+    sys.path.insert(0, str(_RECIPE_DIR / "building"))
+    import flag_rules
+
+    want = tuple(next(r for r in flag_rules.RULES if r["id"] == "R14_baked_probes")["match"]["values"])
+    if installer._CC_PROBES == want:
+        PASS("[probes] installer probe order matches flag_rules.py")
+    else:
+        FAIL("[probes] installer probe order matches flag_rules.py", f"{installer._CC_PROBES} != {want}")
+
+    if sys.platform == "win32":
+        SKIP("[probes] baked with the prefix spelled {conda_prefix}", "fake zig is a shell script")
+        return
+    prefix = workdir / "probe-prefix"
+    (prefix / "bin").mkdir(parents=True)
+    zig = prefix / "bin" / "zig"
+    zig.write_text(_PROBE_ZIG)
+    zig.chmod(0o755)
+    got = installer._bake_cc_probes(zig, "x86_64-linux-gnu", prefix)
+    want = ("19.1.7\n", "", "", "", "", "", "", "InstalledDir: {conda_prefix}/bin\n")
+    if got == want:
+        PASS("[probes] baked with the prefix spelled {conda_prefix}")
+    else:
+        FAIL("[probes] baked with the prefix spelled {conda_prefix}", repr(got))
+
+    if installer._bake_cc_probes(None, "x86_64-linux-gnu", prefix) == ("",) * 8:
+        PASS("[probes] nothing baked without a runnable zig")
+    else:
+        FAIL("[probes] nothing baked without a runnable zig")
+
+    define = installer._c_define("ZIG_BAKED_PROBES", ("a\tb\n", 'q"\\'))
+    if define == '-DZIG_BAKED_PROBES="a\\011b\\n", "q\\"\\\\"':
+        PASS("[probes] baked text survives as C string literals")
+    else:
+        FAIL("[probes] baked text survives as C string literals", define)
+
+
+def main() -> int:
+    print("=== install_zig_activation.py templates ===")
+    with tempfile.TemporaryDirectory(prefix="install_templates_") as td:
+        workdir = Path(td)
+        _check_engine(workdir)
+        _check_installers(workdir)
+        _check_probe_baking(workdir)
+
+    n_fail = len(_results["FAIL"])
+    print(f"\n=== Results: {len(_results['PASS'])} passed, {n_fail} failed, {len(_results['SKIP'])} skipped ===")
+    return 1 if n_fail else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
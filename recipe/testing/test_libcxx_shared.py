@@ -43,6 +43,9 @@ from _test_utils import (
     _record,
     _results,
     _run,
+    calibrate_timeouts,
+    describe_calibration,
+    prewarm_zig_cache,
     PASS,
     FAIL,
     WARN,
@@ -742,7 +745,19 @@ def test_libcxx_shared_simulation() -> None:
 # ===================================================================
 # Main
 # ===================================================================
+def _warm_links() -> list[tuple[list[str], str, str]]:
+    """The C and C++ shared-library links the tests below make, so their
+    runtimes are built once up front (none when linking tests skip)."""
+    zig = _find_zig_binary()
+    if is_ppc64le or _is_emulated or not zig:
+        return []
+    ext = ".dll" if is_win_target else ".dylib" if is_macos_target else ".so"
+    return [([zig, "c++", "-shared"], "c++", f"libwarm-cxx{ext}"),
+            ([zig, "cc", "-shared"], "c", f"libwarm-c{ext}")]
+
+
 def main() -> int:
+    calibrate_timeouts()
     print("=== Shared libc++ Discovery Tests (patch 0008) ===")
     print(f"  CONDA_PREFIX  = {_prefix}")
     print(f"  CONDA_TRIPLET = {_conda_triplet}")
@@ -752,8 +767,13 @@ def main() -> int:
     print(f"  arm64         = {is_arm64}")
     print(f"  ppc64le       = {is_ppc64le}")
     print(f"  emulated      = {_is_emulated}")
+    print(f"  timeout scale = {describe_calibration()}")
     print()
 
+    links = _warm_links()
+    if links:
+        prewarm_zig_cache(links)
+
     test_libcxx_fallback_static()
     test_libcxx_probe_paths()
     test_libcxx_shared_simulation()
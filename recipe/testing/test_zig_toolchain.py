@@ -6,6 +6,23 @@ Replaces test-wrappers.sh / test-wrappers.bat with a single cross-platform
 test that adds functional validation and characterization tests for known
 zig bugs.
 
+Independent tests run in parallel worker processes (--jobs, default
+CPU_COUNT, 1 under emulation) once prewarm_zig_cache() has built the
+target's runtimes into the shared ZIG_GLOBAL_CACHE_DIR -- heaviest first
+when an earlier report (--costs) gives their timings. The report and exit
+code are those of a serial run (see run_tests in _test_utils.py).
+
+_run() timeouts are scaled by the runner's slowdown, measured at startup
+(calibrate_timeouts; under qemu typically 5-20x).
+
+Every test and every _run() is timed (wall; child CPU and peak RSS where
+the resource module exists). --json / --junit, or $ZIG_TEST_REPORT_DIR,
+write them out; compare_test_reports.py diffs a JSON report against a
+stored baseline.
+
+Usage:
+    python testing/test_zig_toolchain.py [--jobs N] [--json PATH] [--junit PATH] [--costs REPORT]
+
 Exit codes:
   0 = all passed (warnings are OK)
   1 = at least one FAIL
@@ -13,9 +30,12 @@ Exit codes:
 
 from __future__ import annotations
 
+import argparse
+import json
 import os
 import platform
 import shutil
+import struct
 import sys
 import tempfile
 
@@ -27,6 +47,7 @@ if hasattr(sys.stderr, "reconfigure"):
     sys.stderr.reconfigure(encoding="utf-8", errors="replace")
 from pathlib import Path
 
+from _bash_worker import BashWorker, BashWorkerError
 from _test_utils import (
     _build_is_win,
     _build_is_mac,
@@ -35,11 +56,22 @@ from _test_utils import (
     _record,
     _results,
     _run,
+    calibrate_timeouts,
+    describe_calibration,
+    dry_exec,
+    dry_exec_many,
+    load_test_costs,
+    prewarm_zig_cache,
+    print_slowest,
+    run_tests,
+    write_reports,
     PASS,
     FAIL,
     WARN,
     SKIP,
     setup_zig_global_cache_dir,
+    temp_env,
+    timeout_scale,
 )
 
 # ---------------------------------------------------------------------------
@@ -108,6 +140,13 @@ int main(void) {
 }
 """
 
+# test_force_load_wrappers (g): archive count on the -all_load stress line,
+# and the budget for STEP 10b alone on a native runner (the linear rewrite
+# takes ~8 ms on an x86_64 runner; the quadratic one it replaced took
+# ~400 ms). The check scales it by the calibrated timeout scale.
+_FORCE_LOAD_STRESS_ARCHIVES = 5000
+_FORCE_LOAD_STRESS_BUDGET_MS = 150
+
 
 # ===================================================================
 # Section 1 — Wrapper existence
@@ -222,9 +261,74 @@ def test_activation_variables() -> None:
 # ===================================================================
 # Section 3 — Flag filtering (functional)
 # ===================================================================
+_CONDA_INJECTED_FLAGS = [
+    "-march=nocona",
+    "-mtune=haswell",
+    "-fstack-protector-strong",
+    "-fno-plt",
+    "-ftree-vectorize",
+    "-fdebug-prefix-map=/src=/usr/local/src/conda/pkg",
+    "-lgcc_s",
+    "-l:libpthread.a",
+]
+
+_FILTER_CASE_SH = r"""
+_frag="$1"
+_filter_case() {
+    _ZIG_MODE="$1"
+    shift
+    source "$_frag"
+    printf '%s\n' "${_exec_args[@]}"
+}
+"""
+
+
+def _check_fragment_filtering() -> None:
+    """Every subset of _CONDA_INJECTED_FLAGS, in both modes, interleaved
+    with an ordinary compile line, through the INSTALLED _zig-cc-common.sh:
+    none may survive into _exec_args, and the compile line must come
+    through intact and in order. One persistent bash worker
+    (_bash_worker.py) serves all the cases; no zig is run."""
+    if _build_is_win:
+        SKIP("fragment filters conda-injected flags", "Unix-only (bash fragment)")
+        return
+    common = _wrapper_dir / f"{_triplet}-_zig-cc-common.sh"
+    if not common.exists():
+        SKIP("fragment filters conda-injected flags", f"{common.name} not installed")
+        return
+
+    keep = ["-c", "-o", "test.o", "test.c"]
+    cases = []
+    for mask in range(1 << len(_CONDA_INJECTED_FLAGS)):
+        injected = [f for i, f in enumerate(_CONDA_INJECTED_FLAGS) if mask >> i & 1]
+        for mode in ("cc", "c++"):
+            cases.append([mode, *injected[: len(injected) // 2], *keep, *injected[len(injected) // 2:]])
+
+    try:
+        with BashWorker(_FILTER_CASE_SH, args=[str(common)], timeout=30) as worker:
+            replies = worker.map("_filter_case", cases)
+    except BashWorkerError as exc:
+        SKIP("fragment filters conda-injected flags", str(exc))
+        return
+
+    bad = []
+    for case, reply in zip(cases, replies):
+        exec_args = reply.stdout.splitlines()
+        kept = [a for a in exec_args if a in keep]
+        leaked = [a for a in exec_args if a in _CONDA_INJECTED_FLAGS]
+        if reply.rc != 0 or leaked or kept != keep or exec_args[:1] != [case[0]]:
+            bad.append(f"{case!r}: rc={reply.rc} exec_args={exec_args!r} {reply.stderr[:200]}")
+    if bad:
+        FAIL("fragment filters conda-injected flags", f"{len(bad)}/{len(cases)} cases, e.g. {bad[0]}")
+    else:
+        PASS("fragment filters conda-injected flags", f"{len(cases)} flag combinations")
+
+
 def test_flag_filtering() -> None:
     print("--- Flag filtering (compile with conda-injected flags) ---")
 
+    _check_fragment_filtering()
+
     zig_cc = _env_var("ZIG_CC")
     if not zig_cc:
         SKIP("flag filtering", "ZIG_CC not set")
@@ -1087,17 +1191,18 @@ def test_force_load_wrappers() -> None:
     already explicitly -force_load'd. No tmpdir is created and ar is never
     invoked (that extraction path belonged to the deleted bash implementation).
 
-    Capture mechanism for sub-cases (a)-(e): ZIG_WRAPPER_PRINT_ARGV=1 makes
+    Capture mechanism for sub-cases (a)-(e): ZIG_WRAPPER_DRY_EXEC=1 makes
     the wrapper dump its complete final argv -- argv[0], then the "cc"/"c++"
-    mode token, then the rest, one token per line -- to stdout and exit 0
-    without ever invoking zig. zig's own --verbose-link is a subcommand-only
+    mode token, then the rest, NUL-terminated -- to stdout and exit 0
+    without ever invoking zig (see _test_utils.dry_exec). zig's own --verbose-link is a subcommand-only
     option that zig's clang-driver (cc) mode rejects outright
     ("Unknown Clang option: '--verbose-link'"), so it cannot be used here.
     Sub-case (e) is checked per-archive: each archive must appear exactly
     once as a -force_load operand, with no leftover -all_load token and no
-    orphaned -Xlinker where -all_load was stripped. Sub-case (f) does not
-    inspect the dumped argv; instead it verifies ar is never invoked and
-    TMPDIR is untouched.
+    orphaned -Xlinker where -all_load was stripped. Sub-case (g) is the
+    5,000-archive stress line with a fixed time budget for the rewrite.
+    Sub-case (f) does not inspect the dumped argv; instead it verifies ar
+    is never invoked and TMPDIR is untouched.
     """
     print("--- Force-load wrappers (Unix) ---")
 
@@ -1157,23 +1262,11 @@ def test_force_load_wrappers() -> None:
         out = Path(td) / "probe"
 
         def _dump_argv(extra: list[str]) -> list[str]:
-            """Invoke the wrapper with ZIG_WRAPPER_PRINT_ARGV=1 and return its
-            fully rewritten argv as a token list (argv[0] and the cc/c++ mode
-            token included, no trailing empty entries)."""
-            cmd = [str(fl_cc), str(main_src), *extra, "-o", str(out)]
-            old_flag = os.environ.get("ZIG_WRAPPER_PRINT_ARGV")
-            os.environ["ZIG_WRAPPER_PRINT_ARGV"] = "1"
-            try:
-                r = _run(cmd, cwd=td, timeout=60)
-            finally:
-                if old_flag is None:
-                    os.environ.pop("ZIG_WRAPPER_PRINT_ARGV", None)
-                else:
-                    os.environ["ZIG_WRAPPER_PRINT_ARGV"] = old_flag
-            tokens = r.stdout.split("\n")
-            while tokens and tokens[-1] == "":
-                tokens.pop()
-            return tokens
+            """Dry-exec the wrapper and return its fully rewritten argv as a
+            token list (argv[0] and the cc/c++ mode token included), or []
+            if it never reached zig."""
+            argv, _ = dry_exec([str(fl_cc), str(main_src), *extra, "-o", str(out)], cwd=td, timeout=60)
+            return argv or []
 
         def _operand_after(tokens: list[str], idx: int) -> str | None:
             """Return the value that follows the -force_load token at idx."""
@@ -1232,6 +1325,43 @@ def test_force_load_wrappers() -> None:
                  f"force_load_operands={operands_e} no_orphan_xlinker={no_orphan_xlinker} "
                  f"argv={' '.join(argv_e)[:800]}")
 
+        # (g) stress: -all_load over 5,000 archives, the first 500 also named
+        # by an explicit -force_load. Every archive must end up force-loaded
+        # exactly once, and STEP 10b must stay linear: its own time, read
+        # from a ZIG_WRAPPER_TRACE record, has a budget (scaled like the
+        # _run() timeouts, so a slow or emulated lane gets the same
+        # headroom) that a per-archive rescan of the whole line blows through.
+        many = Path(td) / "many"
+        many.mkdir()
+        archives = []
+        for i in range(_FORCE_LOAD_STRESS_ARCHIVES):
+            dst = many / f"l{i}.a"
+            try:
+                os.link(lib_a, dst)
+            except OSError:
+                shutil.copyfile(lib_a, dst)
+            archives.append(f"many/l{i}.a")
+        explicit = [tok for a in archives[:500] for tok in ("-force_load", a)]
+        trace_dir = Path(td) / "trace"
+        with temp_env(ZIG_WRAPPER_TRACE=str(trace_dir)):
+            argv_g = _dump_argv([*explicit, "-all_load", *archives])
+        operands_g = [argv_g[i + 1] for i, tok in enumerate(argv_g[:-1]) if tok == "-force_load"]
+        if sorted(operands_g) == sorted(archives) and "-all_load" not in argv_g:
+            PASS(f"-all_load over {len(archives)} archives force-loads each exactly once")
+        else:
+            FAIL(f"-all_load over {len(archives)} archives force-loads each exactly once",
+                 f"{len(operands_g)} operands, {len(set(operands_g))} distinct")
+        records = [json.loads(line) for f in sorted(trace_dir.glob("trace-*.jsonl"))
+                   for line in f.read_text().splitlines()] if trace_dir.is_dir() else []
+        step_ms = records[0]["steps_ns"]["force_load"] / 1e6 if len(records) == 1 else None
+        budget_ms = _FORCE_LOAD_STRESS_BUDGET_MS * timeout_scale()
+        if step_ms is None:
+            FAIL("STEP 10b time budget", f"expected one trace record, got {len(records)}")
+        elif step_ms <= budget_ms:
+            PASS("STEP 10b time budget", f"{step_ms:.1f} ms <= {budget_ms:g} ms")
+        else:
+            FAIL("STEP 10b time budget", f"{step_ms:.1f} ms > {budget_ms:g} ms")
+
         # (f) no temp dir leaked, ar never invoked -- shadow PATH with a
         # sentinel "ar" and point TMPDIR at an empty scratch dir.
         fake_bin = Path(td) / "fake_bin"
@@ -1243,18 +1373,9 @@ def test_force_load_wrappers() -> None:
         tmp_scratch = Path(td) / "tmp_scratch"
         tmp_scratch.mkdir()
 
-        _old_path = os.environ.get("PATH", "")
-        _old_tmpdir = os.environ.get("TMPDIR")
-        os.environ["PATH"] = f"{fake_bin}{os.pathsep}{_old_path}"
-        os.environ["TMPDIR"] = str(tmp_scratch)
-        try:
+        with temp_env(PATH=f"{fake_bin}{os.pathsep}{os.environ.get('PATH', '')}",
+                      TMPDIR=str(tmp_scratch)):
             _dump_argv(["-all_load", str(lib_a), str(lib_b)])
-        finally:
-            os.environ["PATH"] = _old_path
-            if _old_tmpdir is None:
-                os.environ.pop("TMPDIR", None)
-            else:
-                os.environ["TMPDIR"] = _old_tmpdir
 
         if ar_sentinel.exists():
             FAIL("ar is never invoked by force-load wrapper", "sentinel ar script ran")
@@ -1268,6 +1389,234 @@ def test_force_load_wrappers() -> None:
             PASS("no temp directory left behind")
 
 
+# ===================================================================
+# Section 8b — Unix-only: opt-in persistent translation cache
+# ===================================================================
+def test_translate_cache() -> None:
+    """ZIG_WRAPPER_TRANSLATE_CACHE=1 makes the C mux memoise run_cc's final
+    argv in $ZIG_GLOBAL_CACHE_DIR/zig-wrapper/translate-v2.cache (see the
+    cache section of recipe/building/unix_common.h). The cache must be
+    invisible: a repeat invocation returns the identical argv, and anything
+    the translation depends on (args, MACOSX_DEPLOYMENT_TARGET) produces a
+    different entry rather than a stale one.
+
+    Hits are observed through the file header's tick, which every store
+    bumps and a lookup never writes: two identical runs leave one occupied
+    entry and tick == 1, i.e. the second run was served from the cache
+    rather than translating and storing again. Capture uses
+    ZIG_WRAPPER_DRY_EXEC=1 as in test_force_load_wrappers.
+    """
+    print("--- Translation cache (Unix) ---")
+
+    if _build_is_win:
+        SKIP("translation cache", "Unix-only")
+        return
+    if _is_emulated or _is_cross_compiler:
+        SKIP("translation cache", "emulated/cross CI — cannot execute target binary")
+        return
+
+    zig_cc = _wrapper_dir / f"{_triplet}-zig-cc"
+    if not zig_cc.exists():
+        SKIP("translation cache", f"{zig_cc.name} not installed")
+        return
+
+    with tempfile.TemporaryDirectory() as td:
+        cache_file = Path(td) / "zig-wrapper" / "translate-v2.cache"
+
+        def _dump(extra: list[str], cache: bool = True) -> list[str]:
+            os.environ["ZIG_WRAPPER_TRANSLATE_CACHE"] = "1" if cache else "0"
+            argv, _ = dry_exec([str(zig_cc), "-c", "probe.c", *extra, "-o", "probe.o"], cwd=td, timeout=60)
+            return argv or []
+
+        def _state() -> tuple[int, int]:
+            """(header tick, occupied entries) of the cache file: the index
+            of 40-byte entries, each starting with its hash, follows the
+            64-byte header."""
+            data = cache_file.read_bytes()
+            _magic, sets, ways, _data_size, _r, tick = struct.unpack_from("=8sIIIIQ", data, 0)
+            occupied = sum(
+                1 for i in range(sets * ways)
+                if struct.unpack_from("=Q", data, 64 + i * 40)[0]
+            )
+            return tick, occupied
+
+        with temp_env(ZIG_GLOBAL_CACHE_DIR=td, ZIG_WRAPPER_TRANSLATE_CACHE=None,
+                      MACOSX_DEPLOYMENT_TARGET=None):
+            args = ["-O2", "-march=nocona", "-Wl,-z,relro", "-Wl,--as-needed"]
+            uncached = _dump(args, cache=False)
+            if cache_file.exists():
+                FAIL("cache off by default", "cache file created with ZIG_WRAPPER_TRANSLATE_CACHE=0")
+                return
+            PASS("cache off by default")
+
+            first = _dump(args)
+            second = _dump(args)
+            if not cache_file.exists():
+                FAIL("cache file created", str(cache_file))
+                return
+            if first == second == uncached and first:
+                PASS("cached argv identical to uncached argv")
+            else:
+                FAIL("cached argv identical to uncached argv",
+                     f"uncached={uncached} first={first} second={second}")
+
+            if _state() == (1, 1):
+                PASS("repeat invocation served from cache")
+            else:
+                FAIL("repeat invocation served from cache", f"(tick, occupied)={_state()}")
+
+            changed = _dump([*args, "-g"])
+            if changed == [*uncached[:-2], "-g", *uncached[-2:]] and _state()[1] == 2:
+                PASS("different args get their own entry")
+            else:
+                FAIL("different args get their own entry", f"argv={changed} state={_state()}")
+
+            os.environ["MACOSX_DEPLOYMENT_TARGET"] = "11.0"
+            dep_uncached = _dump(args, cache=False)
+            dep_cached = _dump(args)
+            if dep_cached == dep_uncached and _state()[1] == 3:
+                PASS("MACOSX_DEPLOYMENT_TARGET is part of the key")
+            else:
+                FAIL("MACOSX_DEPLOYMENT_TARGET is part of the key",
+                     f"uncached={dep_uncached} cached={dep_cached} state={_state()}")
+
+            size = cache_file.stat().st_size
+            if size == 64 + 64 * 8 * (40 + 8192):
+                PASS("cache file is size-bounded", f"{size} bytes")
+            else:
+                FAIL("cache file is size-bounded", f"{size} bytes")
+
+
+def test_wrapper_trace() -> None:
+    """ZIG_WRAPPER_TRACE=<dir> makes every C mux process append one JSON
+    record to <dir>/trace-<pid>.jsonl (see the tracing section of
+    recipe/building/unix_common.h), and testing/summarize_wrapper_trace.py
+    folds a directory of them into a report. Tracing must be invisible to
+    the build: the traced argv is identical to the untraced one.
+    """
+    print("--- Wrapper trace (Unix) ---")
+
+    if _build_is_win:
+        SKIP("wrapper trace", "Unix-only")
+        return
+    if _is_emulated or _is_cross_compiler:
+        SKIP("wrapper trace", "emulated/cross CI — cannot execute target binary")
+        return
+
+    zig_cc = _wrapper_dir / f"{_triplet}-zig-cc"
+    zig_ar = _wrapper_dir / f"{_triplet}-zig-ar"
+    if not zig_cc.exists():
+        SKIP("wrapper trace", f"{zig_cc.name} not installed")
+        return
+
+    with tempfile.TemporaryDirectory() as td:
+        trace_dir = Path(td) / "trace"
+        args = [str(zig_cc), "-c", "probe.c", "-O2", "-march=nocona", "-o", "probe.o"]
+        with temp_env(ZIG_WRAPPER_TRACE=None):
+            plain, _ = dry_exec(args, cwd=td, timeout=60)
+        with temp_env(ZIG_WRAPPER_TRACE=str(trace_dir)):
+            traced, _ = dry_exec(args, cwd=td, timeout=60)
+            if zig_ar.exists():
+                dry_exec([str(zig_ar), "rcs", "probe.a"], cwd=td, timeout=60)
+
+        if plain == traced and plain:
+            PASS("traced argv identical to untraced argv")
+        else:
+            FAIL("traced argv identical to untraced argv", f"plain={plain!r} traced={traced!r}")
+
+        records = []
+        for f in sorted(trace_dir.glob("trace-*.jsonl")) if trace_dir.is_dir() else []:
+            records += [json.loads(line) for line in f.read_text().splitlines()]
+        cc = [r for r in records if r.get("tool") == "cc"]
+        n_args = len(plain) - 1 if plain else None
+        if (len(cc) == 1 and cc[0]["outcome"] == "exec" and cc[0]["argc_in"] == len(args) - 1
+                and cc[0]["argc_out"] == n_args and cc[0]["steps_ns"]["translate"] > 0
+                and cc[0]["wrapper_ns"] >= sum(cc[0]["steps_ns"].values())):
+            PASS("one cc record with argv sizes and per-STEP timings")
+        else:
+            FAIL("one cc record with argv sizes and per-STEP timings", f"records={records}")
+        if zig_ar.exists():
+            if any(r.get("tool") == "ar" for r in records):
+                PASS("non-cc arms are traced too")
+            else:
+                FAIL("non-cc arms are traced too", f"records={records}")
+
+        summarizer = Path(__file__).resolve().parent / "summarize_wrapper_trace.py"
+        if not summarizer.exists():
+            SKIP("trace summarizer", f"{summarizer.name} not staged")
+            return
+        r = _run([sys.executable, str(summarizer), str(trace_dir), "--json"], timeout=60)
+        try:
+            summary = json.loads(r.stdout)
+        except ValueError:
+            summary = {}
+        if summary.get("records") == len(records) and "translate" in summary.get("steps", {}):
+            PASS("trace summarizer aggregates the records")
+        else:
+            FAIL("trace summarizer aggregates the records", f"rc={r.returncode} out={r.stdout[:300]!r}")
+
+
+# ===================================================================
+# Section 8c — Unix-only: the ten multiplexer names share one binary
+# ===================================================================
+_MUX_ARMS = {
+    "zig-cc": "cc", "zig-cxx": "c++",
+    "zig-force-load-cc": "cc", "zig-force-load-cxx": "c++",
+    "zig-ar": "ar", "zig-ranlib": "ranlib", "zig-rc": "rc",
+    "zig-windres": "rc", "zig-asm": "cc",
+    "zig-lld": "ld64.lld" if is_macos_target else "ld.lld",
+}
+
+
+def test_mux_links() -> None:
+    """install_zig_cc_wrappers() compiles zig-cc-unix.c once and hard-links
+    (else reflinks, else copies) it to the other nine names, so the package
+    and the page cache hold one binary. Each name must still dispatch on
+    basename(argv[0]): with ZIG_WRAPPER_DRY_EXEC=1 the zig subcommand in
+    argv[1] identifies the arm that ran.
+
+    Sharing is reported as a WARN rather than a FAIL when the names are
+    byte-identical copies: the package manager's link mode (copy vs
+    hard link out of the package cache) decides what lands in the env.
+    """
+    print("--- Multiplexer links (Unix) ---")
+
+    if _build_is_win:
+        SKIP("multiplexer links", "Unix-only")
+        return
+
+    paths = {name: _wrapper_dir / f"{_triplet}-{name}" for name in _MUX_ARMS}
+    missing = [p.name for p in paths.values() if not p.exists()]
+    if missing:
+        FAIL("multiplexer names installed", f"missing: {missing}")
+        return
+
+    inodes = {(p.stat().st_dev, p.stat().st_ino) for p in paths.values()}
+    if len(inodes) == 1:
+        PASS(f"all {len(paths)} multiplexer names share one inode")
+    elif len({p.read_bytes() for p in paths.values()}) == 1:
+        WARN(f"all {len(paths)} multiplexer names share one inode",
+             f"{len(inodes)} inodes holding identical bytes (copied on install)")
+    else:
+        FAIL(f"all {len(paths)} multiplexer names share one inode",
+             f"{len(inodes)} inodes with differing contents")
+
+    if _is_emulated or _is_cross_compiler:
+        SKIP("multiplexer dispatch", "emulated/cross CI — cannot execute target binary")
+        return
+
+    wrong = []
+    names = list(_MUX_ARMS)
+    for name, (argv, _) in zip(names, dry_exec_many([[str(paths[n]), "mux-probe"] for n in names])):
+        argv = argv or []
+        if len(argv) < 3 or argv[1] != _MUX_ARMS[name] or argv[-1] != "mux-probe":
+            wrong.append(f"{name}: {argv[:3]}")
+    if wrong:
+        FAIL("each multiplexer name dispatches on basename(argv[0])", "; ".join(wrong))
+    else:
+        PASS("each multiplexer name dispatches on basename(argv[0])", f"{len(_MUX_ARMS)} arms")
+
+
 # ===================================================================
 # Section 9 — Unix-only: wrapper executability under emulation
 # ===================================================================
@@ -1385,7 +1734,43 @@ def test_wrapper_exec_under_emulation() -> None:
 # ===================================================================
 # Main
 # ===================================================================
-def main() -> int:
+def _default_jobs() -> int:
+    # Under qemu-user zig's linker already runs close to OOM: one at a time.
+    if _is_emulated:
+        return 1
+    return int(os.environ.get("CPU_COUNT") or os.cpu_count() or 1)
+
+
+def _warm_links() -> list[tuple[list[str], str, str]]:
+    """The links prewarm_zig_cache() runs before the tests: a C and a C++
+    exe through the wrappers, i.e. the runtimes every linking test needs.
+    None when linking tests skip (emulated/cross) or there is no wrapper."""
+    zig_cc, zig_cxx = _env_var("ZIG_CC"), _env_var("ZIG_CXX")
+    if not zig_cc or _is_emulated or _is_cross_compiler:
+        return []
+    exe_suffix = ".exe" if is_win_target else ""
+    links = [([zig_cc], "c", f"warm-c{exe_suffix}")]
+    if zig_cxx:
+        links.append(([zig_cxx], "c++", f"warm-cxx{exe_suffix}"))
+    return links
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=_default_jobs(),
+                        help="tests run in parallel worker processes (default CPU_COUNT; 1 under emulation)")
+    report_dir = os.environ.get("ZIG_TEST_REPORT_DIR")
+    parser.add_argument("--json", default=report_dir and os.path.join(report_dir, "test_zig_toolchain.json"),
+                        help="write per-test timings and results as JSON (default: $ZIG_TEST_REPORT_DIR/...)")
+    parser.add_argument("--junit", default=report_dir and os.path.join(report_dir, "test_zig_toolchain.xml"),
+                        help="write a JUnit XML report (default: $ZIG_TEST_REPORT_DIR/...)")
+    parser.add_argument("--costs", metavar="REPORT",
+                        help="earlier JSON report whose timings order the parallel run heaviest first "
+                             "(default: the --json report of the previous run, if present)")
+    args = parser.parse_args(argv)
+    costs = load_test_costs(args.costs or args.json)
+    calibrate_timeouts()
+
     print(f"=== Zig Toolchain Tests ===")
     print(f"  CONDA_ZIG_HOST  = {_host!r}")
     print(f"  CONDA_ZIG_BUILD = {_build_zig!r}")
@@ -1394,6 +1779,8 @@ def main() -> int:
     print(f"  cross-compiler  = {_is_cross_compiler}")
     print(f"  build OS        = {sys.platform}")
     print(f"  wrapper dir     = {_wrapper_dir}")
+    print(f"  jobs            = {args.jobs}")
+    print(f"  timeout scale   = {describe_calibration()}")
     print()
 
     # Overlay patched native zig if stashed by build (BUILD_NATIVE_ZIG=true)
@@ -1406,23 +1793,42 @@ def main() -> int:
             os.chmod(str(zig_bin), 0o755)
             print(f"  [patched] Overlaid {zig_bin} with locally-built native zig")
 
-    test_wrapper_existence()
-    test_activation_variables()
-    test_flag_filter_content()
-    test_force_load_wrappers()
-    test_wrapper_shebang_portability()
-    test_wrapper_exec_under_emulation()
-    test_flag_filtering()
-    test_target_override()
-    test_shared_lib()
-    test_exe_linking()
-    test_libc_linking()
-    test_windows_import_libs()
-    test_win_arm64_entry_point()
-    test_print_search_dirs()
-    test_mingw_prebuilt_import_libs()
-    test_visibility()
-    test_lld_dispatch()
+    links = _warm_links()
+    warm = prewarm_zig_cache(links, jobs=args.jobs) if links else None
+    run_tests(
+        [
+            test_wrapper_existence,
+            test_activation_variables,
+            test_flag_filter_content,
+            test_force_load_wrappers,
+            test_translate_cache,
+            test_wrapper_trace,
+            test_mux_links,
+            test_wrapper_shebang_portability,
+            test_wrapper_exec_under_emulation,
+            test_flag_filtering,
+            test_target_override,
+            test_shared_lib,
+            test_exe_linking,
+            test_libc_linking,
+            test_windows_import_libs,
+            test_win_arm64_entry_point,
+            test_print_search_dirs,
+            test_mingw_prebuilt_import_libs,
+            test_visibility,
+            test_lld_dispatch,
+        ],
+        jobs=args.jobs,
+        # Its STEP 10b time budget must not share the CPU with other tests.
+        serial=(test_force_load_wrappers,),
+        cost=costs,
+    )
+
+    print_slowest()
+    if args.json or args.junit:
+        write_reports("test_zig_toolchain", json_path=args.json, junit_path=args.junit,
+                      meta={"host": _host, "build": _build_zig, "jobs": args.jobs, "emulated": _is_emulated,
+                            "warm": warm})
 
     print()
     n_pass = len(_results["PASS"])